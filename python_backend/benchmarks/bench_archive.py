@@ -0,0 +1,111 @@
+"""Cold archive: archive throughput, size on disk and archived-range query latency
+
+Seeds N audit logs spread over 12 months (plus N/5 payments) into a
+SQLite database, then reports:
+  - the archive pass that moves the oldest 6 months to Parquet (rows/s),
+  - the database size before (after VACUUM) and the archive's size,
+  - get_user_action_history and generate_regulatory_report latency for a
+    hot month, an archived month, and a year spanning both.
+
+Usage: python -m benchmarks.bench_archive [--logs 1000000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, text
+
+from benchmarks.bench_audit_retention import START, database, seed
+from src.models.payment import Payment, PaymentStatus, PaymentType
+from src.repositories.audit_log_partitions import AuditLogPartitions
+from src.repositories.cold_archive import ColdArchive
+from src.services.archive_service import Archiver
+from src.services.audit_service import AuditService
+
+def seed_payments(factory, payments: int):
+    rng = random.Random(9)
+    db = factory()
+    batch = []
+    for n in range(payments):
+        batch.append({
+            'payment_id': f"p{n}", 'user_id': f"u{rng.randrange(50000)}", 'payment_type': PaymentType.DEPOSIT,
+            'amount': round(rng.uniform(1, 500), 2), 'currency': 'CCD', 'status': PaymentStatus.COMPLETED,
+            'created_at': START + timedelta(seconds=rng.uniform(0, 365 * 86400))
+        })
+        if len(batch) == 20000:
+            db.execute(insert(Payment), batch)
+            batch = []
+    if batch:
+        db.execute(insert(Payment), batch)
+    db.commit()
+    db.close()
+
+def size_mb(path: str) -> float:
+    if os.path.isfile(path):
+        return os.path.getsize(path) / 1e6
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names) / 1e6
+
+def latency_ms(call, runs: int = 10) -> float:
+    timings = []
+    for n in range(runs):
+        start = time.perf_counter()
+        asyncio.run(call(n))
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def queries(factory, archive: ColdArchive, label: str):
+    db = factory()
+    service = AuditService(db, archive)
+    for name, start, end in (('hot month     ', datetime(2025, 11, 1), datetime(2025, 11, 30, 23, 59, 59)),
+                             ('archived month', datetime(2025, 3, 1), datetime(2025, 3, 31, 23, 59, 59)),
+                             ('whole year    ', datetime(2025, 1, 1), datetime(2025, 12, 31, 23, 59, 59))):
+        history = latency_ms(lambda n: service.get_user_action_history(f"u{n * 997}", (start, end)))
+        report = latency_ms(lambda n: service.generate_regulatory_report(f"op{n}", 'custom', start, end), runs=5)
+        print(f"  {label} {name} user history {history:7.1f} ms, operator report {report:7.1f} ms")
+    db.close()
+
+def run(logs: int):
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'archive.db')
+    engine, factory = database(directory, 'archive.db')
+    archive = ColdArchive(os.path.join(directory, 'archive'))
+
+    start = time.perf_counter()
+    seed(factory, logs)
+    seed_payments(factory, logs // 5)
+    with engine.connect() as connection:
+        connection.execute(text("CREATE INDEX ix_bench_user_time ON audit_logs (user_id, timestamp)"))
+        connection.commit()
+    print(f"seeded {logs} audit logs and {logs // 5} payments in {time.perf_counter() - start:.1f} s")
+    queries(factory, archive, 'all in database:')
+
+    with engine.connect() as connection:
+        connection.execute(text("VACUUM"))
+    before = size_mb(path)
+    archiver = Archiver(factory, archive, AuditLogPartitions(enabled=False), hot_months=6)
+    start = time.perf_counter()
+    result = archiver.run_once(datetime(2026, 1, 10))
+    elapsed = time.perf_counter() - start
+    moved = sum(rows for months in result['archived'].values() for rows in months.values())
+    with engine.connect() as connection:
+        connection.execute(text("VACUUM"))
+    print(f"archived {moved} rows ({len(result['archived'])} tables) in {elapsed:.1f} s, {moved / elapsed:,.0f} rows/s")
+    print(f"database {before:.0f} MB -> {size_mb(path):.0f} MB, archive {size_mb(archive.root):.0f} MB "
+          f"for the {moved} archived rows")
+    queries(factory, archive, 'after archive: ')
+    shutil.rmtree(directory)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logs", type=int, default=1000000)
+    args = parser.parse_args()
+    run(args.logs)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Audit log retention and range queries, unpartitioned vs monthly partitions
+
+Seeds N audit logs spread over 12 months into two SQLite databases, one
+with everything in audit_logs and one with a table per month, then
+reports:
+  - a one-month operator report query (get_logs_by_operator) on both,
+  - removing the oldest 6 months: the old single DELETE, the chunked
+    DELETE (longest chunk = longest the write lock is held), and dropping
+    the month partitions.
+
+Usage: python -m benchmarks.bench_audit_retention [--logs 1000000]
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.schema import create_schema
+from src.models.audit_log import AuditLog
+from src.repositories.audit_log_partitions import AuditLogPartitions, month_start
+from src.repositories.audit_log_repository import AuditLogRepository
+
+START = datetime(2025, 1, 1)
+ACTIONS = ('session_started', 'session_ended', 'payment_deposit', 'payment_withdrawal', 'limit_set', 'login')
+
+def rows(logs: int):
+    rng = random.Random(5)
+    for n in range(logs):
+        yield {
+            'log_id': f"l{n}", 'timestamp': START + timedelta(seconds=rng.uniform(0, 365 * 86400)),
+            'action_type': rng.choice(ACTIONS), 'user_id': f"u{rng.randrange(50000)}",
+            'operator_id': f"op{rng.randrange(20)}", 'platform_id': 'web', 'ip_address': '10.0.0.1',
+            'details': {'amount': round(rng.uniform(1, 500), 2)}, 'result': 'success'
+        }
+
+def seed(factory: sessionmaker, logs: int, partitions: AuditLogPartitions = None):
+    db = factory()
+    batches = {}
+    for row in rows(logs):
+        table = AuditLog.__table__ if partitions is None else partitions.table(row['timestamp'])
+        batch = batches.setdefault(table, [])
+        batch.append(row)
+        if len(batch) == 20000:
+            if partitions is not None:
+                partitions.ensure(db, row['timestamp'])
+            db.execute(insert(table), batch)
+            batches[table] = []
+    for table, batch in batches.items():
+        if batch:
+            if partitions is not None:
+                partitions.ensure(db, batch[0]['timestamp'])
+            db.execute(insert(table), batch)
+    db.commit()
+    db.close()
+
+def database(directory: str, name: str):
+    engine = create_engine(f"sqlite:///{os.path.join(directory, name)}")
+    create_schema(engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def report_ms(factory: sessionmaker, partitions: AuditLogPartitions, runs: int = 20) -> float:
+    db = factory()
+    repository = AuditLogRepository(db, partitions)
+    timings = []
+    for n in range(runs):
+        start = time.perf_counter()
+        repository.get_logs_by_operator(f"op{n % 20}", datetime(2025, 9, 1), datetime(2025, 9, 30, 23, 59, 59))
+        timings.append((time.perf_counter() - start) * 1000)
+    db.close()
+    return statistics.median(timings)
+
+def statement_timer(engine, timings: list):
+    event.listen(engine, 'before_cursor_execute', lambda conn, *args: conn.info.__setitem__('started', time.perf_counter()))
+    event.listen(engine, 'after_cursor_execute', lambda conn, cursor, statement, *args: statement.startswith(('DELETE', 'DROP'))
+                 and timings.append((time.perf_counter() - conn.info['started']) * 1000))
+
+def run(logs: int):
+    directory = tempfile.mkdtemp()
+    flat_engine, flat = database(directory, 'flat.db')
+    parted_engine, parted = database(directory, 'partitioned.db')
+    unpartitioned, partitions = AuditLogPartitions(enabled=False), AuditLogPartitions(enabled=True)
+
+    start = time.perf_counter()
+    seed(flat, logs)
+    seed(parted, logs, partitions)
+    shutil.copy(os.path.join(directory, 'flat.db'), os.path.join(directory, 'flat_copy.db'))
+    print(f"seeded {logs} audit logs twice in {time.perf_counter() - start:.1f} s")
+    print(f"one-month report   unpartitioned {report_ms(flat, unpartitioned):.1f} ms, "
+          f"partitioned {report_ms(parted, partitions):.1f} ms")
+
+    cutoff = month_start(START + timedelta(days=6 * 31))
+    copy_engine, copy = database(directory, 'flat_copy.db')
+    db = copy()
+    start = time.perf_counter()
+    deleted = db.query(AuditLog).filter(AuditLog.timestamp < cutoff).delete()
+    db.commit()
+    db.close()
+    print(f"single DELETE      {deleted} rows, write lock held {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    for label, engine, factory, layout in (('chunked DELETE    ', flat_engine, flat, unpartitioned),
+                                           ('partition drop    ', parted_engine, parted, partitions)):
+        timings = []
+        statement_timer(engine, timings)
+        db = factory()
+        start = time.perf_counter()
+        deleted = AuditLogRepository(db, layout).delete_old_logs(cutoff)
+        elapsed = time.perf_counter() - start
+        db.close()
+        print(f"{label} {deleted} rows in {elapsed * 1000:.0f} ms over {len(timings)} statements, "
+              f"longest {max(timings):.1f} ms")
+    shutil.rmtree(directory)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logs", type=int, default=1000000)
+    args = parser.parse_args()
+    run(args.logs)
+
+if __name__ == "__main__":
+    main()
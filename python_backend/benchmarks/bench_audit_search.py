@@ -0,0 +1,142 @@
+"""Audit search: full-text, detail column and ip_address lookups, cursor paging
+
+Seeds N audit logs over 12 months (reasons, nested details, a few
+thousand IP addresses) into a SQLite database, builds the search index
+with backfill(), then reports median latency of:
+  - a word in reason or details: LIKE over reason and the details JSON
+    vs the FTS5 index,
+  - details game_id / amount range: json_extract() scan vs the indexed
+    detail_* columns,
+  - one ip_address: full scan (NOT INDEXED) vs the ip_address index,
+  - a page 2,000 results deep: OFFSET vs the keyset cursor.
+
+Usage: python -m benchmarks.bench_audit_search [--logs 1000000]
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.schema import create_schema
+from src.models.audit_log import AuditLog, searched_details
+from src.repositories.audit_log_partitions import AuditLogPartitions
+from src.repositories.audit_log_repository import AuditLogRepository, encode_cursor
+from src.repositories.audit_search import AuditSearchIndex
+
+START = datetime(2025, 1, 1)
+ACTIONS = ('session_started', 'session_ended', 'payment_deposit', 'payment_withdrawal', 'limit_set', 'login')
+REASONS = (None, None, None, 'Deposit approved', 'Withdrawal requested by player', 'Limit raised after cooling-off',
+           'Session closed by reality check', 'Manual review of large withdrawal')
+
+def rows(logs: int):
+    rng = random.Random(11)
+    for n in range(logs):
+        details = {'game_id': f"game_{rng.randrange(300)}", 'amount': round(rng.uniform(1, 500), 2),
+                   'concordium_id': f"ccd_{rng.randrange(50000)}",
+                   'payment': {'method': rng.choice(('wallet', 'card', 'bank_transfer')), 'currency': 'CCD'}}
+        reason = rng.choice(REASONS)
+        if rng.random() < 0.001:
+            reason = 'Chargeback dispute opened'
+        yield {
+            'log_id': f"l{n:08d}", 'timestamp': START + timedelta(seconds=rng.uniform(0, 365 * 86400)),
+            'action_type': rng.choice(ACTIONS), 'user_id': f"u{rng.randrange(50000)}",
+            'operator_id': f"op{rng.randrange(20)}", 'ip_address': f"10.{rng.randrange(8)}.{rng.randrange(256)}.1",
+            'reason': reason, 'details': details, 'result': 'success', **searched_details(details)
+        }
+
+def seed(factory, logs: int):
+    db = factory()
+    batch = []
+    for row in rows(logs):
+        batch.append(row)
+        if len(batch) == 20000:
+            db.execute(insert(AuditLog), batch)
+            batch = []
+    if batch:
+        db.execute(insert(AuditLog), batch)
+    db.commit()
+    db.close()
+
+def median_ms(call, runs: int = 10) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def compare(label: str, scan, indexed):
+    before, after = median_ms(scan), median_ms(indexed)
+    print(f"  {label:26} scan {before:8.1f} ms   indexed {after:6.2f} ms   ({before / after:,.1f}x)")
+
+def run(logs: int):
+    directory = tempfile.mkdtemp()
+    engine = create_engine(f"sqlite:///{os.path.join(directory, 'search.db')}")
+    create_schema(engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    start = time.perf_counter()
+    seed(factory, logs)
+    print(f"seeded {logs} audit logs in {time.perf_counter() - start:.1f} s")
+    search_index = AuditSearchIndex(enabled=True, partitions=AuditLogPartitions(enabled=False))
+    db = factory()
+    start = time.perf_counter()
+    indexed = search_index.backfill(db, 20000)
+    elapsed = time.perf_counter() - start
+    print(f"backfill indexed {indexed} logs in {elapsed:.1f} s ({indexed / elapsed:,.0f} rows/s)")
+
+    repository = AuditLogRepository(db, AuditLogPartitions(enabled=False), search_index)
+    scan = lambda sql, **params: lambda: db.execute(text(sql), params).all()
+    search = lambda **filters: lambda: repository.search_page(filters, limit=100)
+
+    compare('rare word "chargeback"',
+            scan("SELECT log_id FROM audit_logs WHERE reason LIKE :like OR details LIKE :like "
+                 "ORDER BY timestamp DESC LIMIT 101", like='%chargeback%'),
+            search(text='chargeback'))
+    compare('common word "cooling-off"',
+            scan("SELECT log_id FROM audit_logs WHERE reason LIKE :like OR details LIKE :like "
+                 "ORDER BY timestamp DESC LIMIT 101", like='%cooling-off%'),
+            search(text='cooling-off'))
+    compare('game_id',
+            scan("SELECT log_id FROM audit_logs WHERE json_extract(details, '$.game_id') = :game "
+                 "ORDER BY timestamp DESC LIMIT 101", game='game_17'),
+            search(game_id='game_17'))
+    compare('amount 499.5..500',
+            scan("SELECT log_id FROM audit_logs WHERE json_extract(details, '$.amount') BETWEEN 499.5 AND 500 "
+                 "ORDER BY timestamp DESC LIMIT 101"),
+            search(amount_min=499.5, amount_max=500))
+    compare('concordium_id',
+            scan("SELECT log_id FROM audit_logs WHERE json_extract(details, '$.concordium_id') = :ccd "
+                 "ORDER BY timestamp DESC LIMIT 101", ccd='ccd_4242'),
+            search(concordium_id='ccd_4242'))
+    compare('ip_address',
+            scan("SELECT log_id FROM audit_logs NOT INDEXED WHERE ip_address = :ip "
+                 "ORDER BY timestamp DESC LIMIT 101", ip='10.3.77.1'),
+            search(ip_address='10.3.77.1'))
+
+    depth = 2000 * 100
+    anchor = repository.search_page({}, limit=depth)[0][-1]
+    cursor = encode_cursor(anchor)
+    compare(f'page at row {depth:,}',
+            lambda: repository.db.query(AuditLog).order_by(AuditLog.timestamp.desc(), AuditLog.log_id.desc())
+            .offset(depth).limit(101).all(),
+            lambda: repository.search_page({}, limit=100, cursor=cursor))
+    db.close()
+    engine.dispose()
+    shutil.rmtree(directory)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logs", type=int, default=1000000)
+    args = parser.parse_args()
+    run(args.logs)
+
+if __name__ == "__main__":
+    main()
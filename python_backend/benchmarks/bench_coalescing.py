@@ -0,0 +1,83 @@
+"""Notification writes with and without coalescing under session polling
+
+Clients poll check_session_duration every --poll-ms, and each poll inside
+the reality-check minute sends a REALITY_CHECK, so one check turns into a
+burst of identical notifications. The bench replays that burst pattern
+(with the coalescing window scaled down to --window-s so it runs in
+seconds) through NotificationService and reports, with coalescing off and
+on:
+  - notification rows written and SQL statements executed,
+  - request-path latency of send_user_notification.
+
+Usage: python -m benchmarks.bench_coalescing [--users 500] [--seconds 5] [--poll-ms 100] [--window-s 1]
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from benchmarks.schema import create_schema
+from src.config.settings import settings
+from src.models.notification import Notification, NotificationType
+from src.services.notification_coalescer import NotificationCoalescer
+from src.services.notification_delivery_service import NotificationDeliveryPool
+from src.services.notification_service import NotificationService
+from src.utils.notification_hub import NotificationHub
+
+async def run(users: int, seconds: float, poll_ms: int, window_s: int, coalesce: bool) -> dict:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    create_schema(engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    delivery = NotificationDeliveryPool(factory, channels=[])
+    hub = NotificationHub()
+    coalescer = NotificationCoalescer(
+        factory, hub=hub, delivery=delivery, windows={'reality_check': window_s}, flush_interval=0.2
+    )
+    service = NotificationService(factory(), hub=hub, delivery=delivery, coalescer=coalescer)
+    settings.NOTIFICATION_COALESCE_ENABLED = coalesce
+
+    statements = [0]
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.__setitem__(0, statements[0] + 1))
+    coalescer.start()
+    latencies = []
+    started = time.perf_counter()
+    for poll in range(int(seconds * 1000 / poll_ms)):
+        for n in range(users):
+            start = time.perf_counter()
+            await service.send_user_notification(
+                f"u{n}", NotificationType.REALITY_CHECK,
+                {'message': 'Reality check: You have been playing for 60 minutes', 'duration': 60}
+            )
+            latencies.append((time.perf_counter() - start) * 1000)
+        # Keep to the poll schedule; a slow round just starts the next one late
+        await asyncio.sleep(max(0.0, started + (poll + 1) * poll_ms / 1000 - time.perf_counter()))
+    await coalescer.stop()
+
+    latencies.sort()
+    rows = factory().query(Notification).count()
+    return {
+        'sends': len(latencies), 'rows': rows, 'statements': statements[0],
+        'p50': latencies[len(latencies) // 2], 'p99': latencies[int(len(latencies) * 0.99)]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--poll-ms", type=int, default=100)
+    parser.add_argument("--window-s", type=int, default=1)
+    args = parser.parse_args()
+    enabled = settings.NOTIFICATION_COALESCE_ENABLED
+    try:
+        for coalesce in (False, True):
+            result = asyncio.run(run(args.users, args.seconds, args.poll_ms, args.window_s, coalesce))
+            print(f"coalescing {'on ' if coalesce else 'off'}  {result['sends']} sends -> {result['rows']} rows, "
+                  f"{result['statements']} statements, send p50 {result['p50']:.3f} ms, p99 {result['p99']:.3f} ms")
+    finally:
+        settings.NOTIFICATION_COALESCE_ENABLED = enabled
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Per-request cost of building route services
+
+Compares the previous pattern, where each handler constructs its service
+graph (PaymentService(db) builds a WalletService, two Concordium clients
+and a SmartContractService), with services resolved from the
+ServiceContainer's per-request scope. Reports wall time, allocated bytes
+and blocks (tracemalloc), and log records emitted per request.
+
+Usage: python -m benchmarks.bench_container [--requests 20000]
+"""
+import argparse
+import logging
+import time
+import tracemalloc
+
+from src.services.container import ServiceContainer
+from src.services.payment_service import PaymentService
+from src.services.session_service import SessionService
+from src.services.transaction_service import TransactionService
+from src.services.user_service import UserService
+
+class CountingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = 0
+
+    def emit(self, record):
+        self.records += 1
+
+def legacy(db):
+    """What a winnings + session + transaction + user request mix built per request"""
+    return (PaymentService(db), SessionService(db), TransactionService(db), UserService(db))
+
+def make_scoped(container):
+    def scoped(db):
+        scope = container.scope(db)
+        return (scope.payment_service, scope.session_service, scope.transaction_service, scope.user_service)
+    return scoped
+
+def measure(build, requests: int, handler: CountingHandler):
+    db = object()  # services only store the session at construction time
+    for _ in range(100):
+        build(db)
+
+    handler.records = 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        build(db)
+    elapsed = time.perf_counter() - start
+    records = handler.records
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    kept = [build(db) for _ in range(1000)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, 'filename')
+    allocated = sum(stat.size_diff for stat in stats) / len(kept)
+    blocks = sum(stat.count_diff for stat in stats) / len(kept)
+    return elapsed / requests * 1e6, allocated, blocks, records / requests
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    handler = CountingHandler()
+    logging.basicConfig(level=logging.INFO, handlers=[handler], force=True)
+
+    container = ServiceContainer()
+    results = {
+        'per-request': measure(legacy, args.requests, handler),
+        'container': measure(make_scoped(container), args.requests, handler)
+    }
+
+    print(f"{'variant':<12} {'us/req':>8} {'bytes/req':>10} {'blocks/req':>11} {'logs/req':>9}")
+    for variant, (us, allocated, blocks, logs) in results.items():
+        print(f"{variant:<12} {us:>8.1f} {allocated:>10.0f} {blocks:>11.1f} {logs:>9.2f}")
+
+if __name__ == "__main__":
+    main()
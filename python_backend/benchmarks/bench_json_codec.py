@@ -0,0 +1,177 @@
+"""Compact JSON columns: size reduction, migration time, read/write cost
+
+Seeds N audit logs (details shaped per action type) and N/10 risk
+assessments and notifications as plain JSON into a SQLite database, then
+reports:
+  - average stored bytes per details value as JSON, msgpack,
+    msgpack + zstd, and msgpack + zstd with the trained dictionaries,
+  - the database file size before and after the compactor rewrites it,
+    and how long training + rewriting took,
+  - inserting and reading back 20k audit logs with compression off and on.
+
+Usage: python -m benchmarks.bench_json_codec [--logs 200000]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import msgpack
+import zstandard
+from sqlalchemy import LargeBinary, create_engine, insert, select, text, type_coerce
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.schema import create_schema
+from src.config.settings import settings
+from src.models.audit_log import AuditLog
+from src.models.notification import Notification, NotificationStatus, NotificationType
+from src.models.risk_assessment import RiskAssessment, RiskLevel
+from src.services.json_compression_service import JsonCompactor
+from src.utils.json_codec import json_codec
+
+START = datetime(2026, 1, 1)
+AGENTS = ('Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15',
+          'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/124.0 Safari/537.36')
+
+def details(rng: random.Random, action_type: str) -> dict:
+    if action_type in ('payment_deposit', 'payment_withdrawal'):
+        return {'payment_id': f"pay_{rng.getrandbits(48):012x}", 'amount': round(rng.uniform(5, 500), 2),
+                'currency': 'CCD', 'method': rng.choice(('wallet', 'card', 'bank_transfer')),
+                'tx_hash': f"{rng.getrandbits(256):064x}", 'limits_checked': ['daily', 'weekly', 'monthly'],
+                'remaining_limit': {'daily': round(rng.uniform(0, 1000), 2), 'weekly': round(rng.uniform(0, 5000), 2)}}
+    if action_type in ('session_started', 'session_ended'):
+        return {'session_id': f"sess_{rng.getrandbits(48):012x}", 'platform_id': rng.choice(('web', 'ios', 'android')),
+                'game_id': f"game_{rng.randrange(300)}", 'duration_minutes': rng.randrange(1, 240),
+                'total_wagered': round(rng.uniform(0, 2000), 2), 'reality_checks_shown': rng.randrange(5)}
+    if action_type == 'limit_set':
+        return {'limit_type': rng.choice(('deposit', 'loss', 'wager', 'session_time')),
+                'period': rng.choice(('daily', 'weekly', 'monthly')), 'old_value': rng.randrange(100, 5000),
+                'new_value': rng.randrange(100, 5000), 'effective_from': (START + timedelta(days=rng.randrange(365))).isoformat(),
+                'cooling_off_applies': rng.random() < 0.5}
+    return {'user_agent': rng.choice(AGENTS), 'ip_country': rng.choice(('DK', 'SE', 'DE', 'MT')),
+            'two_factor': rng.random() < 0.7, 'login_method': rng.choice(('password', 'passkey', 'wallet'))}
+
+ACTIONS = ('payment_deposit', 'payment_withdrawal', 'session_started', 'session_ended', 'limit_set', 'login')
+FACTORS = ('spending_escalation', 'loss_chasing', 'excessive_time', 'late_night_gambling', 'high_frequency',
+           'limit_compliance', 'moderate_frequency', 'spending_pattern')
+ADVICE = ('Consider setting a deposit limit', 'Take regular breaks during sessions',
+          'Review your recent spending', 'Avoid gambling late at night', 'Talk to our support team')
+
+def log_rows(n: int, offset: int = 0):
+    rng = random.Random(7 + offset)
+    for i in range(n):
+        action_type = rng.choice(ACTIONS)
+        yield {'log_id': f"l{offset + i}", 'timestamp': START + timedelta(seconds=rng.uniform(0, 30 * 86400)),
+               'action_type': action_type, 'user_id': f"u{rng.randrange(20000)}", 'operator_id': f"op{rng.randrange(20)}",
+               'details': details(rng, action_type), 'result': 'success'}
+
+def seed(factory, logs: int):
+    rng = random.Random(3)
+    db = factory()
+    batch = []
+    for row in log_rows(logs):
+        batch.append(row)
+        if len(batch) == 20000:
+            db.execute(insert(AuditLog), batch)
+            batch = []
+    if batch:
+        db.execute(insert(AuditLog), batch)
+    db.execute(insert(RiskAssessment), [
+        {'assessment_id': f"r{i}", 'user_id': f"u{i}", 'risk_score': 40.0, 'risk_level': RiskLevel.MEDIUM,
+         'factors': {name: rng.choice((5, 10, 15, 20, 25, 30)) for name in rng.sample(FACTORS, rng.randrange(2, 6))},
+         'recommendations': rng.sample(ADVICE, rng.randrange(1, 4)), 'assessed_at': START}
+        for i in range(logs // 10)
+    ])
+    db.execute(insert(Notification), [
+        {'notification_id': f"n{i}", 'user_id': f"u{i}", 'notification_type': NotificationType.LIMIT_WARNING,
+         'title': 'Limit warning', 'message': 'You are close to your limit', 'priority': 'normal',
+         'status': NotificationStatus.SENT, 'created_at': START,
+         'notification_data': {'limit_type': 'deposit', 'period': 'daily', 'used': rng.randrange(100),
+                               'limit': 100, 'percentage': rng.randrange(80, 100)}}
+        for i in range(logs // 10)
+    ])
+    db.commit()
+    db.close()
+
+def value_sizes(factory):
+    db = factory()
+    values = [value for value in db.execute(select(AuditLog.details).limit(20000)).scalars()]
+    db.close()
+    plain = zstandard.ZstdCompressor(level=settings.JSON_COMPRESSION_LEVEL, write_checksum=False)
+    sizes = {
+        'JSON text': [len(json.dumps(value)) for value in values],
+        'msgpack': [len(msgpack.packb(value)) for value in values],
+        'msgpack + zstd': [len(plain.compress(msgpack.packb(value))) for value in values],
+        'msgpack + zstd + dictionary': [len(json_codec.encode('audit_logs.details', value)) for value in values],
+    }
+    for label, lengths in sizes.items():
+        print(f"  {label:28} {statistics.mean(lengths):6.1f} bytes per details value")
+
+def engine_at(path: str):
+    engine = create_engine(f"sqlite:///{path}")
+    create_schema(engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def vacuumed_mb(engine, path: str) -> float:
+    with engine.connect() as connection:
+        connection.execute(text("VACUUM"))
+    return os.path.getsize(path) / 1e6
+
+def write_read(path: str, label: str, offset: int, rows: int = 20000):
+    """Insert rows, then read their details back"""
+    engine, factory = engine_at(path)
+    db = factory()
+    start = time.perf_counter()
+    for i, row in enumerate(log_rows(rows, offset)):
+        db.add(AuditLog(**row))
+        if i % 1000 == 999:
+            db.commit()
+    db.commit()
+    write = (time.perf_counter() - start) * 1e6 / rows
+    start = time.perf_counter()
+    values = db.execute(select(AuditLog.details).where(AuditLog.log_id.like(f"l{offset // 10 ** 6}%"))).scalars().all()
+    read = (time.perf_counter() - start) * 1e6 / len(values)
+    stored = db.execute(select(type_coerce(AuditLog.details, LargeBinary)).limit(1)).scalar()
+    db.close()
+    engine.dispose()
+    print(f"  {label:15} insert {write:6.1f} us/row, read details {read:5.2f} us/row ({type(stored).__name__} stored)")
+
+def run(logs: int):
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'codec.db')
+    engine, factory = engine_at(path)
+    start = time.perf_counter()
+    seed(factory, logs)
+    print(f"seeded {logs} audit logs, {logs // 10} risk assessments and {logs // 10} notifications "
+          f"as JSON in {time.perf_counter() - start:.1f} s")
+    before = vacuumed_mb(engine, path)
+    engine.dispose()
+    write_read(os.path.join(directory, 'off.db'), 'compression off', 10 ** 7)
+
+    settings.JSON_COMPRESSION_ENABLED = True
+    engine, factory = engine_at(path)
+    start = time.perf_counter()
+    result = JsonCompactor(factory, pause=0).run_once()
+    elapsed = time.perf_counter() - start
+    rewritten = sum(result['rewritten'].values())
+    print(f"compactor trained {sum(len(names) for names in result['trained'].values())} dictionaries and rewrote "
+          f"{rewritten} values in {elapsed:.1f} s ({rewritten / elapsed:,.0f} rows/s)")
+    print(f"database {before:.1f} MB as JSON -> {vacuumed_mb(engine, path):.1f} MB compact")
+    value_sizes(factory)
+    engine.dispose()
+    write_read(os.path.join(directory, 'on.db'), 'compression on ', 2 * 10 ** 7)
+    shutil.rmtree(directory)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logs", type=int, default=200000)
+    args = parser.parse_args()
+    run(args.logs)
+
+if __name__ == "__main__":
+    main()
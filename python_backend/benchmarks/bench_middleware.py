@@ -0,0 +1,146 @@
+"""Throughput of the request middleware stack
+
+Drives a minimal FastAPI app directly through its ASGI interface (no
+HTTP client or server in the loop) so that the numbers reflect the cost
+of the middleware itself. Compares no middleware, the previous
+BaseHTTPMiddleware implementation, the current pure ASGI one and the
+pure ASGI one with metrics enabled.
+
+Usage: python -m benchmarks.bench_middleware [--requests 20000] [--concurrency 50]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+from fastapi import FastAPI, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from src.api.middleware import ErrorHandlingMiddleware, LoggingMiddleware, MetricsMiddleware
+
+logger = logging.getLogger("benchmarks.legacy_middleware")
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    """The LoggingMiddleware this benchmark replaced"""
+
+    async def dispatch(self, request: Request, call_next):
+        start_time = time.time()
+        logger.info(f"Request: {request.method} {request.url.path}")
+        try:
+            response = await call_next(request)
+            process_time = time.time() - start_time
+            logger.info(f"Completed: {request.method} {request.url.path} - {response.status_code} - {process_time:.3f}s")
+            return response
+        except Exception as e:
+            logger.error(f"Error processing request: {str(e)}")
+            raise
+
+class LegacyErrorHandlingMiddleware(BaseHTTPMiddleware):
+    """The ErrorHandlingMiddleware this benchmark replaced"""
+
+    async def dispatch(self, request: Request, call_next):
+        try:
+            return await call_next(request)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Unhandled error: {str(e)}", exc_info=True)
+            return JSONResponse(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                content={"error": "An internal error occurred"}
+            )
+
+def build_app(variant: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/ping")
+    async def ping():
+        return {"status": "ok"}
+
+    if variant == "legacy":
+        app.add_middleware(LegacyLoggingMiddleware)
+        app.add_middleware(LegacyErrorHandlingMiddleware)
+    elif variant in ("asgi", "metrics"):
+        app.add_middleware(LoggingMiddleware)
+        app.add_middleware(ErrorHandlingMiddleware)
+    if variant == "metrics":
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+async def call(app, path: str = "/api/v1/ping") -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    status_code = 0
+    messages = [{"type": "http.disconnect"}, {"type": "http.request", "body": b"", "more_body": False}]
+
+    async def receive():
+        if len(messages) > 1:
+            return messages.pop()
+        # Like a server, block until the client goes away
+        await asyncio.sleep(3600)
+        return messages[0]
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+
+    await app(scope, receive, send)
+    return status_code
+
+async def run(variant: str, requests: int, concurrency: int) -> float:
+    app = build_app(variant)
+    # Warm up route matching and middleware stack construction
+    for _ in range(200):
+        await call(app)
+
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await call(app)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return requests / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    # Log at INFO to a real (discarded) stream, as a deployed worker would
+    handler = logging.StreamHandler(open(os.devnull, "w"))
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    logging.basicConfig(level=logging.INFO, handlers=[handler], force=True)
+
+    results = {}
+    for variant in ("none", "legacy", "asgi", "metrics"):
+        results[variant] = asyncio.run(run(variant, args.requests, args.concurrency))
+
+    baseline = results["none"]
+    print(f"{'variant':<8} {'req/s':>10} {'overhead/req':>14}")
+    for variant, rps in results.items():
+        overhead_us = (1 / rps - 1 / baseline) * 1e6
+        print(f"{variant:<8} {rps:>10.0f} {overhead_us:>12.1f}us")
+    print(f"asgi vs legacy: {results['asgi'] / results['legacy']:.2f}x throughput")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Notification send latency and delivery worker throughput
+
+Runs against the local SMTP sink and SMS/push gateway sink. Reports:
+  - request-path latency of NotificationService.send_user_notification
+    with the old insert-then-mark-sent path, with delivery done inline in
+    the request, and queued for the worker pool (the current path),
+  - how fast the worker pool drains a backlog for a few worker counts,
+    with a slow gateway and some injected failures. The sinks run in
+    this process, so SMTP throughput is bound by the interpreter rather
+    than by the network.
+
+Usage: python -m benchmarks.bench_notification_delivery [--notifications 2000] [--gateway-latency-ms 20]
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from benchmarks.notification_sinks import GatewaySink, SmtpSink
+from benchmarks.schema import create_schema
+from src.models.notification import Notification, NotificationStatus, NotificationType
+from src.repositories.notification_repository import NotificationRepository
+from src.services.notification_channels import EmailChannel, GatewayChannel
+from src.services.notification_delivery_service import NotificationDeliveryPool
+from src.services.notification_service import NotificationService
+from src.utils.notification_hub import NotificationHub
+
+def session_factory() -> sessionmaker:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    create_schema(engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def recipient(n: int) -> dict:
+    return {'email': f"player{n}@example.com", 'push_token': f"tok{n}", 'phone': f"+4670000{n:04d}"}
+
+async def send_latency(channels, requests: int):
+    """Per-request milliseconds for the old path, inline delivery and the queued path"""
+    factory = session_factory()
+    pool = NotificationDeliveryPool(factory, channels=channels)
+    service = NotificationService(factory(), hub=NotificationHub(), delivery=pool)
+    repository = service.notification_repository
+    results = {}
+
+    async def old_path(n):
+        created = (await service.send_user_notification(f"u{n}", NotificationType.REALITY_CHECK, recipient(n)))['notification']
+        notification = repository.get_notification(created['notification_id'])
+        notification.mark_as_sent()
+        repository.update_notification(notification)
+
+    async def inline_delivery(n):
+        created = (await service.send_user_notification(f"u{n}", NotificationType.REALITY_CHECK, recipient(n)))['notification']
+        notification = repository.get_notification(created['notification_id'])
+        await asyncio.gather(*(channel.send_batch([notification]) for channel in channels))
+        notification.mark_as_sent()
+        repository.update_notification(notification)
+
+    async def queued(n):
+        await service.send_user_notification(f"u{n}", NotificationType.REALITY_CHECK, recipient(n))
+
+    for name, send in (('old (mark sent)', old_path), ('inline delivery', inline_delivery), ('queued', queued)):
+        latencies = []
+        for n in range(requests):
+            start = time.perf_counter()
+            await send(n)
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        results[name] = (latencies[len(latencies) // 2] * 1000, latencies[int(len(latencies) * 0.99)] * 1000)
+    return results
+
+async def drain(channels, notifications: int, workers: int, batch_size: int):
+    factory = session_factory()
+    db = factory()
+    db.add_all(
+        Notification(
+            notification_id=f"n{n}", user_id=f"u{n}", notification_type=NotificationType.REALITY_CHECK,
+            title='Reality check', message='Here are your current session statistics',
+            status=NotificationStatus.PENDING, notification_data=recipient(n)
+        )
+        for n in range(notifications)
+    )
+    db.commit()
+    pool = NotificationDeliveryPool(factory, channels=channels, workers=workers, batch_size=batch_size,
+                                    poll_interval=0.05, backoff_seconds=3600)
+    start = time.perf_counter()
+    pool.start()
+    repository = NotificationRepository(db)
+    while True:
+        db.expire_all()
+        if not repository.db.query(Notification).filter(
+            Notification.status == NotificationStatus.PENDING, Notification.attempts == 0
+        ).count():
+            break
+        await asyncio.sleep(0.01)
+    seconds = time.perf_counter() - start
+    await pool.stop()
+    sent = db.query(Notification).filter(Notification.status == NotificationStatus.SENT).count()
+    db.close()
+    return seconds, sent
+
+async def run(args):
+    with SmtpSink(error_rate=args.error_rate, seed=1) as smtp, \
+            GatewaySink(error_rate=args.error_rate, latency_ms=args.gateway_latency_ms, seed=1) as gateway:
+        channels = [
+            EmailChannel(host=smtp.host, port=smtp.port, sender='noreply@example.com'),
+            GatewayChannel('sms', 'phone', gateway.url + '/sms'),
+            GatewayChannel('push', 'push_token', gateway.url + '/push')
+        ]
+        print(f"send path ({args.requests} requests, gateway latency {args.gateway_latency_ms:.0f} ms)")
+        for name, (p50, p99) in (await send_latency(channels, args.requests)).items():
+            print(f"  {name:<16} p50 {p50:7.2f} ms   p99 {p99:7.2f} ms")
+
+        print(f"drain {args.notifications} notifications (error rate {args.error_rate:.0%}, batch {args.batch_size})")
+        print(f"  {'channels':<13} {'workers':>7} {'seconds':>8} {'sent':>6} {'per second':>11}")
+        for label, selected in (('push gateway', channels[2:]), ('all three', channels)):
+            for workers in (1, 2, 4, 8):
+                seconds, sent = await drain(selected, args.notifications, workers, args.batch_size)
+                print(f"  {label:<13} {workers:>7} {seconds:>8.2f} {sent:>6} {args.notifications / seconds:>11.0f}")
+
+        for channel in channels:
+            await channel.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notifications", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--gateway-latency-ms", type=float, default=20.0)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
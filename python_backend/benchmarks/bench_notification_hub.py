@@ -0,0 +1,121 @@
+"""Notification hub at tens of thousands of idle connections
+
+Opens N subscriptions, each with a task parked in Subscription.next() the
+way an SSE or WebSocket handler waits between events. Reports:
+  - memory the hub holds per idle connection,
+  - time to subscribe everyone, and to cancel their handlers and unsubscribe,
+  - publish-to-wakeup latency for one user while every other connection
+    stays idle,
+  - the cost of answering an unread-count poll from the database versus
+    from the hub's in-memory counter.
+
+Usage: python -m benchmarks.bench_notification_hub [--connections 50000]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from benchmarks.schema import create_schema
+from src.models.notification import Notification, NotificationStatus, NotificationType
+from src.repositories.notification_repository import NotificationRepository
+from src.utils.notification_hub import NotificationHub
+
+async def park(subscription):
+    """Drain events like a connection handler with a very long heartbeat"""
+    while True:
+        await subscription.next(3600)
+
+def unread_poll_cost(polls: int):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    create_schema(engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all(
+        Notification(
+            notification_id=f"n{n}", user_id=f"u{n % 500}", notification_type=NotificationType.REALITY_CHECK,
+            title='Reality check', message='...', status=NotificationStatus.SENT if n % 3 else NotificationStatus.READ
+        )
+        for n in range(20000)
+    )
+    db.commit()
+    repository = NotificationRepository(db)
+    hub = NotificationHub()
+
+    start = time.perf_counter()
+    for n in range(polls):
+        repository.get_unread_count(f"u{n % 500}")
+    database_us = (time.perf_counter() - start) / polls * 1e6
+
+    start = time.perf_counter()
+    for n in range(polls):
+        hub.unread_count(f"u{n % 500}")
+    memory_us = (time.perf_counter() - start) / polls * 1e6
+    return database_us, memory_us
+
+def hub_bytes_per_connection(connections: int) -> float:
+    """Memory the hub itself holds per idle subscription (after the initial unread event is read)"""
+    hub = NotificationHub(max_connections=connections)
+    user_ids = [f"user{n}" for n in range(connections)]
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    subscriptions = [hub.subscribe(user_id, lambda: 0) for user_id in user_ids]
+    for subscription in subscriptions:
+        subscription.pending.pop()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    return sum(stat.size_diff for stat in after.compare_to(before, 'filename')) / connections
+
+async def run(connections: int, publishes: int):
+    hub_bytes = hub_bytes_per_connection(min(connections, 10000))
+    hub = NotificationHub(max_connections=connections)
+
+    start = time.perf_counter()
+    subscriptions = [hub.subscribe(f"user{n}", lambda: 0) for n in range(connections)]
+    subscribe_seconds = time.perf_counter() - start
+    tasks = [asyncio.create_task(park(subscription)) for subscription in subscriptions]
+    await asyncio.sleep(0)  # let every handler read its unread event and park in next()
+
+    latencies = []
+    for n in range(publishes):
+        subscription = subscriptions[(n * 7919) % connections]
+        start = time.perf_counter()
+        hub.publish(subscription.user_id, {'title': 'Reality check'})
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert not subscription.pending or len(subscription.pending) <= 1
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    for subscription in subscriptions:
+        hub.unsubscribe(subscription)
+    unsubscribe_seconds = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"idle connections      {connections}")
+    print(f"hub memory / idle     {hub_bytes:.0f} bytes per connection (excluding the server's own connection state)")
+    print(f"subscribe all         {subscribe_seconds * 1000:.0f} ms")
+    print(f"cancel + unsubscribe  {unsubscribe_seconds * 1000:.0f} ms")
+    print(f"publish -> wakeup     p50 {latencies[len(latencies) // 2] * 1e6:.0f} us, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:.0f} us, "
+          f"mean {statistics.mean(latencies) * 1e6:.0f} us")
+
+    database_us, memory_us = unread_poll_cost(2000)
+    print(f"unread-count poll     database {database_us:.0f} us, hub counter {memory_us:.2f} us")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", type=int, default=50000)
+    parser.add_argument("--publishes", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(run(args.connections, args.publishes))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Notification retention at millions of rows
+
+Seeds N notifications over the last 180 days for a set of users (a few
+heavy users hold thousands each), then reports:
+  - get_user_notifications / get_unread_count latency for a heavy user,
+    before and after the purge,
+  - one NotificationPurger pass: rows removed by age and by the per-user
+    cap, duration, and the longest single chunk (the longest the write
+    lock is held), next to one unbounded DELETE of the same rows.
+
+Usage: python -m benchmarks.bench_notification_retention [--notifications 1000000] [--users 20000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, delete, event, insert
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.schema import create_schema
+from src.models.notification import Notification, NotificationStatus, NotificationType
+from src.repositories.notification_repository import NotificationRepository
+from src.services.notification_retention_service import NotificationPurger
+from src.utils.notification_hub import NotificationHub
+
+TYPES = list(NotificationType)
+STATUSES = (NotificationStatus.READ, NotificationStatus.READ, NotificationStatus.SENT, NotificationStatus.DELIVERED)
+
+def seed(factory: sessionmaker, notifications: int, users: int, now: datetime):
+    rng = random.Random(11)
+    db = factory()
+    rows = []
+    for n in range(notifications):
+        # 1% of notifications go to the first ten users, so they each pass the per-user cap
+        user = rng.randrange(10) if n % 100 == 0 else rng.randrange(users)
+        rows.append({
+            'notification_id': f"n{n}", 'user_id': f"u{user}", 'notification_type': rng.choice(TYPES),
+            'title': 'Reality Check', 'message': 'You have been playing for 60 minutes',
+            'created_at': now - timedelta(seconds=rng.uniform(0, 180 * 86400)), 'status': rng.choice(STATUSES),
+            'priority': rng.choice(('normal', 'normal', 'normal', 'low', 'high')), 'attempts': 0
+        })
+        if len(rows) == 50000:
+            db.execute(insert(Notification), rows)
+            rows = []
+    if rows:
+        db.execute(insert(Notification), rows)
+    db.commit()
+    db.close()
+
+def read_latency(factory: sessionmaker, user_id: str, runs: int = 200) -> tuple:
+    db = factory()
+    repository = NotificationRepository(db)
+    lists, counts = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        repository.get_user_notifications(user_id, limit=50)
+        lists.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        repository.get_unread_count(user_id)
+        counts.append((time.perf_counter() - start) * 1000)
+    db.close()
+    return statistics.median(lists), statistics.median(counts)
+
+def copy_engine(path: str, name: str):
+    copy = os.path.join(os.path.dirname(path), name)
+    shutil.copy(path, copy)
+    return create_engine(f"sqlite:///{copy}")
+
+async def run(notifications: int, users: int):
+    path = os.path.join(tempfile.mkdtemp(), 'retention.db')
+    engine = create_engine(f"sqlite:///{path}")
+    create_schema(engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    now = datetime.utcnow()
+
+    start = time.perf_counter()
+    seed(factory, notifications, users, now)
+    print(f"seeded {notifications} notifications in {time.perf_counter() - start:.1f} s")
+    heavy = factory().query(Notification).filter(Notification.user_id == 'u0').count()
+    list_ms, count_ms = read_latency(factory, 'u0')
+    print(f"before purge    heavy user ({heavy} rows): list p50 {list_ms:.2f} ms, unread count p50 {count_ms:.2f} ms")
+
+    # Baseline: the same age policy as one unbounded DELETE per type on a copy of the database
+    baseline = copy_engine(path, 'baseline.db')
+    purger = NotificationPurger(factory, hub=NotificationHub(), pause=0)
+    start = time.perf_counter()
+    with baseline.begin() as connection:
+        for notification_type in NotificationType:
+            for priority in purger.priorities:
+                cutoff = now - timedelta(days=purger.retention_days(notification_type, priority))
+                connection.execute(delete(Notification).where(
+                    Notification.notification_type == notification_type, Notification.priority == priority,
+                    Notification.created_at < cutoff, Notification.status != NotificationStatus.PENDING
+                ))
+    print(f"single DELETE   age policy in one transaction: write lock held {(time.perf_counter() - start) * 1000:.0f} ms")
+    baseline.dispose()
+
+    chunk_ms = []
+    event.listen(engine, 'before_cursor_execute', lambda conn, *args: conn.info.__setitem__('started', time.perf_counter()))
+    event.listen(engine, 'after_cursor_execute', lambda conn, cursor, statement, *args: statement.startswith('DELETE')
+                 and chunk_ms.append((time.perf_counter() - conn.info['started']) * 1000))
+    start = time.perf_counter()
+    result = await purger.run_once(now)
+    elapsed = time.perf_counter() - start
+    print(f"purge pass      {result['expired']} expired + {result['capped']} over cap in {result['chunks']} chunks, "
+          f"{elapsed:.1f} s; chunk p50 {statistics.median(chunk_ms):.1f} ms, max {max(chunk_ms):.1f} ms")
+
+    remaining = factory().query(Notification).count()
+    heavy = factory().query(Notification).filter(Notification.user_id == 'u0').count()
+    list_ms, count_ms = read_latency(factory, 'u0')
+    print(f"after purge     {remaining} rows left; heavy user ({heavy} rows): list p50 {list_ms:.2f} ms, "
+          f"unread count p50 {count_ms:.2f} ms")
+    shutil.rmtree(os.path.dirname(path))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notifications", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(run(args.notifications, args.users))
+
+if __name__ == "__main__":
+    main()
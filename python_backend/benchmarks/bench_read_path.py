@@ -0,0 +1,121 @@
+"""CPU cost of list responses: ORM + to_dict() vs Core rows + FastJSONResponse
+
+Seeds an in-memory SQLite database with ROWS sessions, notifications,
+payments and audit log entries for one user. It then times the previous
+read path and the current one, taking both from the query to the
+encoded response body. The previous path loads ORM entities, calls
+to_dict(), runs FastAPI's jsonable_encoder and renders a JSONResponse.
+The current path uses ReadRepository row DTOs and FastJSONResponse.
+
+Usage: python -m benchmarks.bench_read_path [--rows 100] [--iterations 300]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from benchmarks.schema import benchmark_metadata
+from src.api.responses import FastJSONResponse
+from src.models.audit_log import AuditLog
+from src.models.notification import Notification, NotificationStatus, NotificationType
+from src.models.payment import Payment, PaymentStatus, PaymentType
+from src.models.session import Session as GamingSession
+from src.repositories.read_repository import ReadRepository
+
+USER_ID = 'bench-user'
+
+def seed(engine, rows: int):
+    """Insert through Core so seeding stays fast for large --rows"""
+    metadata = benchmark_metadata()
+    metadata.create_all(bind=engine)
+    tables = metadata.tables
+    rng = random.Random(1)
+    start = datetime(2025, 1, 1)
+    data = {name: [] for name in ('sessions', 'notifications', 'payments', 'audit_logs')}
+    for n in range(rows):
+        at = start + timedelta(minutes=37 * n, microseconds=rng.randrange(1_000_000))
+        data['sessions'].append(dict(
+            session_id=f"s{n}", user_id=USER_ID, platform_id='casino', start_time=at,
+            end_time=at + timedelta(minutes=rng.randrange(5, 90)), total_wagered=rng.uniform(5, 500),
+            total_won=rng.uniform(0, 400), total_lost=rng.uniform(0, 300), reality_checks_shown=rng.randrange(4),
+            currency='CCD', status='ended'
+        ))
+        data['notifications'].append(dict(
+            notification_id=f"n{n}", user_id=USER_ID, notification_type=rng.choice(list(NotificationType)),
+            title='Reality check', message='You have been playing for 60 minutes', created_at=at, sent_at=at,
+            read_at=None, status=NotificationStatus.SENT, notification_data={'session_id': f"s{n}", 'minutes': 60},
+            priority='normal'
+        ))
+        data['payments'].append(dict(
+            payment_id=f"p{n}", user_id=USER_ID, payment_type=rng.choice(list(PaymentType)), amount=rng.uniform(1, 1000),
+            currency='CCD', status=PaymentStatus.COMPLETED, tx_hash=f"{n:064x}", from_address=None,
+            to_address='3kBx' + 'a' * 46, game_id='roulette', session_id=f"s{n}", created_at=at,
+            completed_at=at + timedelta(seconds=4), error_message=None
+        ))
+        data['audit_logs'].append(dict(
+            log_id=f"a{n}", timestamp=at, action_type='transaction_recorded', user_id=USER_ID, operator_id='op1',
+            platform_id='casino', ip_address='10.0.0.1', user_agent='bench', details={'amount': 10.5, 'currency': 'CCD'},
+            result='success', reason=None, concordium_tx_hash=None
+        ))
+    with engine.begin() as conn:
+        for name, values in data.items():
+            conn.execute(tables[name].insert(), values)
+
+def legacy_paths(db, rows):
+    return {
+        'sessions': lambda: {'success': True, 'sessions': [s.to_dict() for s in db.query(GamingSession).filter(
+            GamingSession.user_id == USER_ID).order_by(GamingSession.start_time.desc()).limit(rows).all()]},
+        'notifications': lambda: {'success': True, 'notifications': [n.to_dict() for n in db.query(Notification).filter(
+            Notification.user_id == USER_ID).order_by(Notification.created_at.desc()).limit(rows).all()]},
+        'payments': lambda: {'payments': [p.to_dict() for p in db.query(Payment).filter(
+            Payment.user_id == USER_ID).order_by(Payment.created_at.desc()).limit(rows).all()]},
+        'audit': lambda: {'success': True, 'history': [a.to_dict() for a in db.query(AuditLog).filter(
+            AuditLog.user_id == USER_ID).order_by(AuditLog.timestamp.desc()).all()]}
+    }
+
+def current_paths(db, rows):
+    reads = ReadRepository(db)
+    return {
+        'sessions': lambda: {'success': True, 'sessions': reads.user_sessions(USER_ID, rows)},
+        'notifications': lambda: {'success': True, 'notifications': reads.user_notifications(USER_ID, False, rows)},
+        'payments': lambda: {'payments': reads.user_payments(USER_ID, None, rows)},
+        'audit': lambda: {'success': True, 'history': reads.user_audit_logs(USER_ID)}
+    }
+
+def cpu_per_response(render, iterations: int) -> float:
+    for _ in range(20):
+        render()
+    start = time.process_time()
+    for _ in range(iterations):
+        render()
+    return (time.process_time() - start) / iterations * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=300)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    seed(engine, args.rows)
+    db = sessionmaker(bind=engine)()
+
+    legacy = legacy_paths(db, args.rows)
+    current = current_paths(db, args.rows)
+    print(f"{'endpoint':<14} {'orm us':>9} {'core us':>9} {'speedup':>8}")
+    for name in legacy:
+        def legacy_render(build=legacy[name]):
+            JSONResponse(jsonable_encoder(build())).body
+            db.expunge_all()  # a request starts with an empty identity map
+        orm_us = cpu_per_response(legacy_render, args.iterations)
+        core_us = cpu_per_response(lambda build=current[name]: FastJSONResponse(build()).body, args.iterations)
+        print(f"{name:<14} {orm_us:>9.0f} {core_us:>9.0f} {orm_us / core_us:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
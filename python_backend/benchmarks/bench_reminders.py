@@ -0,0 +1,111 @@
+"""Reminder scheduler with millions of future reminders
+
+Seeds scheduled_notifications with N reminders spread over the next 90
+days plus a burst due in the next few seconds, then starts a
+ReminderScheduler and reports:
+  - time to load a window from the (status, due_at) index, and the
+    scheduler's memory for it, independent of N,
+  - firing lateness (fire time minus due_at) for the burst,
+  - when the last reminder of the burst fired.
+
+Usage: python -m benchmarks.bench_reminders [--reminders 1000000] [--burst 5000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.schema import create_schema
+from src.models.notification import Notification, NotificationType
+from src.models.scheduled_notification import ScheduledNotification, ScheduledStatus
+from src.services.notification_delivery_service import NotificationDeliveryPool
+from src.services.reminder_service import ReminderScheduler
+from src.utils.notification_hub import NotificationHub
+
+def seed(factory: sessionmaker, reminders: int, burst: int) -> datetime:
+    """Insert the reminders, then a burst due over 2 s starting 3 s from now; returns the burst start"""
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    db = factory()
+    rows = []
+
+    def row(n: int, due_at: datetime) -> dict:
+        return {
+            'schedule_id': f"r{n}", 'user_id': f"u{n % 100000}", 'notification_type': NotificationType.WELLNESS_TIP,
+            'title': 'Reminder', 'message': 'You have a scheduled reminder', 'notification_data': {},
+            'priority': 'normal', 'due_at': due_at, 'status': ScheduledStatus.SCHEDULED, 'created_at': now
+        }
+
+    for n in range(reminders):
+        rows.append(row(n, now + timedelta(hours=1, seconds=rng.uniform(0, 90 * 86400))))
+        if len(rows) == 50000:
+            db.execute(insert(ScheduledNotification), rows)
+            rows = []
+    if rows:
+        db.execute(insert(ScheduledNotification), rows)
+    db.commit()
+    burst_start = datetime.utcnow() + timedelta(seconds=3)
+    db.execute(insert(ScheduledNotification), [
+        row(reminders + n, burst_start + timedelta(seconds=rng.uniform(0, 2))) for n in range(burst)
+    ])
+    db.commit()
+    db.close()
+    return burst_start
+
+async def run(reminders: int, burst: int):
+    path = os.path.join(tempfile.mkdtemp(), 'reminders.db')
+    engine = create_engine(f"sqlite:///{path}")
+    create_schema(engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    start = time.perf_counter()
+    burst_start = seed(factory, reminders, burst)
+    print(f"seeded {reminders + burst} reminders in {time.perf_counter() - start:.1f} s")
+
+    delivery = NotificationDeliveryPool(factory, channels=[])
+    scheduler = ReminderScheduler(factory, hub=NotificationHub(), delivery=delivery, window_seconds=60)
+    start = time.perf_counter()
+    result = scheduler.run_once()
+    window_ms = (time.perf_counter() - start) * 1000
+
+    probe = ReminderScheduler(factory, hub=NotificationHub(), delivery=delivery, window_seconds=60)
+    tracemalloc.start()
+    probe.run_once()
+    heap_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"window load     {result['loaded']} reminders in {window_ms:.1f} ms, {heap_bytes / 1024:.0f} KiB held")
+
+    scheduler.start()
+    db = factory()
+    while db.query(Notification).count() < burst:
+        await asyncio.sleep(0.1)
+    await scheduler.stop()
+
+    lateness = sorted(
+        (created_at - due_at).total_seconds() * 1000
+        for created_at, due_at in db.query(Notification.created_at, ScheduledNotification.due_at)
+        .join(ScheduledNotification, ScheduledNotification.schedule_id == Notification.notification_id)
+    )
+    fired_span = (max(n.created_at for n in db.query(Notification.created_at)) - burst_start).total_seconds()
+    db.close()
+    print(f"firing lateness p50 {lateness[len(lateness) // 2]:.1f} ms, p99 {lateness[int(len(lateness) * 0.99)]:.1f} ms, "
+          f"max {lateness[-1]:.1f} ms")
+    print(f"burst           {burst} reminders due over 2 s, last fired {fired_span:.2f} s after the first was due")
+    os.remove(path)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reminders", type=int, default=1000000)
+    parser.add_argument("--burst", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run(args.reminders, args.burst))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Database round trips on the deposit, session-start and account paths
+
+Runs each path against an in-memory SQLite database, with a Concordium
+client that answers immediately. For each path it counts statements and
+COMMITs, which is the number of round trips to the database server on a
+networked backend. The wallet cache is cleared before every run, so the
+counts are cold-cache worst cases.
+
+Usage: python -m benchmarks.bench_round_trips [--runs 200]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from benchmarks.schema import create_schema
+from src.models.session import Session as GamingSession
+from src.models.user import User
+from src.models.wallet import Wallet
+from src.services.payment_service import PaymentService
+from src.services.session_service import SessionService
+from src.services.smart_contract_service import SmartContractService
+from src.services.user_service import UserService
+from src.services.wallet_service import WalletService
+from src.utils.cache import clear_caches
+
+class InstantBlockchainService:
+    async def transfer_funds(self, from_address: str, to_address: str, amount: float):
+        return {'success': True, 'tx_hash': 'ab' * 32}
+
+class RoundTripCounter:
+    def __init__(self, engine):
+        self.statements = 0
+        self.commits = 0
+        event.listen(engine, 'before_cursor_execute', self._statement)
+        event.listen(engine, 'commit', self._commit)
+
+    def _statement(self, *args):
+        self.statements += 1
+
+    def _commit(self, conn):
+        self.commits += 1
+
+    def reset(self):
+        self.statements = self.commits = 0
+
+def seed(factory):
+    db = factory()
+    user = User(wallet_address='3kBx' + 'a' * 46, age_verified=True)
+    db.add(user)
+    db.commit()
+    db.add(Wallet(wallet_id='w1', user_id=str(user.id), concordium_address=user.wallet_address, balance=0.0))
+    db.commit()
+    user_id = str(user.id)
+    db.close()
+    return user_id
+
+def make_paths(factory, user_id: str):
+    blockchain = InstantBlockchainService()
+    contracts = SmartContractService()
+
+    async def deposit(db):
+        wallets = WalletService(db, blockchain_service=blockchain)
+        result = await PaymentService(
+            db, wallet_service=wallets, blockchain_service=blockchain, contract_service=contracts
+        ).deposit(user_id, 10.0)
+        assert result['success'], result
+
+    async def session_start(db):
+        result = await SessionService(db).start_session(user_id, 'casino')
+        assert result['success'], result
+
+    def end_sessions(db):
+        # leave the user with ended sessions outside the mandatory break, as after a normal day of play
+        db.query(GamingSession).filter(GamingSession.user_id == user_id).update({'status': 'ended', 'end_time': None})
+        db.commit()
+
+    async def separate_reads(db):
+        """How a user + wallet + active session read looked before the relationships"""
+        user = await UserService(db, blockchain_service=blockchain).get_user(user_id)
+        wallet = await WalletService(db, blockchain_service=blockchain).get_wallet(user_id)
+        active = SessionService(db).session_repository.get_active_session(user_id)
+        assert user['success'] and wallet['success'] and active is not None
+
+    async def joined_read(db):
+        result = await UserService(db, blockchain_service=blockchain).get_account(user_id)
+        assert result['success'] and result['active_session'] is not None, result
+
+    def start_session(db):
+        db.add(GamingSession(session_id=str(uuid.uuid4()), user_id=user_id, platform_id='casino', status='active'))
+        db.commit()
+
+    return {
+        'deposit': (deposit, None, None),
+        'session start': (session_start, None, end_sessions),
+        'account 3x': (separate_reads, start_session, end_sessions),
+        'account join': (joined_read, start_session, end_sessions)
+    }
+
+async def measure(factory, path, setup, teardown, counter: RoundTripCounter, runs: int):
+    statements = commits = 0
+    elapsed = 0.0
+    for _ in range(runs):
+        clear_caches()
+        db = factory()
+        if setup:
+            setup(db)
+        counter.reset()
+        start = time.perf_counter()
+        await path(db)
+        elapsed += time.perf_counter() - start
+        statements += counter.statements
+        commits += counter.commits
+        if teardown:
+            teardown(db)
+        db.close()
+    return statements / runs, commits / runs, elapsed / runs * 1e6
+
+async def run(runs: int):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    create_schema(engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    user_id = seed(factory)
+    counter = RoundTripCounter(engine)
+
+    print(f"{'path':<14} {'statements':>10} {'commits':>8} {'round trips':>12} {'us':>8}")
+    for name, (path, setup, teardown) in make_paths(factory, user_id).items():
+        statements, commits, us = await measure(factory, path, setup, teardown, counter, runs)
+        print(f"{name:<14} {statements:>10.1f} {commits:>8.1f} {statements + commits:>12.1f} {us:>8.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.runs))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Wallet balance sync against a slow or flaky chain
+
+Seeds an in-memory SQLite database with stale wallets and runs one
+WalletSyncScheduler cycle against the local Concordium stand-in for
+each latency / error-rate profile.
+
+Usage: python -m benchmarks.bench_wallet_sync [--wallets 500] [--concurrency 10]
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from benchmarks.concordium_stub import ConcordiumStub, EndpointBehaviour, StubConfig
+from src.models.payment import Payment
+from src.models.wallet import Wallet
+from src.services.blockchain_integration_service import BlockchainIntegrationService
+from src.services.wallet_sync_service import WalletSyncScheduler
+
+PROFILES = (
+    ('fast', EndpointBehaviour(latency_ms=5)),
+    ('slow', EndpointBehaviour(latency_ms=200, distribution='lognormal', jitter=0.5)),
+    ('flaky', EndpointBehaviour(latency_ms=50, distribution='exponential', jitter=50, error_rate=0.1)),
+    ('hanging', EndpointBehaviour(latency_ms=50, timeout_rate=0.05, timeout_seconds=30)),
+)
+
+def seed(wallets: int) -> sessionmaker:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Wallet.metadata.create_all(bind=engine)
+    Payment.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = factory()
+    db.add_all(
+        Wallet(wallet_id=f"w{n}", user_id=f"u{n}", concordium_address=f"addr{n}", balance=0.0)
+        for n in range(wallets)
+    )
+    db.commit()
+    db.close()
+    return factory
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wallets", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--client-timeout", type=float, default=2.0)
+    args = parser.parse_args()
+
+    print(f"{'profile':<8} {'seconds':>8} {'updated':>8} {'failed':>7} {'wallets/s':>10}")
+    for name, behaviour in PROFILES:
+        with ConcordiumStub(StubConfig(default=behaviour, seed=42)) as stub:
+            chain = BlockchainIntegrationService(stub.url)
+            chain.timeout = args.client_timeout
+            scheduler = WalletSyncScheduler(
+                seed(args.wallets), chain,
+                concurrency=args.concurrency, max_per_cycle=args.wallets
+            )
+            started = time.perf_counter()
+            result = asyncio.run(scheduler.run_once())
+            elapsed = time.perf_counter() - started
+        print(f"{name:<8} {elapsed:>8.2f} {result['updated']:>8} {result['failed']:>7} {args.wallets / elapsed:>10.1f}")
+
+if __name__ == "__main__":
+    main()
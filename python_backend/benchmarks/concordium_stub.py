@@ -0,0 +1,331 @@
+"""Local stand-in for the Node.js Concordium service
+
+Implements the endpoints BlockchainIntegrationService calls, with
+configurable latency distributions, error rates, hung requests and a
+finality delay for logged transactions, so the backend can be tested and
+benchmarked against a slow or flaky chain without a Concordium node.
+
+In-process (tests, benchmarks):
+
+    with ConcordiumStub(StubConfig(default=EndpointBehaviour(latency_ms=200))) as stub:
+        settings.CONCORDIUM_SERVICE_URL = stub.url
+
+Standalone (point CONCORDIUM_SERVICE_URL at it):
+
+    python -m benchmarks.concordium_stub --port 3000 --latency-ms 200 \\
+        --distribution lognormal --jitter 0.5 --error-rate 0.05 --finality-delay 10
+
+Behaviour can be changed at runtime with POST /_stub/config and
+per-endpoint call counts are available from GET /_stub/stats.
+"""
+import argparse
+import asyncio
+import hashlib
+import math
+import random
+import socket
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+ENDPOINTS = ('health', 'verify_identity', 'verify_transaction', 'log_transaction', 'balance')
+DISTRIBUTIONS = ('fixed', 'uniform', 'exponential', 'lognormal')
+
+class EndpointBehaviour:
+    """Latency and fault injection for one endpoint
+
+    distribution:
+        fixed        always latency_ms
+        uniform      latency_ms +/- jitter milliseconds
+        exponential  latency_ms plus an exponential tail with mean jitter milliseconds
+        lognormal    median latency_ms with shape (sigma) jitter
+    """
+
+    __slots__ = ('latency_ms', 'distribution', 'jitter', 'error_rate', 'timeout_rate', 'timeout_seconds')
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        distribution: str = 'fixed',
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        timeout_seconds: float = 60.0
+    ):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        self.latency_ms = latency_ms
+        self.distribution = distribution
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_seconds = timeout_seconds
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Seconds to wait before answering"""
+        if self.distribution == 'uniform':
+            ms = rng.uniform(self.latency_ms - self.jitter, self.latency_ms + self.jitter)
+        elif self.distribution == 'exponential':
+            ms = self.latency_ms + (rng.expovariate(1 / self.jitter) if self.jitter else 0.0)
+        elif self.distribution == 'lognormal':
+            ms = rng.lognormvariate(math.log(self.latency_ms), self.jitter) if self.latency_ms else 0.0
+        else:
+            ms = self.latency_ms
+        return max(0.0, ms) / 1000
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class StubConfig:
+    """Stand-in behaviour: defaults, per-endpoint overrides and chain state"""
+
+    def __init__(
+        self,
+        default: EndpointBehaviour = None,
+        endpoints: Dict[str, EndpointBehaviour] = None,
+        finality_delay: float = 0.0,
+        balances: Dict[str, float] = None,
+        default_balance: float = None,
+        seed: Optional[int] = None
+    ):
+        self.default = default or EndpointBehaviour()
+        self.endpoints = endpoints or {}
+        self.finality_delay = finality_delay
+        self.balances = balances or {}
+        self.default_balance = default_balance
+        self.seed = seed
+
+    def behaviour(self, endpoint: str) -> EndpointBehaviour:
+        return self.endpoints.get(endpoint, self.default)
+
+    def balance_of(self, address: str) -> float:
+        if address in self.balances:
+            return self.balances[address]
+        if self.default_balance is not None:
+            return self.default_balance
+        # Stable pseudo-random balance so repeated runs see the same chain
+        digest = hashlib.sha256(address.encode()).digest()
+        return int.from_bytes(digest[:4], 'big') % 1_000_000 / 100
+
+    def update(self, data: Dict):
+        """Apply a partial configuration (as accepted by POST /_stub/config)"""
+        if 'default' in data:
+            self.default = EndpointBehaviour(**data['default'])
+        for name, behaviour in (data.get('endpoints') or {}).items():
+            if name not in ENDPOINTS:
+                raise ValueError(f"Unknown endpoint: {name}")
+            self.endpoints[name] = EndpointBehaviour(**behaviour)
+        if 'finality_delay' in data:
+            self.finality_delay = float(data['finality_delay'])
+        if 'balances' in data:
+            self.balances.update(data['balances'])
+        if 'default_balance' in data:
+            self.default_balance = data['default_balance']
+
+    def to_dict(self) -> Dict:
+        return {
+            'default': self.default.to_dict(),
+            'endpoints': {name: b.to_dict() for name, b in self.endpoints.items()},
+            'finality_delay': self.finality_delay,
+            'default_balance': self.default_balance
+        }
+
+def create_stub_app(config: StubConfig = None) -> FastAPI:
+    """Build the stand-in ASGI app"""
+    config = config or StubConfig()
+    rng = random.Random(config.seed)
+    started = time.monotonic()
+    # transaction hash -> monotonic time it was submitted
+    submitted: Dict[str, float] = {}
+    stats = {name: {'calls': 0, 'errors': 0, 'timeouts': 0} for name in ENDPOINTS}
+
+    app = FastAPI(title="Concordium service stand-in", docs_url=None, redoc_url=None)
+    app.state.config = config
+    app.state.stats = stats
+    # Set on shutdown so hung requests finish instead of blocking it
+    app.state.closing = False
+
+    async def inject(endpoint: str) -> Optional[JSONResponse]:
+        """Apply latency and faults; returns an error response to send instead, if any"""
+        behaviour = config.behaviour(endpoint)
+        counters = stats[endpoint]
+        counters['calls'] += 1
+        if behaviour.timeout_rate and rng.random() < behaviour.timeout_rate:
+            counters['timeouts'] += 1
+            deadline = time.monotonic() + behaviour.timeout_seconds
+            while time.monotonic() < deadline and not app.state.closing:
+                await asyncio.sleep(0.05)
+        else:
+            delay = behaviour.sample_latency(rng)
+            if delay:
+                await asyncio.sleep(delay)
+        if behaviour.error_rate and rng.random() < behaviour.error_rate:
+            counters['errors'] += 1
+            return JSONResponse(status_code=500, content={
+                'success': False,
+                'error': 'Injected failure',
+                'message': f"{endpoint} failed (stand-in fault injection)"
+            })
+        return None
+
+    @app.get("/api/health")
+    async def health():
+        error = await inject('health')
+        if error:
+            return error
+        return {'status': 'healthy', 'uptime': time.monotonic() - started, 'stub': True}
+
+    @app.get("/api/concordium/balance/{address}")
+    async def balance(address: str, currency: str = "CCD"):
+        error = await inject('balance')
+        if error:
+            return error
+        return {'success': True, 'balance': config.balance_of(address), 'currency': currency, 'address': address}
+
+    @app.get("/api/concordium/verify-transaction/{tx_hash}")
+    async def verify_transaction(tx_hash: str):
+        error = await inject('verify_transaction')
+        if error:
+            return error
+        submitted_at = submitted.get(tx_hash)
+        if submitted_at is None or time.monotonic() - submitted_at >= config.finality_delay:
+            status = 'finalized'
+        else:
+            status = 'committed'
+        return {'success': True, 'verified': True, 'status': status, 'transaction_hash': tx_hash}
+
+    @app.post("/api/concordium/verify-identity")
+    async def verify_identity(request: Request):
+        error = await inject('verify_identity')
+        if error:
+            return error
+        body = await request.json()
+        return {
+            'success': True,
+            'verified': True,
+            'concordium_id': body.get('concordium_id'),
+            'account_exists': True
+        }
+
+    @app.post("/api/concordium/log-transaction")
+    async def log_transaction(request: Request):
+        error = await inject('log_transaction')
+        if error:
+            return error
+        await request.body()
+        tx_hash = uuid.uuid4().hex + uuid.uuid4().hex
+        submitted[tx_hash] = time.monotonic()
+        return JSONResponse(status_code=201, content={
+            'success': True,
+            'transaction_hash': tx_hash,
+            'status': 'finalized' if config.finality_delay <= 0 else 'received'
+        })
+
+    @app.get("/_stub/config")
+    async def get_config():
+        return config.to_dict()
+
+    @app.post("/_stub/config")
+    async def set_config(request: Request):
+        try:
+            config.update(await request.json())
+        except (TypeError, ValueError) as e:
+            return JSONResponse(status_code=400, content={'error': str(e)})
+        return config.to_dict()
+
+    @app.get("/_stub/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+class ConcordiumStub:
+    """Runs the stand-in on a localhost port in a background thread"""
+
+    def __init__(self, config: StubConfig = None, host: str = '127.0.0.1', port: int = 0):
+        self.config = config or StubConfig()
+        self.app = create_stub_app(self.config)
+        self.host = host
+        self.port = port
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def stats(self) -> Dict:
+        return self.app.state.stats
+
+    def start(self, startup_timeout: float = 10.0) -> str:
+        """Start serving and return the base URL"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        self.port = sock.getsockname()[1]
+
+        config = uvicorn.Config(self.app, log_level='warning', lifespan='off', timeout_graceful_shutdown=1)
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, kwargs={'sockets': [sock]}, daemon=True)
+        self._thread.start()
+
+        deadline = time.monotonic() + startup_timeout
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("Concordium stand-in failed to start")
+            time.sleep(0.01)
+        return self.url
+
+    def stop(self):
+        if self._server is None:
+            return
+        self.app.state.closing = True
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+        self._server = None
+        self._thread = None
+
+    def __enter__(self) -> "ConcordiumStub":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Concordium service stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3000)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="uniform/exponential: milliseconds; lognormal: sigma")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-seconds", type=float, default=60.0)
+    parser.add_argument("--finality-delay", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = StubConfig(
+        default=EndpointBehaviour(
+            latency_ms=args.latency_ms,
+            distribution=args.distribution,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            timeout_rate=args.timeout_rate,
+            timeout_seconds=args.timeout_seconds
+        ),
+        finality_delay=args.finality_delay,
+        seed=args.seed
+    )
+    uvicorn.run(create_stub_app(config), host=args.host, port=args.port, log_level='warning')
+
+if __name__ == "__main__":
+    main()
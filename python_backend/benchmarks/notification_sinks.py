@@ -0,0 +1,270 @@
+"""Local sinks for notification delivery: an SMTP server and an SMS/push gateway
+
+Both record what they receive and can fail a fraction of messages, so
+the delivery workers can be tested and benchmarked without a mail relay
+or a push provider.
+
+In-process (tests, benchmarks):
+
+    with SmtpSink() as smtp, GatewaySink(error_rate=0.1) as gateway:
+        EmailChannel(host=smtp.host, port=smtp.port)
+        GatewayChannel('push', 'push_token', gateway.url + '/push')
+
+Standalone (point NOTIFICATION_SMTP_* and NOTIFICATION_*_GATEWAY_URL at it):
+
+    python -m benchmarks.notification_sinks --smtp-port 8026 --gateway-port 8025
+"""
+import argparse
+import asyncio
+import random
+import socket
+import threading
+import time
+from typing import Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+class SmtpMessage:
+    __slots__ = ('mail_from', 'rcpt_tos', 'data')
+
+    def __init__(self, mail_from: str, rcpt_tos: List[str], data: bytes):
+        self.mail_from = mail_from
+        self.rcpt_tos = rcpt_tos
+        self.data = data
+
+class SmtpSink:
+    """Minimal SMTP server (EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT) on a background event loop
+
+    A recipient is refused with 550 if it contains reject_substring, or at
+    random with probability error_rate.
+    """
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        error_rate: float = 0.0,
+        reject_substring: str = None,
+        seed: Optional[int] = None
+    ):
+        self.host = host
+        self.port = port
+        self.error_rate = error_rate
+        self.reject_substring = reject_substring
+        self.rng = random.Random(seed)
+        self.messages: List[SmtpMessage] = []
+        self.rejected = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _refuse(self, recipient: str) -> bool:
+        if self.reject_substring and self.reject_substring in recipient:
+            return True
+        return bool(self.error_rate) and self.rng.random() < self.error_rate
+
+    async def _session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        def reply(line: str):
+            writer.write(line.encode() + b"\r\n")
+
+        reply("220 sink ESMTP")
+        mail_from, rcpt_tos = None, []
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode(errors='replace').strip()
+                verb = command[:4].upper()
+                if verb == 'EHLO':
+                    reply("250-sink")
+                    reply("250 8BITMIME")
+                elif verb == 'HELO':
+                    reply("250 sink")
+                elif verb == 'MAIL':
+                    mail_from, rcpt_tos = command.partition(':')[2].strip(), []
+                    reply("250 OK")
+                elif verb == 'RCPT':
+                    recipient = command.partition(':')[2].strip()
+                    if self._refuse(recipient):
+                        self.rejected += 1
+                        reply("550 Mailbox unavailable")
+                    else:
+                        rcpt_tos.append(recipient)
+                        reply("250 OK")
+                elif verb == 'DATA':
+                    if not rcpt_tos:
+                        reply("503 No valid recipients")
+                        continue
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    lines = []
+                    while True:
+                        data_line = await reader.readline()
+                        if not data_line or data_line in (b".\r\n", b".\n"):
+                            break
+                        lines.append(data_line[1:] if data_line.startswith(b"..") else data_line)
+                    self.messages.append(SmtpMessage(mail_from, rcpt_tos, b"".join(lines)))
+                    mail_from, rcpt_tos = None, []
+                    reply("250 OK queued")
+                elif verb == 'RSET':
+                    mail_from, rcpt_tos = None, []
+                    reply("250 OK")
+                elif verb == 'NOOP':
+                    reply("250 OK")
+                elif verb == 'QUIT':
+                    reply("221 Bye")
+                    await writer.drain()
+                    break
+                else:
+                    reply("502 Command not implemented")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def start(self, startup_timeout: float = 10.0) -> int:
+        """Start serving and return the port"""
+        started = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._server = self._loop.run_until_complete(asyncio.start_server(self._session, self.host, self.port))
+            self.port = self._server.sockets[0].getsockname()[1]
+            started.set()
+            self._loop.run_forever()
+            self._server.close()
+            self._loop.run_until_complete(self._server.wait_closed())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        if not started.wait(startup_timeout):
+            raise RuntimeError("SMTP sink failed to start")
+        return self.port
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def __enter__(self) -> "SmtpSink":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def create_gateway_app(error_rate: float = 0.0, latency_ms: float = 0.0, seed: Optional[int] = None) -> FastAPI:
+    """SMS/push gateway stand-in speaking GatewayChannel's batch protocol on POST /sms and /push"""
+    rng = random.Random(seed)
+    app = FastAPI(title="Notification gateway stand-in", docs_url=None, redoc_url=None)
+    app.state.received = {'sms': [], 'push': []}
+    app.state.batches = 0
+    app.state.error_rate = error_rate
+
+    async def accept(channel: str, request: Request) -> Dict:
+        body = await request.json()
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        app.state.batches += 1
+        results = []
+        for message in body.get('messages', []):
+            if app.state.error_rate and rng.random() < app.state.error_rate:
+                results.append({'id': message['id'], 'ok': False, 'error': 'Injected failure'})
+            else:
+                app.state.received[channel].append(message)
+                results.append({'id': message['id'], 'ok': True})
+        return {'results': results}
+
+    @app.post("/sms")
+    async def sms(request: Request):
+        return await accept('sms', request)
+
+    @app.post("/push")
+    async def push(request: Request):
+        return await accept('push', request)
+
+    return app
+
+class GatewaySink:
+    """Runs the gateway stand-in on a localhost port in a background thread"""
+
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 0,
+        error_rate: float = 0.0,
+        latency_ms: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        self.app = create_gateway_app(error_rate, latency_ms, seed)
+        self.host = host
+        self.port = port
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def received(self) -> Dict[str, List[Dict]]:
+        return self.app.state.received
+
+    def start(self, startup_timeout: float = 10.0) -> str:
+        """Start serving and return the base URL"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        self.port = sock.getsockname()[1]
+
+        config = uvicorn.Config(self.app, log_level='warning', lifespan='off', timeout_graceful_shutdown=1)
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, kwargs={'sockets': [sock]}, daemon=True)
+        self._thread.start()
+
+        deadline = time.monotonic() + startup_timeout
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("Gateway stand-in failed to start")
+            time.sleep(0.01)
+        return self.url
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+        self._server = None
+        self._thread = None
+
+    def __enter__(self) -> "GatewaySink":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Local SMTP and SMS/push gateway sinks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--smtp-port", type=int, default=8026)
+    parser.add_argument("--gateway-port", type=int, default=8025)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    smtp = SmtpSink(args.host, args.smtp_port, error_rate=args.error_rate)
+    smtp.start()
+    print(f"SMTP sink on {args.host}:{smtp.port}, gateway on http://{args.host}:{args.gateway_port}/sms and /push")
+    try:
+        uvicorn.run(create_gateway_app(args.error_rate, args.latency_ms), host=args.host, port=args.gateway_port, log_level='warning')
+    finally:
+        smtp.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""Schema setup for benchmark databases
+
+Every model is mapped on the shared declarative Base, so its metadata
+describes the whole schema once all model modules are imported.
+"""
+from sqlalchemy import MetaData
+
+from src.config.database import Base
+from src.models.audit_log import AuditLog
+from src.models.notification import Notification
+from src.models.operator import Operator
+from src.models.payment import Payment
+from src.models.risk_assessment import RiskAssessment
+from src.models.scheduled_notification import ScheduledNotification
+from src.models.session import Session
+from src.models.user import User
+from src.models.wallet import Wallet
+from src.repositories.transaction_repository import Transaction
+
+MODELS = (User, Wallet, Session, Transaction, Payment, Notification, ScheduledNotification, AuditLog, RiskAssessment, Operator)
+
+def benchmark_metadata() -> MetaData:
+    return Base.metadata
+
+def create_schema(engine, drop_existing: bool = False):
+    """Create every mapped table on an engine"""
+    metadata = benchmark_metadata()
+    if drop_existing:
+        metadata.drop_all(bind=engine)
+    metadata.create_all(bind=engine)
@@ -0,0 +1,69 @@
+from fastapi import Depends
+from starlette.requests import HTTPConnection
+from sqlalchemy.orm import Session
+
+from src.config.database import get_db
+from src.services.audit_service import AuditService
+from src.services.behavior_analytics_service import BehaviorAnalyticsService
+from src.services.blockchain_integration_service import BlockchainIntegrationService
+from src.services.container import RequestScope, ServiceContainer
+from src.services.limit_enforcement_service import LimitEnforcementService
+from src.services.notification_service import NotificationService
+from src.services.operator_auth_service import OperatorAuthService
+from src.services.payment_service import PaymentService
+from src.services.self_exclusion_service import SelfExclusionService
+from src.services.session_service import SessionService
+from src.services.transaction_service import TransactionService
+from src.services.user_service import UserService
+from src.services.wallet_service import WalletService
+
+# Providers are async so FastAPI resolves them inline instead of in the threadpool
+
+async def get_container(connection: HTTPConnection) -> ServiceContainer:
+    """The app's ServiceContainer (created in the lifespan, or on first use without one)"""
+    container = getattr(connection.app.state, 'container', None)
+    if container is None:
+        container = connection.app.state.container = ServiceContainer()
+    return container
+
+async def get_scope(
+    db: Session = Depends(get_db),
+    container: ServiceContainer = Depends(get_container)
+) -> RequestScope:
+    return container.scope(db)
+
+async def get_blockchain_service(container: ServiceContainer = Depends(get_container)) -> BlockchainIntegrationService:
+    return container.blockchain_service
+
+async def get_user_service(scope: RequestScope = Depends(get_scope)) -> UserService:
+    return scope.user_service
+
+async def get_session_service(scope: RequestScope = Depends(get_scope)) -> SessionService:
+    return scope.session_service
+
+async def get_transaction_service(scope: RequestScope = Depends(get_scope)) -> TransactionService:
+    return scope.transaction_service
+
+async def get_limit_service(scope: RequestScope = Depends(get_scope)) -> LimitEnforcementService:
+    return scope.limit_service
+
+async def get_self_exclusion_service(scope: RequestScope = Depends(get_scope)) -> SelfExclusionService:
+    return scope.self_exclusion_service
+
+async def get_analytics_service(scope: RequestScope = Depends(get_scope)) -> BehaviorAnalyticsService:
+    return scope.analytics_service
+
+async def get_notification_service(scope: RequestScope = Depends(get_scope)) -> NotificationService:
+    return scope.notification_service
+
+async def get_audit_service(scope: RequestScope = Depends(get_scope)) -> AuditService:
+    return scope.audit_service
+
+async def get_operator_auth_service(scope: RequestScope = Depends(get_scope)) -> OperatorAuthService:
+    return scope.operator_auth_service
+
+async def get_wallet_service(scope: RequestScope = Depends(get_scope)) -> WalletService:
+    return scope.wallet_service
+
+async def get_payment_service(scope: RequestScope = Depends(get_scope)) -> PaymentService:
+    return scope.payment_service
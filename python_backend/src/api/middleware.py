@@ -1,49 +1,603 @@
-from fastapi import Request, HTTPException, status
+from collections import OrderedDict
+from contextvars import ContextVar
+from fastapi import HTTPException, status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+import ipaddress
+import json
 import logging
+import hmac
+import math
+import random
+import sys
 import time
+import uuid
+
+from src.api.streaming import is_stream
+from src.config.settings import settings
+from src.utils.loop_lag import LoopLagMonitor, loop_lag_monitor
+from src.utils.metrics import (
+    QueryStats, current_query_stats, db_queries_per_request, db_time_per_request,
+    http_request_duration, http_requests_in_flight
+)
+from src.utils.operator_index import operator_key_index
+from src.utils.profiler import SamplingProfiler, request_profiler
+from src.utils.tracing import Tracer, tracer as default_tracer
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware to log all requests"""
-    
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        
-        # Log request
-        logger.info(f"Request: {request.method} {request.url.path}")
-        
+# ID of the request being handled, for log correlation outside the middleware
+request_id_ctx: ContextVar[Optional[str]] = ContextVar('request_id', default=None)
+
+class LoggingMiddleware:
+    """Assigns request IDs and logs completed requests
+
+    Pure ASGI middleware: the response is passed through untouched apart
+    from an added X-Request-ID header, so streaming keeps working.
+    Successful fast requests are logged for a sampled fraction only;
+    client errors, server errors and slow requests are always logged.
+    Log records are formatted lazily and carry the fields as `extra`.
+    """
+
+    def __init__(self, app, sample_rate: float = None, slow_request_ms: float = None):
+        self.app = app
+        self.sample_rate = settings.LOG_SUCCESS_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.slow_request_ms = slow_request_ms or settings.LOG_SLOW_REQUEST_MS
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope['headers']:
+            if name == b'x-request-id':
+                request_id = value.decode('latin-1')[:64]
+                break
+        if not request_id:
+            request_id = uuid.uuid4().hex
+        scope.setdefault('state', {})['request_id'] = request_id
+        request_id_header = (b'x-request-id', request_id.encode('latin-1'))
+        status_code = 500
+
+        async def send_with_request_id(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                message['headers'] = [*message.get('headers', ()), request_id_header]
+            await send(message)
+
+        token = request_id_ctx.set(request_id)
+        start_time = time.perf_counter()
         try:
-            response = await call_next(request)
-            
-            # Log response time
-            process_time = time.time() - start_time
-            logger.info(f"Completed: {request.method} {request.url.path} - {response.status_code} - {process_time:.3f}s")
-            
-            return response
-        except Exception as e:
-            logger.error(f"Error processing request: {str(e)}")
+            await self.app(scope, receive, send_with_request_id)
+        except Exception:
+            logger.error(
+                "Failed: %s %s request_id=%s",
+                scope['method'], scope['path'], request_id,
+                extra={'request_id': request_id, 'method': scope['method'], 'path': scope['path']}
+            )
             raise
+        finally:
+            request_id_ctx.reset(token)
+
+        self._log(scope, status_code, (time.perf_counter() - start_time) * 1000, request_id)
+
+    def _log(self, scope, status_code: int, duration_ms: float, request_id: str):
+        if status_code >= 500:
+            level = logging.ERROR
+        elif duration_ms >= self.slow_request_ms and not is_stream(scope):
+            level = logging.WARNING
+        elif status_code >= 400 or random.random() < self.sample_rate:
+            level = logging.INFO
+        else:
+            return
+        if not logger.isEnabledFor(level):
+            return
+        logger.log(
+            level,
+            "Completed: %s %s - %d - %.1fms request_id=%s",
+            scope['method'], scope['path'], status_code, duration_ms, request_id,
+            extra={
+                'request_id': request_id,
+                'method': scope['method'],
+                'path': scope['path'],
+                'status_code': status_code,
+                'duration_ms': round(duration_ms, 3)
+            }
+        )
+
+class ErrorHandlingMiddleware:
+    """Turns unhandled exceptions into a JSON 500 response
+
+    Pure ASGI middleware. If the response has already started there is
+    nothing sensible to send, so the exception is re-raised.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_tracking_start(message):
+            nonlocal response_started
+            if message['type'] == 'http.response.start':
+                response_started = True
+            await send(message)
 
-class ErrorHandlingMiddleware(BaseHTTPMiddleware):
-    """Middleware to handle errors globally"""
-    
-    async def dispatch(self, request: Request, call_next):
         try:
-            return await call_next(request)
+            await self.app(scope, receive, send_tracking_start)
         except HTTPException:
             # Re-raise HTTP exceptions
             raise
         except Exception as e:
-            logger.error(f"Unhandled error: {str(e)}", exc_info=True)
-            return JSONResponse(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                content={"error": "An internal error occurred"}
+            request_id = scope.get('state', {}).get('request_id')
+            logger.error("Unhandled error: %s request_id=%s", e, request_id, exc_info=True,
+                         extra={'request_id': request_id})
+            if response_started:
+                raise
+            content = {"error": "An internal error occurred"}
+            if request_id:
+                content["request_id"] = request_id
+            response = JSONResponse(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, content=content)
+            if request_id:
+                response.headers['x-request-id'] = request_id
+            await response(scope, receive, send)
+
+class MetricsMiddleware:
+    """Records request latency and database usage per route
+
+    Pure ASGI middleware. Routes are labelled by their path template
+    (e.g. /api/v1/users/{user_id}) so label cardinality stays bounded.
+    Statement counts come from the engine hooks in src.utils.metrics,
+    which add to the QueryStats installed here for the request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.in_flight = 0
+        http_requests_in_flight.set_function(lambda: self.in_flight)
+
+    async def __call__(self, scope, receive, send):
+        # Notification streams stay open for hours; their latency would swamp the histograms
+        if scope['type'] != 'http' or is_stream(scope):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_recording_status(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        self.in_flight += 1
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_recording_status)
+        finally:
+            duration = time.perf_counter() - start_time
+            self.in_flight -= 1
+            current_query_stats.reset(token)
+            route = scope.get('route')
+            route_path = route.path if route is not None else '<unmatched>'
+            http_request_duration.observe(duration, (scope['method'], route_path, status_code))
+            db_queries_per_request.observe(stats.count, (route_path,))
+            db_time_per_request.observe(stats.seconds, (route_path,))
+
+class TracingMiddleware:
+    """Starts a sampled trace per request (the root SERVER span)
+
+    Continues an incoming W3C traceparent when present. Sampled responses
+    carry X-Trace-Id so a slow request can be found in the trace file.
+    """
+
+    def __init__(self, app, tracer: Tracer = None):
+        self.app = app
+        self.tracer = tracer or default_tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope['headers']:
+            if name == b'traceparent':
+                traceparent = value.decode('latin-1')
+                break
+        root = self.tracer.start_trace(f"{scope['method']} {scope['path']}", 'server', traceparent)
+        if root is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_trace_id(message):
+            if message['type'] == 'http.response.start':
+                root.set_attribute('http.status_code', message['status'])
+                if message['status'] >= 500:
+                    root.set_error(f"HTTP {message['status']}")
+                message['headers'] = [*message.get('headers', ()), (b'x-trace-id', root.trace_id.encode())]
+            await send(message)
+
+        root.set_attribute('http.method', scope['method'])
+        root.set_attribute('http.target', scope['path'])
+        request_id = scope.get('state', {}).get('request_id')
+        if request_id:
+            root.set_attribute('request_id', request_id)
+        with self.tracer.activate(root):
+            try:
+                await self.app(scope, receive, send_with_trace_id)
+            finally:
+                route = scope.get('route')
+                if route is not None:
+                    root.name = f"{scope['method']} {route.path}"
+                    root.set_attribute('http.route', route.path)
+
+class QueryBudgetMiddleware:
+    """Flags requests that exceed their database budget or repeat a statement (N+1)
+
+    Pure ASGI middleware sharing the per-request QueryStats with
+    MetricsMiddleware (or installing its own when metrics are off).
+    Offending requests are logged with the most repeated statement. In
+    debug mode (or with QUERY_BUDGET_HEADERS) the counts are also sent
+    as X-DB-Query-Count, X-DB-Query-Time-Ms and X-DB-Repeated-Statements.
+    """
+
+    def __init__(self, app, max_statements: int = None, max_db_ms: float = None, repeat_threshold: int = None):
+        self.app = app
+        self.max_statements = max_statements or settings.QUERY_BUDGET_MAX_STATEMENTS
+        self.max_db_ms = max_db_ms or settings.QUERY_BUDGET_MAX_DB_MS
+        self.repeat_threshold = repeat_threshold or settings.QUERY_BUDGET_REPEAT_THRESHOLD
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = current_query_stats.get()
+        token = None
+        if stats is None:
+            stats = QueryStats()
+            token = current_query_stats.set(stats)
+
+        async def send_with_query_headers(message):
+            if message['type'] == 'http.response.start':
+                message['headers'] = [
+                    *message.get('headers', ()),
+                    (b'x-db-query-count', str(stats.count).encode()),
+                    (b'x-db-query-time-ms', f"{stats.seconds * 1000:.2f}".encode()),
+                    (b'x-db-repeated-statements', str(stats.max_repeats()).encode())
+                ]
+            await send(message)
+
+        expose = settings.DEBUG or settings.QUERY_BUDGET_HEADERS
+        try:
+            await self.app(scope, receive, send_with_query_headers if expose else send)
+        finally:
+            if token is not None:
+                current_query_stats.reset(token)
+        self._check(scope, stats)
+
+    def _check(self, scope, stats: QueryStats):
+        db_ms = stats.seconds * 1000
+        over_budget = stats.count > self.max_statements or db_ms > self.max_db_ms
+        repeated = stats.repeated(self.repeat_threshold) if stats.max_repeats() >= self.repeat_threshold else []
+        if not over_budget and not repeated:
+            return
+        route = scope.get('route')
+        route_path = route.path if route is not None else scope['path']
+        request_id = scope.get('state', {}).get('request_id')
+        if repeated:
+            shape, times = repeated[0]
+            logger.warning(
+                "Possible N+1: %s %s - statement repeated %dx (%d statements, %.1fms in DB) request_id=%s: %.200s",
+                scope['method'], route_path, times, stats.count, db_ms, request_id, shape,
+                extra={'request_id': request_id, 'route': route_path, 'db_statements': stats.count,
+                       'db_ms': round(db_ms, 3), 'repeated_statement': shape, 'repeats': times}
+            )
+        else:
+            logger.warning(
+                "Query budget exceeded: %s %s - %d statements, %.1fms in DB (budget %d / %.0fms) request_id=%s",
+                scope['method'], route_path, stats.count, db_ms, self.max_statements, self.max_db_ms, request_id,
+                extra={'request_id': request_id, 'route': route_path, 'db_statements': stats.count,
+                       'db_ms': round(db_ms, 3)}
             )
 
+class ProfilingMiddleware:
+    """Runs the sampling profiler for requests that ask for it
+
+    A request is profiled when it carries X-Profile-Key set to the admin
+    API key (ignored while API_KEY is a placeholder), or when its route
+    was armed through the admin profiling endpoint. The profile ID is
+    returned in the X-Profile-Id header.
+    """
+
+    def __init__(self, app, profiler: SamplingProfiler = None):
+        self.app = app
+        self.profiler = profiler or request_profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self._wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = self.profiler.begin(scope['method'], scope['path'], sys._getframe())
+        status_code = 500
+
+        async def send_with_profile_id(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                message['headers'] = [*message.get('headers', ()), (b'x-profile-id', profile.id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            route = scope.get('route')
+            self.profiler.end(profile, status_code, route.path if route is not None else None)
+
+    def _wants_profile(self, scope) -> bool:
+        if self.profiler.armed and self.profiler.take_armed(scope['method'], scope['path']):
+            return True
+        if settings.is_placeholder('API_KEY'):
+            return False
+        for name, value in scope['headers']:
+            if name == b'x-profile-key':
+                return hmac.compare_digest(value, settings.API_KEY.encode())
+        return False
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` tokens per second"""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated', 'source')
+
+    def __init__(self, rate: float, capacity: float, now: float, source=None):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+        self.source = source
+
+    def take(self, now: float) -> float:
+        """Consume a token; returns 0 if allowed, else seconds until one is available"""
+        tokens = self.tokens + (now - self.updated) * self.rate
+        if tokens > self.capacity:
+            tokens = self.capacity
+        self.updated = now
+        if tokens >= 1:
+            self.tokens = tokens - 1
+            return 0.0
+        self.tokens = tokens
+        return (1 - tokens) / self.rate
+
+    def is_idle(self, now: float) -> bool:
+        """Whether the bucket has refilled completely (safe to forget)"""
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+# Rate multipliers per operator compliance level
+COMPLIANCE_RATE_MULTIPLIERS = {
+    'standard': 1,
+    'enhanced': 2,
+    'premium': 5
+}
+
+# Paths that are never rate limited or shed
+RATE_LIMIT_EXEMPT_PATHS = {'/', '/api/v1/health', '/metrics', '/docs', '/redoc', '/openapi.json'}
+
+# Path segments whose next segment is a user id
+USER_PATH_SEGMENTS = {'users', 'wallet'}
+
+class RateLimitMiddleware:
+    """Per-operator and per-user token buckets with adaptive load shedding
+
+    Pure ASGI middleware. All state lives in plain dicts touched without
+    awaiting, so updates are atomic on the event loop and no locks are
+    needed. Operators are resolved from the in-memory API key index;
+    their limits come from Operator.settings['rate_limit'] or their
+    compliance level. Requests without an API key share a bucket per
+    client address, at the anonymous limits; behind a trusted proxy the
+    address is taken from X-Forwarded-For. Requests are shed when too
+    many are in flight or the event loop lags (with a probability that
+    grows with the lag).
+    """
+
+    def __init__(
+        self,
+        app,
+        operator_rps: float = None,
+        operator_burst: float = None,
+        user_rps: float = None,
+        user_burst: float = None,
+        anonymous_rps: float = None,
+        anonymous_burst: float = None,
+        trusted_proxies: List[str] = None,
+        max_in_flight: int = None,
+        lag_threshold_ms: float = None,
+        max_buckets: int = None,
+        lag_monitor: LoopLagMonitor = None
+    ):
+        self.app = app
+        self.operator_rps = operator_rps or settings.RATE_LIMIT_OPERATOR_RPS
+        self.operator_burst = operator_burst or settings.RATE_LIMIT_OPERATOR_BURST
+        self.user_rps = user_rps or settings.RATE_LIMIT_USER_RPS
+        self.user_burst = user_burst or settings.RATE_LIMIT_USER_BURST
+        self.anonymous_rps = anonymous_rps or settings.RATE_LIMIT_ANONYMOUS_RPS
+        self.anonymous_burst = anonymous_burst or settings.RATE_LIMIT_ANONYMOUS_BURST
+        self.trusted_proxies = [
+            ipaddress.ip_network(proxy, strict=False)
+            for proxy in (settings.RATE_LIMIT_TRUSTED_PROXIES if trusted_proxies is None else trusted_proxies)
+        ]
+        self.max_in_flight = max_in_flight or settings.LOAD_SHED_MAX_IN_FLIGHT
+        self.lag_threshold = (lag_threshold_ms or settings.LOAD_SHED_LAG_THRESHOLD_MS) / 1000
+        self.max_buckets = max_buckets or settings.RATE_LIMIT_MAX_BUCKETS
+        self.lag_monitor = lag_monitor or loop_lag_monitor
+        self.in_flight = 0
+        self.rejected = 0
+        self.shed = 0
+        # Least recently used first, so a full table evicts the buckets that matter least
+        self._operator_buckets: 'OrderedDict[str, TokenBucket]' = OrderedDict()
+        self._user_buckets: 'OrderedDict[Tuple[str, str], TokenBucket]' = OrderedDict()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not settings.RATE_LIMIT_ENABLED or scope['path'] in RATE_LIMIT_EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = self._shed_delay()
+        if retry_after:
+            self.shed += 1
+            await self._reject(send, retry_after, "Server is overloaded, please retry later")
+            return
+
+        now = time.monotonic()
+        api_key, user_id, forwarded_for = self._read_headers(scope)
+        operator = operator_key_index.lookup(api_key) if api_key else None
+
+        if operator is not None:
+            client_key = operator.operator_id
+            rate, burst, user_rate, user_burst = self._operator_limits(operator)
+        else:
+            client_key = f"anon:{self._client_address(scope, forwarded_for)}"
+            rate, burst, user_rate, user_burst = self.anonymous_rps, self.anonymous_burst, self.user_rps, self.user_burst
+
+        wait = self._take(self._operator_buckets, client_key, rate, burst, now, operator)
+        if not wait:
+            user_id = user_id or self._user_from_request(scope)
+            if user_id:
+                wait = self._take(self._user_buckets, (client_key, user_id), user_rate, user_burst, now, operator)
+        if wait:
+            self.rejected += 1
+            await self._reject(send, wait, "Rate limit exceeded")
+            return
+
+        if is_stream(scope):
+            # An idle stream costs almost nothing, so it is not an in-flight request for shedding
+            await self.app(scope, receive, send)
+            return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    def _shed_delay(self) -> float:
+        """Seconds a shed request should wait, or 0 to admit it"""
+        if self.in_flight >= self.max_in_flight:
+            return 1.0
+        lag = self.lag_monitor.lag
+        if lag > self.lag_threshold and random.random() < (lag - self.lag_threshold) / self.lag_threshold:
+            return max(1.0, lag * 2)
+        return 0.0
+
+    def _operator_limits(self, operator) -> Tuple[float, float, float, float]:
+        multiplier = COMPLIANCE_RATE_MULTIPLIERS.get(operator.compliance_level, 1)
+        overrides = operator.settings.get('rate_limit') or {}
+        return (
+            overrides.get('requests_per_second', self.operator_rps * multiplier),
+            overrides.get('burst', self.operator_burst * multiplier),
+            overrides.get('user_requests_per_second', self.user_rps),
+            overrides.get('user_burst', self.user_burst)
+        )
+
+    def _take(self, buckets: OrderedDict, key, rate: float, burst: float, now: float, source) -> float:
+        bucket = buckets.get(key)
+        if bucket is None:
+            if len(buckets) >= self.max_buckets:
+                self._prune(buckets, now)
+            bucket = buckets[key] = TokenBucket(rate, burst, now, source)
+        else:
+            buckets.move_to_end(key)
+            if bucket.source is not source:
+                # Operator settings changed since the bucket was created
+                bucket.rate, bucket.capacity, bucket.source = rate, burst, source
+        return bucket.take(now)
+
+    def _prune(self, buckets: OrderedDict, now: float):
+        """Forget full buckets (they behave exactly like new ones), then the least recently used
+
+        Only the stalest tenth is evicted when every bucket is active, so
+        a flood of new keys cannot reset the limits of clients in use.
+        """
+        for key in [key for key, bucket in buckets.items() if bucket.is_idle(now)]:
+            del buckets[key]
+        if len(buckets) >= self.max_buckets:
+            evict = len(buckets) - int(self.max_buckets * 0.9)
+            logger.warning(f"Rate limiter tracking {len(buckets)} active buckets - evicting {evict} least recently used")
+            for _ in range(evict):
+                buckets.popitem(last=False)
+
+    def _is_trusted(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self.trusted_proxies)
+
+    def _client_address(self, scope, forwarded_for: Optional[str]) -> str:
+        """The peer address, or behind trusted proxies the nearest untrusted X-Forwarded-For hop"""
+        client = scope.get('client')
+        address = client[0] if client else 'unknown'
+        if not forwarded_for or not self._is_trusted(address):
+            return address
+        hops = [hop.strip() for hop in forwarded_for.split(',') if hop.strip()]
+        for hop in reversed(hops):
+            address = hop
+            if not self._is_trusted(hop):
+                break
+        return address
+
+    @staticmethod
+    def _read_headers(scope) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        api_key = user_id = forwarded_for = None
+        for name, value in scope['headers']:
+            if name == b'x-api-key':
+                api_key = value.decode('latin-1')
+            elif name == b'x-user-id':
+                user_id = value.decode('latin-1')
+            elif name == b'x-forwarded-for':
+                forwarded_for = value.decode('latin-1')
+        return api_key, user_id, forwarded_for
+
+    @staticmethod
+    def _user_from_request(scope) -> Optional[str]:
+        query_string = scope.get('query_string')
+        if query_string and b'user_id=' in query_string:
+            values = parse_qs(query_string.decode('latin-1')).get('user_id')
+            if values:
+                return values[0]
+        segments = scope['path'].split('/')
+        for i in range(len(segments) - 1):
+            if segments[i] in USER_PATH_SEGMENTS:
+                return segments[i + 1]
+        return None
+
+    @staticmethod
+    async def _reject(send, retry_after: float, message: str):
+        seconds = max(1, math.ceil(retry_after))
+        body = json.dumps({'error': message, 'retry_after': seconds}).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': status.HTTP_429_TOO_MANY_REQUESTS,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                (b'retry-after', str(seconds).encode())
+            ]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
 def validate_token(token: str) -> bool:
     """Validate authentication token"""
     # TODO: Implement actual token validation logic
@@ -54,4 +608,5 @@ def validate_token(token: str) -> bool:
 # from fastapi import FastAPI
 # app = FastAPI()
 # app.add_middleware(LoggingMiddleware)
-# app.add_middleware(ErrorHandlingMiddleware)
\ No newline at end of file
+# app.add_middleware(ErrorHandlingMiddleware)
+# app.add_middleware(RateLimitMiddleware)
\ No newline at end of file
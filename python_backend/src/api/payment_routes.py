@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
 from typing import Optional
 from pydantic import BaseModel
 
-from src.config.database import get_db
+from src.api.dependencies import get_payment_service, get_wallet_service
+from src.api.responses import FastJSONResponse
 from src.services.wallet_service import WalletService
 from src.services.payment_service import PaymentService
 from src.models.payment import PaymentType
@@ -33,9 +33,8 @@ class WinningsRequest(BaseModel):
 
 # Wallet endpoints
 @router.post("/wallet/connect")
-async def connect_wallet(request: ConnectWalletRequest, db: Session = Depends(get_db)):
+async def connect_wallet(request: ConnectWalletRequest, wallet_service: WalletService = Depends(get_wallet_service)):
     """Connect a Concordium wallet to user account"""
-    wallet_service = WalletService(db)
     result = await wallet_service.connect_wallet(request.user_id, request.concordium_address)
     
     if result['success']:
@@ -43,9 +42,8 @@ async def connect_wallet(request: ConnectWalletRequest, db: Session = Depends(ge
     raise HTTPException(status_code=400, detail=result.get('error'))
 
 @router.get("/wallet/{user_id}")
-async def get_wallet(user_id: str, db: Session = Depends(get_db)):
+async def get_wallet(user_id: str, wallet_service: WalletService = Depends(get_wallet_service)):
     """Get user's wallet information"""
-    wallet_service = WalletService(db)
     result = await wallet_service.get_wallet(user_id)
     
     if result['success']:
@@ -53,9 +51,8 @@ async def get_wallet(user_id: str, db: Session = Depends(get_db)):
     raise HTTPException(status_code=404, detail=result.get('error'))
 
 @router.get("/wallet/{user_id}/balance")
-async def get_balance(user_id: str, db: Session = Depends(get_db)):
+async def get_balance(user_id: str, wallet_service: WalletService = Depends(get_wallet_service)):
     """Get wallet balance"""
-    wallet_service = WalletService(db)
     result = await wallet_service.get_balance(user_id)
     
     if result['success']:
@@ -63,9 +60,8 @@ async def get_balance(user_id: str, db: Session = Depends(get_db)):
     raise HTTPException(status_code=404, detail=result.get('error'))
 
 @router.post("/wallet/{user_id}/sync")
-async def sync_balance(user_id: str, db: Session = Depends(get_db)):
+async def sync_balance(user_id: str, wallet_service: WalletService = Depends(get_wallet_service)):
     """Sync wallet balance with blockchain"""
-    wallet_service = WalletService(db)
     result = await wallet_service.sync_balance(user_id)
     
     if result['success']:
@@ -74,9 +70,8 @@ async def sync_balance(user_id: str, db: Session = Depends(get_db)):
 
 # Payment endpoints
 @router.post("/payment/deposit")
-async def deposit(request: DepositRequest, db: Session = Depends(get_db)):
+async def deposit(request: DepositRequest, payment_service: PaymentService = Depends(get_payment_service)):
     """Deposit funds from wallet to platform"""
-    payment_service = PaymentService(db)
     result = await payment_service.deposit(
         request.user_id,
         request.amount,
@@ -88,9 +83,8 @@ async def deposit(request: DepositRequest, db: Session = Depends(get_db)):
     raise HTTPException(status_code=400, detail=result.get('error'))
 
 @router.post("/payment/withdraw")
-async def withdraw(request: WithdrawRequest, db: Session = Depends(get_db)):
+async def withdraw(request: WithdrawRequest, payment_service: PaymentService = Depends(get_payment_service)):
     """Withdraw funds from platform to wallet"""
-    payment_service = PaymentService(db)
     result = await payment_service.withdraw(
         request.user_id,
         request.amount,
@@ -102,9 +96,8 @@ async def withdraw(request: WithdrawRequest, db: Session = Depends(get_db)):
     raise HTTPException(status_code=400, detail=result.get('error'))
 
 @router.post("/payment/winnings")
-async def process_winnings(request: WinningsRequest, db: Session = Depends(get_db)):
+async def process_winnings(request: WinningsRequest, payment_service: PaymentService = Depends(get_payment_service)):
     """Process winnings from gambling provider (called by frontend)"""
-    payment_service = PaymentService(db)
     result = await payment_service.process_winnings(
         request.user_id,
         request.amount,
@@ -121,10 +114,9 @@ async def get_payment_history(
     user_id: str,
     payment_type: Optional[str] = None,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    payment_service: PaymentService = Depends(get_payment_service)
 ):
     """Get payment history"""
-    payment_service = PaymentService(db)
     
     # Convert string to enum if provided
     type_filter = None
@@ -135,15 +127,14 @@ async def get_payment_history(
             raise HTTPException(status_code=400, detail="Invalid payment type")
     
     history = payment_service.get_payment_history(user_id, type_filter, limit)
-    return {'payments': history, 'count': len(history)}
+    return FastJSONResponse({'payments': history, 'count': len(history)})
 
 @router.get("/payment/analytics/{user_id}")
 async def get_analytics(
     user_id: str,
     days: int = 30,
-    db: Session = Depends(get_db)
+    payment_service: PaymentService = Depends(get_payment_service)
 ):
     """Get payment analytics (profit/loss)"""
-    payment_service = PaymentService(db)
     analytics = payment_service.get_analytics(user_id, days)
     return analytics
@@ -0,0 +1,37 @@
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime
+from enum import Enum
+import json
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson  # optional dependency, ~10x faster encoding
+except ImportError:
+    orjson = None
+
+def _default(obj):
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if is_dataclass(obj):
+        return {field.name: getattr(obj, field.name) for field in fields(obj)}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(content) -> bytes:
+    """Encode content the way FastJSONResponse does"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """JSON response that encodes datetimes, enums and row DTOs natively
+
+    Return it from a handler directly (not a dict) so FastAPI skips
+    jsonable_encoder. Uses orjson when installed, else the stdlib encoder
+    with the same output.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -1,11 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Header, Request, WebSocket
+from fastapi.responses import JSONResponse, PlainTextResponse
 from typing import Optional, List
 from datetime import datetime
+import hmac
+
+from sqlalchemy.orm import Session
 
-# Import database dependency
+# Import dependency providers (services come from the ServiceContainer)
+from src.api.dependencies import (
+    get_analytics_service, get_audit_service, get_blockchain_service, get_limit_service,
+    get_notification_service, get_operator_auth_service, get_self_exclusion_service,
+    get_session_service, get_transaction_service, get_user_service
+)
+from src.api.responses import FastJSONResponse
 from src.config.database import get_db
+from src.api.streaming import SSEResponse, websocket_events
 
 # Import services
 from src.services.user_service import UserService
@@ -14,17 +23,40 @@ from src.services.limit_enforcement_service import LimitEnforcementService
 from src.services.self_exclusion_service import SelfExclusionService
 from src.services.session_service import SessionService
 from src.services.notification_service import NotificationService
+from src.services.notification_retention_service import notification_purger
 from src.services.behavior_analytics_service import BehaviorAnalyticsService
 from src.services.audit_service import AuditService
 from src.services.blockchain_integration_service import BlockchainIntegrationService
+from src.services.operator_auth_service import OperatorAuthService, authenticate_operator
+from src.utils.cache import get_cache_stats
+from src.utils.notification_hub import notification_hub
+from src.utils.operator_index import OperatorIdentity
+from src.utils.profiler import request_profiler
+from src.utils.slow_query_log import slow_query_log
 
 # Create router
 api_router = APIRouter(prefix="/api/v1", tags=["api"])
 
-# Dependency for API key authentication
-async def verify_api_key(x_api_key: Optional[str] = Header(None)):
+# Dependency for operator API key authentication (in-memory; the database only for keys the index does not know)
+async def verify_api_key(x_api_key: Optional[str] = Header(None), db: Session = Depends(get_db)) -> OperatorIdentity:
+    operator = authenticate_operator(x_api_key, db)
+    if operator is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API Key"
+        )
+    return operator
+
+# Dependency for administrative endpoints (service-wide API key)
+async def verify_admin_key(x_api_key: Optional[str] = Header(None)) -> str:
     from src.config.settings import settings
-    if x_api_key and x_api_key != settings.API_KEY:
+    if settings.is_placeholder('API_KEY') or settings.is_placeholder('SECRET_KEY'):
+        # The example keys are public: with them anyone could register operators
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Administrative API disabled: set API_KEY and SECRET_KEY"
+        )
+    if not x_api_key or not hmac.compare_digest(x_api_key.encode(), settings.API_KEY.encode()):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API Key"
@@ -36,25 +68,30 @@ async def verify_api_key(x_api_key: Optional[str] = Header(None)):
 # ============================================================================
 
 @api_router.post("/users/register", status_code=status.HTTP_201_CREATED)
-async def register_user(user_data: dict, db: Session = Depends(get_db)):
+async def register_user(user_data: dict, user_service: UserService = Depends(get_user_service)):
     """Register a new user with Concordium identity verification"""
-    user_service = UserService(db)
     result = await user_service.register_user(user_data)
     return result
 
 @api_router.get("/users/{user_id}")
-async def get_user(user_id: str, db: Session = Depends(get_db)):
+async def get_user(user_id: str, user_service: UserService = Depends(get_user_service)):
     """Get user details"""
-    user_service = UserService(db)
     result = await user_service.get_user(user_id)
     if not result['success']:
         raise HTTPException(status_code=404, detail="User not found")
     return result
 
+@api_router.get("/users/{user_id}/account")
+async def get_user_account(user_id: str, user_service: UserService = Depends(get_user_service)):
+    """Get user details with their wallet and active session"""
+    result = await user_service.get_account(user_id)
+    if not result['success']:
+        raise HTTPException(status_code=404, detail="User not found")
+    return result
+
 @api_router.put("/users/{user_id}")
-async def update_user(user_id: str, user_data: dict, db: Session = Depends(get_db)):
+async def update_user(user_id: str, user_data: dict, user_service: UserService = Depends(get_user_service)):
     """Update user information"""
-    user_service = UserService(db)
     result = await user_service.update_user(user_id, user_data)
     return result
 
@@ -67,24 +104,21 @@ async def start_session(
     user_id: str,
     platform_id: str,
     currency: str = "CCD",
-    db: Session = Depends(get_db)
+    session_service: SessionService = Depends(get_session_service)
 ):
     """Start a new gambling session"""
-    session_service = SessionService(db)
     result = await session_service.start_session(user_id, platform_id, currency)
     return result
 
 @api_router.post("/sessions/{session_id}/end")
-async def end_session(session_id: str, db: Session = Depends(get_db)):
+async def end_session(session_id: str, session_service: SessionService = Depends(get_session_service)):
     """End a gambling session"""
-    session_service = SessionService(db)
     result = await session_service.end_session(session_id)
     return result
 
 @api_router.get("/sessions/{session_id}")
-async def get_session_summary(session_id: str, db: Session = Depends(get_db)):
+async def get_session_summary(session_id: str, session_service: SessionService = Depends(get_session_service)):
     """Get session summary"""
-    session_service = SessionService(db)
     result = await session_service.get_session_summary(session_id)
     return result
 
@@ -93,17 +127,15 @@ async def update_session_stats(
     session_id: str,
     wagered: float = 0,
     won: float = 0,
-    db: Session = Depends(get_db)
+    session_service: SessionService = Depends(get_session_service)
 ):
     """Update session statistics"""
-    session_service = SessionService(db)
     result = await session_service.update_session_stats(session_id, wagered, won)
     return result
 
 @api_router.get("/sessions/{session_id}/check")
-async def check_session_duration(session_id: str, db: Session = Depends(get_db)):
+async def check_session_duration(session_id: str, session_service: SessionService = Depends(get_session_service)):
     """Check if session has exceeded limits"""
-    session_service = SessionService(db)
     result = await session_service.check_session_duration(session_id)
     return result
 
@@ -111,28 +143,25 @@ async def check_session_duration(session_id: str, db: Session = Depends(get_db))
 async def get_user_sessions(
     user_id: str,
     limit: int = 10,
-    db: Session = Depends(get_db)
+    session_service: SessionService = Depends(get_session_service)
 ):
     """Get user's session history"""
-    session_service = SessionService(db)
     result = await session_service.get_user_sessions(user_id, limit)
-    return result
+    return FastJSONResponse(result)
 
 # ============================================================================
 # TRANSACTION ENDPOINTS
 # ============================================================================
 
 @api_router.post("/transactions", status_code=status.HTTP_201_CREATED)
-async def record_transaction(transaction_data: dict, db: Session = Depends(get_db)):
+async def record_transaction(transaction_data: dict, transaction_service: TransactionService = Depends(get_transaction_service)):
     """Record a new transaction"""
-    transaction_service = TransactionService(db)
     result = await transaction_service.record_transaction(transaction_data)
     return result
 
 @api_router.get("/transactions/{transaction_id}")
-async def get_transaction(transaction_id: str, db: Session = Depends(get_db)):
+async def get_transaction(transaction_id: str, transaction_service: TransactionService = Depends(get_transaction_service)):
     """Get transaction details"""
-    transaction_service = TransactionService(db)
     result = await transaction_service.get_transaction(transaction_id)
     return result
 
@@ -140,10 +169,9 @@ async def get_transaction(transaction_id: str, db: Session = Depends(get_db)):
 async def get_user_transactions(
     user_id: str,
     limit: int = 50,
-    db: Session = Depends(get_db)
+    transaction_service: TransactionService = Depends(get_transaction_service)
 ):
     """Get user's transaction history"""
-    transaction_service = TransactionService(db)
     result = await transaction_service.get_user_transactions(user_id, limit)
     return result
 
@@ -152,23 +180,20 @@ async def get_user_transactions(
 # ============================================================================
 
 @api_router.post("/limits/set")
-async def set_user_limit(limit_data: dict, db: Session = Depends(get_db)):
+async def set_user_limit(limit_data: dict, limit_service: LimitEnforcementService = Depends(get_limit_service)):
     """Set spending limit for user"""
-    limit_service = LimitEnforcementService(db)
     result = await limit_service.set_limit(limit_data)
     return result
 
 @api_router.get("/limits/{user_id}")
-async def get_user_limits(user_id: str, db: Session = Depends(get_db)):
+async def get_user_limits(user_id: str, limit_service: LimitEnforcementService = Depends(get_limit_service)):
     """Get user's current limits"""
-    limit_service = LimitEnforcementService(db)
     result = await limit_service.get_user_limits(user_id)
     return result
 
 @api_router.post("/limits/check")
-async def check_limit(user_id: str, amount: float, db: Session = Depends(get_db)):
+async def check_limit(user_id: str, amount: float, limit_service: LimitEnforcementService = Depends(get_limit_service)):
     """Check if transaction would exceed limit"""
-    limit_service = LimitEnforcementService(db)
     result = await limit_service.check_limit(user_id, amount)
     return result
 
@@ -177,23 +202,20 @@ async def check_limit(user_id: str, amount: float, db: Session = Depends(get_db)
 # ============================================================================
 
 @api_router.post("/self-exclusion", status_code=status.HTTP_201_CREATED)
-async def add_self_exclusion(exclusion_data: dict, db: Session = Depends(get_db)):
+async def add_self_exclusion(exclusion_data: dict, exclusion_service: SelfExclusionService = Depends(get_self_exclusion_service)):
     """Add user to self-exclusion registry"""
-    exclusion_service = SelfExclusionService(db)
     result = await exclusion_service.add_self_exclusion(exclusion_data)
     return result
 
 @api_router.get("/self-exclusion/{user_id}")
-async def get_self_exclusion(user_id: str, db: Session = Depends(get_db)):
+async def get_self_exclusion(user_id: str, exclusion_service: SelfExclusionService = Depends(get_self_exclusion_service)):
     """Check if user is self-excluded"""
-    exclusion_service = SelfExclusionService(db)
     result = await exclusion_service.get_self_exclusion(user_id)
     return result
 
 @api_router.delete("/self-exclusion/{user_id}")
-async def remove_self_exclusion(user_id: str, db: Session = Depends(get_db)):
+async def remove_self_exclusion(user_id: str, exclusion_service: SelfExclusionService = Depends(get_self_exclusion_service)):
     """Remove user from self-exclusion (after period expires)"""
-    exclusion_service = SelfExclusionService(db)
     result = await exclusion_service.remove_self_exclusion(user_id)
     return result
 
@@ -202,9 +224,8 @@ async def remove_self_exclusion(user_id: str, db: Session = Depends(get_db)):
 # ============================================================================
 
 @api_router.get("/analytics/risk-score/{user_id}")
-async def calculate_risk_score(user_id: str, db: Session = Depends(get_db)):
+async def calculate_risk_score(user_id: str, analytics_service: BehaviorAnalyticsService = Depends(get_analytics_service)):
     """Calculate user's risk score"""
-    analytics_service = BehaviorAnalyticsService(db)
     result = await analytics_service.calculate_risk_score(user_id)
     return result
 
@@ -212,24 +233,21 @@ async def calculate_risk_score(user_id: str, db: Session = Depends(get_db)):
 async def analyze_spending_pattern(
     user_id: str,
     days: int = 30,
-    db: Session = Depends(get_db)
+    analytics_service: BehaviorAnalyticsService = Depends(get_analytics_service)
 ):
     """Analyze user's spending patterns"""
-    analytics_service = BehaviorAnalyticsService(db)
     result = await analytics_service.analyze_spending_pattern(user_id, days)
     return result
 
 @api_router.get("/analytics/time-patterns/{user_id}")
-async def detect_time_anomalies(user_id: str, db: Session = Depends(get_db)):
+async def detect_time_anomalies(user_id: str, analytics_service: BehaviorAnalyticsService = Depends(get_analytics_service)):
     """Detect unhealthy time patterns"""
-    analytics_service = BehaviorAnalyticsService(db)
     result = await analytics_service.detect_time_anomalies(user_id)
     return result
 
 @api_router.get("/analytics/wellness-report/{user_id}")
-async def generate_wellness_report(user_id: str, db: Session = Depends(get_db)):
+async def generate_wellness_report(user_id: str, analytics_service: BehaviorAnalyticsService = Depends(get_analytics_service)):
     """Generate personalized wellness report"""
-    analytics_service = BehaviorAnalyticsService(db)
     result = await analytics_service.generate_wellness_report(user_id)
     return result
 
@@ -242,65 +260,174 @@ async def get_user_notifications(
     user_id: str,
     unread_only: bool = False,
     limit: int = 50,
-    db: Session = Depends(get_db)
+    notification_service: NotificationService = Depends(get_notification_service)
 ):
     """Get user's notifications"""
-    notification_service = NotificationService(db)
     result = await notification_service.get_user_notifications(user_id, unread_only, limit)
-    return result
+    return FastJSONResponse(result)
 
 @api_router.put("/notifications/{notification_id}/read")
-async def mark_notification_read(notification_id: str, db: Session = Depends(get_db)):
+async def mark_notification_read(notification_id: str, notification_service: NotificationService = Depends(get_notification_service)):
     """Mark notification as read"""
-    notification_service = NotificationService(db)
     result = await notification_service.mark_notification_read(notification_id)
     return result
 
 @api_router.get("/notifications/{user_id}/unread-count")
-async def get_unread_count(user_id: str, db: Session = Depends(get_db)):
+async def get_unread_count(user_id: str, notification_service: NotificationService = Depends(get_notification_service)):
     """Get count of unread notifications"""
-    notification_service = NotificationService(db)
     result = await notification_service.get_unread_count(user_id)
     return result
 
+@api_router.get("/notifications/{user_id}/stream")
+async def stream_notifications(user_id: str, notification_service: NotificationService = Depends(get_notification_service)):
+    """Push new notifications and unread counts as server-sent events"""
+    subscription = notification_service.open_stream(user_id)
+    if subscription is None:
+        raise HTTPException(status_code=503, detail="Too many open notification streams", headers={'Retry-After': '30'})
+    return SSEResponse(notification_service.hub, subscription)
+
+@api_router.websocket("/notifications/{user_id}/ws")
+async def notifications_websocket(
+    websocket: WebSocket,
+    user_id: str,
+    notification_service: NotificationService = Depends(get_notification_service)
+):
+    """Push new notifications and unread counts over a WebSocket"""
+    subscription = notification_service.open_stream(user_id)
+    if subscription is None:
+        await websocket.close(code=1013)  # try again later
+        return
+    try:
+        await websocket.accept()
+        await websocket_events(websocket, notification_service.hub, subscription)
+    finally:
+        notification_service.hub.unsubscribe(subscription)  # also if accept() fails
+
+@api_router.get("/notification-streams/stats")
+async def notification_stream_stats(api_key: str = Depends(verify_admin_key)):
+    """Get open notification stream counts for this worker"""
+    return {
+        'success': True,
+        'streams': notification_hub.stats()
+    }
+
+@api_router.get("/notification-retention/stats")
+async def notification_retention_stats(api_key: str = Depends(verify_admin_key)):
+    """Get rows removed by the notification retention purger in this worker"""
+    return {
+        'success': True,
+        'retention': notification_purger.stats()
+    }
+
 # ============================================================================
 # AUDIT ENDPOINTS
 # ============================================================================
 
 @api_router.post("/audit/log")
-async def log_action(log_data: dict, db: Session = Depends(get_db)):
+async def log_action(log_data: dict, audit_service: AuditService = Depends(get_audit_service)):
     """Create audit log entry"""
-    audit_service = AuditService(db)
     result = await audit_service.log_action(**log_data)
     return result
 
 @api_router.get("/audit/user/{user_id}")
-async def get_user_audit_history(user_id: str, db: Session = Depends(get_db)):
+async def get_user_audit_history(user_id: str, audit_service: AuditService = Depends(get_audit_service)):
     """Get user's audit history"""
-    audit_service = AuditService(db)
     result = await audit_service.get_user_action_history(user_id)
-    return result
+    return FastJSONResponse(result)
+
+@api_router.get("/audit/search")
+async def search_audit_logs(
+    q: Optional[str] = None,
+    user_id: Optional[str] = None,
+    action_type: Optional[str] = None,
+    result: Optional[str] = None,
+    ip_address: Optional[str] = None,
+    game_id: Optional[str] = None,
+    concordium_id: Optional[str] = None,
+    amount_min: Optional[float] = None,
+    amount_max: Optional[float] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    audit_service: AuditService = Depends(get_audit_service),
+    operator: OperatorIdentity = Depends(verify_api_key)
+):
+    """Search the operator's audit logs: full text over reasons and details plus exact filters, newest first
+
+    Pass next_cursor from a response as cursor to get the following page.
+    """
+    filters = {
+        'text': q, 'user_id': user_id, 'action_type': action_type, 'result': result, 'ip_address': ip_address,
+        'game_id': game_id, 'concordium_id': concordium_id, 'amount_min': amount_min, 'amount_max': amount_max,
+        'start_date': start_date, 'end_date': end_date
+    }
+    filters = {key: value for key, value in filters.items() if value is not None}
+    filters['operator_id'] = operator.operator_id
+    page = await audit_service.search_logs(filters, limit, cursor)
+    if not page['success']:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=page['error'])
+    return FastJSONResponse(page)
 
 @api_router.get("/audit/report/{operator_id}")
 async def generate_regulatory_report(
     operator_id: str,
     period: str = "month",
-    db: Session = Depends(get_db),
-    api_key: str = Depends(verify_api_key)
+    audit_service: AuditService = Depends(get_audit_service),
+    operator: OperatorIdentity = Depends(verify_api_key)
 ):
     """Generate regulatory compliance report"""
-    audit_service = AuditService(db)
+    if operator.operator_id != operator_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Operator mismatch")
     result = await audit_service.generate_regulatory_report(operator_id, period)
     return result
 
+# ============================================================================
+# OPERATOR ENDPOINTS
+# ============================================================================
+
+@api_router.post("/operators", status_code=status.HTTP_201_CREATED)
+async def register_operator(
+    operator_data: dict,
+    auth_service: OperatorAuthService = Depends(get_operator_auth_service),
+    api_key: str = Depends(verify_admin_key)
+):
+    """Register a gambling operator and issue its API key"""
+    result = auth_service.register_operator(operator_data)
+    if not result['success']:
+        code = status.HTTP_409_CONFLICT if result.get('conflict') else status.HTTP_400_BAD_REQUEST
+        raise HTTPException(status_code=code, detail=result['error'])
+    return result
+
+@api_router.post("/operators/{operator_id}/rotate-key")
+async def rotate_operator_key(
+    operator_id: str,
+    auth_service: OperatorAuthService = Depends(get_operator_auth_service),
+    api_key: str = Depends(verify_admin_key)
+):
+    """Issue a new API key for an operator, revoking the old one"""
+    result = auth_service.rotate_api_key(operator_id)
+    if not result['success']:
+        raise HTTPException(status_code=404, detail=result['error'])
+    return result
+
+@api_router.get("/operators/me")
+async def get_current_operator(operator: OperatorIdentity = Depends(verify_api_key)):
+    """Get the operator authenticated by the request's API key"""
+    return {
+        'success': True,
+        'operator_id': operator.operator_id,
+        'name': operator.name,
+        'compliance_level': operator.compliance_level
+    }
+
 # ============================================================================
 # CONCORDIUM INTEGRATION ENDPOINTS
 # ============================================================================
 
 @api_router.get("/concordium/health")
-async def check_concordium_service():
+async def check_concordium_service(blockchain_service: BlockchainIntegrationService = Depends(get_blockchain_service)):
     """Check Concordium Node.js service availability"""
-    blockchain_service = BlockchainIntegrationService()
     result = await blockchain_service.check_service_health()
     return result
 
@@ -308,14 +435,13 @@ async def check_concordium_service():
 async def verify_concordium_identity(
     concordium_id: str,
     attributes: dict = None,
-    db: Session = Depends(get_db)
+    blockchain_service: BlockchainIntegrationService = Depends(get_blockchain_service),
+    audit_service: AuditService = Depends(get_audit_service)
 ):
     """Verify user identity with Concordium blockchain"""
-    blockchain_service = BlockchainIntegrationService()
     result = await blockchain_service.verify_user_identity(concordium_id, attributes)
     
     # Log the verification attempt
-    audit_service = AuditService(db)
     await audit_service.log_action(
         action_type="identity_verification",
         details={
@@ -331,24 +457,23 @@ async def verify_concordium_identity(
 @api_router.get("/concordium/balance/{concordium_id}")
 async def get_concordium_balance(
     concordium_id: str,
-    currency: str = "CCD"
+    currency: str = "CCD",
+    blockchain_service: BlockchainIntegrationService = Depends(get_blockchain_service)
 ):
     """Get user's balance from Concordium"""
-    blockchain_service = BlockchainIntegrationService()
     result = await blockchain_service.get_user_balance(concordium_id, currency)
     return result
 
 @api_router.post("/concordium/log-transaction")
 async def log_transaction_on_chain(
     transaction_data: dict,
-    db: Session = Depends(get_db)
+    blockchain_service: BlockchainIntegrationService = Depends(get_blockchain_service),
+    audit_service: AuditService = Depends(get_audit_service)
 ):
     """Log transaction to Concordium blockchain"""
-    blockchain_service = BlockchainIntegrationService()
     result = await blockchain_service.log_transaction_on_chain(transaction_data)
     
     # Log the attempt
-    audit_service = AuditService(db)
     await audit_service.log_action(
         action_type="blockchain_transaction_log",
         details=transaction_data,
@@ -358,14 +483,113 @@ async def log_transaction_on_chain(
     
     return result
 
+# ============================================================================
+# CACHE
+# ============================================================================
+
+@api_router.get("/cache/stats")
+async def cache_stats(api_key: str = Depends(verify_admin_key)):
+    """Get read-through cache hit/miss counters"""
+    return {
+        'success': True,
+        'caches': get_cache_stats()
+    }
+
+# ============================================================================
+# SLOW QUERIES
+# ============================================================================
+
+@api_router.get("/slow-queries")
+async def list_slow_queries(
+    sort: str = "total",
+    limit: int = 50,
+    api_key: str = Depends(verify_admin_key)
+):
+    """Slow statements grouped by fingerprint (sort by total, count, max or recent)"""
+    return {
+        'success': True,
+        'threshold_ms': slow_query_log.threshold * 1000,
+        'queries': slow_query_log.entries(sort, limit)
+    }
+
+@api_router.get("/slow-queries/{fingerprint}")
+async def get_slow_query(fingerprint: str, api_key: str = Depends(verify_admin_key)):
+    """Get one slow statement with its captured query plan"""
+    entry = slow_query_log.get(fingerprint)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Slow query not found")
+    return {
+        'success': True,
+        'query': entry.to_dict()
+    }
+
+@api_router.delete("/slow-queries")
+async def clear_slow_queries(api_key: str = Depends(verify_admin_key)):
+    """Reset the slow-query log"""
+    slow_query_log.clear()
+    return {'success': True}
+
+# ============================================================================
+# PROFILING
+# ============================================================================
+
+@api_router.post("/profiling/arm")
+async def arm_profiling(
+    arm_data: dict,
+    request: Request,
+    api_key: str = Depends(verify_admin_key)
+):
+    """Profile the next N requests to a route template (e.g. /api/v1/transactions)"""
+    route = arm_data.get('route')
+    if route not in {getattr(r, 'path', None) for r in request.app.routes}:
+        raise HTTPException(status_code=404, detail="Unknown route")
+    count = int(arm_data.get('count', 1))
+    if count < 1:
+        raise HTTPException(status_code=400, detail="count must be at least 1")
+    request_profiler.arm(route, count, arm_data.get('method'))
+    return {
+        'success': True,
+        'armed': request_profiler.armed_routes()
+    }
+
+@api_router.delete("/profiling/arm")
+async def disarm_profiling(route: Optional[str] = None, api_key: str = Depends(verify_admin_key)):
+    """Cancel pending profiling for one route, or all routes"""
+    request_profiler.disarm(route)
+    return {
+        'success': True,
+        'armed': request_profiler.armed_routes()
+    }
+
+@api_router.get("/profiling/profiles")
+async def list_profiles(api_key: str = Depends(verify_admin_key)):
+    """List stored request profiles, newest first"""
+    return {
+        'success': True,
+        'armed': request_profiler.armed_routes(),
+        'profiles': [profile.to_dict() for profile in request_profiler.list()]
+    }
+
+@api_router.get("/profiling/profiles/{profile_id}")
+async def get_profile(profile_id: str, format: str = "json", api_key: str = Depends(verify_admin_key)):
+    """Get a request profile; format=collapsed returns flame-graph input"""
+    profile = request_profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "collapsed":
+        return PlainTextResponse(profile.collapsed())
+    return {
+        'success': True,
+        'profile': profile.to_dict(include_stacks=True)
+    }
+
 # ============================================================================
 # HEALTH CHECK
 # ============================================================================
 
 @api_router.get("/health")
-async def health_check():
+async def health_check(blockchain_service: BlockchainIntegrationService = Depends(get_blockchain_service)):
     """Comprehensive health check endpoint"""
-    blockchain_service = BlockchainIntegrationService()
     concordium_health = await blockchain_service.check_service_health()
     
     return {
@@ -0,0 +1,93 @@
+from typing import AsyncIterator
+import asyncio
+
+from fastapi import WebSocket
+from fastapi.responses import StreamingResponse
+from starlette.websockets import WebSocketDisconnect
+
+from src.api.responses import dumps
+from src.config.settings import settings
+from src.utils.notification_hub import NotificationHub, Subscription
+
+# Paths of long-lived responses, which must not count as in-flight requests or slow requests
+STREAM_PATH_SUFFIXES = ('/stream', '/ws')
+
+SSE_HEADERS = {
+    'Cache-Control': 'no-cache',
+    'X-Accel-Buffering': 'no'  # stop nginx from buffering the stream
+}
+
+def is_stream(scope) -> bool:
+    return scope['path'].endswith(STREAM_PATH_SUFFIXES)
+
+async def sse_events(hub: NotificationHub, subscription: Subscription) -> AsyncIterator[bytes]:
+    """Server-sent events for one subscription, with comment heartbeats while idle
+
+    Starlette cancels the generator when the client disconnects, and the
+    subscription is closed in the finally block.
+    """
+    heartbeat = settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS
+    try:
+        yield b"retry: 5000\n\n"
+        while True:
+            event = await subscription.next(heartbeat)
+            if event is None:
+                yield b": keepalive\n\n"
+                continue
+            name, payload = event
+            yield b"event: " + name.encode() + b"\ndata: " + dumps(payload) + b"\n\n"
+    finally:
+        hub.unsubscribe(subscription)
+
+class SSEResponse(StreamingResponse):
+    """Server-sent events response that closes its subscription however the response ends
+
+    sse_events() only gets to its finally block once it has started; a
+    client that disconnects before the first chunk, or a failed send,
+    would otherwise leave the subscription open.
+    """
+
+    def __init__(self, hub: NotificationHub, subscription: Subscription):
+        super().__init__(sse_events(hub, subscription), media_type="text/event-stream", headers=SSE_HEADERS)
+        self.hub = hub
+        self.subscription = subscription
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.hub.unsubscribe(self.subscription)
+
+async def websocket_events(websocket: WebSocket, hub: NotificationHub, subscription: Subscription):
+    """Send a subscription's events as {"event": ..., "data": ...} text frames until the client leaves
+
+    A watcher task reads the socket, because a disconnect only shows up on
+    receive. It ignores client messages and wakes the sender when the
+    client goes away.
+    """
+    heartbeat = settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS
+    closed = ('close', {})
+
+    async def watch_disconnect():
+        try:
+            while (await websocket.receive())['type'] != 'websocket.disconnect':
+                pass
+        finally:
+            subscription.push(closed)
+
+    watcher = asyncio.create_task(watch_disconnect())
+    try:
+        while True:
+            event = await subscription.next(heartbeat)
+            if event is closed:
+                break
+            if event is None:
+                await websocket.send_text('{"event":"keepalive"}')
+                continue
+            name, payload = event
+            await websocket.send_text(dumps({'event': name, 'data': payload}).decode())
+    except (WebSocketDisconnect, RuntimeError, OSError):
+        pass
+    finally:
+        watcher.cancel()
+        hub.unsubscribe(subscription)
@@ -2,6 +2,8 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from src.config.settings import settings
+from src.utils.metrics import install_query_metrics
+from src.utils.slow_query_log import install_slow_query_log, slow_query_log
 
 # Create database engine
 engine = create_engine(
@@ -9,10 +11,18 @@ engine = create_engine(
     connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
 )
 
+# Count and time every statement for /metrics and the per-request query budget
+if settings.METRICS_ENABLED or settings.QUERY_BUDGET_ENABLED:
+    install_query_metrics(engine)
+
+# Log statements above SLOW_QUERY_THRESHOLD_MS with their query plans
+if settings.SLOW_QUERY_LOG_ENABLED:
+    install_slow_query_log(engine, slow_query_log)
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Base class for models
+# Base class for models; every mapped table shares its metadata
 Base = declarative_base()
 
 # Dependency to get database session
@@ -26,7 +36,11 @@ def get_db():
 # Function to initialize database
 def init_db():
     """Initialize database tables"""
-    from src.models import user, transaction, limit, cooldown, self_exclusion
-    from src.models import session, notification, risk_assessment, audit_log, operator
-    
+    from src.models import user, wallet, session, payment, notification, scheduled_notification, risk_assessment, audit_log, operator
+    from src.repositories import transaction_repository, self_exclusion_repository
+
     Base.metadata.create_all(bind=engine)
+
+    # create_all does not alter existing tables; move databases from before API keys were hashed
+    from src.repositories.operator_repository import migrate_plaintext_api_keys
+    migrate_plaintext_api_keys(engine)
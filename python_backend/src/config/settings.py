@@ -1,6 +1,14 @@
 import os
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
+
+# Example values of SECRET_KEY / API_KEY shipped in this file and .env.example
+PLACEHOLDER_SECRETS = frozenset({
+    "your-secret-key-change-in-production",
+    "your-super-secret-key-change-this-in-production",
+    "your_api_key_here",
+    "your_api_key_here_change_in_production",
+})
 
 class Settings(BaseSettings):
     """Application settings"""
@@ -8,6 +16,35 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./responsible_gambling.db"
     
+    # Audit log storage: monthly partitions (PostgreSQL range partitions, one table per month on
+    # SQLite) make retention a partition drop. Takes effect when the tables are created.
+    AUDIT_LOG_PARTITIONED: bool = False
+    AUDIT_LOG_RETENTION_DAYS: int = 0  # 0 keeps every audit log
+    AUDIT_LOG_DELETE_CHUNK_SIZE: int = 1000  # rows per transaction when deleting outside whole partitions
+    AUDIT_LOG_MAINTENANCE_INTERVAL: float = 3600.0  # seconds between partition/retention passes
+    AUDIT_SEARCH_ENABLED: bool = True  # full-text index over audit log reasons and details
+    
+    # Cold archive: closed months of audit logs, payments, transactions and sessions older than
+    # ARCHIVE_HOT_MONTHS move from the database to compressed Parquet files (needs pyarrow)
+    ARCHIVE_ENABLED: bool = False
+    ARCHIVE_DIR: str = "./archive"
+    ARCHIVE_HOT_MONTHS: int = 6  # months kept in the database besides the current one
+    ARCHIVE_INTERVAL: float = 86400.0  # seconds between archive passes
+    ARCHIVE_BATCH_SIZE: int = 50000  # rows per Parquet row group / read batch
+    ARCHIVE_COMPRESSION: str = "zstd"
+
+    # Compact JSON columns (audit details, notification data, risk factors/recommendations): stored
+    # as msgpack + zstd with dictionaries trained per action/notification type (needs msgpack and
+    # zstandard). Rows already stored as JSON stay readable and are rewritten in the background.
+    JSON_COMPRESSION_ENABLED: bool = False
+    JSON_COMPRESSION_LEVEL: int = 3
+    JSON_DICTIONARY_SIZE: int = 8192  # bytes per trained dictionary
+    JSON_DICTIONARY_SAMPLES: int = 2000  # values sampled to train one dictionary
+    JSON_DICTIONARY_MIN_SAMPLES: int = 100  # groups with fewer rows wait for a later pass
+    JSON_COMPACT_BATCH_SIZE: int = 1000  # rows rewritten per transaction
+    JSON_COMPACT_PAUSE: float = 0.05  # seconds between batches
+    JSON_COMPACT_INTERVAL: float = 86400.0  # seconds between training/rewrite passes
+
     # API Configuration
     API_V1_PREFIX: str = "/api/v1"
     PROJECT_NAME: str = "Responsible Gambling Tool and Services"
@@ -23,10 +60,13 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-change-in-production"
     API_KEY: str = "your_api_key_here"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    OPERATOR_LAST_ACTIVE_FLUSH_INTERVAL: int = 30  # seconds between batched last_active writes
+    OPERATOR_INDEX_REFRESH_INTERVAL: int = 30  # seconds between full operator key index reloads (how long a revoked key lingers in other workers)
     
     # Concordium Node.js Service
     CONCORDIUM_SERVICE_URL: str = "http://localhost:3000"
     CONCORDIUM_SERVICE_API_KEY: str = "your_concordium_api_key"
+    CONCORDIUM_SERVICE_TIMEOUT: float = 30.0  # seconds
     
     # Responsible Gambling Settings
     COOLDOWN_PERIOD: int = 24  # hours
@@ -57,10 +97,134 @@ class Settings(BaseSettings):
     NOTIFICATION_EMAIL_ENABLED: bool = False
     NOTIFICATION_SMS_ENABLED: bool = False
     NOTIFICATION_PUSH_ENABLED: bool = False
+    NOTIFICATION_SMTP_HOST: str = "localhost"
+    NOTIFICATION_SMTP_PORT: int = 25
+    NOTIFICATION_SMTP_SENDER: str = "noreply@responsible-gambling.local"
+    NOTIFICATION_SMTP_USERNAME: str = ""
+    NOTIFICATION_SMTP_PASSWORD: str = ""
+    NOTIFICATION_SMTP_STARTTLS: bool = False
+    NOTIFICATION_SMS_GATEWAY_URL: str = "http://localhost:8025/sms"
+    NOTIFICATION_PUSH_GATEWAY_URL: str = "http://localhost:8025/push"
+
+    # Notification delivery workers (claim PENDING notifications and send them through the channels above)
+    NOTIFICATION_DELIVERY_ENABLED: bool = True
+    NOTIFICATION_DELIVERY_WORKERS: int = 4
+    NOTIFICATION_DELIVERY_BATCH_SIZE: int = 100  # notifications claimed per batch
+    NOTIFICATION_DELIVERY_POLL_INTERVAL: float = 1.0  # seconds an idle worker waits before polling again
+    NOTIFICATION_DELIVERY_MAX_ATTEMPTS: int = 5  # attempts before a notification is marked failed
+    NOTIFICATION_DELIVERY_BACKOFF_SECONDS: float = 30.0  # first retry delay, doubled per attempt
+    NOTIFICATION_DELIVERY_MAX_BACKOFF_SECONDS: float = 3600.0
+    NOTIFICATION_DELIVERY_LEASE_SECONDS: int = 300  # claims older than this are taken over (crashed worker)
+
+    # Notification coalescing: repeats of these types for a user within the window (seconds) are
+    # not stored; the window's repeats are summarised in one digest notification when it closes
+    NOTIFICATION_COALESCE_ENABLED: bool = True
+    NOTIFICATION_COALESCE_WINDOWS: Dict[str, int] = {
+        "reality_check": 300,
+        "limit_warning": 900,
+        "break_reminder": 600,
+        "session_time_warning": 300
+    }
+    NOTIFICATION_COALESCE_FLUSH_INTERVAL: float = 5.0  # seconds between digest flushes
+
+    # Notification retention: a notification is kept for the longer of its type's and its
+    # priority's retention (NOTIFICATION_RETENTION_DAYS when neither is listed), and a user
+    # keeps at most NOTIFICATION_RETENTION_MAX_PER_USER. Undelivered (pending) ones are kept.
+    NOTIFICATION_RETENTION_ENABLED: bool = True
+    NOTIFICATION_RETENTION_DAYS: int = 90
+    NOTIFICATION_RETENTION_DAYS_BY_TYPE: Dict[str, int] = {
+        "reality_check": 30,
+        "break_reminder": 30,
+        "session_time_warning": 30,
+        "wellness_tip": 30,
+        "risk_alert": 365,
+        "self_exclusion_reminder": 365
+    }
+    NOTIFICATION_RETENTION_DAYS_BY_PRIORITY: Dict[str, int] = {"high": 180, "critical": 365}
+    NOTIFICATION_RETENTION_MAX_PER_USER: int = 500
+    NOTIFICATION_PURGE_INTERVAL: float = 3600.0  # seconds between purge passes
+    NOTIFICATION_PURGE_CHUNK_SIZE: int = 500  # rows deleted per transaction
+    NOTIFICATION_PURGE_PAUSE: float = 0.05  # seconds between chunks, so other writers get the lock
+
+    # Scheduled notifications (reminders, cooldown-ending and self-exclusion notices)
+    REMINDER_SCHEDULER_ENABLED: bool = True
+    REMINDER_WINDOW_SECONDS: int = 300  # how far ahead due reminders are loaded into memory
+    REMINDER_MAX_LOADED: int = 10000  # cap on reminders held in memory per window
+    REMINDER_BATCH_SIZE: int = 500  # reminders fired per transaction
+    REMINDER_MAX_LATENESS_SECONDS: int = 3600  # reminders overdue by more than this are expired, not fired
+
+    # Notification stream (SSE / WebSocket push to connected clients)
+    NOTIFICATION_STREAM_MAX_CONNECTIONS: int = 50000  # per worker
+    NOTIFICATION_STREAM_MAX_PENDING: int = 100  # events buffered per connection before the oldest are dropped
+    NOTIFICATION_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    
+    # Wallet Balance Sync
+    WALLET_SYNC_ENABLED: bool = True
+    WALLET_SYNC_INTERVAL: int = 30  # seconds between sync cycles
+    WALLET_SYNC_STALENESS: int = 300  # seconds before a cached balance is refreshed
+    WALLET_SYNC_CONCURRENCY: int = 10  # max concurrent balance requests to the chain
+    WALLET_SYNC_BATCH_SIZE: int = 100  # wallets committed per batch
+    WALLET_SYNC_MAX_PER_CYCLE: int = 1000  # wallets refreshed per cycle
+    WALLET_SYNC_ACTIVITY_WINDOW: int = 7  # days of payment activity used for prioritising
+    
+    # Read-through Cache
+    CACHE_BACKEND: str = "memory"  # memory or redis
+    CACHE_TTL: int = 60  # seconds
+    CACHE_MAX_ENTRIES: int = 10000  # per cache namespace
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    
+    # Rate Limiting & Load Shedding
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_OPERATOR_RPS: float = 50.0  # standard compliance level; enhanced x2, premium x5
+    RATE_LIMIT_OPERATOR_BURST: float = 100.0
+    RATE_LIMIT_USER_RPS: float = 5.0
+    RATE_LIMIT_USER_BURST: float = 20.0
+    RATE_LIMIT_ANONYMOUS_RPS: float = 10.0  # per client address, for requests without an API key
+    RATE_LIMIT_ANONYMOUS_BURST: float = 30.0
+    RATE_LIMIT_TRUSTED_PROXIES: List[str] = []  # addresses / CIDRs whose X-Forwarded-For is honoured
+    RATE_LIMIT_MAX_BUCKETS: int = 100000
+    LOAD_SHED_MAX_IN_FLIGHT: int = 500  # concurrent requests per worker
+    LOAD_SHED_LAG_THRESHOLD_MS: float = 200.0  # event-loop lag before shedding starts
+    
+    # Metrics
+    METRICS_ENABLED: bool = True
+    
+    # Query Budget (per request)
+    QUERY_BUDGET_ENABLED: bool = True
+    QUERY_BUDGET_MAX_STATEMENTS: int = 25
+    QUERY_BUDGET_MAX_DB_MS: float = 250.0
+    QUERY_BUDGET_REPEAT_THRESHOLD: int = 5  # same statement this many times in one request looks like N+1
+    QUERY_BUDGET_HEADERS: bool = False  # send X-DB-* headers outside DEBUG mode too
+    
+    # Slow-query log
+    SLOW_QUERY_LOG_ENABLED: bool = True
+    SLOW_QUERY_THRESHOLD_MS: float = 100.0
+    SLOW_QUERY_EXPLAIN: bool = True  # capture EXPLAIN / EXPLAIN QUERY PLAN once per fingerprint
+    SLOW_QUERY_MAX_FINGERPRINTS: int = 500
+    
+    # Tracing (OTLP/JSON lines, rotated by size)
+    TRACING_ENABLED: bool = True
+    TRACING_SAMPLE_RATE: float = 0.01
+    TRACING_EXPORT_PATH: str = "traces/spans.jsonl"
+    TRACING_MAX_BYTES: int = 50 * 1024 * 1024
+    TRACING_BACKUP_COUNT: int = 5
+    TRACING_SERVICE_NAME: str = "responsible-gambling-backend"
+    
+    # On-demand request profiling (admin-triggered; not installed at all when disabled)
+    PROFILING_ENABLED: bool = False
+    PROFILING_INTERVAL_MS: float = 5.0
+    PROFILING_MAX_PROFILES: int = 50
     
     # Logging
     LOG_LEVEL: str = "INFO"
+    LOG_SUCCESS_SAMPLE_RATE: float = 0.1  # fraction of fast successful requests that are logged
+    LOG_SLOW_REQUEST_MS: float = 1000.0  # requests slower than this are always logged
     
+    def is_placeholder(self, name: str) -> bool:
+        """Whether a secret setting is unset or still one of the shipped example values"""
+        value = getattr(self, name)
+        return not value or value in PLACEHOLDER_SECRETS
+
     class Config:
         env_file = ".env"
         case_sensitive = False
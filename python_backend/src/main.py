@@ -1,12 +1,31 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
 
 from src.api.routes import api_router
-from src.api.middleware import LoggingMiddleware, ErrorHandlingMiddleware
+from src.api.payment_routes import router as payment_router
+from src.api.middleware import (
+    LoggingMiddleware, ErrorHandlingMiddleware, MetricsMiddleware, ProfilingMiddleware,
+    QueryBudgetMiddleware, RateLimitMiddleware, TracingMiddleware
+)
 from src.config.settings import settings
 from src.config.database import init_db
+from src.services.container import ServiceContainer
+from src.services.archive_service import archiver
+from src.services.audit_maintenance_service import audit_log_maintenance
+from src.services.json_compression_service import json_compactor
+from src.services.notification_coalescer import notification_coalescer
+from src.services.notification_delivery_service import notification_delivery
+from src.services.notification_retention_service import notification_purger
+from src.services.reminder_service import reminder_scheduler
+from src.services.wallet_sync_service import WalletSyncScheduler
+from src.services.operator_auth_service import last_active_tracker, warm_operator_index
+from src.utils.json_codec import json_codec
+from src.utils.loop_lag import loop_lag_monitor
+from src.utils.metrics import register_loop_lag, register_queue, render_metrics, unregister_queue
+from src.utils.tracing import tracer
 
 # Configure logging
 logging.basicConfig(
@@ -27,15 +46,101 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
     
+    # The admin API stays disabled (503) until real keys are configured
+    if settings.is_placeholder('API_KEY') or settings.is_placeholder('SECRET_KEY'):
+        logger.warning("API_KEY or SECRET_KEY is a placeholder; administrative endpoints are disabled")
+    
+    # Load operator API keys into memory for request authentication
+    warm_operator_index()
+    last_active_tracker.start()
+    register_queue('operator_last_active', lambda: last_active_tracker.pending)
+    
+    # Track event-loop lag for load shedding
+    loop_lag_monitor.start()
+    register_loop_lag(loop_lag_monitor)
+    
+    # Process-wide service singletons, injected into routes via src.api.dependencies
+    container = ServiceContainer()
+    app.state.container = container
+    
     # Log configuration
     logger.info(f"Server running on {settings.HOST}:{settings.PORT}")
     logger.info(f"Concordium service URL: {settings.CONCORDIUM_SERVICE_URL}")
     logger.info(f"Database: {settings.DATABASE_URL}")
     
+    # Start background wallet balance sync
+    wallet_sync = None
+    if settings.WALLET_SYNC_ENABLED:
+        wallet_sync = WalletSyncScheduler(blockchain_service=container.blockchain_service)
+        wallet_sync.start()
+        register_queue('wallet_sync', lambda: wallet_sync.pending)
+    app.state.wallet_sync = wallet_sync
+    
+    # Start the notification delivery workers
+    if settings.NOTIFICATION_DELIVERY_ENABLED:
+        notification_delivery.start()
+        register_queue('notification_delivery', lambda: notification_delivery.pending)
+    
+    # Fire scheduled reminders when they fall due
+    if settings.REMINDER_SCHEDULER_ENABLED:
+        reminder_scheduler.start()
+        register_queue('reminders', lambda: reminder_scheduler.pending)
+    
+    # Write digests for coalesced notification bursts as their windows close
+    if settings.NOTIFICATION_COALESCE_ENABLED:
+        notification_coalescer.start()
+        register_queue('notification_coalescer', lambda: notification_coalescer.pending)
+    
+    # Purge notifications past their retention
+    if settings.NOTIFICATION_RETENTION_ENABLED:
+        notification_purger.start()
+    
+    # Create audit log partitions ahead of time, drop months past retention, fill the search index
+    audit_maintenance = (
+        settings.AUDIT_LOG_PARTITIONED or settings.AUDIT_LOG_RETENTION_DAYS > 0 or settings.AUDIT_SEARCH_ENABLED
+    )
+    if audit_maintenance:
+        audit_log_maintenance.start()
+    
+    # Move closed months of history tables to the cold archive
+    if settings.ARCHIVE_ENABLED:
+        archiver.start()
+    
+    # Train JSON dictionaries and rewrite rows still stored as JSON text. Compressed rows
+    # stay readable with the setting off, but not without msgpack/zstandard: refuse to start then
+    json_compactor.check_storage()
+    if json_codec.enabled:
+        json_compactor.start()
+    elif settings.JSON_COMPRESSION_ENABLED:
+        logger.warning("JSON_COMPRESSION_ENABLED is set but msgpack/zstandard are not installed; storing plain JSON")
+    
     yield
     
     # Cleanup on shutdown
     logger.info("Shutting down Responsible Gambling Tool and Services...")
+    if wallet_sync:
+        await wallet_sync.stop()
+        unregister_queue('wallet_sync')
+    if json_codec.enabled:
+        await json_compactor.stop()
+    if settings.ARCHIVE_ENABLED:
+        await archiver.stop()
+    if audit_maintenance:
+        await audit_log_maintenance.stop()
+    if settings.NOTIFICATION_RETENTION_ENABLED:
+        await notification_purger.stop()
+    if settings.NOTIFICATION_COALESCE_ENABLED:
+        await notification_coalescer.stop()
+        unregister_queue('notification_coalescer')
+    if settings.REMINDER_SCHEDULER_ENABLED:
+        await reminder_scheduler.stop()
+        unregister_queue('reminders')
+    if settings.NOTIFICATION_DELIVERY_ENABLED:
+        await notification_delivery.stop()
+        unregister_queue('notification_delivery')
+    await last_active_tracker.stop()
+    await loop_lag_monitor.stop()
+    tracer.shutdown()
 
 # Create FastAPI app
 app = FastAPI(
@@ -45,6 +150,17 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# On-demand request profiling (innermost, so profiles show the route's own stack)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Per-request query budget and N+1 detection
+if settings.QUERY_BUDGET_ENABLED:
+    app.add_middleware(QueryBudgetMiddleware)
+
+# Rate limiting and load shedding (innermost, so rejections still get CORS headers and are logged)
+app.add_middleware(RateLimitMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -54,12 +170,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Sampled request tracing (inside logging, so spans carry the request ID)
+if settings.TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
+
 # Add custom middleware
 app.add_middleware(LoggingMiddleware)
 app.add_middleware(ErrorHandlingMiddleware)
 
+# Outermost, so latency includes every other middleware
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include the API routes
 app.include_router(api_router)
+app.include_router(payment_router)
 
 @app.get("/")
 def read_root():
@@ -73,6 +198,12 @@ def read_root():
         "concordium_service": settings.CONCORDIUM_SERVICE_URL
     }
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    def metrics():
+        """Prometheus scrape endpoint"""
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -1,25 +1,41 @@
-from sqlalchemy import Column, String, DateTime, JSON, Text
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import DDL, Column, Float, Integer, String, DateTime, Text, event
+from sqlalchemy.orm import validates
 from datetime import datetime
-
-Base = declarative_base()
+from typing import Any, Dict
+from src.config.database import Base
+from src.config.settings import settings
+from src.utils.json_codec import CompressedJSON
 
 class AuditLog(Base):
     """Audit log model for compliance and tracking"""
     __tablename__ = 'audit_logs'
+    # Monthly range partitions on PostgreSQL (see repositories/audit_log_partitions.py)
+    __table_args__ = {'postgresql_partition_by': 'RANGE (timestamp)'} if settings.AUDIT_LOG_PARTITIONED else {}
 
     log_id = Column(String, primary_key=True, index=True)
-    timestamp = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    # Part of the key only when partitioned: a partitioned table's primary key must include the partition column
+    timestamp = Column(DateTime, primary_key=settings.AUDIT_LOG_PARTITIONED, default=datetime.utcnow, index=True)
     action_type = Column(String, nullable=False, index=True)  # login, transaction, limit_set, exclusion, etc.
     user_id = Column(String, nullable=True, index=True)
     operator_id = Column(String, nullable=True, index=True)
     platform_id = Column(String, nullable=True)
-    ip_address = Column(String, nullable=True)
+    ip_address = Column(String, nullable=True, index=True)
     user_agent = Column(String, nullable=True)
-    details = Column(JSON, nullable=False)  # Detailed action data
+    details = Column(CompressedJSON('audit_logs.details'), nullable=False)  # Detailed action data
     result = Column(String, nullable=True)  # success, failure, blocked
     reason = Column(Text, nullable=True)  # Reason for action/block
     concordium_tx_hash = Column(String, nullable=True)  # Blockchain transaction hash
+    # Commonly searched details keys, copied out of details on write so they can be indexed
+    # (details may be stored compressed, see utils/json_codec.py)
+    detail_game_id = Column(String, nullable=True, index=True)
+    detail_amount = Column(Float, nullable=True, index=True)
+    detail_concordium_id = Column(String, nullable=True, index=True)
+
+    @validates('details')
+    def _copy_searched_details(self, key: str, details: Dict) -> Dict:
+        for column, value in searched_details(details).items():
+            setattr(self, column, value)
+        return details
 
     def __repr__(self):
         return f"<AuditLog(log_id='{self.log_id}', action_type='{self.action_type}', user_id='{self.user_id}', timestamp='{self.timestamp}')>"
@@ -39,3 +55,58 @@ class AuditLog(Base):
             'reason': self.reason,
             'concordium_tx_hash': self.concordium_tx_hash
         }
+
+def searched_details(details: Any) -> Dict:
+    """The detail_* column values for a details value"""
+    details = details if isinstance(details, dict) else {}
+    amount = details.get('amount')
+    try:
+        amount = None if amount is None or isinstance(amount, bool) else float(amount)
+    except (TypeError, ValueError):
+        amount = None
+    game_id, concordium_id = details.get('game_id'), details.get('concordium_id')
+    return {
+        'detail_game_id': None if game_id is None else str(game_id),
+        'detail_amount': amount,
+        'detail_concordium_id': None if concordium_id is None else str(concordium_id)
+    }
+
+class AuditLogSearch(Base):
+    """Full-text document of an audit log: its reason and flattened details
+
+    Kept outside audit_logs so one index covers every month partition and
+    retention can remove documents by timestamp. On SQLite the
+    audit_log_search_fts FTS5 table indexes body (kept in sync by
+    triggers); on PostgreSQL a generated tsvector column has a GIN index.
+    """
+    __tablename__ = 'audit_log_search'
+
+    id = Column(Integer, primary_key=True)  # the FTS5 rowid on SQLite
+    log_id = Column(String, nullable=False, unique=True)
+    timestamp = Column(DateTime, nullable=False, index=True)
+    body = Column(Text, nullable=False)
+
+for statement in (
+    # unicode61 splits on punctuation; keep keys (game_id, limits.daily), IPs, dates and emails whole
+    # (document() drops '.', ':' and '@' at the ends of words, so sentence punctuation is not kept)
+    "CREATE VIRTUAL TABLE audit_log_search_fts USING fts5(body, content='audit_log_search', content_rowid='id', "
+    "tokenize=\"unicode61 tokenchars '_.-@:'\")",
+    "CREATE TRIGGER audit_log_search_ai AFTER INSERT ON audit_log_search BEGIN "
+    "INSERT INTO audit_log_search_fts(rowid, body) VALUES (new.id, new.body); END",
+    "CREATE TRIGGER audit_log_search_ad AFTER DELETE ON audit_log_search BEGIN "
+    "INSERT INTO audit_log_search_fts(audit_log_search_fts, rowid, body) VALUES ('delete', old.id, old.body); END",
+    "CREATE TRIGGER audit_log_search_au AFTER UPDATE ON audit_log_search BEGIN "
+    "INSERT INTO audit_log_search_fts(audit_log_search_fts, rowid, body) VALUES ('delete', old.id, old.body); "
+    "INSERT INTO audit_log_search_fts(rowid, body) VALUES (new.id, new.body); END",
+):
+    event.listen(AuditLogSearch.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+for statement in (
+    "ALTER TABLE audit_log_search ADD COLUMN search tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple', body)) STORED",
+    "CREATE INDEX ix_audit_log_search_search ON audit_log_search USING GIN (search)",
+):
+    event.listen(AuditLogSearch.__table__, 'after_create', DDL(statement).execute_if(dialect='postgresql'))
+event.listen(
+    AuditLogSearch.__table__, 'before_drop',
+    DDL("DROP TABLE IF EXISTS audit_log_search_fts").execute_if(dialect='sqlite')
+)
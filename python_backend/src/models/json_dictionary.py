@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON, LargeBinary
+from datetime import datetime
+from src.config.database import Base
+
+class JsonDictionary(Base):
+    """A zstd dictionary trained on one group of a compressed JSON column's values"""
+    __tablename__ = 'json_dictionaries'
+
+    dict_id = Column(Integer, primary_key=True, autoincrement=False)  # the id zstd writes into each frame
+    column = Column(String, nullable=False, index=True)  # e.g. audit_logs.details
+    name = Column(String, nullable=True)  # the group it was trained on (action_type, notification_type)
+    signatures = Column(JSON, nullable=False)  # {value shape: sample count}, see utils/json_codec.py
+    samples = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<JsonDictionary(dict_id={self.dict_id}, column='{self.column}', name='{self.name}')>"
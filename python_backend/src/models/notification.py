@@ -1,9 +1,8 @@
-from sqlalchemy import Column, String, DateTime, JSON, Enum as SQLEnum
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Column, Index, Integer, String, DateTime, Text, Enum as SQLEnum
 from datetime import datetime
 from enum import Enum
-
-Base = declarative_base()
+from src.config.database import Base
+from src.utils.json_codec import CompressedJSON
 
 class NotificationStatus(str, Enum):
     """Notification delivery status"""
@@ -26,12 +25,22 @@ class NotificationType(str, Enum):
     REALITY_CHECK = "reality_check"
     SELF_EXCLUSION_REMINDER = "self_exclusion_reminder"
 
+# Statuses a user has not read yet
+UNREAD_STATUSES = (NotificationStatus.PENDING, NotificationStatus.SENT, NotificationStatus.DELIVERED)
+
 class Notification(Base):
     """Notification model for user alerts and messages"""
     __tablename__ = 'notifications'
+    __table_args__ = (
+        # A user's history newest first (list, per-user cap) and unread count, without a sort or row lookups
+        Index('ix_notifications_user_id_created_at', 'user_id', 'created_at'),
+        Index('ix_notifications_user_id_status', 'user_id', 'status'),
+        # Age-based purge: one range scan per (type, priority) policy
+        Index('ix_notifications_type_priority_created_at', 'notification_type', 'priority', 'created_at'),
+    )
 
     notification_id = Column(String, primary_key=True, index=True)
-    user_id = Column(String, nullable=False, index=True)
+    user_id = Column(String, nullable=False)  # indexed by the composite indexes above
     notification_type = Column(SQLEnum(NotificationType), nullable=False)
     title = Column(String, nullable=False)
     message = Column(String, nullable=False)
@@ -39,9 +48,16 @@ class Notification(Base):
     sent_at = Column(DateTime, nullable=True)
     read_at = Column(DateTime, nullable=True)
     status = Column(SQLEnum(NotificationStatus), nullable=False, default=NotificationStatus.PENDING)
-    notification_data = Column(JSON, nullable=True)  # Renamed from 'metadata' to avoid SQLAlchemy conflict
+    notification_data = Column(CompressedJSON('notifications.notification_data'), nullable=True)  # Renamed from 'metadata' to avoid SQLAlchemy conflict
     priority = Column(String, default='normal')  # low, normal, high, critical
 
+    # Delivery bookkeeping for the notification worker pool
+    attempts = Column(Integer, nullable=False, default=0, server_default='0')
+    next_attempt_at = Column(DateTime, nullable=True, index=True)  # not before; null means now
+    claim_token = Column(String, nullable=True, index=True)  # set while a worker holds the notification
+    claimed_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+
     def __repr__(self):
         return f"<Notification(notification_id='{self.notification_id}', user_id='{self.user_id}', type='{self.notification_type}', status='{self.status}')>"
 
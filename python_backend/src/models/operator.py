@@ -1,8 +1,6 @@
 from sqlalchemy import Column, String, Boolean, DateTime, JSON
-from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
-
-Base = declarative_base()
+from src.config.database import Base
 
 class Operator(Base):
     """Gambling platform operator model"""
@@ -11,7 +9,7 @@ class Operator(Base):
     operator_id = Column(String, primary_key=True, index=True)
     name = Column(String, nullable=False)
     platform_url = Column(String, nullable=True)
-    api_key = Column(String, nullable=False, unique=True)
+    api_key_hash = Column(String, nullable=False, unique=True)  # HMAC-SHA256 of the API key, never the key itself
     is_active = Column(Boolean, default=True)
     registered_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     last_active = Column(DateTime, nullable=True)
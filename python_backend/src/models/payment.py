@@ -1,9 +1,7 @@
 from sqlalchemy import Column, String, Float, DateTime, Enum as SQLEnum
-from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime, timezone
 from enum import Enum
-
-Base = declarative_base()
+from src.config.database import Base
 
 class PaymentType(str, Enum):
     """Payment type enumeration"""
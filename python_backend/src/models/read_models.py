@@ -0,0 +1,74 @@
+"""Row DTOs for the ORM-free read path
+
+Slotted dataclasses filled straight from Core select() rows. They skip
+ORM identity-map and instance-state bookkeeping, and FastJSONResponse
+serialises them, with their datetimes and enums, without a to_dict()
+step. Field names and order match the projected columns and the keys
+of the models' to_dict().
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+
+from src.models.notification import NotificationStatus, NotificationType
+from src.models.payment import PaymentStatus, PaymentType
+
+@dataclass(slots=True)
+class SessionRow:
+    session_id: str
+    user_id: str
+    platform_id: str
+    start_time: datetime
+    end_time: Optional[datetime]
+    total_wagered: float
+    total_won: float
+    total_lost: float
+    reality_checks_shown: int
+    currency: str
+    status: str
+
+@dataclass(slots=True)
+class NotificationRow:
+    notification_id: str
+    user_id: str
+    notification_type: NotificationType
+    title: str
+    message: str
+    created_at: datetime
+    sent_at: Optional[datetime]
+    read_at: Optional[datetime]
+    status: NotificationStatus
+    notification_data: Any
+    priority: str
+
+@dataclass(slots=True)
+class PaymentRow:
+    payment_id: str
+    user_id: str
+    payment_type: PaymentType
+    amount: float
+    currency: str
+    status: PaymentStatus
+    tx_hash: Optional[str]
+    from_address: Optional[str]
+    to_address: Optional[str]
+    game_id: Optional[str]
+    session_id: Optional[str]
+    created_at: datetime
+    completed_at: Optional[datetime]
+    error_message: Optional[str]
+
+@dataclass(slots=True)
+class AuditLogRow:
+    log_id: str
+    timestamp: datetime
+    action_type: str
+    user_id: Optional[str]
+    operator_id: Optional[str]
+    platform_id: Optional[str]
+    ip_address: Optional[str]
+    user_agent: Optional[str]
+    details: Any
+    result: Optional[str]
+    reason: Optional[str]
+    concordium_tx_hash: Optional[str]
@@ -1,10 +1,9 @@
-from sqlalchemy import Column, String, Float, DateTime, JSON, Enum as SQLEnum
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Column, String, Float, DateTime, Enum as SQLEnum
 from datetime import datetime
 from enum import Enum
 from typing import Dict, List
-
-Base = declarative_base()
+from src.config.database import Base
+from src.utils.json_codec import CompressedJSON
 
 class RiskLevel(str, Enum):
     """Risk level classification"""
@@ -21,9 +20,9 @@ class RiskAssessment(Base):
     user_id = Column(String, nullable=False, index=True)
     risk_score = Column(Float, nullable=False)  # 0-100
     risk_level = Column(SQLEnum(RiskLevel), nullable=False)
-    factors = Column(JSON, nullable=False)  # Contributing factors as dict
+    factors = Column(CompressedJSON('risk_assessments.factors'), nullable=False)  # Contributing factors as dict
     assessed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
-    recommendations = Column(JSON, nullable=True)  # List of recommendations
+    recommendations = Column(CompressedJSON('risk_assessments.recommendations'), nullable=True)  # List of recommendations
     previous_score = Column(Float, nullable=True)
     trend = Column(String, nullable=True)  # improving, stable, worsening
 
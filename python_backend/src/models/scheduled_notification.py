@@ -0,0 +1,55 @@
+from sqlalchemy import Column, String, DateTime, JSON, Index, Enum as SQLEnum
+from datetime import datetime
+from enum import Enum
+from src.config.database import Base
+from src.models.notification import NotificationType
+
+class ScheduledStatus(str, Enum):
+    """Lifecycle of a scheduled notification"""
+    SCHEDULED = "scheduled"
+    FIRED = "fired"
+    CANCELLED = "cancelled"
+    EXPIRED = "expired"  # the scheduler was down for longer than the allowed lateness
+
+class ScheduledNotification(Base):
+    """A notification to create at due_at (reminders, cooldown-ending and self-exclusion notices)
+
+    The notification created when it fires reuses schedule_id as its
+    notification_id.
+    """
+    __tablename__ = 'scheduled_notifications'
+    __table_args__ = (
+        # The scheduler's window query: status = 'scheduled' AND due_at < :until ORDER BY due_at
+        Index('ix_scheduled_notifications_status_due_at', 'status', 'due_at'),
+    )
+
+    schedule_id = Column(String, primary_key=True)
+    user_id = Column(String, nullable=False, index=True)
+    notification_type = Column(SQLEnum(NotificationType), nullable=False)
+    title = Column(String, nullable=False)
+    message = Column(String, nullable=False)
+    notification_data = Column(JSON, nullable=True)
+    priority = Column(String, default='normal')
+    due_at = Column(DateTime, nullable=False)
+    status = Column(SQLEnum(ScheduledStatus), nullable=False, default=ScheduledStatus.SCHEDULED)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    fired_at = Column(DateTime, nullable=True)
+    fire_token = Column(String, nullable=True, index=True)
+
+    def __repr__(self):
+        return f"<ScheduledNotification(schedule_id='{self.schedule_id}', user_id='{self.user_id}', due_at='{self.due_at}', status='{self.status}')>"
+
+    def to_dict(self):
+        return {
+            'schedule_id': self.schedule_id,
+            'user_id': self.user_id,
+            'notification_type': self.notification_type.value if isinstance(self.notification_type, Enum) else self.notification_type,
+            'title': self.title,
+            'message': self.message,
+            'notification_data': self.notification_data,
+            'priority': self.priority,
+            'due_at': self.due_at.isoformat() if self.due_at else None,
+            'status': self.status.value if isinstance(self.status, Enum) else self.status,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'fired_at': self.fired_at.isoformat() if self.fired_at else None
+        }
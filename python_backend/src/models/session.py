@@ -1,16 +1,14 @@
-from sqlalchemy import Column, String, Float, Integer, DateTime, ForeignKey
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Column, String, Float, Integer, DateTime
 from datetime import datetime
 from typing import Optional
-
-Base = declarative_base()
+from src.config.database import Base
 
 class Session(Base):
     """Gambling session model for tracking user gaming sessions"""
     __tablename__ = 'sessions'
 
     session_id = Column(String, primary_key=True, index=True)
-    user_id = Column(String, ForeignKey('users.id'), nullable=False, index=True)
+    user_id = Column(String, nullable=False, index=True)
     platform_id = Column(String, nullable=False, index=True)
     start_time = Column(DateTime, nullable=False, default=datetime.utcnow)
     end_time = Column(DateTime, nullable=True)
@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, and_, cast
+from sqlalchemy.orm import backref, foreign, relationship
 from datetime import datetime
-
-Base = declarative_base()
+from src.config.database import Base
+from src.models.payment import Payment
+from src.models.session import Session
+from src.models.wallet import Wallet
 
 class User(Base):
     __tablename__ = 'users'
@@ -25,6 +27,36 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     last_login = Column(DateTime, nullable=True)
 
+    # Dependent tables store the id as a string, so joins compare against CAST(users.id)
+    # and the relationships are read-only: writers keep setting user_id themselves
+    wallet = relationship(
+        Wallet,
+        primaryjoin=lambda: foreign(Wallet.user_id) == cast(User.id, String),
+        uselist=False,
+        viewonly=True,
+        backref=backref('user', uselist=False, viewonly=True)
+    )
+    sessions = relationship(
+        Session,
+        primaryjoin=lambda: foreign(Session.user_id) == cast(User.id, String),
+        order_by=lambda: Session.start_time.desc(),
+        viewonly=True,
+        backref=backref('user', uselist=False, viewonly=True)
+    )
+    active_session = relationship(
+        Session,
+        primaryjoin=lambda: and_(foreign(Session.user_id) == cast(User.id, String), Session.status == 'active'),
+        uselist=False,
+        viewonly=True
+    )
+    payments = relationship(
+        Payment,
+        primaryjoin=lambda: foreign(Payment.user_id) == cast(User.id, String),
+        order_by=lambda: Payment.created_at.desc(),
+        viewonly=True,
+        backref=backref('user', uselist=False, viewonly=True)
+    )
+
     def __repr__(self):
         return f"<User(wallet='{self.wallet_address}', verified={self.age_verified})>"
     
@@ -1,8 +1,6 @@
 from sqlalchemy import Column, String, Float, DateTime, Boolean
-from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime, timezone
-
-Base = declarative_base()
+from src.config.database import Base
 
 class Wallet(Base):
     """Simple wallet model for Concordium integration"""
@@ -0,0 +1,148 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+import re
+import weakref
+
+from sqlalchemy import MetaData, Table, select, text, union_all
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import FromClause
+
+from src.config.settings import settings
+from src.models.audit_log import AuditLog
+
+PARTITION_NAME = re.compile(r'^audit_logs_(\d{4})_(\d{2})$')
+
+def month_start(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, 1)
+
+def next_month(month: datetime) -> datetime:
+    return datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+def partition_name(month: datetime) -> str:
+    return f"audit_logs_{month.year:04d}_{month.month:02d}"
+
+class AuditLogPartitions:
+    """Monthly partitions of audit_logs, named audit_logs_YYYY_MM
+
+    On PostgreSQL audit_logs is created PARTITION BY RANGE (timestamp)
+    and every month is a partition of it. Queries keep using audit_logs
+    and the planner prunes months from their timestamp filters.
+
+    SQLite has no partitioning, so every month is a table of its own with
+    the audit_logs columns and indexes. Writes go to the month's table
+    and reads select from a UNION ALL of audit_logs (rows written before
+    partitioning was turned on) and the tables of the months their
+    timestamp filters cover; SQLite pushes the remaining filters into
+    every branch.
+
+    Either way dropping a month is a DROP TABLE instead of a DELETE that
+    touches every row and index entry.
+    """
+
+    def __init__(self, enabled: bool = None):
+        self.enabled = settings.AUDIT_LOG_PARTITIONED if enabled is None else enabled
+        self._metadata = MetaData()
+        # Months known to exist, per engine, so a write only issues DDL for a new month
+        self._created: 'weakref.WeakKeyDictionary[Engine, Set[datetime]]' = weakref.WeakKeyDictionary()
+
+    def table(self, month: datetime) -> Table:
+        """The SQLite table holding one month"""
+        name = partition_name(month)
+        if name not in self._metadata.tables:
+            AuditLog.__table__.to_metadata(self._metadata, name=name)
+        return self._metadata.tables[name]
+
+    def ensure(self, db: Session, moment: datetime):
+        """Create the partition for moment's month if it does not exist yet
+
+        New partitions are committed straight away, so a write that is
+        rolled back afterwards does not take its month's table with it.
+        """
+        month = month_start(moment)
+        engine = db.get_bind()
+        created = self._created.setdefault(engine, set())
+        if month in created:
+            return
+        connection = db.connection()
+        if connection.dialect.name == 'postgresql':
+            connection.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF audit_logs "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+            ))
+        else:
+            self.table(month).create(bind=connection, checkfirst=True)
+        db.commit()
+        created.add(month)
+
+    def months(self, db: Session) -> List[datetime]:
+        """Existing partitions, oldest first"""
+        connection = db.connection()
+        if connection.dialect.name == 'postgresql':
+            names = connection.execute(text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = 'audit_logs'"
+            )).scalars()
+        else:
+            names = connection.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'audit\\_logs\\_%' ESCAPE '\\'"
+            )).scalars()
+        matches = (PARTITION_NAME.match(name) for name in names)
+        return sorted(datetime(int(m.group(1)), int(m.group(2)), 1) for m in matches if m)
+
+    def source(self, db: Session, start_date: datetime = None, end_date: datetime = None) -> FromClause:
+        """What to select audit logs from for a timestamp range
+
+        audit_logs itself unless this is partitioned SQLite, where it is the
+        UNION ALL of audit_logs and the month tables overlapping the range.
+        """
+        if not self.enabled or db.get_bind().dialect.name == 'postgresql':
+            return AuditLog.__table__
+        first = month_start(start_date) if start_date else None
+        tables = [
+            self.table(month) for month in self.months(db)
+            if (first is None or month >= first) and (end_date is None or month <= end_date)
+        ]
+        if not tables:
+            return AuditLog.__table__
+        return union_all(
+            select(AuditLog.__table__), *(select(table) for table in tables)
+        ).subquery('audit_logs')
+
+    def drop_before(self, db: Session, cutoff: datetime) -> Dict[str, int]:
+        """Drop every partition whose month ends on or before cutoff; returns {name: rows dropped}"""
+        dropped: Dict[str, int] = {}
+        for month in self.months(db):
+            if next_month(month) > cutoff:
+                break
+            name = partition_name(month)
+            dropped[name] = self.count(db, month)
+            self._drop(db, month)
+        db.commit()
+        return dropped
+
+    def count(self, db: Session, month: datetime) -> int:
+        return db.connection().execute(text(f"SELECT COUNT(*) FROM {partition_name(month)}")).scalar()
+
+    def drop(self, db: Session, month: datetime):
+        """Drop one month's partition"""
+        self._drop(db, month)
+        db.commit()
+
+    def _drop(self, db: Session, month: datetime):
+        name = partition_name(month)
+        db.connection().execute(text(f"DROP TABLE {name}"))
+        if name in self._metadata.tables:
+            self._metadata.remove(self._metadata.tables[name])
+        self._created.get(db.get_bind(), set()).discard(month)
+
+    def partial_month_table(self, db: Session, cutoff: datetime) -> Optional[Table]:
+        """The SQLite table of the month cutoff falls in, if it exists (its older rows are deleted row by row)"""
+        if not self.enabled or db.get_bind().dialect.name == 'postgresql':
+            return None
+        month = month_start(cutoff)
+        return self.table(month) if month in self.months(db) else None
+
+audit_log_partitions = AuditLogPartitions()
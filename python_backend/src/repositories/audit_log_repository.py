@@ -1,75 +1,125 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, insert, select, tuple_
+from sqlalchemy.orm import Session, aliased
 from src.models.audit_log import AuditLog
-from typing import List, Optional, Dict
+from src.repositories.audit_log_partitions import AuditLogPartitions, audit_log_partitions
+from src.repositories.audit_search import AuditSearchIndex, audit_search_index
+from typing import List, Optional, Dict, Tuple
 from datetime import datetime
+from src.config.settings import settings
+from src.utils.tracing import trace_class
+import base64
 
+def encode_cursor(log: AuditLog) -> str:
+    """Opaque position after log in newest-first order"""
+    return base64.urlsafe_b64encode(f"{log.timestamp.isoformat()}|{log.log_id}".encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Raises ValueError for a cursor encode_cursor did not make"""
+    try:
+        timestamp, log_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|', 1)
+        return datetime.fromisoformat(timestamp), log_id
+    except (UnicodeError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+@trace_class()
 class AuditLogRepository:
-    """Repository for audit log data access"""
-    
-    def __init__(self, db: Session):
+    """Repository for audit log data access
+
+    Every query selects from the partitions its timestamp filters cover
+    (see AuditLogPartitions); without partitioning that is audit_logs.
+    """
+
+    def __init__(self, db: Session, partitions: AuditLogPartitions = None, search_index: AuditSearchIndex = None):
         self.db = db
+        self.partitions = partitions or audit_log_partitions
+        self.search_index = search_index or audit_search_index
+
+    def _logs(self, start_date: datetime = None, end_date: datetime = None):
+        """AuditLog, or AuditLog mapped onto the month tables covering the range"""
+        source = self.partitions.source(self.db, start_date, end_date)
+        if source is AuditLog.__table__:
+            return AuditLog
+        return aliased(AuditLog, source, adapt_on_names=True)
 
     def create_log(self, log: AuditLog) -> AuditLog:
         """Create a new audit log entry"""
-        self.db.add(log)
+        log.timestamp = log.timestamp or datetime.utcnow()
+        if self.partitions.enabled:
+            # ensure() commits a new month's table, so it runs before anything joins this transaction
+            self.partitions.ensure(self.db, log.timestamp)
+        if self.search_index.enabled:
+            self.search_index.add(self.db, [log])
+        if not self.partitions.enabled:
+            self.db.add(log)
+            self.db.commit()
+            self.db.refresh(log)
+            return log
+        if self.db.get_bind().dialect.name == 'postgresql':
+            self.db.add(log)  # routed to its partition by the database
+        else:
+            table = self.partitions.table(log.timestamp)
+            self.db.execute(insert(table), [{column.name: getattr(log, column.name) for column in table.columns}])
         self.db.commit()
-        self.db.refresh(log)
         return log
 
     def get_log(self, log_id: str) -> Optional[AuditLog]:
         """Get audit log by ID"""
-        return self.db.query(AuditLog).filter(AuditLog.log_id == log_id).first()
+        log = self._logs()
+        return self.db.query(log).filter(log.log_id == log_id).first()
 
     def get_logs_by_user(
-        self, 
+        self,
         user_id: str,
         start_date: datetime = None,
         end_date: datetime = None,
         action_types: List[str] = None
     ) -> List[AuditLog]:
         """Get all logs for a user"""
-        query = self.db.query(AuditLog).filter(AuditLog.user_id == user_id)
-        
+        log = self._logs(start_date, end_date)
+        query = self.db.query(log).filter(log.user_id == user_id)
+
         if start_date:
-            query = query.filter(AuditLog.timestamp >= start_date)
+            query = query.filter(log.timestamp >= start_date)
         if end_date:
-            query = query.filter(AuditLog.timestamp <= end_date)
+            query = query.filter(log.timestamp <= end_date)
         if action_types:
-            query = query.filter(AuditLog.action_type.in_(action_types))
-        
-        return query.order_by(AuditLog.timestamp.desc()).all()
+            query = query.filter(log.action_type.in_(action_types))
+
+        return query.order_by(log.timestamp.desc()).all()
 
     def get_logs_by_operator(
-        self, 
+        self,
         operator_id: str,
         start_date: datetime = None,
         end_date: datetime = None
     ) -> List[AuditLog]:
         """Get all logs for an operator"""
-        query = self.db.query(AuditLog).filter(AuditLog.operator_id == operator_id)
-        
+        log = self._logs(start_date, end_date)
+        query = self.db.query(log).filter(log.operator_id == operator_id)
+
         if start_date:
-            query = query.filter(AuditLog.timestamp >= start_date)
+            query = query.filter(log.timestamp >= start_date)
         if end_date:
-            query = query.filter(AuditLog.timestamp <= end_date)
-        
-        return query.order_by(AuditLog.timestamp.desc()).all()
+            query = query.filter(log.timestamp <= end_date)
+
+        return query.order_by(log.timestamp.desc()).all()
 
     def get_logs_by_action_type(
-        self, 
+        self,
         action_type: str,
         start_date: datetime = None,
         end_date: datetime = None
     ) -> List[AuditLog]:
         """Get all logs of a specific action type"""
-        query = self.db.query(AuditLog).filter(AuditLog.action_type == action_type)
-        
+        log = self._logs(start_date, end_date)
+        query = self.db.query(log).filter(log.action_type == action_type)
+
         if start_date:
-            query = query.filter(AuditLog.timestamp >= start_date)
+            query = query.filter(log.timestamp >= start_date)
         if end_date:
-            query = query.filter(AuditLog.timestamp <= end_date)
-        
-        return query.order_by(AuditLog.timestamp.desc()).all()
+            query = query.filter(log.timestamp <= end_date)
+
+        return query.order_by(log.timestamp.desc()).all()
 
     def get_logs_with_blockchain_tx(
         self,
@@ -77,40 +127,87 @@ class AuditLogRepository:
         operator_id: str = None
     ) -> List[AuditLog]:
         """Get logs that have blockchain transaction hashes"""
-        query = self.db.query(AuditLog).filter(AuditLog.concordium_tx_hash.isnot(None))
-        
+        log = self._logs()
+        query = self.db.query(log).filter(log.concordium_tx_hash.isnot(None))
+
         if user_id:
-            query = query.filter(AuditLog.user_id == user_id)
+            query = query.filter(log.user_id == user_id)
         if operator_id:
-            query = query.filter(AuditLog.operator_id == operator_id)
-        
-        return query.order_by(AuditLog.timestamp.desc()).all()
+            query = query.filter(log.operator_id == operator_id)
+
+        return query.order_by(log.timestamp.desc()).all()
 
     def search_logs(self, filters: Dict, limit: int = 100) -> List[AuditLog]:
         """Search logs with dynamic filters"""
-        query = self.db.query(AuditLog)
-        
-        if 'user_id' in filters:
-            query = query.filter(AuditLog.user_id == filters['user_id'])
-        if 'operator_id' in filters:
-            query = query.filter(AuditLog.operator_id == filters['operator_id'])
-        if 'action_type' in filters:
-            query = query.filter(AuditLog.action_type == filters['action_type'])
-        if 'result' in filters:
-            query = query.filter(AuditLog.result == filters['result'])
+        return self.search_page(filters, limit)[0]
+
+    def search_page(self, filters: Dict, limit: int = 100, cursor: str = None) -> Tuple[List[AuditLog], Optional[str]]:
+        """One page of logs matching the filters, newest first, and the cursor of the next page
+
+        Besides exact matches on the log's columns, 'text' matches words
+        of the reason and details through the full-text index, and
+        game_id, concordium_id, amount_min and amount_max use the
+        indexed detail_* columns.
+        """
+        log = self._logs(filters.get('start_date'), filters.get('end_date'))
+        query = self.db.query(log)
+
+        for key in ('user_id', 'operator_id', 'action_type', 'result', 'ip_address'):
+            if key in filters:
+                query = query.filter(getattr(log, key) == filters[key])
         if 'start_date' in filters:
-            query = query.filter(AuditLog.timestamp >= filters['start_date'])
+            query = query.filter(log.timestamp >= filters['start_date'])
         if 'end_date' in filters:
-            query = query.filter(AuditLog.timestamp <= filters['end_date'])
-        if 'ip_address' in filters:
-            query = query.filter(AuditLog.ip_address == filters['ip_address'])
-        
-        return query.order_by(AuditLog.timestamp.desc()).limit(limit).all()
-
-    def delete_old_logs(self, before_date: datetime) -> int:
-        """Delete logs older than specified date"""
-        count = self.db.query(AuditLog).filter(
-            AuditLog.timestamp < before_date
-        ).delete()
-        self.db.commit()
+            query = query.filter(log.timestamp <= filters['end_date'])
+        if 'game_id' in filters:
+            query = query.filter(log.detail_game_id == filters['game_id'])
+        if 'concordium_id' in filters:
+            query = query.filter(log.detail_concordium_id == filters['concordium_id'])
+        if 'amount_min' in filters:
+            query = query.filter(log.detail_amount >= filters['amount_min'])
+        if 'amount_max' in filters:
+            query = query.filter(log.detail_amount <= filters['amount_max'])
+        if filters.get('text'):
+            matching = self.search_index.matching(self.db, filters['text'])
+            if matching is not None:
+                query = query.filter(log.log_id.in_(matching))
+        if cursor:
+            timestamp, log_id = decode_cursor(cursor)
+            query = query.filter(tuple_(log.timestamp, log.log_id) < (timestamp, log_id))
+
+        logs = query.order_by(log.timestamp.desc(), log.log_id.desc()).limit(limit + 1).all()
+        if len(logs) > limit:
+            return logs[:limit], encode_cursor(logs[limit - 1])
+        return logs, None
+
+    def delete_old_logs(self, before_date: datetime, chunk_size: int = None) -> int:
+        """Delete logs older than specified date
+
+        With partitioning, months that ended by before_date are dropped
+        whole. Everything else (the month before_date falls in, rows
+        written before partitioning, unpartitioned deployments) is deleted
+        chunk_size rows per transaction, so no single transaction holds
+        the write lock for long.
+        """
+        chunk_size = chunk_size or settings.AUDIT_LOG_DELETE_CHUNK_SIZE
+        count = 0
+        tables = [AuditLog.__table__]
+        if self.partitions.enabled:
+            count += sum(self.partitions.drop_before(self.db, before_date).values())
+            partial = self.partitions.partial_month_table(self.db, before_date)
+            if partial is not None:
+                tables.append(partial)
+        for table in tables:
+            while True:
+                deleted = self.db.execute(
+                    delete(table).where(table.c.timestamp < before_date, table.c.log_id.in_(
+                        select(table.c.log_id).where(table.c.timestamp < before_date).limit(chunk_size).scalar_subquery()
+                    ))
+                ).rowcount
+                self.db.commit()
+                count += deleted
+                if deleted < chunk_size:
+                    break
+        if self.search_index.enabled:
+            self.search_index.forget_before(self.db, before_date, chunk_size)
         return count
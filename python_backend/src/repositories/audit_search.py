@@ -0,0 +1,114 @@
+from datetime import datetime
+from typing import Any, Iterable, Iterator, List, Optional
+import re
+
+from sqlalchemy import Select, delete, exists, func, insert, literal_column, select, text
+from sqlalchemy.orm import Session
+
+from src.config.settings import settings
+from src.models.audit_log import AuditLog, AuditLogSearch
+from src.repositories.audit_log_partitions import AuditLogPartitions, audit_log_partitions
+
+# Words, IPs, ids, dates and emails; a trailing * makes a prefix search
+_TERM = re.compile(r"[\w.@:-]+\*?")
+# '.', ':' and '@' at either end of a word are punctuation ("exceeded.", "Blocked:"), not part of it
+_EDGE = re.compile(r"(?<![\w.@:-])[.@:]+|[.@:]+(?![\w.@:-])")
+
+def flatten(value: Any, path: str = '') -> Iterator[str]:
+    """'key value' pairs of a details value, nested keys joined with dots"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from flatten(item, f"{path}.{key}" if path else str(key))
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from flatten(item, path)
+    elif value is not None:
+        yield f"{path} {value}" if path else str(value)
+
+def document(reason: Optional[str], details: Any) -> str:
+    return _EDGE.sub('', ' '.join(filter(None, [reason, *flatten(details)])))
+
+class AuditSearchIndex:
+    """Full-text documents of audit logs in audit_log_search
+
+    Documents are written with their log, in the same transaction, and
+    removed with it by retention and archiving; backfill() indexes logs
+    written without one (bulk inserts, logs from before the index).
+    """
+
+    def __init__(self, enabled: bool = None, partitions: AuditLogPartitions = None):
+        self.enabled = settings.AUDIT_SEARCH_ENABLED if enabled is None else enabled
+        self.partitions = partitions or audit_log_partitions
+
+    def add(self, db: Session, logs: Iterable[AuditLog]):
+        """Index logs; the caller commits"""
+        rows = [
+            {'log_id': log.log_id, 'timestamp': log.timestamp, 'body': document(log.reason, log.details)}
+            for log in logs
+        ]
+        if rows:
+            db.execute(insert(AuditLogSearch), rows)
+
+    def forget(self, db: Session, log_ids: List[str]):
+        """Remove the documents of deleted logs; the caller commits"""
+        db.execute(delete(AuditLogSearch).where(AuditLogSearch.log_id.in_(log_ids)))
+
+    def forget_before(self, db: Session, cutoff: datetime, chunk_size: int) -> int:
+        """Remove documents of logs older than cutoff, chunk_size per transaction"""
+        count = 0
+        while True:
+            deleted = db.execute(delete(AuditLogSearch).where(AuditLogSearch.id.in_(
+                select(AuditLogSearch.id).where(AuditLogSearch.timestamp < cutoff).limit(chunk_size).scalar_subquery()
+            ))).rowcount
+            db.commit()
+            count += deleted
+            if deleted < chunk_size:
+                return count
+
+    def backfill(self, db: Session, batch_size: int = None) -> int:
+        """Index every log that has no document, batch_size per transaction"""
+        batch_size = batch_size or settings.AUDIT_LOG_DELETE_CHUNK_SIZE
+        tables = [AuditLog.__table__]
+        if self.partitions.enabled and db.get_bind().dialect.name != 'postgresql':
+            tables.extend(self.partitions.table(month) for month in self.partitions.months(db))
+        count = 0
+        for table in tables:
+            last = None
+            while True:
+                query = select(table.c.log_id, table.c.timestamp, table.c.reason, table.c.details).where(
+                    ~exists().where(AuditLogSearch.log_id == table.c.log_id)
+                ).order_by(table.c.log_id).limit(batch_size)
+                if last is not None:
+                    query = query.where(table.c.log_id > last)
+                rows = db.execute(query).all()
+                if not rows:
+                    break
+                self.add(db, rows)
+                db.commit()
+                count += len(rows)
+                last = rows[-1].log_id
+        return count
+
+    def matching(self, db: Session, query: str) -> Optional[Select]:
+        """Ids of the logs whose reason or details contain every term of query (None if it has none)"""
+        terms = _TERM.findall(_EDGE.sub('', query or ''))
+        if not terms:
+            return None
+        dialect = db.get_bind().dialect.name
+        if dialect == 'sqlite':
+            expression = ' AND '.join(f'"{term.rstrip("*")}"' + ('*' if term.endswith('*') else '') for term in terms)
+            rowids = text(
+                "SELECT rowid FROM audit_log_search_fts WHERE audit_log_search_fts MATCH :query"
+            ).bindparams(query=expression).columns(rowid=AuditLogSearch.id.type)
+            documents = select(AuditLogSearch.log_id).where(AuditLogSearch.id.in_(rowids))
+        elif dialect == 'postgresql':
+            documents = select(AuditLogSearch.log_id).where(
+                literal_column('search').op('@@')(func.plainto_tsquery('simple', ' '.join(term.rstrip('*') for term in terms)))
+            )
+        else:
+            documents = select(AuditLogSearch.log_id).where(
+                *(AuditLogSearch.body.ilike(f"%{term.rstrip('*')}%") for term in terms)
+            )
+        return documents
+
+audit_search_index = AuditSearchIndex()
@@ -0,0 +1,297 @@
+"""Cold archive of closed months in compressed Parquet files
+
+Layout under the archive root:
+
+    manifest.json
+    audit_logs/2025-01/part-0.parquet
+    payments/2025-01/part-0.parquet
+    ...
+
+The manifest lists every part with its row count, size, checksum and
+state. A part is 'exported' once its file is complete and 'archived' once
+its rows are gone from the database; readers only use archived parts, so
+a month is never counted twice while it moves. Rows are sorted within a
+part (audit logs by user, then time) and written in row groups, so the
+min/max statistics let filters skip most of a file.
+"""
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from sqlalchemy import Boolean, DateTime, Enum as SQLEnum, Float, Integer, JSON, Table
+
+from src.config.settings import settings
+from src.models.audit_log import AuditLog
+from src.models.payment import Payment, PaymentStatus
+from src.models.session import Session as GamingSession
+from src.repositories.audit_log_partitions import next_month
+from src.repositories.transaction_repository import Transaction
+from src.utils.json_codec import CompressedJSON
+
+try:
+    import pyarrow as pa  # optional dependency
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pc = ds = pq = None
+
+logger = logging.getLogger(__name__)
+
+class ArchivedTable:
+    """A table whose closed months move to the archive"""
+
+    __slots__ = ('table', 'time_column', 'sort', 'closed')
+
+    def __init__(self, table: Table, time_column: str, sort: Tuple[str, ...], closed: Callable = None):
+        self.table = table
+        self.time_column = time_column
+        self.sort = sort
+        self.closed = closed  # table -> extra condition for rows that may be archived
+
+    @property
+    def name(self) -> str:
+        return self.table.name
+
+    @property
+    def key(self) -> str:
+        return self.table.primary_key.columns.values()[0].name
+
+    def json_columns(self) -> List[str]:
+        return [column.name for column in self.table.columns if _is_json(column.type)]
+
+    def schema(self):
+        return pa.schema([(column.name, _arrow_type(column.type)) for column in self.table.columns])
+
+ARCHIVED_TABLES: Dict[str, ArchivedTable] = {
+    spec.name: spec for spec in (
+        ArchivedTable(AuditLog.__table__, 'timestamp', ('user_id', 'timestamp')),
+        ArchivedTable(
+            Payment.__table__, 'created_at', ('user_id', 'created_at'),
+            lambda table: table.c.status != PaymentStatus.PENDING
+        ),
+        ArchivedTable(Transaction.__table__, 'timestamp', ('user_id', 'timestamp')),
+        ArchivedTable(
+            GamingSession.__table__, 'start_time', ('user_id', 'start_time'),
+            lambda table: table.c.end_time.isnot(None)
+        ),
+    )
+}
+
+def _is_json(column_type) -> bool:
+    return isinstance(column_type, (JSON, CompressedJSON))
+
+def _arrow_type(column_type):
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, Float):
+        return pa.float64()
+    if isinstance(column_type, DateTime):
+        return pa.timestamp('us')
+    return pa.string()  # String, Text, Enum (its value) and JSON (as text)
+
+def _to_arrow(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def _converter(column) -> Optional[Callable[[List], List]]:
+    """Converts a column's values for Arrow; None for columns Arrow takes as they are"""
+    if _is_json(column.type):
+        return lambda values: [None if value is None else json.dumps(value) for value in values]
+    if isinstance(column.type, (SQLEnum, DateTime)):
+        return lambda values: [_to_arrow(value) for value in values]
+    return None
+
+def month_key(month: datetime) -> str:
+    return f"{month.year:04d}-{month.month:02d}"
+
+class ColdArchive:
+    """Parquet files and their manifest under one directory"""
+
+    def __init__(self, root: str = None, compression: str = None):
+        self.root = root or settings.ARCHIVE_DIR
+        self.compression = compression or settings.ARCHIVE_COMPRESSION
+        self._lock = threading.Lock()
+        self._cached: Tuple[int, Optional[Dict]] = (0, None)
+
+    @property
+    def available(self) -> bool:
+        return pa is not None
+
+    # Manifest
+
+    def manifest(self) -> Dict:
+        """The manifest, re-read only when the file changes"""
+        path = os.path.join(self.root, 'manifest.json')
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return {'version': 1, 'tables': {}}
+        if self._cached[0] != mtime:
+            with open(path) as f:
+                self._cached = (mtime, json.load(f))
+        return json.loads(json.dumps(self._cached[1]))  # callers may modify their copy
+
+    def _save(self, manifest: Dict):
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, 'manifest.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(path + '.tmp', path)
+
+    def parts(self, table_name: str, start: datetime = None, end: datetime = None, state: str = 'archived') -> List[Dict]:
+        """Parts of the months overlapping [start, end]"""
+        selected = []
+        for key, month_parts in sorted(self.manifest()['tables'].get(table_name, {}).items()):
+            month = datetime.strptime(key, '%Y-%m')
+            if (start is None or next_month(month) > start) and (end is None or month <= end):
+                selected.extend(part for part in month_parts if part['state'] == state)
+        return selected
+
+    def covers(self, table_name: str, start: datetime = None, end: datetime = None) -> bool:
+        """Whether any archived month overlaps the range"""
+        return bool(self.parts(table_name, start, end))
+
+    # Writing
+
+    def write_part(self, spec: ArchivedTable, month: datetime, batches: Iterable[List[Dict]]) -> Optional[Dict]:
+        """Write rows (in batches of dicts, already sorted) as the month's next part; None if there were none
+
+        The part is recorded as 'exported'; call mark_archived once its rows
+        are deleted from the database.
+        """
+        self._require()
+        schema = spec.schema()
+        converters = {column.name: _converter(column) for column in spec.table.columns}
+        directory = os.path.join(self.root, spec.name, month_key(month))
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            existing = self.manifest()['tables'].get(spec.name, {}).get(month_key(month), [])
+            relative = os.path.join(spec.name, month_key(month), f"part-{len(existing)}.parquet")
+        path = os.path.join(self.root, relative)
+
+        rows = 0
+        first = last = None
+        writer = None
+        try:
+            for batch in batches:
+                if not batch:
+                    continue
+                columns = {}
+                for name, convert in converters.items():
+                    values = [row[name] for row in batch]
+                    columns[name] = values if convert is None else convert(values)
+                table = pa.Table.from_pydict(columns, schema=schema)
+                if writer is None:
+                    writer = pq.ParquetWriter(path + '.tmp', schema, compression=self.compression)
+                writer.write_table(table, row_group_size=settings.ARCHIVE_BATCH_SIZE)
+                rows += len(batch)
+                low, high = pc.min_max(table.column(spec.time_column)).values()
+                low, high = low.as_py(), high.as_py()
+                first = low if first is None or low < first else first
+                last = high if last is None or high > last else last
+        finally:
+            if writer is not None:
+                writer.close()
+        if not rows:
+            return None
+        os.replace(path + '.tmp', path)
+
+        part = {
+            'file': relative,
+            'rows': rows,
+            'bytes': os.path.getsize(path),
+            'sha256': _sha256(path),
+            'min': first.isoformat(),
+            'max': last.isoformat(),
+            'exported_at': datetime.utcnow().isoformat(),
+            'state': 'exported'
+        }
+        with self._lock:
+            manifest = self.manifest()
+            manifest['tables'].setdefault(spec.name, {}).setdefault(month_key(month), []).append(part)
+            self._save(manifest)
+        return part
+
+    def mark_archived(self, table_name: str, file: str):
+        with self._lock:
+            manifest = self.manifest()
+            for month_parts in manifest['tables'].get(table_name, {}).values():
+                for part in month_parts:
+                    if part['file'] == file:
+                        part['state'] = 'archived'
+                        part['archived_at'] = datetime.utcnow().isoformat()
+            self._save(manifest)
+
+    def keys(self, part: Dict, column: str, batch_size: int) -> Iterator[List]:
+        """The values of one column of a part, in batches"""
+        self._require()
+        parquet = pq.ParquetFile(os.path.join(self.root, part['file']))
+        for batch in parquet.iter_batches(batch_size=batch_size, columns=[column]):
+            yield batch.column(0).to_pylist()
+
+    # Reading
+
+    def read(
+        self,
+        table_name: str,
+        start: datetime = None,
+        end: datetime = None,
+        equals: Dict[str, Any] = None
+    ) -> List[Dict]:
+        """Archived rows with start <= time <= end and column == value (or in a list of values)
+
+        Only files of months overlapping the range are opened, and the
+        filter is pushed down to the Parquet reader, which skips row
+        groups whose statistics rule them out.
+        """
+        parts = self.parts(table_name, start, end)
+        if not parts:
+            return []
+        self._require()
+        spec = ARCHIVED_TABLES[table_name]
+        dataset = ds.dataset(
+            [os.path.join(self.root, part['file']) for part in parts], format='parquet', schema=spec.schema()
+        )
+        conditions = []
+        time = ds.field(spec.time_column)
+        if start is not None:
+            conditions.append(time >= pa.scalar(start, pa.timestamp('us')))
+        if end is not None:
+            conditions.append(time <= pa.scalar(end, pa.timestamp('us')))
+        for column, value in (equals or {}).items():
+            if value is None:
+                continue
+            conditions.append(ds.field(column).isin(value) if isinstance(value, (list, tuple, set)) else ds.field(column) == value)
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        rows = dataset.to_table(filter=expression).to_pylist()
+        for column in spec.json_columns():
+            for row in rows:
+                if row[column] is not None:
+                    row[column] = json.loads(row[column])
+        return rows
+
+    def _require(self):
+        if pa is None:
+            raise RuntimeError("pyarrow is required for the cold archive (pip install pyarrow)")
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+cold_archive = ColdArchive()
@@ -1,8 +1,11 @@
+from sqlalchemy import delete, func, or_, select, update
 from sqlalchemy.orm import Session
-from src.models.notification import Notification, NotificationStatus
-from typing import List, Optional
-from datetime import datetime
+from src.models.notification import UNREAD_STATUSES, Notification, NotificationStatus, NotificationType
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta
+from src.utils.tracing import trace_class
 
+@trace_class()
 class NotificationRepository:
     """Repository for notification data access"""
     
@@ -33,7 +36,7 @@ class NotificationRepository:
         
         if unread_only:
             query = query.filter(
-                Notification.status.in_([NotificationStatus.PENDING, NotificationStatus.SENT, NotificationStatus.DELIVERED])
+                Notification.status.in_(UNREAD_STATUSES)
             )
         
         return query.order_by(Notification.created_at.desc()).limit(limit).all()
@@ -42,7 +45,7 @@ class NotificationRepository:
         """Get count of unread notifications"""
         return self.db.query(Notification).filter(
             Notification.user_id == user_id,
-            Notification.status.in_([NotificationStatus.PENDING, NotificationStatus.SENT, NotificationStatus.DELIVERED])
+            Notification.status.in_(UNREAD_STATUSES)
         ).count()
 
     def update_notification(self, notification: Notification) -> Notification:
@@ -71,3 +74,83 @@ class NotificationRepository:
         })
         self.db.commit()
         return count
+
+    def claim_pending(self, token: str, batch_size: int, now: datetime, lease_seconds: int) -> List[Notification]:
+        """Claim up to batch_size due PENDING notifications for one delivery worker
+
+        A notification is due once its next_attempt_at has passed and it is
+        unclaimed, or its claim is older than the lease (the worker holding
+        it died). One UPDATE stamps a fresh token on the batch and the batch
+        is read back by that token. On PostgreSQL the batch subquery takes
+        FOR UPDATE SKIP LOCKED, so concurrent workers skip each other's rows
+        instead of waiting on them; SQLite serialises writers anyway.
+        """
+        batch = (
+            select(Notification.notification_id)
+            .where(
+                Notification.status == NotificationStatus.PENDING,
+                or_(Notification.next_attempt_at.is_(None), Notification.next_attempt_at <= now),
+                or_(Notification.claim_token.is_(None), Notification.claimed_at < now - timedelta(seconds=lease_seconds))
+            )
+            .order_by(Notification.created_at)
+            .limit(batch_size)
+        )
+        if self.db.bind.dialect.name == 'postgresql':
+            batch = batch.with_for_update(skip_locked=True)
+        self.db.execute(
+            update(Notification)
+            .where(Notification.notification_id.in_(batch.scalar_subquery()))
+            .values(claim_token=token, claimed_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return self.db.execute(select(Notification).where(Notification.claim_token == token)).scalars().all()
+
+    def purge_older_than(
+        self,
+        notification_type: NotificationType,
+        priority: str,
+        cutoff: datetime,
+        limit: int
+    ) -> List[Tuple[str, NotificationStatus]]:
+        """Delete up to limit non-pending notifications of one type and priority created before cutoff"""
+        return self._delete_chunk(
+            select(Notification.notification_id)
+            .where(
+                Notification.notification_type == notification_type,
+                Notification.priority == priority,
+                Notification.created_at < cutoff,
+                Notification.status != NotificationStatus.PENDING
+            )
+            .limit(limit)
+        )
+
+    def users_over(self, max_per_user: int) -> List[str]:
+        """Users holding more than max_per_user notifications"""
+        return self.db.execute(
+            select(Notification.user_id)
+            .group_by(Notification.user_id)
+            .having(func.count() > max_per_user)
+        ).scalars().all()
+
+    def purge_beyond_latest(self, user_id: str, keep: int, limit: int) -> List[Tuple[str, NotificationStatus]]:
+        """Delete up to limit of a user's non-pending notifications older than their newest keep"""
+        return self._delete_chunk(
+            select(Notification.notification_id)
+            .where(Notification.user_id == user_id, Notification.status != NotificationStatus.PENDING)
+            .order_by(Notification.created_at.desc(), Notification.notification_id.desc())
+            .offset(keep)
+            .limit(limit)
+        )
+
+    def _delete_chunk(self, ids) -> List[Tuple[str, NotificationStatus]]:
+        """Delete the selected notifications in one short transaction; returns their (user_id, status)"""
+        # The id subquery runs on an index and the delete goes by primary key
+        deleted = self.db.execute(
+            delete(Notification)
+            .where(Notification.notification_id.in_(ids.scalar_subquery()))
+            .returning(Notification.user_id, Notification.status)
+            .execution_options(synchronize_session=False)
+        ).all()
+        self.db.commit()
+        return [tuple(row) for row in deleted]
@@ -1,18 +1,79 @@
 from sqlalchemy.orm import Session
 from src.models.operator import Operator
-from typing import List, Optional
+from src.utils.cache import get_cache, snapshot_row, restore_row, history_values
+from src.utils.operator_index import operator_key_index, hash_api_key
+from sqlalchemy import bindparam, inspect, text, update
+from sqlalchemy.engine import Engine
+from typing import Dict, List, Optional
 from datetime import datetime
+import logging
+from src.utils.tracing import trace_class
 
+logger = logging.getLogger(__name__)
+
+def migrate_plaintext_api_keys(engine: Engine) -> int:
+    """Replace the plaintext operators.api_key column of an existing database by api_key_hash
+
+    create_all does not alter existing tables, and without api_key_hash no
+    operator can be registered or authenticated. Each stored key is hashed
+    into api_key_hash and the plaintext column is dropped. SQLite cannot
+    drop a UNIQUE column, so there the table is rebuilt. Returns the number
+    of keys hashed (0 when there is nothing to migrate).
+    """
+    columns = {column['name'] for column in inspect(engine).get_columns('operators')}
+    if 'api_key' not in columns or 'api_key_hash' in columns:
+        return 0
+    table = Operator.__table__
+    with engine.begin() as connection:
+        keys = connection.execute(text("SELECT operator_id, api_key FROM operators")).all()
+        if connection.dialect.name == 'sqlite':
+            connection.execute(text("ALTER TABLE operators RENAME TO operators_plaintext"))
+            for index in inspect(connection).get_indexes('operators_plaintext'):
+                connection.execute(text(f"DROP INDEX {index['name']}"))
+            table.create(connection)
+            kept = ', '.join(column.name for column in table.columns if column.name in columns)
+            # The plaintext key only fills the NOT NULL column until it is hashed below, in this transaction
+            connection.execute(text(
+                f"INSERT INTO operators ({kept}, api_key_hash) SELECT {kept}, api_key FROM operators_plaintext"
+            ))
+            connection.execute(text("DROP TABLE operators_plaintext"))
+        else:
+            connection.execute(text("ALTER TABLE operators ADD COLUMN api_key_hash VARCHAR"))
+        if keys:
+            connection.execute(
+                update(table).where(table.c.operator_id == bindparam('b_id')).values(api_key_hash=bindparam('b_hash')),
+                [{'b_id': operator_id, 'b_hash': hash_api_key(api_key)} for operator_id, api_key in keys]
+            )
+        if connection.dialect.name != 'sqlite':
+            connection.execute(text("ALTER TABLE operators ALTER COLUMN api_key_hash SET NOT NULL"))
+            connection.execute(text("ALTER TABLE operators ADD CONSTRAINT operators_api_key_hash_key UNIQUE (api_key_hash)"))
+            connection.execute(text("ALTER TABLE operators DROP COLUMN api_key"))
+    logger.info(f"Hashed {len(keys)} plaintext operator API keys into operators.api_key_hash")
+    return len(keys)
+
+@trace_class()
 class OperatorRepository:
     """Repository for operator data access"""
     
     def __init__(self, db: Session):
         self.db = db
+        self.cache_by_api_key = get_cache('operators_by_api_key')
+
+    def _commit(self, operator: Operator, deleted: bool = False):
+        """Commit pending changes, then refresh the key index and drop cached lookups"""
+        key_hashes = history_values(operator, 'api_key_hash')
+        operator_id = operator.operator_id
+        self.db.commit()
+        self.cache_by_api_key.invalidate(*key_hashes)
+        if deleted:
+            operator_key_index.remove(operator_id)
+        else:
+            operator_key_index.upsert(operator)
 
     def create_operator(self, operator: Operator) -> Operator:
         """Create a new operator"""
         self.db.add(operator)
-        self.db.commit()
+        self._commit(operator)
         self.db.refresh(operator)
         return operator
 
@@ -22,7 +83,16 @@ class OperatorRepository:
 
     def get_operator_by_api_key(self, api_key: str) -> Optional[Operator]:
         """Get operator by API key"""
-        return self.db.query(Operator).filter(Operator.api_key == api_key).first()
+        key_hash = hash_api_key(api_key)
+        row = self.cache_by_api_key.get_or_load(
+            key_hash,
+            lambda: snapshot_row(self.db.query(Operator).filter(Operator.api_key_hash == key_hash).first())
+        )
+        return restore_row(self.db, Operator, row)
+
+    def get_operator_by_api_key_hash(self, key_hash: str) -> Optional[Operator]:
+        """Get operator by API key digest, bypassing the cache"""
+        return self.db.query(Operator).filter(Operator.api_key_hash == key_hash).first()
 
     def get_all_operators(self, active_only: bool = False) -> List[Operator]:
         """Get all operators"""
@@ -35,7 +105,7 @@ class OperatorRepository:
 
     def update_operator(self, operator: Operator) -> Operator:
         """Update operator"""
-        self.db.commit()
+        self._commit(operator)
         self.db.refresh(operator)
         return operator
 
@@ -44,16 +114,27 @@ class OperatorRepository:
         operator = self.get_operator(operator_id)
         if operator:
             operator.last_active = datetime.utcnow()
-            self.db.commit()
+            self._commit(operator)
             return True
         return False
 
+    def bulk_update_last_active(self, last_active: Dict[str, datetime]) -> int:
+        """Write many operators' last active timestamps in one executemany"""
+        if not last_active:
+            return 0
+        self.db.execute(
+            update(Operator),
+            [{'operator_id': operator_id, 'last_active': ts} for operator_id, ts in last_active.items()]
+        )
+        self.db.commit()
+        return len(last_active)
+
     def deactivate_operator(self, operator_id: str) -> bool:
         """Deactivate an operator"""
         operator = self.get_operator(operator_id)
         if operator:
             operator.is_active = False
-            self.db.commit()
+            self._commit(operator)
             return True
         return False
 
@@ -62,6 +143,6 @@ class OperatorRepository:
         operator = self.get_operator(operator_id)
         if operator:
             self.db.delete(operator)
-            self.db.commit()
+            self._commit(operator, deleted=True)
             return True
         return False
@@ -2,7 +2,9 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta, timezone
 from src.models.payment import Payment, PaymentType, PaymentStatus
+from src.utils.tracing import trace_class
 
+@trace_class()
 class PaymentRepository:
     """Repository for payment data access"""
     
@@ -10,10 +12,9 @@ class PaymentRepository:
         self.db = db
 
     def create(self, payment: Payment) -> Payment:
-        """Create a new payment"""
+        """Create a new payment (attributes reload on first access after the commit)"""
         self.db.add(payment)
         self.db.commit()
-        self.db.refresh(payment)
         return payment
     
     def get_by_id(self, payment_id: str) -> Optional[Payment]:
@@ -39,10 +40,11 @@ class PaymentRepository:
         payment_id: str, 
         status: PaymentStatus,
         tx_hash: Optional[str] = None,
-        error_message: Optional[str] = None
+        error_message: Optional[str] = None,
+        commit: bool = True
     ) -> Optional[Payment]:
-        """Update payment status"""
-        payment = self.get_by_id(payment_id)
+        """Update payment status; with commit=False the change goes out with the caller's next commit"""
+        payment = self.db.get(Payment, payment_id)
         if payment:
             payment.status = status
             if tx_hash:
@@ -51,8 +53,9 @@ class PaymentRepository:
                 payment.error_message = error_message
             if status == PaymentStatus.COMPLETED:
                 payment.completed_at = datetime.now(timezone.utc)
-            self.db.commit()
-            self.db.refresh(payment)
+            if commit:
+                self.db.commit()
+                self.db.refresh(payment)
         return payment
     
     def get_totals(self, user_id: str, days: Optional[int] = None) -> dict:
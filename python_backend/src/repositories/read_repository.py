@@ -0,0 +1,72 @@
+from dataclasses import fields
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.models.audit_log import AuditLog
+from src.models.notification import UNREAD_STATUSES, Notification
+from src.models.payment import Payment, PaymentType
+from src.models.read_models import AuditLogRow, NotificationRow, PaymentRow, SessionRow
+from src.models.session import Session as GamingSession
+from src.repositories.audit_log_partitions import audit_log_partitions
+from src.utils.tracing import trace_class
+
+def _projection(model, row_type, source=None):
+    """The model's (or source's) columns in the DTO's field order"""
+    columns = (model.__table__ if source is None else source).c
+    return select(*(columns[field.name] for field in fields(row_type)))
+
+_SESSIONS = _projection(GamingSession, SessionRow)
+_NOTIFICATIONS = _projection(Notification, NotificationRow)
+_PAYMENTS = _projection(Payment, PaymentRow)
+_AUDIT_LOGS = _projection(AuditLog, AuditLogRow)
+
+@trace_class()
+class ReadRepository:
+    """List queries for read endpoints, returning row DTOs instead of ORM entities"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def user_sessions(self, user_id: str, limit: int = 10) -> List[SessionRow]:
+        query = _SESSIONS.where(GamingSession.user_id == user_id).order_by(GamingSession.start_time.desc()).limit(limit)
+        return [SessionRow(*row) for row in self.db.execute(query)]
+
+    def user_notifications(self, user_id: str, unread_only: bool = False, limit: int = 50) -> List[NotificationRow]:
+        query = _NOTIFICATIONS.where(Notification.user_id == user_id)
+        if unread_only:
+            query = query.where(Notification.status.in_(UNREAD_STATUSES))
+        query = query.order_by(Notification.created_at.desc()).limit(limit)
+        return [NotificationRow(*row) for row in self.db.execute(query)]
+
+    def user_payments(
+        self,
+        user_id: str,
+        payment_type: Optional[PaymentType] = None,
+        limit: int = 100
+    ) -> List[PaymentRow]:
+        query = _PAYMENTS.where(Payment.user_id == user_id)
+        if payment_type:
+            query = query.where(Payment.payment_type == payment_type)
+        query = query.order_by(Payment.created_at.desc()).limit(limit)
+        return [PaymentRow(*row) for row in self.db.execute(query)]
+
+    def user_audit_logs(
+        self,
+        user_id: str,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        action_types: List[str] = None
+    ) -> List[AuditLogRow]:
+        logs = audit_log_partitions.source(self.db, start_date, end_date)
+        query = _AUDIT_LOGS if logs is AuditLog.__table__ else _projection(AuditLog, AuditLogRow, logs)
+        query = query.where(logs.c.user_id == user_id)
+        if start_date:
+            query = query.where(logs.c.timestamp >= start_date)
+        if end_date:
+            query = query.where(logs.c.timestamp <= end_date)
+        if action_types:
+            query = query.where(logs.c.action_type.in_(action_types))
+        query = query.order_by(logs.c.timestamp.desc())
+        return [AuditLogRow(*row) for row in self.db.execute(query)]
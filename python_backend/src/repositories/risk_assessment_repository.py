@@ -2,7 +2,9 @@ from sqlalchemy.orm import Session
 from src.models.risk_assessment import RiskAssessment, RiskLevel
 from typing import List, Optional
 from datetime import datetime, timedelta
+from src.utils.tracing import trace_class
 
+@trace_class()
 class RiskAssessmentRepository:
     """Repository for risk assessment data access"""
     
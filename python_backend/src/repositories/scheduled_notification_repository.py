@@ -0,0 +1,75 @@
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+from src.models.notification import NotificationType
+from src.models.scheduled_notification import ScheduledNotification, ScheduledStatus
+from src.utils.tracing import trace_class
+
+@trace_class()
+class ScheduledNotificationRepository:
+    """Repository for scheduled notifications"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, scheduled: ScheduledNotification) -> ScheduledNotification:
+        """Store a scheduled notification"""
+        self.db.add(scheduled)
+        self.db.commit()
+        return scheduled
+
+    def get(self, schedule_id: str) -> Optional[ScheduledNotification]:
+        return self.db.get(ScheduledNotification, schedule_id)
+
+    def due_before(self, until: datetime, limit: int) -> List[Tuple[datetime, str]]:
+        """(due_at, schedule_id) of the earliest still-scheduled rows due before until"""
+        rows = self.db.execute(
+            select(ScheduledNotification.due_at, ScheduledNotification.schedule_id)
+            .where(ScheduledNotification.status == ScheduledStatus.SCHEDULED, ScheduledNotification.due_at < until)
+            .order_by(ScheduledNotification.due_at)
+            .limit(limit)
+        )
+        return [(row.due_at, row.schedule_id) for row in rows]
+
+    def claim(self, schedule_ids: List[str], token: str, now: datetime) -> List[ScheduledNotification]:
+        """Mark still-scheduled rows FIRED under token and return them, without committing
+
+        Another process firing the same rows blocks on the row locks (or,
+        on SQLite, the write lock) and then finds them no longer scheduled,
+        so each row is claimed by exactly one caller.
+        """
+        self.db.execute(
+            self._by_id().values(status=ScheduledStatus.FIRED, fired_at=now, fire_token=token),
+            [{'id': schedule_id} for schedule_id in schedule_ids]
+        )
+        return self.db.execute(
+            select(ScheduledNotification).where(ScheduledNotification.fire_token == token)
+        ).scalars().all()
+
+    def expire(self, schedule_ids: List[str]) -> int:
+        """Mark still-scheduled rows EXPIRED (too late to be useful), without committing"""
+        return self.db.execute(
+            self._by_id().values(status=ScheduledStatus.EXPIRED),
+            [{'id': schedule_id} for schedule_id in schedule_ids]
+        ).rowcount
+
+    def _by_id(self):
+        # One primary-key lookup per row (executemany). With a long IN list SQLite's planner
+        # prefers the (status, due_at) index and walks every scheduled row instead.
+        table = ScheduledNotification.__table__
+        return update(table).where(table.c.schedule_id == bindparam('id'), table.c.status == ScheduledStatus.SCHEDULED)
+
+    def cancel(self, user_id: str, notification_type: NotificationType = None) -> int:
+        """Cancel a user's pending scheduled notifications, optionally of one type"""
+        query = update(ScheduledNotification).where(
+            ScheduledNotification.user_id == user_id,
+            ScheduledNotification.status == ScheduledStatus.SCHEDULED
+        )
+        if notification_type is not None:
+            query = query.where(ScheduledNotification.notification_type == notification_type)
+        count = self.db.execute(
+            query.values(status=ScheduledStatus.CANCELLED).execution_options(synchronize_session=False)
+        ).rowcount
+        self.db.commit()
+        return count
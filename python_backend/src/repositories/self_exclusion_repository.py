@@ -1,8 +1,7 @@
 from sqlalchemy import Column, Integer, String, Boolean
-from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session
-
-Base = declarative_base()
+from src.utils.tracing import trace_class
+from src.config.database import Base
 
 class SelfExclusion(Base):
     __tablename__ = 'self_exclusions'
@@ -11,6 +10,7 @@ class SelfExclusion(Base):
     user_id = Column(Integer, nullable=False)
     is_excluded = Column(Boolean, default=False)
 
+@trace_class()
 class SelfExclusionRepository:
     def __init__(self, session: Session):
         self.session = session
@@ -2,7 +2,9 @@ from sqlalchemy.orm import Session
 from src.models.session import Session as GamingSession
 from typing import List, Optional
 from datetime import datetime
+from src.utils.tracing import trace_class
 
+@trace_class()
 class SessionRepository:
     """Repository for session data access"""
     
@@ -33,6 +35,15 @@ class SessionRepository:
             GamingSession.user_id == user_id
         ).order_by(GamingSession.start_time.desc()).first()
 
+    def get_current_session(self, user_id: str) -> Optional[GamingSession]:
+        """Get user's active session, or their most recent one if none is active"""
+        return self.db.query(GamingSession).filter(
+            GamingSession.user_id == user_id
+        ).order_by(
+            (GamingSession.status == 'active').desc(),
+            GamingSession.start_time.desc()
+        ).first()
+
     def get_user_sessions(self, user_id: str, limit: int = 10) -> List[GamingSession]:
         """Get user's recent sessions"""
         return self.db.query(GamingSession).filter(
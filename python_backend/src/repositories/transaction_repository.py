@@ -1,9 +1,8 @@
 from sqlalchemy import Column, Integer, String, Float, DateTime
-from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session
 from datetime import datetime
-
-Base = declarative_base()
+from src.utils.tracing import trace_class
+from src.config.database import Base
 
 class Transaction(Base):
     __tablename__ = 'transactions'
@@ -13,6 +12,7 @@ class Transaction(Base):
     amount = Column(Float)
     timestamp = Column(DateTime, default=datetime.utcnow)
 
+@trace_class()
 class TransactionRepository:
     def __init__(self, session: Session):
         self.session = session
@@ -1,18 +1,26 @@
 from sqlalchemy import Column, Integer, String, Boolean
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from src.models.user import User
+from src.utils.cache import get_cache, snapshot_row, restore_row, history_values
 from typing import Optional, List
 from datetime import datetime
+from src.utils.tracing import trace_class
 
-
-
-Base = declarative_base()
-
-
+@trace_class()
 class UserRepository:
     def __init__(self, db: Session):
         self.db = db
+        self.cache_by_id = get_cache('users')
+        self.cache_by_wallet = get_cache('users_by_wallet')
+
+    def _cache_keys(self, user: User) -> tuple:
+        """Cache keys to drop for a user, including uncommitted old wallet addresses"""
+        return [str(user.id)], history_values(user, 'wallet_address')
+
+    def _invalidate(self, keys: tuple):
+        ids, wallets = keys
+        self.cache_by_id.invalidate(*ids)
+        self.cache_by_wallet.invalidate(*wallets)
 
     def create_user(self, user: User) -> User:
         """Create a new user (expects User object)"""
@@ -26,18 +34,35 @@ class UserRepository:
     
     def get_user_by_wallet(self, wallet_address: str) -> Optional[User]:
         """Get user by wallet address"""
-        return self.db.query(User).filter(
-        User.wallet_address == wallet_address
-        ).first()
+        row = self.cache_by_wallet.get_or_load(
+            wallet_address,
+            lambda: snapshot_row(self.db.query(User).filter(
+                User.wallet_address == wallet_address
+            ).first())
+        )
+        return restore_row(self.db, User, row)
 
     def get_user(self, user_id: str) -> Optional[User]:
         """Get user by ID"""
-        return self.db.query(User).filter(User.id == user_id).first()
+        row = self.cache_by_id.get_or_load(
+            str(user_id),
+            lambda: snapshot_row(self.db.query(User).filter(User.id == user_id).first())
+        )
+        return restore_row(self.db, User, row)
+
+    def get_user_account(self, user_id: str) -> Optional[User]:
+        """Get user with their wallet and active session in one joined query"""
+        return self.db.query(User).options(
+            joinedload(User.wallet),
+            joinedload(User.active_session)
+        ).filter(User.id == user_id).first()
 
     
     def update_user(self, user: User) -> User:
         """Update user (expects User object that's already been modified)"""
+        keys = self._cache_keys(user)
         self.db.commit()
+        self._invalidate(keys)
         self.db.refresh(user)
         return user
 
@@ -46,8 +71,10 @@ class UserRepository:
         """Delete user by ID"""
         user = self.get_user(user_id)
         if user:
+            keys = self._cache_keys(user)
             self.db.delete(user)
             self.db.commit()
+            self._invalidate(keys)
             return True
         return False
 
@@ -57,7 +84,9 @@ class UserRepository:
         user = self.get_user(user_id)
         if user:
             user.self_excluded = status
+            keys = self._cache_keys(user)
             self.db.commit()
+            self._invalidate(keys)
             self.db.refresh(user)
         return user
     
@@ -66,7 +95,9 @@ class UserRepository:
         user = self.get_user(user_id)
         if user:
             user.last_login = datetime.utcnow()
+            keys = self._cache_keys(user)
             self.db.commit()
+            self._invalidate(keys)
             self.db.refresh(user)
         return user
     
@@ -0,0 +1,151 @@
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+import asyncio
+import logging
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.config.database import SessionLocal
+from src.config.settings import settings
+from src.repositories.audit_log_partitions import AuditLogPartitions, audit_log_partitions, month_start, next_month
+from src.repositories.audit_search import AuditSearchIndex, audit_search_index
+from src.repositories.cold_archive import ARCHIVED_TABLES, ArchivedTable, ColdArchive, cold_archive, month_key
+from src.utils.periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+DELETE_CHUNK_SIZE = 1000  # primary keys per DELETE, each in its own short transaction
+
+class Archiver:
+    """Moves closed months of history tables from the database to the cold archive
+
+    A month is closed once it is more than hot_months before the current
+    month. Each month is streamed out in time-sorted batches into one
+    Parquet part, and only after the part is complete and in the manifest
+    are its rows deleted, by primary key read back from the file, in small
+    transactions (or, for a partitioned audit log month, by dropping the
+    partition). A part whose rows were not fully deleted (the process
+    stopped) is finished on the next pass before anything else.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        archive: ColdArchive = None,
+        partitions: AuditLogPartitions = None,
+        search_index: AuditSearchIndex = None,
+        hot_months: int = None,
+        interval: float = None,
+        batch_size: int = None
+    ):
+        self.session_factory = session_factory
+        self.archive = archive or cold_archive
+        self.partitions = partitions or audit_log_partitions
+        self.search_index = search_index or audit_search_index
+        self.hot_months = settings.ARCHIVE_HOT_MONTHS if hot_months is None else hot_months
+        self.interval = interval or settings.ARCHIVE_INTERVAL
+        self.batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+        self.last_run: Optional[Dict] = None
+        self._periodic = PeriodicTask('Archive pass', lambda: asyncio.to_thread(self.run_once), self.interval)
+
+    def cutoff(self, now: datetime) -> datetime:
+        """Start of the oldest month kept in the database"""
+        month = month_start(now)
+        for _ in range(self.hot_months):
+            month = datetime(month.year - (month.month == 1), (month.month - 2) % 12 + 1, 1)
+        return month
+
+    def start(self):
+        """Start the periodic archive pass on the running event loop"""
+        if not self.archive.available:
+            logger.error("Archiving is enabled but pyarrow is not installed; nothing will be archived")
+            return
+        self._periodic.start()
+
+    async def stop(self):
+        await self._periodic.stop()
+
+    def run_once(self, now: datetime = None) -> Dict:
+        """Archive every closed month of every archived table"""
+        cutoff = self.cutoff(now or datetime.utcnow())
+        archived: Dict[str, Dict[str, int]] = {}
+        for spec in ARCHIVED_TABLES.values():
+            for part in self.archive.parts(spec.name, state='exported'):
+                self._delete_part(spec, part)
+            month = self._oldest_month(spec)
+            while month is not None and month < cutoff:
+                part = self._export(spec, month)
+                if part is not None:
+                    self._delete_part(spec, part)
+                    archived.setdefault(spec.name, {})[month_key(month)] = part['rows']
+                month = next_month(month)
+        if archived:
+            logger.info(f"Archived rows before {cutoff.date().isoformat()}: {archived}")
+        self.last_run = {'success': True, 'cutoff': cutoff.isoformat(), 'archived': archived}
+        return self.last_run
+
+    def _partitioned(self, spec: ArchivedTable, db: Session) -> bool:
+        return spec.name == 'audit_logs' and self.partitions.enabled and db.get_bind().dialect.name != 'postgresql'
+
+    def _source(self, spec: ArchivedTable, db: Session, start: datetime = None, end: datetime = None):
+        if self._partitioned(spec, db):
+            return self.partitions.source(db, start, end)
+        return spec.table
+
+    def _oldest_month(self, spec: ArchivedTable) -> Optional[datetime]:
+        db = self.session_factory()
+        try:
+            source = self._source(spec, db)
+            oldest = db.execute(select(func.min(source.c[spec.time_column]))).scalar()
+        finally:
+            db.close()
+        return month_start(oldest) if oldest else None
+
+    def _export(self, spec: ArchivedTable, month: datetime) -> Optional[Dict]:
+        db = self.session_factory()
+        try:
+            end = next_month(month)
+            source = self._source(spec, db, month, end)
+            time = source.c[spec.time_column]
+            query = select(source).where(time >= month, time < end)
+            if spec.closed is not None:
+                query = query.where(spec.closed(source))
+            query = query.order_by(*(source.c[column] for column in spec.sort))
+            result = db.execute(query.execution_options(yield_per=self.batch_size))
+
+            def batches() -> Iterator[List[Dict]]:
+                for rows in result.partitions(self.batch_size):
+                    yield [dict(row._mapping) for row in rows]
+
+            return self.archive.write_part(spec, month, batches())
+        finally:
+            db.close()
+
+    def _delete_part(self, spec: ArchivedTable, part: Dict):
+        """Delete a part's rows from the database, then mark it archived"""
+        db = self.session_factory()
+        try:
+            month = datetime.strptime(part['file'].split('/')[-2], '%Y-%m')
+            deleted = self._delete_keys(db, spec.table, spec.key, part)
+            if self._partitioned(spec, db) and month in self.partitions.months(db):
+                remaining = part['rows'] - deleted
+                if self.partitions.count(db, month) == remaining:
+                    self.partitions.drop(db, month)  # every row of the partition is in the part
+                else:
+                    self._delete_keys(db, self.partitions.table(month), spec.key, part)
+        finally:
+            db.close()
+        self.archive.mark_archived(spec.name, part['file'])
+
+    def _delete_keys(self, db: Session, table, key: str, part: Dict) -> int:
+        deleted = 0
+        searched = table.name.startswith('audit_logs') and self.search_index.enabled
+        for keys in self.archive.keys(part, key, DELETE_CHUNK_SIZE):
+            deleted += db.execute(delete(table).where(table.c[key].in_(keys))).rowcount
+            if searched:
+                self.search_index.forget(db, keys)  # archived logs are searched by their filters, not text
+            db.commit()
+        return deleted
+
+archiver = Archiver()
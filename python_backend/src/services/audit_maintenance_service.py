@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import asyncio
+import logging
+
+from sqlalchemy.orm import sessionmaker
+
+from src.config.database import SessionLocal
+from src.config.settings import settings
+from src.repositories.audit_log_partitions import AuditLogPartitions, audit_log_partitions, month_start, next_month
+from src.repositories.audit_log_repository import AuditLogRepository
+from src.repositories.audit_search import AuditSearchIndex, audit_search_index
+from src.utils.periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+class AuditLogMaintenance:
+    """Keeps audit log partitions ahead of time, enforces audit log retention, fills the search index
+
+    Each pass creates this month's and next month's partitions (so the
+    first write of a month never waits on DDL) and, when retention_days is
+    set, removes older logs: whole months by dropping their partitions,
+    the rest in chunks. With the search index on, it then indexes logs
+    written without a search document. The database work runs off the
+    event loop.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        partitions: AuditLogPartitions = None,
+        search_index: AuditSearchIndex = None,
+        retention_days: int = None,
+        interval: float = None,
+        chunk_size: int = None
+    ):
+        self.session_factory = session_factory
+        self.partitions = partitions or audit_log_partitions
+        self.search_index = search_index or audit_search_index
+        self.retention_days = settings.AUDIT_LOG_RETENTION_DAYS if retention_days is None else retention_days
+        self.interval = interval or settings.AUDIT_LOG_MAINTENANCE_INTERVAL
+        self.chunk_size = chunk_size or settings.AUDIT_LOG_DELETE_CHUNK_SIZE
+        self.last_run: Optional[Dict] = None
+        self._periodic = PeriodicTask('Audit log maintenance', lambda: asyncio.to_thread(self.run_once), self.interval)
+
+    def start(self):
+        """Start the periodic pass on the running event loop"""
+        self._periodic.start()
+
+    async def stop(self):
+        await self._periodic.stop()
+
+    def run_once(self, now: datetime = None) -> Dict:
+        """Create upcoming partitions, delete logs past retention, index logs missing from search"""
+        now = now or datetime.utcnow()
+        db = self.session_factory()
+        try:
+            if self.partitions.enabled:
+                this_month = month_start(now)
+                for month in (this_month, next_month(this_month)):
+                    self.partitions.ensure(db, month)
+            deleted = 0
+            if self.retention_days:
+                cutoff = now - timedelta(days=self.retention_days)
+                repository = AuditLogRepository(db, self.partitions, self.search_index)
+                deleted = repository.delete_old_logs(cutoff, self.chunk_size)
+                if deleted:
+                    logger.info(f"Audit log retention removed {deleted} logs older than {cutoff.isoformat()}")
+            indexed = self.search_index.backfill(db, self.chunk_size) if self.search_index.enabled else 0
+        finally:
+            db.close()
+        self.last_run = {
+            'success': True,
+            'deleted': deleted,
+            'indexed': indexed,
+            'finished_at': datetime.utcnow().isoformat()
+        }
+        return self.last_run
+
+audit_log_maintenance = AuditLogMaintenance()
@@ -1,16 +1,31 @@
+from dataclasses import fields
 from datetime import datetime
 from typing import Dict, List
 from sqlalchemy.orm import Session
 from src.repositories.audit_log_repository import AuditLogRepository
+from src.repositories.cold_archive import ColdArchive, cold_archive
+from src.repositories.read_repository import ReadRepository
 from src.models.audit_log import AuditLog
+from src.models.read_models import AuditLogRow
+import asyncio
 import uuid
+from src.utils.tracing import trace_class
 
+@trace_class()
 class AuditService:
     """Maintains audit trails for regulatory compliance"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, archive: ColdArchive = None):
         self.db = db
         self.audit_repository = AuditLogRepository(db)
+        self.read_repository = ReadRepository(db)
+        self.archive = archive or cold_archive
+
+    async def _archived_logs(self, start_date: datetime, end_date: datetime, **equals) -> List[Dict]:
+        """Archived audit log rows in the range, read off the event loop; [] unless an archived month overlaps it"""
+        if not self.archive.covers('audit_logs', start_date, end_date):
+            return []
+        return await asyncio.to_thread(self.archive.read, 'audit_logs', start_date, end_date, equals)
 
     async def log_action(
         self,
@@ -73,6 +88,8 @@ class AuditService:
             start_date,
             end_date
         )
+        archived = await self._archived_logs(start_date, end_date, operator_id=operator_id)
+        logs.extend(AuditLog(**row) for row in archived)
         
         # Aggregate statistics
         total_actions = len(logs)
@@ -110,17 +127,16 @@ class AuditService:
         """Get complete action history for a user"""
         start_date, end_date = date_range if date_range else (None, None)
         
-        logs = self.audit_repository.get_logs_by_user(
-            user_id,
-            start_date,
-            end_date,
-            action_types
-        )
+        logs = self.read_repository.user_audit_logs(user_id, start_date, end_date, action_types)
+        archived = await self._archived_logs(start_date, end_date, user_id=user_id, action_type=action_types)
+        if archived:
+            logs.extend(AuditLogRow(**{field.name: row[field.name] for field in fields(AuditLogRow)}) for row in archived)
+            logs.sort(key=lambda log: log.timestamp, reverse=True)
         
         return {
             'success': True,
             'user_id': user_id,
-            'history': [log.to_dict() for log in logs],
+            'history': logs,
             'count': len(logs)
         }
 
@@ -156,15 +172,20 @@ class AuditService:
     async def search_logs(
         self,
         filters: Dict,
-        limit: int = 100
+        limit: int = 100,
+        cursor: str = None
     ) -> Dict:
-        """Search audit logs with filters"""
-        logs = self.audit_repository.search_logs(filters, limit)
+        """Search audit logs with filters, one page at a time"""
+        try:
+            logs, next_cursor = self.audit_repository.search_page(filters, limit, cursor)
+        except ValueError as e:
+            return {'success': False, 'error': str(e)}
         
         return {
             'success': True,
             'logs': [log.to_dict() for log in logs],
-            'count': len(logs)
+            'count': len(logs),
+            'next_cursor': next_cursor
         }
 
     async def get_blockchain_transactions(
@@ -6,7 +6,9 @@ from src.repositories.session_repository import SessionRepository
 from src.repositories.risk_assessment_repository import RiskAssessmentRepository
 from src.models.risk_assessment import RiskAssessment, RiskLevel
 import uuid
+from src.utils.tracing import trace_class
 
+@trace_class()
 class BehaviorAnalyticsService:
     """Analyzes user gambling behavior for risk indicators"""
     
@@ -1,25 +1,31 @@
 from typing import Any, Dict, Optional
+import asyncio
 import requests
 import logging
 from src.config.settings import settings
+from src.utils.metrics import instrument_concordium
+from src.utils.tracing import trace_class, trace_headers
 
 logger = logging.getLogger(__name__)
 
+@trace_class(kind='client')
 class BlockchainIntegrationService:
     """Service for integrating with Node.js Concordium blockchain service"""
     
     def __init__(self, blockchain_api_url: str = None):
         self.blockchain_api_url = blockchain_api_url or settings.CONCORDIUM_SERVICE_URL
         self.api_key = settings.CONCORDIUM_SERVICE_API_KEY
-        self.timeout = 30  # seconds
+        self.timeout = settings.CONCORDIUM_SERVICE_TIMEOUT
         
     def _get_headers(self) -> Dict[str, str]:
         """Get request headers with API key"""
         return {
             "Content-Type": "application/json",
-            "X-API-Key": self.api_key
+            "X-API-Key": self.api_key,
+            **trace_headers()
         }
     
+    @instrument_concordium('health')
     async def check_service_health(self) -> Dict[str, Any]:
         """Check if Concordium service is available"""
         try:
@@ -46,6 +52,7 @@ class BlockchainIntegrationService:
                 "error": str(e)
             }
     
+    @instrument_concordium('verify_identity')
     async def verify_user_identity(self, concordium_id: str, attributes: Dict[str, Any] = None) -> Dict[str, Any]:
         """Verify user identity with Concordium blockchain"""
         try:
@@ -96,6 +103,7 @@ class BlockchainIntegrationService:
                 "message": "Mock verification - Service unavailable"
             }
     
+    @instrument_concordium('verify_transaction')
     async def verify_transaction(self, transaction_hash: str) -> Dict[str, Any]:
         """Verify transaction on Concordium blockchain"""
         try:
@@ -136,6 +144,7 @@ class BlockchainIntegrationService:
                 "mock": True
             }
     
+    @instrument_concordium('log_transaction')
     async def log_transaction_on_chain(self, transaction_data: Dict[str, Any]) -> Dict[str, Any]:
         """Log transaction to Concordium blockchain"""
         try:
@@ -179,6 +188,7 @@ class BlockchainIntegrationService:
                 "message": "Transaction logged locally only"
             }
     
+    @instrument_concordium('get_user_balance')
     async def get_user_balance(self, concordium_id: str, currency: str = "CCD") -> Dict[str, Any]:
         """Get user's balance from Concordium"""
         try:
@@ -218,4 +228,41 @@ class BlockchainIntegrationService:
                 "balance": 0.0,
                 "currency": currency,
                 "mock": True
-            }
\ No newline at end of file
+            }
+    
+    @instrument_concordium('get_wallet_balance')
+    async def get_wallet_balance(self, concordium_address: str, currency: str = "CCD") -> Dict[str, Any]:
+        """Fetch a wallet balance from Concordium without blocking the event loop
+        
+        Unlike get_user_balance this skips the health probe and never falls back
+        to a mock balance, so callers caching the result keep the last known
+        value when the chain is unreachable.
+        """
+        try:
+            response = await asyncio.to_thread(
+                requests.get,
+                f"{self.blockchain_api_url}/api/concordium/balance/{concordium_address}",
+                params={"currency": currency},
+                headers=self._get_headers(),
+                timeout=self.timeout
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                return {
+                    "success": True,
+                    "balance": data.get('balance', 0.0),
+                    "currency": currency,
+                    "data": data
+                }
+            return {
+                "success": False,
+                "error": f"Failed to get balance with status {response.status_code}"
+            }
+            
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Failed to fetch wallet balance for {concordium_address}: {e}")
+            return {
+                "success": False,
+                "error": str(e)
+            }
@@ -0,0 +1,105 @@
+from functools import cached_property
+from sqlalchemy.orm import Session
+
+from src.services.audit_service import AuditService
+from src.services.behavior_analytics_service import BehaviorAnalyticsService
+from src.services.blockchain_integration_service import BlockchainIntegrationService
+from src.services.limit_enforcement_service import LimitEnforcementService
+from src.services.notification_service import NotificationService
+from src.services.operator_auth_service import OperatorAuthService
+from src.services.payment_service import PaymentService
+from src.services.self_exclusion_service import SelfExclusionService
+from src.services.session_service import SessionService
+from src.services.smart_contract_service import SmartContractService
+from src.services.transaction_service import TransactionService
+from src.services.user_service import UserService
+from src.services.wallet_service import WalletService
+
+class ServiceContainer:
+    """Process-wide service singletons, created once in the app lifespan
+
+    Only services without per-request state live here: the Concordium
+    client and the smart contract client. Everything bound to a database
+    session is built per request by a RequestScope.
+    """
+
+    def __init__(
+        self,
+        blockchain_service: BlockchainIntegrationService = None,
+        contract_service: SmartContractService = None
+    ):
+        self.blockchain_service = blockchain_service or BlockchainIntegrationService()
+        self.contract_service = contract_service or SmartContractService()
+
+    def scope(self, db: Session) -> 'RequestScope':
+        return RequestScope(self, db)
+
+class RequestScope:
+    """Services bound to one request's database session
+
+    Services are built on first use and shared for the rest of the
+    request. For example, the NotificationService used by SessionService
+    is the same instance a handler receives.
+    """
+
+    def __init__(self, container: ServiceContainer, db: Session):
+        self.container = container
+        self.db = db
+
+    @cached_property
+    def audit_service(self) -> AuditService:
+        return AuditService(self.db)
+
+    @cached_property
+    def limit_service(self) -> LimitEnforcementService:
+        return LimitEnforcementService(self.db)
+
+    @cached_property
+    def notification_service(self) -> NotificationService:
+        return NotificationService(self.db)
+
+    @cached_property
+    def user_service(self) -> UserService:
+        return UserService(
+            self.db,
+            blockchain_service=self.container.blockchain_service,
+            audit_service=self.audit_service
+        )
+
+    @cached_property
+    def session_service(self) -> SessionService:
+        return SessionService(self.db, notification_service=self.notification_service)
+
+    @cached_property
+    def transaction_service(self) -> TransactionService:
+        return TransactionService(
+            self.db,
+            blockchain_service=self.container.blockchain_service,
+            limit_service=self.limit_service,
+            audit_service=self.audit_service
+        )
+
+    @cached_property
+    def self_exclusion_service(self) -> SelfExclusionService:
+        return SelfExclusionService(self.db, notification_service=self.notification_service)
+
+    @cached_property
+    def analytics_service(self) -> BehaviorAnalyticsService:
+        return BehaviorAnalyticsService(self.db)
+
+    @cached_property
+    def operator_auth_service(self) -> OperatorAuthService:
+        return OperatorAuthService(self.db)
+
+    @cached_property
+    def wallet_service(self) -> WalletService:
+        return WalletService(self.db, blockchain_service=self.container.blockchain_service)
+
+    @cached_property
+    def payment_service(self) -> PaymentService:
+        return PaymentService(
+            self.db,
+            wallet_service=self.wallet_service,
+            blockchain_service=self.container.blockchain_service,
+            contract_service=self.container.contract_service
+        )
@@ -2,10 +2,15 @@ from datetime import datetime, timedelta
 from typing import Dict, Optional
 from sqlalchemy.orm import Session
 from src.models.cooldown import Cooldown
+from src.models.notification import NotificationType
+from src.services.notification_service import NotificationService
+from src.utils.tracing import trace_class
 
+@trace_class()
 class CooldownService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, notification_service: NotificationService = None):
         self.db = db
+        self.notification_service = notification_service or NotificationService(db)
 
     async def set_cooldown(self, user_id: str, duration_minutes: int) -> Dict:
         """Set a cooldown period for a user"""
@@ -29,6 +34,8 @@ class CooldownService:
             self.db.add(cooldown)
             self.db.commit()
         
+        await self.notification_service.schedule_cooldown_ending(user_id, end_time)
+        
         return {
             'success': True,
             'cooldown_until': end_time.isoformat()
@@ -56,6 +63,7 @@ class CooldownService:
         """Remove cooldown for a user"""
         result = self.db.query(Cooldown).filter(Cooldown.user_id == user_id).delete()
         self.db.commit()
+        await self.notification_service.cancel_scheduled(user_id, NotificationType.COOLDOWN_ENDING)
         
         return {
             'success': result > 0,
@@ -0,0 +1,226 @@
+from typing import Dict, List, Optional
+import asyncio
+import logging
+import time
+
+from sqlalchemy import LargeBinary, Table, bindparam, func, inspect, select, text, type_coerce, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.config.database import SessionLocal
+from src.config.settings import settings
+from src.models.audit_log import AuditLog
+from src.models.notification import Notification
+from src.models.risk_assessment import RiskAssessment
+from src.repositories.audit_log_partitions import AuditLogPartitions, audit_log_partitions
+from src.utils.json_codec import JsonCodec, json_codec
+from src.utils.periodic import PeriodicTask
+
+try:
+    from zstandard import ZstdError
+except ImportError:
+    ZstdError = Exception
+
+logger = logging.getLogger(__name__)
+
+class CompressedColumn:
+    """A CompressedJSON column and the column its dictionaries are trained per value of"""
+
+    __slots__ = ('table', 'column', 'group')
+
+    def __init__(self, table: Table, column: str, group: str = None):
+        self.table = table
+        self.column = column
+        self.group = group
+
+    @property
+    def key(self) -> str:
+        return self.table.c[self.column].type.column
+
+COMPRESSED_COLUMNS = (
+    CompressedColumn(AuditLog.__table__, 'details', 'action_type'),
+    CompressedColumn(Notification.__table__, 'notification_data', 'notification_type'),
+    CompressedColumn(RiskAssessment.__table__, 'factors'),
+    CompressedColumn(RiskAssessment.__table__, 'recommendations'),
+)
+
+class JsonCompactor:
+    """Trains the JSON dictionaries and rewrites rows into the compact format
+
+    Each pass trains a dictionary for every group (action_type,
+    notification_type, or the whole column) that has enough rows and no
+    dictionary yet, then, on the first pass and after new dictionaries,
+    walks each table by primary key and rewrites the rows still stored as
+    JSON text, or compressed before their column had a dictionary, one
+    short transaction of batch_size rows at a time with a pause between
+    them. On PostgreSQL the JSON columns are first altered to bytea.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        codec: JsonCodec = None,
+        partitions: AuditLogPartitions = None,
+        samples: int = None,
+        min_samples: int = None,
+        batch_size: int = None,
+        pause: float = None,
+        interval: float = None
+    ):
+        self.session_factory = session_factory
+        self.codec = codec or json_codec
+        self.partitions = partitions or audit_log_partitions
+        self.samples = samples or settings.JSON_DICTIONARY_SAMPLES
+        self.min_samples = settings.JSON_DICTIONARY_MIN_SAMPLES if min_samples is None else min_samples
+        self.batch_size = batch_size or settings.JSON_COMPACT_BATCH_SIZE
+        self.pause = settings.JSON_COMPACT_PAUSE if pause is None else pause
+        self.interval = interval or settings.JSON_COMPACT_INTERVAL
+        self.last_run: Optional[Dict] = None
+        self._rewritten_once = False
+        self._periodic = PeriodicTask('JSON compaction', lambda: asyncio.to_thread(self.run_once), self.interval)
+
+    def start(self):
+        """Start the periodic pass on the running event loop"""
+        self._periodic.start()
+
+    async def stop(self):
+        await self._periodic.stop()
+
+    def check_storage(self):
+        """Check the JSON columns as stored can be read and written with what is installed
+
+        Records the columns PostgreSQL already stores as bytea, so plain
+        JSON is written to them as bytes while compression is off. Raises
+        RuntimeError when rows are stored compressed but msgpack/zstandard
+        are not installed, as they could not be read.
+        """
+        db = self.session_factory()
+        try:
+            postgresql = db.get_bind().dialect.name == 'postgresql'
+            for spec in COMPRESSED_COLUMNS:
+                if postgresql:
+                    if not self._is_binary(db, spec):
+                        continue
+                    self.codec.binary_columns.add(spec.key)
+                if self.codec.available:
+                    continue
+                for table in self._tables(db, spec):
+                    value = table.c[spec.column]
+                    if postgresql:
+                        compressed = text(f"get_byte({spec.column}, 0) < 2")
+                    else:
+                        compressed = func.typeof(value) == 'blob'
+                    if db.execute(select(value.isnot(None)).where(compressed).limit(1)).first():
+                        raise RuntimeError(
+                            f"{table.name}.{spec.column} has rows stored compressed, "
+                            f"but msgpack/zstandard are not installed"
+                        )
+        finally:
+            db.close()
+
+    def run_once(self) -> Dict:
+        """Train missing dictionaries, then rewrite rows not in the compact format"""
+        trained: Dict[str, List] = {}
+        rewritten: Dict[str, int] = {}
+        db = self.session_factory()
+        try:
+            self.codec.load(db)
+            for spec in COMPRESSED_COLUMNS:
+                self._prepare(db, spec)
+                names = self._train(db, spec)
+                if names:
+                    trained[spec.key] = names
+            if trained or not self._rewritten_once:
+                for spec in COMPRESSED_COLUMNS:
+                    rewritten[spec.key] = sum(self._rewrite(db, table, spec) for table in self._tables(db, spec))
+                self._rewritten_once = True
+        finally:
+            db.close()
+        if trained or any(rewritten.values()):
+            logger.info(f"JSON compaction trained {trained}, rewrote {rewritten}")
+        self.last_run = {'success': True, 'trained': trained, 'rewritten': rewritten}
+        return self.last_run
+
+    def _partitioned(self, spec: CompressedColumn, db: Session) -> bool:
+        return spec.table is AuditLog.__table__ and self.partitions.enabled and db.get_bind().dialect.name != 'postgresql'
+
+    def _tables(self, db: Session, spec: CompressedColumn) -> List[Table]:
+        tables = [spec.table]
+        if self._partitioned(spec, db):
+            tables.extend(self.partitions.table(month) for month in self.partitions.months(db))
+        return tables
+
+    def _prepare(self, db: Session, spec: CompressedColumn):
+        """On PostgreSQL, turn a json column into bytea (existing values become their JSON text)"""
+        if db.get_bind().dialect.name != 'postgresql':
+            return
+        if self._is_binary(db, spec):
+            return
+        db.execute(text(
+            f"ALTER TABLE {spec.table.name} ALTER COLUMN {spec.column} "
+            f"TYPE bytea USING convert_to({spec.column}::text, 'UTF8')"
+        ))
+        db.commit()
+        self.codec.binary_columns.add(spec.key)
+
+    def _is_binary(self, db: Session, spec: CompressedColumn) -> bool:
+        columns = {column['name']: column for column in inspect(db.connection()).get_columns(spec.table.name)}
+        return columns[spec.column]['type'].__class__.__name__ in ('BYTEA', 'LargeBinary')
+
+    def _train(self, db: Session, spec: CompressedColumn) -> List:
+        source = self.partitions.source(db) if self._partitioned(spec, db) else spec.table
+        value = source.c[spec.column]
+        groups = [None] if spec.group is None else db.execute(select(source.c[spec.group]).distinct()).scalars().all()
+        known = self.codec.names(spec.key)
+        trained = []
+        for group in groups:
+            name = getattr(group, 'value', group)
+            if name in known:
+                continue
+            query = select(value).where(value.isnot(None)).limit(self.samples)
+            if group is not None:
+                query = query.where(source.c[spec.group] == group)
+            values = [value for value in db.execute(query).scalars() if value is not None]
+            if len(values) < self.min_samples:
+                continue
+            try:
+                dictionary = self.codec.train(spec.key, name, values)
+            except ZstdError as e:
+                logger.warning(f"Could not train a dictionary for {spec.key} {name}: {e}")
+                continue
+            db.merge(dictionary)
+            db.commit()
+            self.codec.register(dictionary)
+            trained.append(name)
+        return trained
+
+    def _rewrite(self, db: Session, table: Table, spec: CompressedColumn) -> int:
+        """Rewrite the table's rows that are not in the compact format, batch by batch"""
+        key = table.primary_key.columns.values()[0]
+        stored = type_coerce(table.c[spec.column], LargeBinary)
+        statement = update(table).where(key == bindparam('b_key')).values(
+            {spec.column: bindparam('b_value', type_=table.c[spec.column].type)}
+        )
+        rewritten = 0
+        last = None
+        while True:
+            query = select(key, stored).order_by(key).limit(self.batch_size)
+            if last is not None:
+                query = query.where(key > last)
+            rows = db.execute(query).all()
+            if not rows:
+                return rewritten
+            last = rows[-1][0]
+            batch = [
+                {'b_key': row[0], 'b_value': self.codec.decode(row[1])}
+                for row in rows if self.codec.needs_rewrite(spec.key, row[1])
+            ]
+            if batch:
+                db.execute(statement, batch)
+                db.commit()
+                rewritten += len(batch)
+                if self.pause:
+                    time.sleep(self.pause)
+            else:
+                db.rollback()  # end the read transaction
+
+json_compactor = JsonCompactor()
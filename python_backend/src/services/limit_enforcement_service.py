@@ -3,7 +3,9 @@ from typing import Dict, Optional
 from sqlalchemy.orm import Session
 from src.models.limit import Limit
 from src.models.transaction import Transaction
+from src.utils.tracing import trace_class
 
+@trace_class()
 class LimitEnforcementService:
     def __init__(self, db: Session):
         self.db = db
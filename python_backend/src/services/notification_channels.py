@@ -0,0 +1,144 @@
+"""Delivery channels for the notification worker pool
+
+A channel sends one batch of claimed notifications and reports, per
+notification ID, None on success or an error message. A notification
+with no recipient for a channel (no `email`, `phone` or `push_token` in
+its notification_data) is skipped by that channel and counts as a
+success. Channels are enabled by NOTIFICATION_EMAIL/SMS/PUSH_ENABLED.
+"""
+from email.message import EmailMessage
+from typing import Dict, List, Optional
+import asyncio
+import logging
+import smtplib
+
+import httpx
+
+from src.config.settings import settings
+from src.models.notification import Notification
+
+logger = logging.getLogger(__name__)
+
+class NotificationChannel:
+    """Base class: subclasses set name and recipient_key and implement deliver()"""
+
+    name = 'channel'
+    recipient_key = ''
+
+    def recipient(self, notification: Notification) -> Optional[str]:
+        return (notification.notification_data or {}).get(self.recipient_key)
+
+    async def send_batch(self, notifications: List[Notification]) -> Dict[str, Optional[str]]:
+        addressed = [(n, self.recipient(n)) for n in notifications]
+        results = {n.notification_id: None for n, to in addressed if not to}
+        addressed = [(n, to) for n, to in addressed if to]
+        if addressed:
+            try:
+                results.update(await self.deliver(addressed))
+            except Exception as e:
+                logger.warning("%s channel failed for a batch of %d: %s", self.name, len(addressed), e)
+                results.update({n.notification_id: f"{self.name}: {e}" for n, _ in addressed})
+        return results
+
+    async def deliver(self, addressed: List) -> Dict[str, Optional[str]]:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+class EmailChannel(NotificationChannel):
+    """SMTP delivery, one connection per batch (smtplib runs in a worker thread)"""
+
+    name = 'email'
+    recipient_key = 'email'
+
+    def __init__(
+        self,
+        host: str = None,
+        port: int = None,
+        sender: str = None,
+        username: str = None,
+        password: str = None,
+        starttls: bool = None,
+        timeout: float = 10.0
+    ):
+        self.host = host or settings.NOTIFICATION_SMTP_HOST
+        self.port = port or settings.NOTIFICATION_SMTP_PORT
+        self.sender = sender or settings.NOTIFICATION_SMTP_SENDER
+        self.username = username if username is not None else settings.NOTIFICATION_SMTP_USERNAME
+        self.password = password if password is not None else settings.NOTIFICATION_SMTP_PASSWORD
+        self.starttls = settings.NOTIFICATION_SMTP_STARTTLS if starttls is None else starttls
+        self.timeout = timeout
+
+    async def deliver(self, addressed: List) -> Dict[str, Optional[str]]:
+        return await asyncio.to_thread(self._send_all, addressed)
+
+    def _send_all(self, addressed: List) -> Dict[str, Optional[str]]:
+        results = {}
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            for notification, to in addressed:
+                message = EmailMessage()
+                message['From'] = self.sender
+                message['To'] = to
+                message['Subject'] = notification.title
+                message.set_content(notification.message)
+                try:
+                    smtp.send_message(message)
+                    results[notification.notification_id] = None
+                except smtplib.SMTPException as e:
+                    results[notification.notification_id] = f"email: {e}"
+        return results
+
+class GatewayChannel(NotificationChannel):
+    """Batch JSON delivery to an HTTP gateway (SMS or mobile push)
+
+    POST {"messages": [{"id", "to", "title", "body", "priority"}]} and expect
+    {"results": [{"id", "ok", "error"}]}. Messages the gateway leaves out of
+    its results count as failed.
+    """
+
+    def __init__(self, name: str, recipient_key: str, url: str, timeout: float = 10.0):
+        self.name = name
+        self.recipient_key = recipient_key
+        self.url = url
+        self.client = httpx.AsyncClient(timeout=timeout)
+
+    async def deliver(self, addressed: List) -> Dict[str, Optional[str]]:
+        response = await self.client.post(self.url, json={'messages': [
+            {
+                'id': notification.notification_id,
+                'to': to,
+                'title': notification.title,
+                'body': notification.message,
+                'priority': notification.priority
+            }
+            for notification, to in addressed
+        ]})
+        response.raise_for_status()
+        reported = {r['id']: r for r in response.json().get('results', [])}
+        results = {}
+        for notification, _ in addressed:
+            result = reported.get(notification.notification_id)
+            if result is None:
+                results[notification.notification_id] = f"{self.name}: no result from gateway"
+            else:
+                results[notification.notification_id] = None if result.get('ok') else f"{self.name}: {result.get('error')}"
+        return results
+
+    async def close(self):
+        await self.client.aclose()
+
+def build_channels() -> List[NotificationChannel]:
+    """The channels enabled in settings"""
+    channels: List[NotificationChannel] = []
+    if settings.NOTIFICATION_EMAIL_ENABLED:
+        channels.append(EmailChannel())
+    if settings.NOTIFICATION_SMS_ENABLED:
+        channels.append(GatewayChannel('sms', 'phone', settings.NOTIFICATION_SMS_GATEWAY_URL))
+    if settings.NOTIFICATION_PUSH_ENABLED:
+        channels.append(GatewayChannel('push', 'push_token', settings.NOTIFICATION_PUSH_GATEWAY_URL))
+    return channels
@@ -0,0 +1,164 @@
+from datetime import datetime
+from typing import Dict, List, Tuple
+import logging
+import math
+import time
+import uuid
+
+from sqlalchemy.orm import sessionmaker
+
+from src.config.database import SessionLocal
+from src.config.settings import settings
+from src.models.notification import Notification, NotificationStatus, NotificationType
+from src.services.notification_delivery_service import NotificationDeliveryPool, notification_delivery
+from src.utils.notification_hub import NotificationHub, notification_hub
+from src.utils.periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+# (user_id, notification type)
+BurstKey = Tuple[str, NotificationType]
+
+class Burst:
+    """Repeats of one notification for one user within one window"""
+
+    __slots__ = ('window_end', 'suppressed', 'title', 'message', 'data', 'priority')
+
+    def __init__(self, window_end: float, title: str, message: str, data: Dict, priority: str):
+        self.window_end = window_end
+        self.suppressed = 0
+        self.title = title
+        self.message = message
+        self.data = data
+        self.priority = priority
+
+class NotificationCoalescer:
+    """Deduplicates repeated notifications per (user, type, window) in memory
+
+    Windows are aligned to the clock (a 300 s window runs from :00 to :05,
+    :05 to :10, ...). The first notification of a window is stored and
+    sent as usual. Repeats are only counted, with no database write. When
+    a window that saw repeats closes, one digest notification with the
+    latest content and a coalesced_count is written for it, in a batch
+    with every other digest due. Open bursts are indexed by window end,
+    so a flush only looks at windows that have closed.
+
+    State is per worker process: with several workers a user can get one
+    notification per window from each of them.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        hub: NotificationHub = None,
+        delivery: NotificationDeliveryPool = None,
+        windows: Dict[str, int] = None,
+        flush_interval: float = None
+    ):
+        self.session_factory = session_factory
+        self.hub = hub or notification_hub
+        self.delivery = delivery or notification_delivery
+        windows = settings.NOTIFICATION_COALESCE_WINDOWS if windows is None else windows
+        self.windows = {NotificationType(name): seconds for name, seconds in windows.items()}
+        self.flush_interval = flush_interval or settings.NOTIFICATION_COALESCE_FLUSH_INTERVAL
+        self.suppressed_total = 0
+        self._open: Dict[BurstKey, Burst] = {}
+        self._closing: Dict[float, List[Tuple[BurstKey, Burst]]] = {}
+        self._periodic = PeriodicTask('Notification digest flush', self.flush, self.flush_interval)
+
+    @property
+    def pending(self) -> int:
+        """Open bursts"""
+        return len(self._open)
+
+    def admit(
+        self,
+        user_id: str,
+        notification_type: NotificationType,
+        title: str,
+        message: str,
+        data: Dict,
+        priority: str = 'normal',
+        now: float = None
+    ) -> bool:
+        """True if the notification should be stored now, False if it was folded into its window (no I/O)"""
+        window = self.windows.get(notification_type)
+        if not window:
+            return True
+        now = time.time() if now is None else now
+        key = (user_id, notification_type)
+        burst = self._open.get(key)
+        if burst is not None and burst.window_end > now:
+            burst.suppressed += 1
+            burst.title, burst.message, burst.data, burst.priority = title, message, data, priority
+            self.suppressed_total += 1
+            return False
+        # A closed burst not flushed yet stays indexed under its window end and is flushed from there
+        window_end = (math.floor(now / window) + 1) * window
+        burst = self._open[key] = Burst(window_end, title, message, data, priority)
+        self._closing.setdefault(window_end, []).append((key, burst))
+        return True
+
+    def clear(self):
+        self._open.clear()
+        self._closing.clear()
+
+    def flush(self, now: float = None) -> int:
+        """Write digests for every closed window that had repeats; returns the number written"""
+        now = time.time() if now is None else now
+        closed = sorted(end for end in self._closing if end <= now)
+        if not closed:
+            return 0
+        created_at = datetime.utcnow()
+        digests: List[Notification] = []
+        for window_end in closed:
+            for key, burst in self._closing.pop(window_end):
+                if self._open.get(key) is burst:
+                    del self._open[key]
+                if not burst.suppressed:
+                    continue
+                user_id, notification_type = key
+                digests.append(Notification(
+                    notification_id=str(uuid.uuid4()),
+                    user_id=user_id,
+                    notification_type=notification_type,
+                    title=burst.title,
+                    message=burst.message,
+                    created_at=created_at,
+                    status=NotificationStatus.PENDING,
+                    notification_data={
+                        **(burst.data or {}),
+                        'coalesced_count': burst.suppressed,
+                        'window_end': datetime.utcfromtimestamp(burst.window_end).isoformat()
+                    },
+                    priority=burst.priority,
+                    attempts=0
+                ))
+        if not digests:
+            return 0
+
+        published = [(n.user_id, n.to_dict()) for n in digests]
+        db = self.session_factory()
+        try:
+            db.add_all(digests)
+            db.commit()
+        except Exception as e:
+            logger.error(f"Failed to write {len(digests)} notification digests: {e}")
+            return 0
+        finally:
+            db.close()
+        for user_id, notification in published:
+            self.hub.publish(user_id, notification)
+        self.delivery.wake()
+        return len(digests)
+
+    def start(self):
+        """Start the periodic digest flush on the running event loop"""
+        self._periodic.start()
+
+    async def stop(self):
+        """Stop the loop and write digests for every window with repeats, closed or not"""
+        await self._periodic.stop()
+        self.flush(now=math.inf)
+
+notification_coalescer = NotificationCoalescer()
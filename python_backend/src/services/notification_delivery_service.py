@@ -0,0 +1,180 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import asyncio
+import logging
+import random
+import uuid
+
+from sqlalchemy import update
+from sqlalchemy.orm import sessionmaker
+
+from src.config.database import SessionLocal
+from src.config.settings import settings
+from src.models.notification import Notification, NotificationStatus
+from src.repositories.notification_repository import NotificationRepository
+from src.services.notification_channels import NotificationChannel, build_channels
+from src.utils.periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+class NotificationDeliveryPool:
+    """Background workers that deliver PENDING notifications
+
+    Requests only insert notifications and wake the pool. Each worker
+    claims a batch (see NotificationRepository.claim_pending), sends it
+    through every enabled channel concurrently and writes all the
+    outcomes back in one executemany. A failed notification goes back to
+    PENDING with an exponentially growing, jittered next_attempt_at, and
+    is marked FAILED after max_attempts. A retry goes out on every channel
+    again, so delivery is at-least-once per channel.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        channels: List[NotificationChannel] = None,
+        workers: int = None,
+        batch_size: int = None,
+        poll_interval: float = None,
+        max_attempts: int = None,
+        backoff_seconds: float = None,
+        max_backoff_seconds: float = None,
+        lease_seconds: int = None
+    ):
+        self.session_factory = session_factory
+        self.channels = channels
+        self._own_channels = channels is None
+        self.workers = workers or settings.NOTIFICATION_DELIVERY_WORKERS
+        self.batch_size = batch_size or settings.NOTIFICATION_DELIVERY_BATCH_SIZE
+        self.poll_interval = poll_interval or settings.NOTIFICATION_DELIVERY_POLL_INTERVAL
+        self.max_attempts = max_attempts or settings.NOTIFICATION_DELIVERY_MAX_ATTEMPTS
+        self.backoff_seconds = backoff_seconds or settings.NOTIFICATION_DELIVERY_BACKOFF_SECONDS
+        self.max_backoff_seconds = max_backoff_seconds or settings.NOTIFICATION_DELIVERY_MAX_BACKOFF_SECONDS
+        self.lease_seconds = lease_seconds or settings.NOTIFICATION_DELIVERY_LEASE_SECONDS
+        self.pending = 0  # notifications claimed and not yet written back
+        self._workers: List[PeriodicTask] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self):
+        """Start the workers on the running event loop"""
+        if self._workers:
+            return
+        if self._own_channels:
+            self.channels = build_channels()
+        self._loop = asyncio.get_running_loop()
+        self._workers = [
+            PeriodicTask('Notification delivery batch', self._drain, self.poll_interval) for _ in range(self.workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+        logger.info(
+            f"Notification delivery started ({self.workers} workers, batch={self.batch_size}, "
+            f"channels={[channel.name for channel in self.channels] or 'none'})"
+        )
+
+    async def stop(self):
+        """Stop the workers; claims they held are retaken once the lease expires"""
+        if not self._workers:
+            return
+        await asyncio.gather(*(worker.stop() for worker in self._workers))
+        self._workers = []
+        if self._own_channels:
+            for channel in self.channels:
+                await channel.close()
+            self.channels = None
+        self._loop = None
+        logger.info("Notification delivery stopped")
+
+    def wake(self):
+        """Tell idle workers there is new work; safe to call from any thread, a no-op when not started"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._wake_workers()
+        else:
+            loop.call_soon_threadsafe(self._wake_workers)
+
+    def _wake_workers(self):
+        for worker in self._workers:
+            worker.wake()
+
+    async def _drain(self):
+        """Deliver batches until one comes back short, i.e. nothing more is waiting"""
+        while (await self.run_once())['claimed'] >= self.batch_size:
+            pass
+
+    async def run_once(self) -> Dict:
+        """Claim, deliver and record one batch"""
+        channels = self.channels if self.channels is not None else []
+        db = self.session_factory()
+        claimed: List[Notification] = []
+        try:
+            repository = NotificationRepository(db)
+            now = datetime.utcnow()
+            claimed = repository.claim_pending(uuid.uuid4().hex, self.batch_size, now, self.lease_seconds)
+            if not claimed:
+                return {'success': True, 'claimed': 0, 'sent': 0, 'retrying': 0, 'failed': 0}
+            self.pending += len(claimed)
+
+            errors = await self._deliver(channels, claimed)
+            rows = [self._outcome(notification, errors.get(notification.notification_id)) for notification in claimed]
+            # Only rows still PENDING: a notification read while in flight keeps its READ status
+            db.execute(
+                update(Notification).where(Notification.status == NotificationStatus.PENDING),
+                rows,
+                execution_options={'synchronize_session': None}
+            )
+            db.commit()
+
+            sent = sum(1 for row in rows if row['status'] == NotificationStatus.SENT)
+            failed = sum(1 for row in rows if row['status'] == NotificationStatus.FAILED)
+            if sent < len(rows):
+                logger.warning(f"Notification delivery: {len(rows) - sent - failed} to retry, {failed} failed of {len(rows)}")
+            return {'success': True, 'claimed': len(rows), 'sent': sent, 'retrying': len(rows) - sent - failed, 'failed': failed}
+        finally:
+            self.pending -= len(claimed)
+            db.close()
+
+    async def _deliver(self, channels: List[NotificationChannel], claimed: List[Notification]) -> Dict[str, str]:
+        """Send the batch on every channel; returns the combined error per failed notification ID"""
+        outcomes = await asyncio.gather(*(channel.send_batch(claimed) for channel in channels))
+        errors: Dict[str, str] = {}
+        for outcome in outcomes:
+            for notification_id, error in outcome.items():
+                if error:
+                    errors[notification_id] = f"{errors[notification_id]}; {error}" if notification_id in errors else error
+        return errors
+
+    def _outcome(self, notification: Notification, error: Optional[str]) -> Dict:
+        now = datetime.utcnow()
+        attempts = (notification.attempts or 0) + 1
+        row = {
+            'notification_id': notification.notification_id,
+            'attempts': attempts,
+            'claim_token': None,
+            'claimed_at': None,
+            'last_error': error,
+            'sent_at': None,
+            'next_attempt_at': None,
+            'status': NotificationStatus.SENT
+        }
+        if error is None:
+            row['sent_at'] = now
+        elif attempts >= self.max_attempts:
+            row['status'] = NotificationStatus.FAILED
+        else:
+            row['status'] = NotificationStatus.PENDING
+            row['next_attempt_at'] = now + timedelta(seconds=self.backoff(attempts))
+        return row
+
+    def backoff(self, attempts: int) -> float:
+        """Seconds before retry number `attempts`: doubling from backoff_seconds, capped, with equal jitter"""
+        delay = min(self.max_backoff_seconds, self.backoff_seconds * 2 ** (attempts - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+notification_delivery = NotificationDeliveryPool()
@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from src.config.database import SessionLocal
+from src.config.settings import settings
+from src.models.notification import UNREAD_STATUSES, NotificationStatus, NotificationType
+from src.repositories.notification_repository import NotificationRepository
+from src.utils.metrics import notifications_purged
+from src.utils.notification_hub import NotificationHub, notification_hub
+from src.utils.periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = ('low', 'normal', 'high', 'critical')
+
+class NotificationPurger:
+    """Deletes notifications past their retention in small chunks
+
+    A notification is kept for the longer of its type's and its
+    priority's retention, and each user keeps at most max_per_user of
+    their newest. Pending (undelivered) notifications are never purged.
+
+    Every chunk is one short DELETE by primary key of at most chunk_size
+    rows picked from an index, run off the event loop, with a pause
+    between chunks so request writes are not held up behind one long
+    transaction. Unread notifications that are purged are taken off the
+    hub's unread counters for users with open streams.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        hub: NotificationHub = None,
+        default_days: int = None,
+        days_by_type: Dict[str, int] = None,
+        days_by_priority: Dict[str, int] = None,
+        max_per_user: int = None,
+        interval: float = None,
+        chunk_size: int = None,
+        pause: float = None
+    ):
+        self.session_factory = session_factory
+        self.hub = hub or notification_hub
+        self.default_days = default_days or settings.NOTIFICATION_RETENTION_DAYS
+        days_by_type = settings.NOTIFICATION_RETENTION_DAYS_BY_TYPE if days_by_type is None else days_by_type
+        self.days_by_type = {NotificationType(name): days for name, days in days_by_type.items()}
+        self.days_by_priority = settings.NOTIFICATION_RETENTION_DAYS_BY_PRIORITY if days_by_priority is None else days_by_priority
+        self.max_per_user = settings.NOTIFICATION_RETENTION_MAX_PER_USER if max_per_user is None else max_per_user
+        self.interval = interval or settings.NOTIFICATION_PURGE_INTERVAL
+        self.chunk_size = chunk_size or settings.NOTIFICATION_PURGE_CHUNK_SIZE
+        self.pause = settings.NOTIFICATION_PURGE_PAUSE if pause is None else pause
+        self.priorities = sorted(set(PRIORITIES) | set(self.days_by_priority))
+        self.totals = {'runs': 0, 'expired': 0, 'capped': 0, 'chunks': 0}
+        self.last_run: Optional[Dict] = None
+        self._periodic = PeriodicTask('Notification purge', self.run_once, self.interval)
+
+    def retention_days(self, notification_type: NotificationType, priority: str) -> int:
+        return max(
+            self.days_by_type.get(notification_type, self.default_days),
+            self.days_by_priority.get(priority, 0)
+        )
+
+    def stats(self) -> Dict:
+        return {**self.totals, 'last_run': self.last_run}
+
+    def start(self):
+        """Start the periodic purge on the running event loop"""
+        if self._periodic.start():
+            logger.info(f"Notification purger started (every {self.interval}s, chunk={self.chunk_size})")
+
+    async def stop(self):
+        """Stop the loop; a pass in progress stops after its current chunk"""
+        await self._periodic.stop()
+
+    async def run_once(self, now: datetime = None) -> Dict:
+        """One full pass: age-based retention per (type, priority), then the per-user cap"""
+        now = now or datetime.utcnow()
+        started = time.perf_counter()
+        expired = capped = chunks = 0
+        for notification_type in NotificationType:
+            for priority in self.priorities:
+                cutoff = now - timedelta(days=self.retention_days(notification_type, priority))
+                deleted, used = await self._drain('purge_older_than', notification_type, priority, cutoff, self.chunk_size)
+                expired += deleted
+                chunks += used
+
+        if self.max_per_user:
+            for user_id in await asyncio.to_thread(self._call, 'users_over', self.max_per_user):
+                deleted, used = await self._drain('purge_beyond_latest', user_id, self.max_per_user, self.chunk_size)
+                capped += deleted
+                chunks += used
+
+        notifications_purged.inc(('age',), expired)
+        notifications_purged.inc(('cap',), capped)
+        self.totals['runs'] += 1
+        self.totals['expired'] += expired
+        self.totals['capped'] += capped
+        self.totals['chunks'] += chunks
+        result = {'success': True, 'expired': expired, 'capped': capped, 'chunks': chunks}
+        self.last_run = {
+            **result,
+            'finished_at': datetime.utcnow().isoformat(),
+            'duration_ms': round((time.perf_counter() - started) * 1000, 1)
+        }
+        if expired or capped:
+            logger.info(f"Notification purge removed {expired} expired and {capped} over-cap notifications in {chunks} chunks")
+        return result
+
+    async def _drain(self, method: str, *args) -> Tuple[int, int]:
+        """Repeat a chunked repository purge until a chunk comes back short; returns (rows, chunks)"""
+        deleted = chunks = 0
+        while True:
+            rows: List[Tuple[str, NotificationStatus]] = await asyncio.to_thread(self._call, method, *args)
+            chunks += 1
+            deleted += len(rows)
+            self._forget_unread(rows)
+            if len(rows) < self.chunk_size:
+                return deleted, chunks
+            await asyncio.sleep(self.pause)
+
+    def _call(self, method: str, *args):
+        db = self.session_factory()
+        try:
+            return getattr(NotificationRepository(db), method)(*args)
+        finally:
+            db.close()
+
+    def _forget_unread(self, rows: List[Tuple[str, NotificationStatus]]):
+        unread: Dict[str, int] = {}
+        for user_id, status in rows:
+            if status in UNREAD_STATUSES:
+                unread[user_id] = unread.get(user_id, 0) + 1
+        for user_id, count in unread.items():
+            self.hub.mark_read(user_id, count)
+
+notification_purger = NotificationPurger()
@@ -1,16 +1,39 @@
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, List, Optional
 import uuid
 from sqlalchemy.orm import Session
-from src.models.notification import Notification, NotificationType, NotificationStatus
+from src.config.settings import settings
+from src.models.notification import UNREAD_STATUSES, Notification, NotificationType, NotificationStatus
+from src.models.scheduled_notification import ScheduledNotification
 from src.repositories.notification_repository import NotificationRepository
+from src.repositories.read_repository import ReadRepository
+from src.repositories.scheduled_notification_repository import ScheduledNotificationRepository
+from src.services.notification_coalescer import NotificationCoalescer, notification_coalescer
+from src.services.notification_delivery_service import NotificationDeliveryPool, notification_delivery
+from src.services.reminder_service import ReminderScheduler, reminder_scheduler
+from src.utils.notification_hub import NotificationHub, Subscription, notification_hub
+from src.utils.tracing import trace_class
 
+@trace_class()
 class NotificationService:
     """Sends notifications to users and operators"""
     
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        hub: NotificationHub = None,
+        delivery: NotificationDeliveryPool = None,
+        scheduler: ReminderScheduler = None,
+        coalescer: NotificationCoalescer = None
+    ):
         self.db = db
         self.notification_repository = NotificationRepository(db)
+        self.scheduled_repository = ScheduledNotificationRepository(db)
+        self.read_repository = ReadRepository(db)
+        self.hub = hub or notification_hub
+        self.delivery = delivery or notification_delivery
+        self.scheduler = scheduler or reminder_scheduler
+        self.coalescer = coalescer or notification_coalescer
 
     async def send_user_notification(
         self, 
@@ -19,12 +42,25 @@ class NotificationService:
         data: dict,
         priority: str = 'normal'
     ) -> Dict:
-        """Send notification to user"""
+        """Queue a notification for the delivery workers and push it to the user's open streams
+
+        Repeats within the type's coalescing window are not stored; they
+        are summarised in a digest when the window closes.
+        """
         notification_id = str(uuid.uuid4())
         
         # Generate title and message based on type
         title, message = self._generate_notification_content(notification_type, data)
         
+        if settings.NOTIFICATION_COALESCE_ENABLED and not self.coalescer.admit(
+            user_id, notification_type, title, message, data, priority
+        ):
+            return {
+                'success': True,
+                'coalesced': True,
+                'notification': None
+            }
+        
         notification = Notification(
             notification_id=notification_id,
             user_id=user_id,
@@ -38,15 +74,14 @@ class NotificationService:
         )
         
         created = self.notification_repository.create_notification(notification)
+        self.delivery.wake()
         
-        # TODO: Implement actual notification delivery (email, push, SMS)
-        # For now, mark as sent
-        created.mark_as_sent()
-        self.notification_repository.update_notification(created)
+        notification_dict = created.to_dict()
+        self.hub.publish(created.user_id, notification_dict)
         
         return {
             'success': True,
-            'notification': created.to_dict()
+            'notification': notification_dict
         }
 
     async def send_operator_alert(
@@ -57,9 +92,6 @@ class NotificationService:
         data: dict
     ) -> Dict:
         """Alert operator about high-risk user behavior"""
-        # This would send alerts to the operator's dashboard/email
-        # For now, we'll create a notification record
-        
         notification_id = str(uuid.uuid4())
         
         notification = Notification(
@@ -75,12 +107,44 @@ class NotificationService:
         )
         
         created = self.notification_repository.create_notification(notification)
-        created.mark_as_sent()
-        self.notification_repository.update_notification(created)
+        self.delivery.wake()
+        
+        notification_dict = created.to_dict()
+        self.hub.publish(created.user_id, notification_dict)
+        
+        return {
+            'success': True,
+            'notification': notification_dict
+        }
+
+    async def schedule_notification(
+        self,
+        user_id: str,
+        notification_type: NotificationType,
+        due_at: datetime,
+        data: dict = None,
+        priority: str = 'normal',
+        title: str = None
+    ) -> Dict:
+        """Create a notification at due_at (UTC), via the reminder scheduler"""
+        data = data or {}
+        default_title, message = self._generate_notification_content(notification_type, data)
+        scheduled = self.scheduled_repository.create(ScheduledNotification(
+            schedule_id=str(uuid.uuid4()),
+            user_id=user_id,
+            notification_type=notification_type,
+            title=title or default_title,
+            message=message,
+            notification_data=data,
+            priority=priority,
+            due_at=due_at,
+            created_at=datetime.utcnow()
+        ))
+        self.scheduler.add(scheduled.schedule_id, due_at)
         
         return {
             'success': True,
-            'notification': created.to_dict()
+            'scheduled': scheduled.to_dict()
         }
 
     async def schedule_reminder(
@@ -91,28 +155,50 @@ class NotificationService:
         data: dict = None
     ) -> Dict:
         """Schedule future reminders"""
-        notification_id = str(uuid.uuid4())
-        
-        notification = Notification(
-            notification_id=notification_id,
-            user_id=user_id,
-            notification_type=NotificationType.WELLNESS_TIP,
-            title=f"Reminder: {reminder_type}",
-            message=data.get('message', 'You have a scheduled reminder'),
-            created_at=datetime.utcnow(),
-            status=NotificationStatus.PENDING,
-            notification_data={'scheduled_for': when.isoformat(), 'reminder_type': reminder_type, **(data or {})},
-            priority='normal'
+        data = data or {}
+        result = await self.schedule_notification(
+            user_id,
+            NotificationType.WELLNESS_TIP,
+            when,
+            {'message': 'You have a scheduled reminder', **data, 'reminder_type': reminder_type},
+            title=f"Reminder: {reminder_type}"
         )
         
-        created = self.notification_repository.create_notification(notification)
-        
         return {
             'success': True,
-            'notification': created.to_dict(),
+            'scheduled': result['scheduled'],
             'scheduled_for': when.isoformat()
         }
 
+    async def schedule_cooldown_ending(self, user_id: str, cooldown_end: datetime, notice_hours: int = 1) -> Dict:
+        """Warn the user notice_hours before their cooldown ends (replacing any earlier warning)"""
+        self.scheduled_repository.cancel(user_id, NotificationType.COOLDOWN_ENDING)
+        due_at = max(datetime.utcnow(), cooldown_end - timedelta(hours=notice_hours))
+        return await self.schedule_notification(
+            user_id, NotificationType.COOLDOWN_ENDING, due_at, {'remaining': notice_hours}
+        )
+
+    async def schedule_self_exclusion_reminder(self, user_id: str, exclusion_end: datetime) -> Dict:
+        """Remind the user the day before their self-exclusion ends (replacing any earlier reminder)"""
+        self.scheduled_repository.cancel(user_id, NotificationType.SELF_EXCLUSION_REMINDER)
+        due_at = max(datetime.utcnow(), exclusion_end - timedelta(days=1))
+        return await self.schedule_notification(
+            user_id,
+            NotificationType.SELF_EXCLUSION_REMINDER,
+            due_at,
+            {'message': f"Your self-exclusion period ends on {exclusion_end.date().isoformat()}"},
+            priority='high'
+        )
+
+    async def cancel_scheduled(self, user_id: str, notification_type: NotificationType = None) -> Dict:
+        """Cancel a user's scheduled notifications, optionally only one type"""
+        cancelled = self.scheduled_repository.cancel(user_id, notification_type)
+        
+        return {
+            'success': True,
+            'cancelled': cancelled
+        }
+
     async def get_user_notifications(
         self, 
         user_id: str, 
@@ -120,15 +206,11 @@ class NotificationService:
         limit: int = 50
     ) -> Dict:
         """Get user's notifications"""
-        notifications = self.notification_repository.get_user_notifications(
-            user_id, 
-            unread_only, 
-            limit
-        )
+        notifications = self.read_repository.user_notifications(user_id, unread_only, limit)
         
         return {
             'success': True,
-            'notifications': [n.to_dict() for n in notifications],
+            'notifications': notifications,
             'count': len(notifications)
         }
 
@@ -138,8 +220,11 @@ class NotificationService:
         if not notification:
             return {'success': False, 'message': 'Notification not found'}
         
+        was_unread = notification.status in UNREAD_STATUSES
         notification.mark_as_read()
         updated = self.notification_repository.update_notification(notification)
+        if was_unread:
+            self.hub.mark_read(updated.user_id)
         
         return {
             'success': True,
@@ -147,14 +232,26 @@ class NotificationService:
         }
 
     async def get_unread_count(self, user_id: str) -> Dict:
-        """Get count of unread notifications"""
+        """Get count of unread notifications
+
+        Always read from the database: the hub's counter only sees changes
+        made through this worker. Open streams are corrected to it.
+        """
         count = self.notification_repository.get_unread_count(user_id)
+        self.hub.sync_unread(user_id, count)
         
         return {
             'success': True,
             'unread_count': count
         }
 
+    def open_stream(self, user_id: str) -> Optional[Subscription]:
+        """Subscribe to pushed notifications, or None if this worker has no connections left"""
+        subscription = self.hub.subscribe(user_id, lambda: self.notification_repository.get_unread_count(user_id))
+        # The stream outlives the request's database use; hand the connection back to the pool now
+        self.db.close()
+        return subscription
+
     def _generate_notification_content(self, notification_type: NotificationType, data: dict) -> tuple:
         """Generate notification title and message"""
         templates = {
@@ -0,0 +1,182 @@
+from datetime import datetime
+from typing import Dict, Optional
+import logging
+import time
+import uuid
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.config.database import SessionLocal
+from src.config.settings import settings
+from src.models.operator import Operator
+from src.repositories.operator_repository import OperatorRepository
+from src.utils.operator_index import OperatorIdentity, generate_api_key, hash_api_key, operator_key_index
+from src.utils.periodic import PeriodicTask
+from src.utils.tracing import trace_class
+
+logger = logging.getLogger(__name__)
+
+# Fields an operator may be registered with; the key, status and timestamps are set by the service
+REGISTRATION_FIELDS = frozenset({
+    'operator_id', 'name', 'platform_url', 'supported_currencies', 'compliance_level',
+    'country', 'license_number', 'contact_email', 'settings'
+})
+COMPLIANCE_LEVELS = ('standard', 'enhanced', 'premium')
+
+class LastActiveTracker:
+    """Coalesces operator last_active writes into periodic batch updates
+
+    Authentication only records a timestamp in memory; a background loop
+    flushes the latest timestamp per operator in one executemany and
+    re-reads the operator key index so changes made by other workers are
+    picked up.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        flush_interval: int = None,
+        index_refresh_interval: int = None
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval or settings.OPERATOR_LAST_ACTIVE_FLUSH_INTERVAL
+        self.index_refresh_interval = index_refresh_interval or settings.OPERATOR_INDEX_REFRESH_INTERVAL
+        self._pending: Dict[str, datetime] = {}
+        self._index_loaded_at = 0.0
+        self._periodic = PeriodicTask('Operator last_active flush', self._tick, self.flush_interval)
+
+    def touch(self, operator_id: str):
+        """Record that an operator was just active (no I/O)"""
+        self._pending[operator_id] = datetime.utcnow()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def flush(self) -> int:
+        """Write all pending last_active timestamps"""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        db = self.session_factory()
+        try:
+            return OperatorRepository(db).bulk_update_last_active(pending)
+        except Exception as e:
+            logger.error(f"Failed to flush operator last_active timestamps: {e}")
+            # Keep the newest timestamps for the next attempt
+            for operator_id, ts in pending.items():
+                self._pending.setdefault(operator_id, ts)
+            return 0
+        finally:
+            db.close()
+
+    def start(self):
+        """Start the periodic flush loop on the running event loop"""
+        if self._periodic.start():
+            self._index_loaded_at = time.monotonic()  # warmed just before, in the lifespan
+
+    async def stop(self):
+        """Stop the loop and flush whatever is still pending"""
+        await self._periodic.stop()
+        self.flush()
+
+    def _tick(self):
+        self.flush()
+        if time.monotonic() - self._index_loaded_at >= self.index_refresh_interval:
+            self._index_loaded_at = time.monotonic()
+            warm_operator_index(self.session_factory)
+
+def warm_operator_index(session_factory: sessionmaker = SessionLocal) -> int:
+    """Load all active operators into the in-memory key index"""
+    db = session_factory()
+    try:
+        operator_key_index.load(OperatorRepository(db).get_all_operators(active_only=True))
+        return len(operator_key_index)
+    except Exception as e:
+        logger.error(f"Failed to load operator key index: {e}")
+        return 0
+    finally:
+        db.close()
+
+def authenticate_operator(api_key: Optional[str], db: Session = None) -> Optional[OperatorIdentity]:
+    """Resolve an API key to an active operator, from memory for every key the index knows
+
+    A key the index does not know (an operator registered or rotated in
+    another worker since the last refresh) is looked up in the database
+    once when a session is given, and added to the index if it exists.
+    """
+    if not api_key:
+        return None
+    identity = operator_key_index.lookup(api_key)
+    if identity is None and db is not None:
+        operator = OperatorRepository(db).get_operator_by_api_key_hash(hash_api_key(api_key))
+        if operator is not None:
+            operator_key_index.upsert(operator)
+            identity = operator_key_index.lookup(api_key)
+    if identity is None or not identity.is_active:
+        return None
+    last_active_tracker.touch(identity.operator_id)
+    return identity
+
+@trace_class()
+class OperatorAuthService:
+    """Issues and rotates operator API keys"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.operator_repository = OperatorRepository(db)
+
+    def register_operator(self, operator_data: dict) -> Dict:
+        """Register an operator and return its API key (shown only once)"""
+        unknown = sorted(set(operator_data) - REGISTRATION_FIELDS)
+        if unknown:
+            return {'success': False, 'error': f"Unknown operator fields: {', '.join(unknown)}"}
+        if not operator_data.get('name'):
+            return {'success': False, 'error': 'Operator name is required'}
+        if operator_data.get('compliance_level', 'standard') not in COMPLIANCE_LEVELS:
+            return {'success': False, 'error': f"compliance_level must be one of {', '.join(COMPLIANCE_LEVELS)}"}
+
+        operator_id = operator_data.get('operator_id') or str(uuid.uuid4())
+        if self.operator_repository.get_operator(operator_id):
+            return {'success': False, 'conflict': True, 'error': 'Operator already exists'}
+        api_key = generate_api_key()
+        operator = Operator(
+            api_key_hash=hash_api_key(api_key),
+            **{**operator_data, 'operator_id': operator_id}
+        )
+        try:
+            created = self.operator_repository.create_operator(operator)
+        except IntegrityError:
+            self.db.rollback()  # registered concurrently
+            return {'success': False, 'conflict': True, 'error': 'Operator already exists'}
+
+        return {
+            'success': True,
+            'operator': created.to_dict(),
+            'api_key': api_key
+        }
+
+    def rotate_api_key(self, operator_id: str) -> Dict:
+        """Replace an operator's API key
+
+        The old key stops working at once in this process; other workers
+        drop it when they next reload the operator key index, within
+        OPERATOR_INDEX_REFRESH_INTERVAL seconds.
+        """
+        operator = self.operator_repository.get_operator(operator_id)
+        if not operator:
+            return {'success': False, 'error': 'Operator not found'}
+
+        api_key = generate_api_key()
+        operator.api_key_hash = hash_api_key(api_key)
+        self.operator_repository.update_operator(operator)
+
+        return {
+            'success': True,
+            'operator_id': operator_id,
+            'api_key': api_key
+        }
+
+# Process-wide tracker, started in the application lifespan
+last_active_tracker = LastActiveTracker()
@@ -4,20 +4,31 @@ import uuid
 from datetime import datetime, timezone
 
 from src.models.payment import Payment, PaymentType, PaymentStatus
+from src.models.read_models import PaymentRow
 from src.repositories.payment_repository import PaymentRepository
+from src.repositories.read_repository import ReadRepository
 from src.services.wallet_service import WalletService
 from src.services.blockchain_integration_service import BlockchainIntegrationService
 from src.services.smart_contract_service import SmartContractService
+from src.utils.tracing import trace_class
 
+@trace_class()
 class PaymentService:
     """Service for payment operations"""
     
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        wallet_service: WalletService = None,
+        blockchain_service: BlockchainIntegrationService = None,
+        contract_service: SmartContractService = None
+    ):
         self.db = db
         self.payment_repo = PaymentRepository(db)
-        self.wallet_service = WalletService(db)
-        self.blockchain_service = BlockchainIntegrationService()
-        self.contract_service = SmartContractService()
+        self.read_repository = ReadRepository(db)
+        self.blockchain_service = blockchain_service or BlockchainIntegrationService()
+        self.wallet_service = wallet_service or WalletService(db, self.blockchain_service)
+        self.contract_service = contract_service or SmartContractService()
     
     async def deposit(
         self, 
@@ -58,11 +69,12 @@ class PaymentService:
             )
             
             if tx_result.get('success'):
-                # Update payment
+                # Update payment; it is committed together with the wallet balance
                 self.payment_repo.update_status(
                     payment.payment_id,
                     PaymentStatus.COMPLETED,
-                    tx_hash=tx_result.get('tx_hash')
+                    tx_hash=tx_result.get('tx_hash'),
+                    commit=False
                 )
                 
                 # Update wallet balance
@@ -141,11 +153,12 @@ class PaymentService:
             )
             
             if tx_result.get('success'):
-                # Update payment
+                # Update payment; it is committed together with the wallet balance
                 self.payment_repo.update_status(
                     payment.payment_id,
                     PaymentStatus.COMPLETED,
-                    tx_hash=tx_result.get('tx_hash')
+                    tx_hash=tx_result.get('tx_hash'),
+                    commit=False
                 )
                 
                 # Update wallet balance
@@ -217,11 +230,12 @@ class PaymentService:
             )
             
             if tx_result.get('success'):
-                # Update payment
+                # Update payment; it is committed together with the wallet balance
                 self.payment_repo.update_status(
                     payment.payment_id,
                     PaymentStatus.COMPLETED,
-                    tx_hash=tx_result.get('tx_hash')
+                    tx_hash=tx_result.get('tx_hash'),
+                    commit=False
                 )
                 
                 # Update wallet balance
@@ -259,10 +273,9 @@ class PaymentService:
         user_id: str,
         payment_type: Optional[PaymentType] = None,
         limit: int = 100
-    ) -> List[Dict]:
+    ) -> List[PaymentRow]:
         """Get payment history"""
-        payments = self.payment_repo.get_user_payments(user_id, payment_type, limit)
-        return [p.to_dict() for p in payments]
+        return self.read_repository.user_payments(user_id, payment_type, limit)
     
     def get_analytics(self, user_id: str, days: int = 30) -> Dict:
         """Get payment analytics (profit/loss analysis)"""
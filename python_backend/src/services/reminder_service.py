@@ -0,0 +1,189 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
+import heapq
+import logging
+import uuid
+
+from sqlalchemy.orm import sessionmaker
+
+from src.config.database import SessionLocal
+from src.config.settings import settings
+from src.models.notification import Notification, NotificationStatus
+from src.repositories.scheduled_notification_repository import ScheduledNotificationRepository
+from src.services.notification_delivery_service import NotificationDeliveryPool, notification_delivery
+from src.utils.notification_hub import NotificationHub, notification_hub
+from src.utils.periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+class ReminderScheduler:
+    """Fires scheduled notifications when they fall due
+
+    Only the next window_seconds of the schedule is held in memory, as a
+    min-heap of (due_at, schedule_id) capped at max_loaded entries, so
+    millions of future reminders cost nothing until their window comes
+    up. The window is refilled from the (status, due_at) index when it
+    runs out, and reminders scheduled inside the current window go
+    straight onto the heap.
+
+    Firing claims the rows (SCHEDULED -> FIRED) and inserts their
+    notifications in one transaction, so across restarts and several
+    worker processes each reminder creates at most one notification.
+    Reminders found more than max_lateness_seconds overdue (the service
+    was down) are marked EXPIRED instead.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        hub: NotificationHub = None,
+        delivery: NotificationDeliveryPool = None,
+        window_seconds: int = None,
+        max_loaded: int = None,
+        batch_size: int = None,
+        max_lateness_seconds: int = None
+    ):
+        self.session_factory = session_factory
+        self.hub = hub or notification_hub
+        self.delivery = delivery or notification_delivery
+        self.window_seconds = window_seconds or settings.REMINDER_WINDOW_SECONDS
+        self.max_loaded = max_loaded or settings.REMINDER_MAX_LOADED
+        self.batch_size = batch_size or settings.REMINDER_BATCH_SIZE
+        self.max_lateness_seconds = max_lateness_seconds or settings.REMINDER_MAX_LATENESS_SECONDS
+        self._heap: List[Tuple[datetime, str]] = []
+        self._loaded: Set[str] = set()
+        self._window_end: Optional[datetime] = None
+        self._periodic = PeriodicTask(
+            'Reminder scheduler cycle', self.run_once, lambda: self._seconds_until_next(datetime.utcnow())
+        )
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def pending(self) -> int:
+        """Reminders loaded and waiting to fire"""
+        return len(self._heap)
+
+    def start(self):
+        """Start the scheduler loop on the running event loop"""
+        if self._periodic.start():
+            self._loop = asyncio.get_running_loop()
+            logger.info(f"Reminder scheduler started (window={self.window_seconds}s, max_loaded={self.max_loaded})")
+
+    async def stop(self):
+        """Stop the loop; unfired reminders stay scheduled in the database"""
+        if not await self._periodic.stop():
+            return
+        self._loop = None
+        self._heap, self._loaded, self._window_end = [], set(), None
+        logger.info("Reminder scheduler stopped")
+
+    def add(self, schedule_id: str, due_at: datetime):
+        """Pick up a newly scheduled reminder if it falls inside the loaded window (any thread)"""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._add(schedule_id, due_at)
+        else:
+            loop.call_soon_threadsafe(self._add, schedule_id, due_at)
+
+    def _add(self, schedule_id: str, due_at: datetime):
+        # Later reminders are left to the refill that loads their window
+        if self._window_end is None or due_at >= self._window_end or schedule_id in self._loaded:
+            return
+        heapq.heappush(self._heap, (due_at, schedule_id))
+        self._loaded.add(schedule_id)
+        if self._heap[0][1] == schedule_id:
+            self._periodic.wake()  # earlier than what the loop is sleeping towards
+
+    def _seconds_until_next(self, now: datetime) -> float:
+        wake_at = self._window_end or now
+        if self._heap:
+            wake_at = min(wake_at, self._heap[0][0])
+        return min(max(0.0, (wake_at - now).total_seconds()), self.window_seconds)
+
+    def run_once(self, now: datetime = None) -> Dict:
+        """Refill the window if it has run out, then fire everything due"""
+        now = now or datetime.utcnow()
+        loaded = 0
+        if self._window_end is None or now >= self._window_end:
+            loaded = self._refill(now)
+
+        fired = expired = 0
+        while self._heap and self._heap[0][0] <= now:
+            batch = []
+            while self._heap and self._heap[0][0] <= now and len(batch) < self.batch_size:
+                due_at, schedule_id = heapq.heappop(self._heap)
+                self._loaded.discard(schedule_id)
+                batch.append((due_at, schedule_id))
+            batch_fired, batch_expired = self._fire(batch, now)
+            fired += batch_fired
+            expired += batch_expired
+        if expired:
+            logger.warning(f"Reminder scheduler: {expired} reminders expired after being overdue by more than {self.max_lateness_seconds}s")
+        return {'success': True, 'loaded': loaded, 'fired': fired, 'expired': expired}
+
+    def _refill(self, now: datetime) -> int:
+        """Load the next window of due reminders onto the heap"""
+        until = now + timedelta(seconds=self.window_seconds)
+        db = self.session_factory()
+        try:
+            rows = ScheduledNotificationRepository(db).due_before(until, self.max_loaded)
+        finally:
+            db.close()
+        # A full page may stop short of the window; the rest loads once the heap reaches its last entry
+        self._window_end = rows[-1][0] if len(rows) >= self.max_loaded else until
+        loaded = 0
+        for due_at, schedule_id in rows:
+            if schedule_id not in self._loaded:
+                heapq.heappush(self._heap, (due_at, schedule_id))
+                self._loaded.add(schedule_id)
+                loaded += 1
+        return loaded
+
+    def _fire(self, batch: List[Tuple[datetime, str]], now: datetime) -> Tuple[int, int]:
+        """Claim the batch and create its notifications in one transaction"""
+        cutoff = now - timedelta(seconds=self.max_lateness_seconds)
+        late = [schedule_id for due_at, schedule_id in batch if due_at < cutoff]
+        on_time = [schedule_id for due_at, schedule_id in batch if due_at >= cutoff]
+        db = self.session_factory()
+        try:
+            repository = ScheduledNotificationRepository(db)
+            expired = repository.expire(late) if late else 0
+            claimed = repository.claim(on_time, uuid.uuid4().hex, now) if on_time else []
+            notifications = [
+                Notification(
+                    notification_id=scheduled.schedule_id,
+                    user_id=scheduled.user_id,
+                    notification_type=scheduled.notification_type,
+                    title=scheduled.title,
+                    message=scheduled.message,
+                    created_at=now,
+                    status=NotificationStatus.PENDING,
+                    notification_data=scheduled.notification_data,
+                    priority=scheduled.priority,
+                    attempts=0
+                )
+                for scheduled in claimed
+            ]
+            published = [(n.user_id, n.to_dict()) for n in notifications]
+            db.add_all(notifications)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        for user_id, notification in published:
+            self.hub.publish(user_id, notification)
+        if published:
+            self.delivery.wake()
+        return len(published), expired
+
+reminder_scheduler = ReminderScheduler()
@@ -1,11 +1,16 @@
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict
 from sqlalchemy.orm import Session
+from src.models.notification import NotificationType
 from src.models.self_exclusion import SelfExclusion
+from src.services.notification_service import NotificationService
+from src.utils.tracing import trace_class
 
+@trace_class()
 class SelfExclusionService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, notification_service: NotificationService = None):
         self.db = db
+        self.notification_service = notification_service or NotificationService(db)
 
     async def add_self_exclusion(self, user_id: str, duration_days: int, reason: str = None) -> Dict:
         """Add self-exclusion period for a user"""
@@ -33,6 +38,7 @@ class SelfExclusionService:
         )
         self.db.add(exclusion)
         self.db.commit()
+        await self.notification_service.schedule_self_exclusion_reminder(user_id, end_date)
         
         return {
             'success': True,
@@ -61,6 +67,7 @@ class SelfExclusionService:
             SelfExclusion.end_date > datetime.utcnow()
         ).delete()
         self.db.commit()
+        await self.notification_service.cancel_scheduled(user_id, NotificationType.SELF_EXCLUSION_REMINDER)
         
         return {
             'success': result > 0,
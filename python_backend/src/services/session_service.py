@@ -4,33 +4,36 @@ import uuid
 from sqlalchemy.orm import Session
 from src.models.session import Session as GamingSession
 from src.repositories.session_repository import SessionRepository
+from src.repositories.read_repository import ReadRepository
 from src.services.notification_service import NotificationService
 from src.models.notification import NotificationType
+from src.utils.tracing import trace_class
 
+@trace_class()
 class SessionService:
     """Manages gambling sessions with time tracking and mandatory breaks"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, notification_service: NotificationService = None):
         self.db = db
         self.session_repository = SessionRepository(db)
-        self.notification_service = NotificationService(db)
+        self.read_repository = ReadRepository(db)
+        self.notification_service = notification_service or NotificationService(db)
         self.max_session_duration = 120  # minutes
         self.reality_check_interval = 30  # minutes
         self.mandatory_break_duration = 15  # minutes
 
     async def start_session(self, user_id: str, platform_id: str, currency: str = 'CCD') -> Dict:
         """Start a new gambling session"""
-        # Check if user has active session
-        active_session = self.session_repository.get_active_session(user_id)
-        if active_session:
+        # Check if user has active session; otherwise this is their last session
+        last_session = self.session_repository.get_current_session(user_id)
+        if last_session and last_session.status == 'active':
             return {
                 'success': False,
                 'message': 'User already has an active session',
-                'session_id': active_session.session_id
+                'session_id': last_session.session_id
             }
         
         # Check if user is in mandatory break period
-        last_session = self.session_repository.get_last_session(user_id)
         if last_session and last_session.end_time:
             time_since_last = datetime.utcnow() - last_session.end_time
             if time_since_last.total_seconds() / 60 < self.mandatory_break_duration:
@@ -192,10 +195,10 @@ class SessionService:
 
     async def get_user_sessions(self, user_id: str, limit: int = 10) -> Dict:
         """Get user's recent sessions"""
-        sessions = self.session_repository.get_user_sessions(user_id, limit)
+        sessions = self.read_repository.user_sessions(user_id, limit)
         
         return {
             'success': True,
-            'sessions': [s.to_dict() for s in sessions],
+            'sessions': sessions,
             'count': len(sessions)
         }
@@ -1,9 +1,11 @@
 from typing import Dict
 import logging
 import os
+from src.utils.tracing import trace_class
 
 logger = logging.getLogger(__name__)
 
+@trace_class()
 class SmartContractService:
     """Service for smart contract interactions"""
     
@@ -7,12 +7,22 @@ from src.repositories.transaction_repository import TransactionRepository
 from src.services.blockchain_integration_service import BlockchainIntegrationService
 from src.services.limit_enforcement_service import LimitEnforcementService
 from src.services.audit_service import AuditService
+from src.utils.tracing import trace_class
 
+@trace_class()
 class TransactionService:
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        blockchain_service: BlockchainIntegrationService = None,
+        limit_service: LimitEnforcementService = None,
+        audit_service: AuditService = None
+    ):
         self.db = db
         self.transaction_repository = TransactionRepository(db)
-        self.blockchain_service = BlockchainIntegrationService()
+        self.blockchain_service = blockchain_service or BlockchainIntegrationService()
+        self.limit_service = limit_service or LimitEnforcementService(db)
+        self.audit_service = audit_service or AuditService(db)
 
     async def record_transaction(self, transaction_data: dict) -> Dict:
         """Record a new transaction"""
@@ -20,8 +30,7 @@ class TransactionService:
         amount = transaction_data.get('amount')
         
         # Check spending limits
-        limit_service = LimitEnforcementService(self.db)
-        limit_check = await limit_service.check_limit(user_id, amount)
+        limit_check = await self.limit_service.check_limit(user_id, amount)
         
         if not limit_check.get('allowed', False):
             return {
@@ -51,8 +60,7 @@ class TransactionService:
         })
         
         # Log audit trail
-        audit_service = AuditService(self.db)
-        await audit_service.log_action(
+        await self.audit_service.log_action(
             action_type='transaction_recorded',
             user_id=user_id,
             details=transaction_data,
@@ -91,5 +99,4 @@ class TransactionService:
 
     async def check_spending_limit(self, user_id: str, amount: float) -> Dict:
         """Check if transaction would exceed spending limit"""
-        limit_service = LimitEnforcementService(self.db)
-        return await limit_service.check_limit(user_id, amount)
\ No newline at end of file
+        return await self.limit_service.check_limit(user_id, amount)
\ No newline at end of file
@@ -5,12 +5,20 @@ from src.models.user import User
 from src.repositories.user_repository import UserRepository
 from src.services.blockchain_integration_service import BlockchainIntegrationService
 from src.services.audit_service import AuditService
+from src.utils.tracing import trace_class
 
+@trace_class()
 class UserService:
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        blockchain_service: BlockchainIntegrationService = None,
+        audit_service: AuditService = None
+    ):
         self.db = db
         self.user_repository = UserRepository(db)
-        self.blockchain_service = BlockchainIntegrationService()
+        self.blockchain_service = blockchain_service or BlockchainIntegrationService()
+        self.audit_service = audit_service or AuditService(db)
 
     async def register_user(self, user_data: dict) -> Dict:
         """Register a new user with Concordium identity verification"""
@@ -30,8 +38,7 @@ class UserService:
         created_user = self.user_repository.create_user(user)
         
         # Log action
-        audit_service = AuditService(self.db)
-        await audit_service.log_action(
+        await self.audit_service.log_action(
             action_type='user_registration',
             user_id=str(created_user.id),
             details=user_data,
@@ -53,6 +60,18 @@ class UserService:
             'user': user.to_dict() if hasattr(user, 'to_dict') else user
         }
 
+    async def get_account(self, user_id: str) -> Dict:
+        """Get user together with their wallet and active session"""
+        user = self.user_repository.get_user_account(user_id)
+        if not user:
+            return {'success': False, 'error': 'User not found'}
+        return {
+            'success': True,
+            'user': user.to_dict(),
+            'wallet': user.wallet.to_dict() if user.wallet else None,
+            'active_session': user.active_session.to_dict() if user.active_session else None
+        }
+
     async def update_user(self, user_id: str, user_data: dict) -> Dict:
         """Update user information"""
         user = self.user_repository.get_user(user_id)
@@ -66,8 +85,7 @@ class UserService:
         updated_user = self.user_repository.update_user(user)
         
         # Log action
-        audit_service = AuditService(self.db)
-        await audit_service.log_action(
+        await self.audit_service.log_action(
             action_type='user_update',
             user_id=user_id,
             details=user_data,
@@ -94,8 +112,7 @@ class UserService:
         
         if success:
             # Log action
-            audit_service = AuditService(self.db)
-            await audit_service.log_action(
+            await self.audit_service.log_action(
                 action_type='user_deletion',
                 user_id=user_id,
                 details={},
@@ -5,13 +5,24 @@ from datetime import datetime, timezone
 
 from src.models.wallet import Wallet
 from src.services.blockchain_integration_service import BlockchainIntegrationService
+from src.utils.cache import get_cache
+from src.utils.tracing import trace_class
 
+@trace_class()
 class WalletService:
     """Service for wallet operations"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, blockchain_service: BlockchainIntegrationService = None):
         self.db = db
-        self.blockchain_service = BlockchainIntegrationService()
+        self.blockchain_service = blockchain_service or BlockchainIntegrationService()
+        self.cache = get_cache('wallets')
+    
+    def _load_wallet(self, user_id: str):
+        """Read-through lookup of a user's wallet as a dict"""
+        def load():
+            wallet = self.db.query(Wallet).filter(Wallet.user_id == user_id).first()
+            return wallet.to_dict() if wallet else None
+        return self.cache.get_or_load(user_id, load)
     
     async def connect_wallet(self, user_id: str, concordium_address: str) -> Dict:
         """Connect a Concordium wallet to user account"""
@@ -42,6 +53,7 @@ class WalletService:
         
         self.db.add(wallet)
         self.db.commit()
+        self.cache.invalidate(user_id)
         self.db.refresh(wallet)
         
         # Get initial balance
@@ -54,25 +66,26 @@ class WalletService:
     
     async def get_wallet(self, user_id: str) -> Dict:
         """Get user's wallet"""
-        wallet = self.db.query(Wallet).filter(Wallet.user_id == user_id).first()
+        wallet = self._load_wallet(user_id)
         if not wallet:
             return {'success': False, 'error': 'Wallet not found'}
         
         return {
             'success': True,
-            'wallet': wallet.to_dict()
+            'wallet': dict(wallet)
         }
     
     async def get_balance(self, user_id: str) -> Dict:
         """Get wallet balance"""
-        wallet = self.db.query(Wallet).filter(Wallet.user_id == user_id).first()
+        wallet = self._load_wallet(user_id)
         if not wallet:
             return {'success': False, 'error': 'Wallet not found'}
         
         return {
             'success': True,
-            'balance': wallet.balance,
-            'address': wallet.concordium_address
+            'balance': wallet['balance'],
+            'address': wallet['concordium_address'],
+            'last_synced_at': wallet['last_synced_at']
         }
     
     async def sync_balance(self, user_id: str) -> Dict:
@@ -89,6 +102,7 @@ class WalletService:
                 wallet.balance = balance_result.get('balance', 0)
                 wallet.last_synced_at = datetime.now(timezone.utc)
                 self.db.commit()
+                self.cache.invalidate(user_id)
                 
                 return {
                     'success': True,
@@ -106,10 +120,10 @@ class WalletService:
             }
     
     def update_balance(self, user_id: str, amount: float) -> bool:
-        """Update wallet balance (local cache)"""
-        wallet = self.db.query(Wallet).filter(Wallet.user_id == user_id).first()
-        if wallet:
-            wallet.balance += amount
-            self.db.commit()
-            return True
-        return False
+        """Update wallet balance (local cache) with a single UPDATE and commit"""
+        updated = self.db.query(Wallet).filter(Wallet.user_id == user_id).update(
+            {Wallet.balance: Wallet.balance + amount}
+        )
+        self.db.commit()
+        self.cache.invalidate(user_id)
+        return updated > 0
@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+import asyncio
+import logging
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import sessionmaker
+
+from src.config.database import SessionLocal
+from src.config.settings import settings
+from src.models.payment import Payment
+from src.models.wallet import Wallet
+from src.services.blockchain_integration_service import BlockchainIntegrationService
+from src.utils.cache import get_cache
+from src.utils.periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+class WalletSyncScheduler:
+    """Background refresh of cached wallet balances from the Concordium chain
+
+    Each cycle picks wallets whose last_synced_at is older than the configured
+    staleness, most recently active users first, fetches their balances
+    concurrently (bounded by a semaphore) and writes them back in batches.
+    API reads only ever see the cached Wallet.balance.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        blockchain_service: BlockchainIntegrationService = None,
+        staleness_seconds: int = None,
+        interval_seconds: int = None,
+        concurrency: int = None,
+        batch_size: int = None,
+        max_per_cycle: int = None,
+        activity_window_days: int = None
+    ):
+        self.session_factory = session_factory
+        self.blockchain_service = blockchain_service or BlockchainIntegrationService()
+        self.staleness_seconds = staleness_seconds or settings.WALLET_SYNC_STALENESS
+        self.interval_seconds = interval_seconds or settings.WALLET_SYNC_INTERVAL
+        self.concurrency = concurrency or settings.WALLET_SYNC_CONCURRENCY
+        self.batch_size = batch_size or settings.WALLET_SYNC_BATCH_SIZE
+        self.max_per_cycle = max_per_cycle or settings.WALLET_SYNC_MAX_PER_CYCLE
+        self.activity_window_days = activity_window_days or settings.WALLET_SYNC_ACTIVITY_WINDOW
+        self.pending = 0
+        self.cache = get_cache('wallets')
+        self._periodic = PeriodicTask('Wallet sync cycle', self.run_once, self.interval_seconds)
+
+    def start(self):
+        """Start the periodic sync loop on the running event loop"""
+        if self._periodic.start():
+            logger.info(f"Wallet sync scheduler started (staleness={self.staleness_seconds}s, interval={self.interval_seconds}s)")
+
+    async def stop(self):
+        """Stop the sync loop and wait for the current cycle to unwind"""
+        if not await self._periodic.stop():
+            return
+        logger.info("Wallet sync scheduler stopped")
+
+    async def run_once(self) -> Dict:
+        """Refresh one cycle worth of stale wallets"""
+        db = self.session_factory()
+        try:
+            stale = self._get_stale_wallets(db)
+            self.pending = len(stale)
+            if not stale:
+                return {'success': True, 'checked': 0, 'updated': 0, 'failed': 0}
+
+            semaphore = asyncio.Semaphore(self.concurrency)
+
+            async def fetch(wallet_id: str, user_id: str, address: str):
+                async with semaphore:
+                    result = await self.blockchain_service.get_wallet_balance(address)
+                return wallet_id, user_id, result
+
+            updated = 0
+            failed = 0
+            batch: List[Dict] = []
+            batch_users: List[str] = []
+            for next_result in asyncio.as_completed([fetch(*wallet) for wallet in stale]):
+                wallet_id, user_id, result = await next_result
+                self.pending -= 1
+                if not result.get('success'):
+                    failed += 1
+                    continue
+                batch.append({
+                    'wallet_id': wallet_id,
+                    'balance': result.get('balance', 0.0),
+                    'last_synced_at': datetime.now(timezone.utc)
+                })
+                batch_users.append(user_id)
+                if len(batch) >= self.batch_size:
+                    updated += self._write_batch(db, batch, batch_users)
+                    batch, batch_users = [], []
+            if batch:
+                updated += self._write_batch(db, batch, batch_users)
+
+            if failed:
+                logger.warning(f"Wallet sync: {failed} of {len(stale)} balance fetches failed")
+
+            return {'success': True, 'checked': len(stale), 'updated': updated, 'failed': failed}
+        finally:
+            self.pending = 0
+            db.close()
+
+    def _get_stale_wallets(self, db) -> List[Tuple[str, str, str]]:
+        """Get (wallet_id, user_id, address) rows due for a refresh, most active users first"""
+        now = datetime.now(timezone.utc)
+        cutoff = now - timedelta(seconds=self.staleness_seconds)
+        activity_since = now - timedelta(days=self.activity_window_days)
+
+        last_activity = (
+            select(Payment.user_id, func.max(Payment.created_at).label('last_activity'))
+            .where(Payment.created_at >= activity_since)
+            .group_by(Payment.user_id)
+            .subquery()
+        )
+
+        query = (
+            select(Wallet.wallet_id, Wallet.user_id, Wallet.concordium_address)
+            .outerjoin(last_activity, last_activity.c.user_id == Wallet.user_id)
+            .where(
+                Wallet.is_active == True,
+                or_(Wallet.last_synced_at.is_(None), Wallet.last_synced_at < cutoff)
+            )
+            .order_by(
+                last_activity.c.last_activity.desc().nulls_last(),
+                Wallet.last_synced_at.asc().nulls_first()
+            )
+            .limit(self.max_per_cycle)
+        )
+
+        return [(row.wallet_id, row.user_id, row.concordium_address) for row in db.execute(query)]
+
+    def _write_batch(self, db, batch: List[Dict], user_ids: List[str]) -> int:
+        """Write a batch of refreshed balances in a single executemany"""
+        db.execute(update(Wallet), batch)
+        db.commit()
+        self.cache.invalidate(*user_ids)
+        return len(batch)
@@ -0,0 +1,200 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+import logging
+import pickle
+import threading
+import time
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Sentinel returned by backends on a miss (None is never cached)
+MISSING = object()
+
+class CacheStats:
+    """Hit/miss counters for a single cache namespace"""
+
+    __slots__ = ('hits', 'misses', 'invalidations')
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def to_dict(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_ratio': self.hits / total if total else 0.0
+        }
+
+class LRUCache:
+    """In-process LRU cache with a per-entry TTL"""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class RedisCache:
+    """Cache backed by a Redis-compatible server (values are pickled)"""
+
+    def __init__(self, url: str, namespace: str, ttl_seconds: float = 60):
+        import redis  # optional dependency, only needed for CACHE_BACKEND=redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = f"rg:{namespace}:"
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, key: Hashable) -> Any:
+        raw = self.client.get(f"{self.prefix}{key}")
+        if raw is None:
+            return MISSING
+        return pickle.loads(raw)
+
+    def set(self, key: Hashable, value: Any):
+        self.client.set(f"{self.prefix}{key}", pickle.dumps(value), ex=max(1, int(self.ttl_seconds)))
+
+    def delete(self, key: Hashable):
+        self.client.delete(f"{self.prefix}{key}")
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=f"{self.prefix}*"))
+        if keys:
+            self.client.delete(*keys)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.client.scan_iter(match=f"{self.prefix}*"))
+
+class ReadThroughCache:
+    """Read-through cache for one namespace of rows"""
+
+    def __init__(self, name: str, backend):
+        self.name = name
+        self.backend = backend
+        self.stats = CacheStats()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for key, calling loader on a miss"""
+        value = self.backend.get(key)
+        if value is not MISSING:
+            self.stats.hits += 1
+            return value
+        self.stats.misses += 1
+        value = loader()
+        if value is not None:
+            self.backend.set(key, value)
+        return value
+
+    def invalidate(self, *keys: Hashable):
+        """Drop keys after a write so the next read reloads them"""
+        for key in keys:
+            if key is not None:
+                self.backend.delete(key)
+                self.stats.invalidations += 1
+
+    def clear(self):
+        self.backend.clear()
+
+    def to_dict(self) -> Dict:
+        return {
+            'backend': type(self.backend).__name__,
+            'size': len(self.backend),
+            **self.stats.to_dict()
+        }
+
+_caches: Dict[str, ReadThroughCache] = {}
+_caches_lock = threading.Lock()
+
+def _create_backend(name: str):
+    if settings.CACHE_BACKEND == 'redis':
+        try:
+            return RedisCache(settings.CACHE_REDIS_URL, name, settings.CACHE_TTL)
+        except ImportError:
+            logger.warning("redis package not installed - falling back to in-process cache")
+    return LRUCache(settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL)
+
+def get_cache(name: str) -> ReadThroughCache:
+    """Get (or create) the cache for a namespace"""
+    cache = _caches.get(name)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(name)
+            if cache is None:
+                cache = ReadThroughCache(name, _create_backend(name))
+                _caches[name] = cache
+    return cache
+
+def get_cache_stats() -> Dict[str, Dict]:
+    """Get hit/miss statistics for every cache namespace"""
+    return {name: cache.to_dict() for name, cache in _caches.items()}
+
+def clear_caches():
+    """Empty every cache namespace"""
+    for cache in _caches.values():
+        cache.clear()
+
+# ORM helpers: rows are cached as plain column snapshots and re-attached to the
+# caller's session, so cached entities can still be modified and committed.
+
+def snapshot_row(obj) -> Optional[Dict]:
+    """Copy an ORM instance's column values into a plain dict"""
+    if obj is None:
+        return None
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+
+def restore_row(db: Session, model, row: Optional[Dict]):
+    """Attach a cached column snapshot to db as a persistent instance"""
+    if row is None:
+        return None
+    mapper = inspect(model)
+    pk = tuple(row[mapper.get_property_by_column(col).key] for col in mapper.primary_key)
+    existing = db.identity_map.get(identity_key(model, pk))
+    if existing is not None:
+        return existing
+    obj = model(**row)
+    make_transient_to_detached(obj)
+    return db.merge(obj, load=False)
+
+def history_values(obj, attr_name: str) -> Iterable:
+    """Current and previous (uncommitted) values of an attribute"""
+    history = inspect(obj).attrs[attr_name].history
+    return [*history.unchanged, *history.added, *history.deleted] or [getattr(obj, attr_name)]
@@ -0,0 +1,266 @@
+"""Compact storage for large JSON columns
+
+With JSON_COMPRESSION_ENABLED, CompressedJSON columns are stored as binary
+instead of JSON text:
+
+    b'\\x00' + zstd frame (without its 4-byte magic) of the msgpack value
+    b'\\x01' + msgpack value, when compression would not make it smaller
+
+Frames are compressed with a zstd dictionary trained on values of the same
+group (audit details of one action_type, notification data of one
+notification_type), which is what makes values of a few hundred bytes
+compress well. The type only sees the value, not its row, so a value is
+matched to a dictionary by its shape (its top-level keys), recorded per
+dictionary at training time; values of an unseen shape use the column's
+largest dictionary. The frame carries the dictionary id, so decoding
+needs no hint. Dictionaries live in the json_dictionaries table and are
+trained by services/json_compression_service.py.
+
+Reads decode whatever is stored, whatever the setting says: JSON text
+(written before compression was enabled, or after it was turned off) is
+read as JSON, and marker-prefixed values are decoded as long as msgpack
+and zstandard are installed. Only writes follow the setting.
+"""
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set
+import json
+import logging
+import threading
+
+from sqlalchemy import JSON, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.types import TypeDecorator, UserDefinedType
+
+from src.config.settings import settings
+from src.models.json_dictionary import JsonDictionary
+
+try:
+    import msgpack  # optional dependency
+    import zstandard
+except ImportError:
+    msgpack = zstandard = None
+
+logger = logging.getLogger(__name__)
+
+ZSTD = b'\x00'
+MSGPACK = b'\x01'
+FRAME_MAGIC = b'\x28\xb5\x2f\xfd'
+
+def signature(value: Any) -> str:
+    """The shape a value is matched to a dictionary by"""
+    if isinstance(value, dict):
+        return ','.join(sorted(map(str, value)))
+    return f"<{type(value).__name__}>"
+
+class JsonCodec:
+    """Encodes JSON values as msgpack + zstd and holds the trained dictionaries"""
+
+    def __init__(self, level: int = None):
+        self.level = level or settings.JSON_COMPRESSION_LEVEL
+        self._dictionaries: Dict[int, Any] = {}
+        self._columns: Dict[str, Dict] = {}  # column -> shapes {signature: dict_id}, their sample counts, default (dict_id, samples), names
+        self._local = threading.local()  # zstd (de)compressors are not thread-safe
+        # Columns whose database type is binary (bytea), so JSON text is written to them as UTF-8 bytes
+        self.binary_columns: Set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return zstandard is not None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.JSON_COMPRESSION_ENABLED and self.available
+
+    # Dictionaries
+
+    def register(self, dictionary: JsonDictionary):
+        """Make a stored dictionary available for encoding and decoding"""
+        with self._lock:
+            if dictionary.dict_id in self._dictionaries:
+                return
+            self._dictionaries[dictionary.dict_id] = zstandard.ZstdCompressionDict(dictionary.data)
+            column = self._columns.setdefault(dictionary.column, {'shapes': {}, 'counts': {}, 'default': None, 'names': set()})
+            column['names'].add(dictionary.name)
+            for shape, count in dictionary.signatures.items():
+                if count > column['counts'].get(shape, 0):
+                    column['shapes'][shape] = dictionary.dict_id
+                    column['counts'][shape] = count
+            largest = column['default']
+            if largest is None or dictionary.samples > largest[1]:
+                column['default'] = (dictionary.dict_id, dictionary.samples)
+
+    def load(self, db: Session) -> int:
+        """Register every stored dictionary not yet known; returns how many were added"""
+        known = set(self._dictionaries)
+        added = 0
+        for dictionary in db.execute(select(JsonDictionary).where(JsonDictionary.dict_id.notin_(known))).scalars():
+            self.register(dictionary)
+            added += 1
+        return added
+
+    def names(self, column: str) -> set:
+        """Groups of the column that have a dictionary"""
+        return set(self._columns.get(column, {}).get('names', ()))
+
+    def has_dictionary(self, column: str) -> bool:
+        return column in self._columns
+
+    def clear(self):
+        with self._lock:
+            self._dictionaries.clear()
+            self._columns.clear()
+            self._local = threading.local()
+
+    def train(self, column: str, name: Optional[str], values: List[Any], size: int = None) -> JsonDictionary:
+        """Train a dictionary on sample values of one group (not stored or registered)"""
+        samples = [msgpack.packb(value, use_bin_type=True) for value in values]
+        trained = zstandard.train_dictionary(size or settings.JSON_DICTIONARY_SIZE, samples, level=self.level)
+        return JsonDictionary(
+            dict_id=trained.dict_id(),
+            column=column,
+            name=name,
+            signatures=dict(Counter(signature(value) for value in values)),
+            samples=len(values),
+            data=trained.as_bytes()
+        )
+
+    def _dictionary_for(self, column: str, value: Any) -> int:
+        entry = self._columns.get(column)
+        if entry is None:
+            return 0
+        return entry['shapes'].get(signature(value), entry['default'][0])
+
+    def _compressor(self, dict_id: int):
+        compressors = self._local.__dict__.setdefault('compressors', {})
+        compressor = compressors.get(dict_id)
+        if compressor is None:
+            params = zstandard.ZstdCompressionParameters.from_level(
+                self.level, write_checksum=0, write_content_size=1, write_dict_id=1
+            )
+            dictionary = self._dictionaries[dict_id] if dict_id else None
+            compressor = compressors[dict_id] = zstandard.ZstdCompressor(dict_data=dictionary, compression_params=params)
+        return compressor
+
+    def _decompressor(self, dict_id: int):
+        decompressors = self._local.__dict__.setdefault('decompressors', {})
+        decompressor = decompressors.get(dict_id)
+        if decompressor is None:
+            if dict_id and dict_id not in self._dictionaries:
+                self._fetch(dict_id)
+            dictionary = self._dictionaries[dict_id] if dict_id else None
+            decompressor = decompressors[dict_id] = zstandard.ZstdDecompressor(dict_data=dictionary)
+        return decompressor
+
+    def _fetch(self, dict_id: int):
+        """Load a dictionary another process trained"""
+        from src.config.database import SessionLocal
+        db = SessionLocal()
+        try:
+            dictionary = db.get(JsonDictionary, dict_id)
+            if dictionary is None:
+                raise ValueError(f"Unknown JSON dictionary {dict_id}")
+            self.register(dictionary)
+        finally:
+            db.close()
+
+    # Values
+
+    def encode(self, column: str, value: Any) -> bytes:
+        packed = msgpack.packb(value, use_bin_type=True)
+        frame = self._compressor(self._dictionary_for(column, value)).compress(packed)
+        if len(frame) - len(FRAME_MAGIC) < len(packed):
+            return ZSTD + frame[len(FRAME_MAGIC):]
+        return MSGPACK + packed
+
+    def decode(self, stored: Any) -> Any:
+        if stored is None:
+            return None
+        if isinstance(stored, str):
+            return json.loads(stored)
+        if isinstance(stored, (dict, list)):
+            return stored  # a json column the driver already parsed
+        stored = bytes(stored)
+        marker = stored[:1]
+        if marker in (ZSTD, MSGPACK) and not self.available:
+            raise RuntimeError("JSON value is stored compressed, but msgpack/zstandard are not installed")
+        if marker == ZSTD:
+            frame = FRAME_MAGIC + stored[1:]
+            dict_id = zstandard.get_frame_parameters(frame).dict_id
+            return msgpack.unpackb(self._decompressor(dict_id).decompress(frame), strict_map_key=False)
+        if marker == MSGPACK:
+            return msgpack.unpackb(stored[1:], strict_map_key=False)
+        return json.loads(stored)  # JSON text in a binary column
+
+    def needs_rewrite(self, column: str, stored: Any) -> bool:
+        """Whether a stored value is JSON text, or was encoded before its column had a dictionary"""
+        if stored is None:
+            return False
+        if isinstance(stored, str):
+            return True
+        marker = bytes(stored[:1])
+        if marker == MSGPACK:  # only if the column's dictionary now makes it smaller
+            return self.has_dictionary(column) and self.encode(column, self.decode(stored))[:1] == ZSTD
+        if marker == ZSTD:
+            return self.has_dictionary(column) and zstandard.get_frame_parameters(FRAME_MAGIC + bytes(stored[1:])).dict_id == 0
+        return True
+
+class _StoredBinary(UserDefinedType):
+    """BLOB / bytea whose values pass to and from the driver untouched"""
+
+    cache_ok = True
+
+    def get_col_spec(self, **kw):
+        return 'BLOB'
+
+@compiles(_StoredBinary, 'postgresql')
+def _compile_bytea(type_, compiler, **kw):
+    return 'BYTEA'
+
+class _StoredJSON(UserDefinedType):
+    """JSON column whose values pass to and from the driver untouched
+
+    A user-defined type, so dialects do not swap in their own JSON type
+    (which would serialize and parse the values again).
+    """
+
+    cache_ok = True
+
+    def get_col_spec(self, **kw):
+        return 'JSON'
+
+class CompressedJSON(TypeDecorator):
+    """JSON column stored through the codec when JSON_COMPRESSION_ENABLED is set, plain JSON otherwise
+
+    The column is created binary when the setting is on at create time.
+    The setting only decides how values are written; reads decode JSON
+    text and codec output alike, so rows compacted earlier stay readable
+    with it off. The storage type's own conversions are bypassed for that:
+    the driver's value goes straight to JsonCodec.decode().
+    """
+
+    impl = JSON
+    cache_ok = True
+
+    def __init__(self, column: str):
+        super().__init__()
+        self.column = column
+
+    def load_dialect_impl(self, dialect):
+        return _StoredBinary() if json_codec.enabled else _StoredJSON()
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if json_codec.enabled:
+            return json_codec.encode(self.column, value)
+        text = json.dumps(value)
+        return text.encode() if self.column in json_codec.binary_columns else text
+
+    def process_result_value(self, value, dialect):
+        if isinstance(value, str) and dialect.name == 'postgresql':
+            return value  # a JSON string value the driver already parsed out of a json column
+        return json_codec.decode(value)
+
+json_codec = JsonCodec()
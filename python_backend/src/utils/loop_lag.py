@@ -0,0 +1,52 @@
+from typing import Optional
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+class LoopLagMonitor:
+    """Measures event-loop lag as the overshoot of a periodic sleep
+
+    A saturated loop wakes the probe late; the smoothed overshoot is a
+    cheap proxy for how long ready callbacks wait to run.
+    """
+
+    def __init__(self, interval: float = 0.1, smoothing: float = 0.3):
+        self.interval = interval
+        self.smoothing = smoothing
+        self.lag = 0.0  # smoothed lag in seconds
+        self.max_lag = 0.0  # worst single observation since start
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start probing on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop probing"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            observed = max(0.0, time.perf_counter() - started - self.interval)
+            self.lag += self.smoothing * (observed - self.lag)
+            if observed > self.max_lag:
+                self.max_lag = observed
+
+# Process-wide monitor, started in the application lifespan
+loop_lag_monitor = LoopLagMonitor()
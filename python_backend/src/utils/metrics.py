@@ -0,0 +1,272 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import functools
+import logging
+import threading
+import time
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+class Metric:
+    """Base class for a metric family with optional labels"""
+
+    type_name = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(Metric):
+    """Monotonically increasing value per label set"""
+
+    type_name = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, labels: Tuple = (), amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels: Tuple = ()) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(v)}" for labels, v in values]
+
+class Gauge(Metric):
+    """Value read from callbacks at scrape time, so it costs nothing on the hot path"""
+
+    type_name = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._functions: Dict[Tuple, Callable[[], float]] = {}
+
+    def set_function(self, fn: Callable[[], float], labels: Tuple = ()):
+        self._functions[labels] = fn
+
+    def remove(self, labels: Tuple = ()):
+        self._functions.pop(labels, None)
+
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, fn in list(self._functions.items()):
+            try:
+                value = float(fn())
+            except Exception as e:
+                logger.warning(f"Metric {self.name}{labels} callback failed: {e}")
+                continue
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+class Histogram(Metric):
+    """Cumulative-bucket histogram per label set"""
+
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple, List[float]] = {}
+
+    def observe(self, value: float, labels: Tuple = ()):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, labels: Tuple = ()) -> int:
+        series = self._series.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def sum(self, labels: Tuple = ()) -> float:
+        series = self._series.get(labels)
+        return series[-1] if series else 0.0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            snapshot = [(labels, list(series)) for labels, series in self._series.items()]
+        lines = []
+        for labels, series in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    """Collection of metric families rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            samples = metric.samples()
+            if samples:
+                lines.extend(metric.header())
+                lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.register(Histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route', ('method', 'route', 'status')
+))
+http_requests_in_flight = registry.register(Gauge(
+    'http_requests_in_flight', 'HTTP requests currently being handled'
+))
+db_query_duration = registry.register(Histogram(
+    'db_query_duration_seconds', 'Database statement execution time by statement type', ('operation',), QUERY_BUCKETS
+))
+db_queries_per_request = registry.register(Histogram(
+    'db_queries_per_request', 'Database statements executed per HTTP request', ('route',), QUERY_COUNT_BUCKETS
+))
+db_time_per_request = registry.register(Histogram(
+    'db_time_per_request_seconds', 'Database time spent per HTTP request', ('route',)
+))
+concordium_request_duration = registry.register(Histogram(
+    'concordium_request_duration_seconds', 'Concordium service call latency', ('operation', 'outcome')
+))
+concordium_errors = registry.register(Counter(
+    'concordium_errors_total', 'Concordium service calls that failed or fell back to a mock', ('operation',)
+))
+notifications_purged = registry.register(Counter(
+    'notifications_purged_total', 'Notifications deleted by the retention purger', ('reason',)
+))
+background_queue_depth = registry.register(Gauge(
+    'background_queue_depth', 'Items waiting in background workers', ('queue',)
+))
+event_loop_lag = registry.register(Gauge(
+    'event_loop_lag_seconds', 'Event-loop lag', ('stat',)
+))
+
+class QueryStats:
+    """Statements executed while handling the current request"""
+
+    __slots__ = ('count', 'seconds', 'shapes')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        # statement text -> executions; ORM statements are parameterised, so equal text means equal shape
+        self.shapes: Dict[str, int] = {}
+
+    def max_repeats(self) -> int:
+        return max(self.shapes.values(), default=0)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes executed at least `threshold` times, most repeated first"""
+        return sorted(
+            ((shape, n) for shape, n in self.shapes.items() if n >= threshold),
+            key=lambda item: item[1],
+            reverse=True
+        )
+
+# Set by MetricsMiddleware / QueryBudgetMiddleware for the duration of a request
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar('current_query_stats', default=None)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+    operation = statement.split(None, 1)[0].upper() if statement else ''
+    db_query_duration.observe(elapsed, (operation,))
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+        stats.shapes[statement] = stats.shapes.get(statement, 0) + 1
+
+def install_query_metrics(engine):
+    """Time every statement executed on an engine and attribute it to the current request"""
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+def instrument_concordium(operation: str):
+    """Record latency and failures of an async Concordium client method
+
+    The client methods swallow transport errors and return
+    {'success': False} or a mock result, so outcomes are read from the
+    returned dict.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            outcome = 'error'
+            try:
+                result = await fn(*args, **kwargs)
+                if isinstance(result, dict) and result.get('success') and not result.get('mock'):
+                    outcome = 'ok'
+                return result
+            finally:
+                concordium_request_duration.observe(time.perf_counter() - start, (operation, outcome))
+                if outcome == 'error':
+                    concordium_errors.inc((operation,))
+        return wrapper
+    return decorator
+
+def register_queue(name: str, depth: Callable[[], float]):
+    """Expose a background worker's queue depth"""
+    background_queue_depth.set_function(depth, (name,))
+
+def unregister_queue(name: str):
+    background_queue_depth.remove((name,))
+
+def register_loop_lag(monitor):
+    """Expose a LoopLagMonitor's smoothed and worst lag"""
+    event_loop_lag.set_function(lambda: monitor.lag, ('smoothed',))
+    event_loop_lag.set_function(lambda: monitor.max_lag, ('max',))
+
+def render_metrics() -> str:
+    return registry.render()
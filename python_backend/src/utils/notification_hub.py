@@ -0,0 +1,180 @@
+"""In-process fan-out of notifications to connected clients
+
+Each open SSE or WebSocket connection holds one Subscription. An idle
+subscription is a slotted object with an empty list. While its
+connection waits it also holds one future, so the hub adds well under a
+kilobyte per idle client and no tasks beyond the connection handlers.
+
+The hub also keeps the unread count of every connected user, for the
+unread events it pushes. A count is loaded from the database once, when
+a user's first connection opens. It is then updated in memory as
+notifications are published and read, and dropped when their last
+connection closes. The counts are per worker process, so changes made
+through another worker are missed until sync_unread() is given the
+database count (every /unread-count request does this) or the client
+reconnects. The /unread-count endpoint itself always reads the database.
+"""
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# (event name, payload)
+Event = Tuple[str, Dict]
+
+class Subscription:
+    """One connected client's queue of pending events
+
+    The queue is bounded. A client too slow to keep up loses its oldest
+    events, and the dropped counter records how many. It is a plain list
+    rather than a deque: an empty deque costs ~760 bytes, which adds up
+    over 50k idle connections, and the queue is short.
+    """
+
+    __slots__ = ('user_id', 'pending', 'max_pending', 'waiter', 'dropped')
+
+    def __init__(self, user_id: str, max_pending: int):
+        self.user_id = user_id
+        self.pending: List[Event] = []
+        self.max_pending = max_pending
+        self.waiter: Optional[asyncio.Future] = None
+        self.dropped = 0
+
+    def push(self, event: Event):
+        if len(self.pending) >= self.max_pending:
+            del self.pending[0]
+            self.dropped += 1
+        self.pending.append(event)
+        if self.waiter is not None and not self.waiter.done():
+            self.waiter.set_result(None)
+
+    async def next(self, timeout: float) -> Optional[Event]:
+        """The next event, or None if nothing arrives within timeout (time for a heartbeat)"""
+        if not self.pending:
+            self.waiter = asyncio.get_running_loop().create_future()
+            try:
+                await asyncio.wait_for(self.waiter, timeout)
+            except asyncio.TimeoutError:
+                return None
+            finally:
+                self.waiter = None
+        return self.pending.pop(0)
+
+class NotificationHub:
+    """Per-user subscriber sets and in-memory unread counters
+
+    All state changes run on the event loop. A publisher on another
+    thread is handed over with call_soon_threadsafe.
+    """
+
+    def __init__(self, max_connections: int = 50000, max_pending: int = 100):
+        self.max_connections = max_connections
+        self.max_pending = max_pending
+        self.connections = 0
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._unread: Dict[str, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, user_id: str, load_unread: Callable[[], int]) -> Optional[Subscription]:
+        """Open a subscription, or None when this worker is at max_connections
+
+        load_unread is only called for the user's first connection.
+        """
+        if self.connections >= self.max_connections:
+            logger.warning("Notification stream refused for user %s: %d connections open", user_id, self.connections)
+            return None
+        self._loop = asyncio.get_running_loop()
+        if user_id not in self._unread:
+            self._unread[user_id] = load_unread()
+        subscription = Subscription(user_id, self.max_pending)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        self.connections += 1
+        subscription.push(('unread', {'unread_count': self._unread[user_id]}))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        self.connections -= 1
+        if not subscribers:
+            del self._subscribers[subscription.user_id]
+            self._unread.pop(subscription.user_id, None)
+
+    def is_connected(self, user_id: str) -> bool:
+        return user_id in self._subscribers
+
+    def unread_count(self, user_id: str) -> Optional[int]:
+        """The in-memory unread count, or None if the user has no open connection"""
+        return self._unread.get(user_id)
+
+    def sync_unread(self, user_id: str, count: int):
+        """Correct a connected user's counter to the database count, pushing it if it changed"""
+        self._dispatch(self._sync_unread, user_id, count)
+
+    def publish(self, user_id: str, notification: Dict):
+        """Deliver a new (unread) notification to the user's connections"""
+        self._dispatch(self._publish, user_id, notification)
+
+    def mark_read(self, user_id: str, count: int = 1):
+        self._dispatch(self._adjust_unread, user_id, -count)
+
+    def mark_all_read(self, user_id: str):
+        self._dispatch(self._adjust_unread, user_id, None)
+
+    def stats(self) -> Dict:
+        return {
+            'connections': self.connections,
+            'users': len(self._subscribers),
+            'max_connections': self.max_connections,
+            'dropped_events': sum(s.dropped for subs in self._subscribers.values() for s in subs)
+        }
+
+    def _dispatch(self, fn, *args):
+        # Nobody has ever connected to this worker, so there is nothing to update
+        if self._loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            fn(*args)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(fn, *args)
+
+    def _publish(self, user_id: str, notification: Dict):
+        subscribers = self._subscribers.get(user_id)
+        if not subscribers:
+            return
+        self._unread[user_id] += 1
+        unread = ('unread', {'unread_count': self._unread[user_id]})
+        for subscription in subscribers:
+            subscription.push(('notification', notification))
+            subscription.push(unread)
+
+    def _adjust_unread(self, user_id: str, delta: Optional[int]):
+        subscribers = self._subscribers.get(user_id)
+        if not subscribers:
+            return
+        count = 0 if delta is None else max(0, self._unread[user_id] + delta)
+        self._unread[user_id] = count
+        for subscription in subscribers:
+            subscription.push(('unread', {'unread_count': count}))
+
+    def _sync_unread(self, user_id: str, count: int):
+        subscribers = self._subscribers.get(user_id)
+        if not subscribers or self._unread[user_id] == count:
+            return
+        self._unread[user_id] = count
+        for subscription in subscribers:
+            subscription.push(('unread', {'unread_count': count}))
+
+notification_hub = NotificationHub(
+    settings.NOTIFICATION_STREAM_MAX_CONNECTIONS,
+    settings.NOTIFICATION_STREAM_MAX_PENDING
+)
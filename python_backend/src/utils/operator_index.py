@@ -0,0 +1,92 @@
+from typing import Dict, Iterable, Optional
+import hashlib
+import hmac
+import logging
+import secrets
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+def generate_api_key() -> str:
+    """Generate a new random operator API key"""
+    return secrets.token_urlsafe(32)
+
+def hash_api_key(api_key: str) -> str:
+    """Keyed SHA-256 digest of an API key (only the digest is stored)"""
+    return hmac.new(settings.SECRET_KEY.encode(), api_key.encode(), hashlib.sha256).hexdigest()
+
+class OperatorIdentity:
+    """Immutable snapshot of the operator fields needed to authorise a request"""
+
+    __slots__ = ('operator_id', 'name', 'api_key_hash', 'is_active', 'compliance_level', 'settings')
+
+    def __init__(self, operator_id: str, name: str, api_key_hash: str, is_active: bool, compliance_level: str, settings: Optional[Dict]):
+        self.operator_id = operator_id
+        self.name = name
+        self.api_key_hash = api_key_hash
+        self.is_active = is_active
+        self.compliance_level = compliance_level or 'standard'
+        self.settings = settings or {}
+
+    @classmethod
+    def from_operator(cls, operator) -> "OperatorIdentity":
+        return cls(
+            operator.operator_id,
+            operator.name,
+            operator.api_key_hash,
+            bool(operator.is_active),
+            operator.compliance_level,
+            operator.settings
+        )
+
+    def __repr__(self):
+        return f"<OperatorIdentity(operator_id='{self.operator_id}', is_active={self.is_active})>"
+
+class OperatorKeyIndex:
+    """In-memory API key digest -> operator index used to authenticate requests"""
+
+    def __init__(self):
+        self._by_hash: Dict[str, OperatorIdentity] = {}
+        self._hash_by_operator: Dict[str, str] = {}
+
+    def load(self, operators: Iterable):
+        """Replace the index with the given operators"""
+        by_hash = {}
+        hash_by_operator = {}
+        for operator in operators:
+            identity = OperatorIdentity.from_operator(operator)
+            by_hash[identity.api_key_hash] = identity
+            hash_by_operator[identity.operator_id] = identity.api_key_hash
+        # Swap both maps at once so concurrent lookups never see a half-built index
+        self._by_hash, self._hash_by_operator = by_hash, hash_by_operator
+        logger.info(f"Operator key index loaded with {len(by_hash)} operators")
+
+    def upsert(self, operator):
+        """Add or refresh a single operator after it changed"""
+        identity = OperatorIdentity.from_operator(operator)
+        old_hash = self._hash_by_operator.get(identity.operator_id)
+        if old_hash and old_hash != identity.api_key_hash:
+            self._by_hash.pop(old_hash, None)
+        self._by_hash[identity.api_key_hash] = identity
+        self._hash_by_operator[identity.operator_id] = identity.api_key_hash
+
+    def remove(self, operator_id: str):
+        """Drop an operator from the index"""
+        old_hash = self._hash_by_operator.pop(operator_id, None)
+        if old_hash:
+            self._by_hash.pop(old_hash, None)
+
+    def lookup(self, api_key: str) -> Optional[OperatorIdentity]:
+        """Find the operator owning an API key without touching the database"""
+        key_hash = hash_api_key(api_key)
+        identity = self._by_hash.get(key_hash)
+        if identity is None or not hmac.compare_digest(identity.api_key_hash, key_hash):
+            return None
+        return identity
+
+    def __len__(self) -> int:
+        return len(self._by_hash)
+
+# Process-wide index, warmed in the application lifespan
+operator_key_index = OperatorKeyIndex()
@@ -0,0 +1,67 @@
+from typing import Any, Callable, Optional, Union
+import asyncio
+import inspect
+import logging
+
+logger = logging.getLogger(__name__)
+
+class PeriodicTask:
+    """Calls a function on the running event loop, then waits, until stopped
+
+    The function may be a coroutine function or a plain one (which then
+    runs on the loop; pass `lambda: asyncio.to_thread(...)` for blocking
+    work). Its errors are logged as "<name> failed: ..." and the loop
+    carries on. The wait is `interval` seconds, or a callable returning
+    them, cut short by wake().
+    """
+
+    def __init__(self, name: str, function: Callable[[], Any], interval: Union[float, Callable[[], float]]):
+        self.name = name
+        self.function = function
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> bool:
+        """Start the loop on the running event loop; False if it is already running"""
+        if self.running:
+            return False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        return True
+
+    async def stop(self) -> bool:
+        """Cancel the loop and wait for it to end; False if it was not started"""
+        if self._task is None:
+            return False
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        return True
+
+    def wake(self):
+        """End the current wait early (event loop thread only)"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            try:
+                result = self.function()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"{self.name} failed: {e}")
+            interval = self.interval() if callable(self.interval) else self.interval
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
@@ -0,0 +1,178 @@
+"""On-demand sampling profiler for individual requests
+
+One daemon thread samples the stacks of the requests that asked to be
+profiled, reading sys._current_frames() every PROFILING_INTERVAL_MS. Each
+request is identified by the frame of its ProfilingMiddleware call. A
+sample only counts when that frame is on the running stack, so requests
+running on the same event loop do not leak into each other's profiles.
+Samples taken while the request's task is suspended count as
+"<not running>", so a profile covers wall-clock time. Work handed to a
+thread pool (asyncio.to_thread, sync dependencies) is not broken down.
+
+Profiles are stored as collapsed stacks ("outer;inner;leaf count"). That
+is the input format of flamegraph.pl and speedscope.
+"""
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+
+from src.config.settings import settings
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    directory, filename = os.path.split(code.co_filename)
+    return f"{code.co_name} ({os.path.basename(directory)}/{filename}:{code.co_firstlineno})"
+
+def _template_regex(route: str):
+    """Compile a route template such as /api/v1/users/{user_id} to a path regex"""
+    parts = re.split(r'(\{[^}]+\})', route)
+    pattern = ''.join('[^/]+' if part.startswith('{') else re.escape(part) for part in parts)
+    return re.compile(f'^{pattern}$')
+
+class Profile:
+    """Samples collected for a single request"""
+
+    __slots__ = (
+        'id', 'method', 'path', 'route', 'status_code', 'started_at',
+        'duration_ms', 'samples', 'stacks', 'interval', '_started'
+    )
+
+    def __init__(self, method: str, path: str, interval: float):
+        self.id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None
+        self.status_code: Optional[int] = None
+        self.started_at = datetime.utcnow()
+        self.duration_ms: Optional[float] = None
+        self.samples = 0
+        self.stacks: Dict[str, int] = {}
+        self.interval = interval
+        self._started = time.perf_counter()
+
+    def collapsed(self) -> str:
+        """Collapsed stack lines, heaviest first"""
+        lines = sorted(self.stacks.items(), key=lambda item: item[1], reverse=True)
+        return ''.join(f"{stack} {count}\n" for stack, count in lines)
+
+    def to_dict(self, include_stacks: bool = False) -> Dict:
+        data = {
+            'id': self.id,
+            'method': self.method,
+            'path': self.path,
+            'route': self.route,
+            'status_code': self.status_code,
+            'started_at': self.started_at.isoformat(),
+            'duration_ms': self.duration_ms,
+            'samples': self.samples,
+            'interval_ms': self.interval * 1000
+        }
+        if include_stacks:
+            data['stacks'] = self.stacks
+        return data
+
+class SamplingProfiler:
+    """Samples in-flight requests on demand and keeps the most recent profiles"""
+
+    def __init__(self, interval: float = 0.005, max_profiles: int = 50):
+        self.interval = interval
+        self.max_profiles = max_profiles
+        self._lock = threading.Lock()
+        self._active: Dict[str, tuple] = {}
+        self._profiles: 'OrderedDict[str, Profile]' = OrderedDict()
+        self._armed: List[list] = []
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- arming -----------------------------------------------------------
+
+    @property
+    def armed(self) -> bool:
+        return bool(self._armed)
+
+    def arm(self, route: str, count: int = 1, method: Optional[str] = None):
+        """Profile the next `count` requests matching a route template"""
+        method = method.upper() if method else None
+        with self._lock:
+            self._armed = [a for a in self._armed if (a[0], a[1]) != (route, method)]
+            self._armed.append([route, method, _template_regex(route), count])
+
+    def disarm(self, route: Optional[str] = None):
+        with self._lock:
+            self._armed = [a for a in self._armed if route is not None and a[0] != route]
+
+    def armed_routes(self) -> List[Dict]:
+        return [{'route': route, 'method': method, 'remaining': remaining}
+                for route, method, _, remaining in self._armed]
+
+    def take_armed(self, method: str, path: str) -> bool:
+        """Consume one armed slot if this request matches an armed route"""
+        with self._lock:
+            for entry in self._armed:
+                if (entry[1] is None or entry[1] == method) and entry[2].match(path):
+                    entry[3] -= 1
+                    if entry[3] <= 0:
+                        self._armed.remove(entry)
+                    return True
+        return False
+
+    # ---- sampling ---------------------------------------------------------
+
+    def begin(self, method: str, path: str, marker) -> Profile:
+        """Start sampling the stack below `marker`, a frame of the request's task"""
+        profile = Profile(method, path, self.interval)
+        with self._lock:
+            self._active[profile.id] = (threading.get_ident(), marker, profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+                self._thread.start()
+        return profile
+
+    def end(self, profile: Profile, status_code: Optional[int] = None, route: Optional[str] = None):
+        profile.duration_ms = round((time.perf_counter() - profile._started) * 1000, 3)
+        profile.status_code = status_code
+        profile.route = route
+        with self._lock:
+            self._active.pop(profile.id, None)
+            self._profiles[profile.id] = profile
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        return self._profiles.get(profile_id)
+
+    def list(self) -> List[Profile]:
+        return list(reversed(self._profiles.values()))
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    self._thread = None
+                    return
+                active = list(self._active.values())
+            frames = sys._current_frames()
+            for thread_id, marker, profile in active:
+                if profile.duration_ms is not None:
+                    continue
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None and frame is not marker:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                if frame is None:
+                    # The request's task is suspended: awaiting I/O, or another task holds the loop
+                    key = '<not running>'
+                else:
+                    key = ';'.join(reversed(stack)) or '<middleware>'
+                profile.stacks[key] = profile.stacks.get(key, 0) + 1
+                profile.samples += 1
+            del frames
+
+request_profiler = SamplingProfiler(settings.PROFILING_INTERVAL_MS / 1000, settings.PROFILING_MAX_PROFILES)
@@ -0,0 +1,200 @@
+"""Slow-query log with captured query plans
+
+Statements slower than SLOW_QUERY_THRESHOLD_MS are grouped by fingerprint
+(the statement with literals, placeholders and IN lists normalised). For
+each group the log keeps a count, cumulative and worst time, and the
+shape of the bound parameters: their names and types, never their
+values. The first time a fingerprint is seen, its plan is captured on the
+same connection. SQLite uses EXPLAIN QUERY PLAN and PostgreSQL uses
+EXPLAIN, which plans the statement without executing it.
+"""
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+import hashlib
+import logging
+import re
+import threading
+import time
+
+from sqlalchemy import event
+
+from src.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+EXPLAIN_PREFIXES = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'postgresql': 'EXPLAIN '
+}
+
+# Only statements EXPLAIN can plan without side effects
+EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE')
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|:\w+|\$\d+|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalise_statement(statement: str) -> str:
+    """Reduce a statement to its shape: literals and placeholders become ?"""
+    shape = _STRING_LITERAL.sub('?', statement)
+    shape = _PLACEHOLDER.sub('?', shape)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _IN_LIST.sub('(?, ...)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+def fingerprint(statement: str) -> str:
+    return hashlib.sha1(normalise_statement(statement).encode()).hexdigest()[:16]
+
+def parameter_shape(parameters, executemany: bool = False):
+    """Names and types of bound parameters, without their values"""
+    if executemany:
+        rows = list(parameters or ())
+        return {'rows': len(rows), 'row': parameter_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return None
+
+class SlowQuery:
+    """Aggregated occurrences of one statement fingerprint"""
+
+    __slots__ = (
+        'fingerprint', 'statement', 'count', 'total_seconds', 'max_seconds',
+        'first_seen', 'last_seen', 'parameter_shape', 'plan', 'plan_error'
+    )
+
+    def __init__(self, key: str, statement: str, shape):
+        self.fingerprint = key
+        self.statement = normalise_statement(statement)
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.first_seen = datetime.utcnow()
+        self.last_seen = self.first_seen
+        self.parameter_shape = shape
+        self.plan: Optional[List[str]] = None
+        self.plan_error: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            'fingerprint': self.fingerprint,
+            'statement': self.statement,
+            'count': self.count,
+            'total_ms': round(self.total_seconds * 1000, 3),
+            'mean_ms': round(self.total_seconds * 1000 / self.count, 3) if self.count else 0.0,
+            'max_ms': round(self.max_seconds * 1000, 3),
+            'first_seen': self.first_seen.isoformat(),
+            'last_seen': self.last_seen.isoformat(),
+            'parameter_shape': self.parameter_shape,
+            'plan': self.plan,
+            'plan_error': self.plan_error
+        }
+
+class SlowQueryLog:
+    """Slow statements deduplicated by fingerprint (least recently seen evicted first)"""
+
+    def __init__(self, threshold_ms: float = 100.0, max_entries: int = 500, explain: bool = True):
+        self.threshold = threshold_ms / 1000
+        self.max_entries = max_entries
+        self.explain = explain
+        self._entries: 'OrderedDict[str, SlowQuery]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, cursor, dialect: str, statement: str, parameters, executemany: bool, elapsed: float):
+        key = fingerprint(statement)
+        with self._lock:
+            entry = self._entries.get(key)
+            is_new = entry is None
+            if is_new:
+                entry = SlowQuery(key, statement, parameter_shape(parameters, executemany))
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(key)
+            entry.count += 1
+            entry.total_seconds += elapsed
+            entry.max_seconds = max(entry.max_seconds, elapsed)
+            entry.last_seen = datetime.utcnow()
+
+        if is_new and self.explain and not executemany:
+            self._capture_plan(entry, cursor, dialect, statement, parameters)
+
+        logger.warning(
+            "Slow query: %.1fms fingerprint=%s count=%d params=%s: %.500s",
+            elapsed * 1000, key, entry.count, entry.parameter_shape, entry.statement,
+            extra={'fingerprint': key, 'duration_ms': round(elapsed * 1000, 3), 'plan': entry.plan}
+        )
+
+    def _capture_plan(self, entry: SlowQuery, cursor, dialect: str, statement: str, parameters):
+        prefix = EXPLAIN_PREFIXES.get(dialect)
+        if prefix is None:
+            entry.plan_error = f"EXPLAIN not supported for {dialect}"
+            return
+        if not statement.lstrip().upper().startswith(EXPLAINABLE):
+            return
+        dbapi_connection = cursor.connection
+        # On PostgreSQL a failed EXPLAIN would abort the caller's transaction
+        savepoint = dialect == 'postgresql'
+        explain_cursor = dbapi_connection.cursor()
+        try:
+            if savepoint:
+                explain_cursor.execute("SAVEPOINT slow_query_explain")
+            explain_cursor.execute(prefix + statement, parameters or ())
+            rows = explain_cursor.fetchall()
+            if savepoint:
+                explain_cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+            # SQLite rows are (id, parent, notused, detail); PostgreSQL rows are one text column
+            entry.plan = [str(row[-1]) for row in rows]
+        except Exception as e:
+            entry.plan_error = str(e)
+            if savepoint:
+                try:
+                    explain_cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                except Exception:
+                    pass
+        finally:
+            explain_cursor.close()
+
+    def entries(self, sort: str = 'total', limit: Optional[int] = None) -> List[Dict]:
+        keys = {
+            'total': lambda e: e.total_seconds,
+            'count': lambda e: e.count,
+            'max': lambda e: e.max_seconds,
+            'recent': lambda e: e.last_seen
+        }
+        with self._lock:
+            entries = sorted(self._entries.values(), key=keys.get(sort, keys['total']), reverse=True)
+        return [entry.to_dict() for entry in entries[:limit]]
+
+    def get(self, key: str) -> Optional[SlowQuery]:
+        return self._entries.get(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+def install_slow_query_log(engine, log: SlowQueryLog):
+    """Time every statement on an engine and hand slow ones to the log"""
+    dialect = engine.dialect.name
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('slow_query_start_time', []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['slow_query_start_time'].pop()
+        if elapsed >= log.threshold:
+            log.record(cursor, dialect, statement, parameters, executemany, elapsed)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+
+slow_query_log = SlowQueryLog(
+    settings.SLOW_QUERY_THRESHOLD_MS,
+    settings.SLOW_QUERY_MAX_FINGERPRINTS,
+    settings.SLOW_QUERY_EXPLAIN
+)
@@ -0,0 +1,286 @@
+"""Lightweight request tracing
+
+The current span lives in a ContextVar. Only TracingMiddleware starts a
+trace, and it samples requests at TRACING_SAMPLE_RATE. It also always
+samples a request whose W3C `traceparent` header carries the sampled
+flag. Outside a sampled trace there is no current span, so the @traced
+wrappers only pay for one ContextVar lookup.
+
+When a trace's root span ends, the whole trace is written as one line of
+OTLP/JSON (an ExportTraceServiceRequest). The file rotates by size. The
+OpenTelemetry collector's otlpjsonfile receiver and most trace viewers
+can read it.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any, Dict, List, Optional
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import re
+import time
+
+from src.config.settings import settings
+
+SPAN_KINDS = {'internal': 1, 'server': 2, 'client': 3}
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# Spans beyond this in one trace are dropped rather than held in memory
+MAX_SPANS_PER_TRACE = 1000
+
+_TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+def parse_traceparent(header: Optional[str]):
+    """Return (trace_id, parent_span_id, sampled) from a W3C traceparent header"""
+    if not header:
+        return None
+    match = _TRACEPARENT.match(header.strip().lower())
+    if match is None:
+        return None
+    trace_id, parent_id, flags = match.groups()
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+def _attribute(key: str, value) -> Dict:
+    if isinstance(value, bool):
+        return {'key': key, 'value': {'boolValue': value}}
+    if isinstance(value, int):
+        return {'key': key, 'value': {'intValue': str(value)}}
+    if isinstance(value, float):
+        return {'key': key, 'value': {'doubleValue': value}}
+    return {'key': key, 'value': {'stringValue': str(value)}}
+
+class Span:
+    """A timed operation within a trace"""
+
+    __slots__ = (
+        'trace_id', 'span_id', 'parent_id', 'name', 'kind', 'start_ns',
+        'end_ns', 'attributes', 'status', 'status_message', 'trace'
+    )
+
+    def __init__(self, name: str, kind: str, trace_id: str, parent_id: Optional[str], trace: List['Span']):
+        self.trace_id = trace_id
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = {}
+        self.status = 0
+        self.status_message: Optional[str] = None
+        self.trace = trace
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def set_error(self, message: Optional[str]):
+        self.status = STATUS_ERROR
+        self.status_message = message
+
+    def to_otlp(self) -> Dict:
+        data = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': self.name,
+            'kind': SPAN_KINDS.get(self.kind, 1),
+            'startTimeUnixNano': str(self.start_ns),
+            'endTimeUnixNano': str(self.end_ns or self.start_ns),
+            'attributes': [_attribute(k, v) for k, v in self.attributes.items()],
+            'status': {'code': self.status or STATUS_OK}
+        }
+        if self.parent_id:
+            data['parentSpanId'] = self.parent_id
+        if self.status_message:
+            data['status']['message'] = self.status_message
+        return data
+
+class FileSpanExporter:
+    """Appends finished traces to a size-rotated OTLP/JSON lines file
+
+    Writes happen on a QueueListener thread so the event loop never blocks
+    on disk I/O. The file is opened on the first export.
+    """
+
+    def __init__(self, path: str, max_bytes: int, backup_count: int, service_name: str):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.resource = {'attributes': [_attribute('service.name', service_name)]}
+        self._logger: Optional[logging.Logger] = None
+        self._listener: Optional[QueueListener] = None
+
+    def _start(self) -> logging.Logger:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handler = RotatingFileHandler(self.path, maxBytes=self.max_bytes, backupCount=self.backup_count)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        records = queue.SimpleQueue()
+        self._listener = QueueListener(records, handler)
+        self._listener.start()
+        # A logger of its own, outside the logging registry, so exporters never share handlers
+        export_logger = logging.Logger(f"{__name__}.export")
+        export_logger.propagate = False
+        export_logger.setLevel(logging.INFO)
+        export_logger.addHandler(QueueHandler(records))
+        self._logger = export_logger
+        return export_logger
+
+    def export(self, spans: List[Span]):
+        payload = {
+            'resourceSpans': [{
+                'resource': self.resource,
+                'scopeSpans': [{
+                    'scope': {'name': __name__},
+                    'spans': [span.to_otlp() for span in spans]
+                }]
+            }]
+        }
+        (self._logger or self._start()).info(json.dumps(payload, separators=(',', ':')))
+
+    def shutdown(self):
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+            for handler in list(self._logger.handlers):
+                self._logger.removeHandler(handler)
+            self._logger = None
+
+_current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+class Tracer:
+    """Starts sampled traces and child spans, and hands finished traces to an exporter"""
+
+    def __init__(self, sample_rate: float, exporter=None):
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+
+    def start_trace(self, name: str, kind: str = 'server', traceparent: Optional[str] = None) -> Optional[Span]:
+        """Start a root span if this request is sampled (continuing an incoming trace)"""
+        parent = parse_traceparent(traceparent)
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+        else:
+            trace_id, parent_id, sampled = None, None, False
+        if not sampled and random.random() >= self.sample_rate:
+            return None
+        span = Span(name, kind, trace_id or _new_id(128), parent_id, [])
+        span.trace.append(span)
+        return span
+
+    def start_span(self, name: str, kind: str = 'internal') -> Optional[Span]:
+        """Start a child of the current span; None outside a sampled trace"""
+        parent = _current_span.get()
+        if parent is None:
+            return None
+        span = Span(name, kind, parent.trace_id, parent.span_id, parent.trace)
+        if len(parent.trace) < MAX_SPANS_PER_TRACE:
+            parent.trace.append(span)
+        return span
+
+    def end(self, span: Span):
+        span.end_ns = time.time_ns()
+        root = span.trace[0]
+        if span is root and self.exporter is not None:
+            self.exporter.export(span.trace)
+
+    @contextmanager
+    def activate(self, span: Optional[Span]):
+        """Make a span current for the enclosed block and end it afterwards"""
+        if span is None:
+            yield None
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current_span.reset(token)
+            self.end(span)
+
+    @contextmanager
+    def span(self, name: str, kind: str = 'internal', **attributes):
+        span = self.start_span(name, kind)
+        if span is not None:
+            span.attributes.update(attributes)
+        with self.activate(span):
+            yield span
+
+    def shutdown(self):
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+def _record_result(span: Span, result):
+    # Services report failures as {'success': False, 'error': ...} rather than raising
+    if isinstance(result, dict) and result.get('success') is False:
+        span.set_error(str(result.get('error') or result.get('message') or 'unsuccessful'))
+
+def traced(name: Optional[str] = None, kind: str = 'internal'):
+    """Wrap a sync or async function in a span when a trace is active"""
+    def decorator(fn):
+        span_name = name or fn.__qualname__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if _current_span.get() is None:
+                    return await fn(*args, **kwargs)
+                with tracer.activate(tracer.start_span(span_name, kind)) as span:
+                    result = await fn(*args, **kwargs)
+                    _record_result(span, result)
+                    return result
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return fn(*args, **kwargs)
+            with tracer.activate(tracer.start_span(span_name, kind)) as span:
+                result = fn(*args, **kwargs)
+                _record_result(span, result)
+                return result
+        return wrapper
+    return decorator
+
+def trace_class(kind: str = 'internal'):
+    """Trace every public method defined on a service or repository class"""
+    def decorator(cls):
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith('_') or not inspect.isfunction(value):
+                continue
+            setattr(cls, attr, traced(f"{cls.__name__}.{attr}", kind)(value))
+        return cls
+    return decorator
+
+def trace_headers() -> Dict[str, str]:
+    """W3C traceparent for outbound calls made inside a sampled trace"""
+    span = _current_span.get()
+    return {'traceparent': span.traceparent} if span is not None else {}
+
+tracer = Tracer(
+    settings.TRACING_SAMPLE_RATE,
+    FileSpanExporter(
+        settings.TRACING_EXPORT_PATH,
+        settings.TRACING_MAX_BYTES,
+        settings.TRACING_BACKUP_COUNT,
+        settings.TRACING_SERVICE_NAME
+    )
+)
@@ -0,0 +1,71 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.config.database import Base
+from src.config.settings import settings
+from src.services.notification_coalescer import notification_coalescer
+from src.utils.tracing import FileSpanExporter, tracer
+
+
+@pytest.fixture
+def engine():
+    """An in-memory SQLite database with every table, shared by all sessions of the test"""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture(autouse=True)
+def reset_notification_coalescer():
+    """Forget bursts from earlier tests; the coalescer is process-wide"""
+    notification_coalescer.clear()
+    yield
+    notification_coalescer.clear()
+
+
+@pytest.fixture(autouse=True)
+def secret_keys(monkeypatch):
+    """Real-looking keys, as the admin API refuses the shipped placeholders"""
+    monkeypatch.setattr(settings, 'API_KEY', 'test-api-key')
+    monkeypatch.setattr(settings, 'SECRET_KEY', 'test-secret-key')
+
+
+@pytest.fixture(autouse=True)
+def trace_to_tmp_path(tmp_path, monkeypatch):
+    """Sampled requests in tests write their spans under tmp_path, not TRACING_EXPORT_PATH"""
+    exporter = FileSpanExporter(str(tmp_path / 'spans.jsonl'), settings.TRACING_MAX_BYTES,
+                                settings.TRACING_BACKUP_COUNT, settings.TRACING_SERVICE_NAME)
+    monkeypatch.setattr(tracer, 'exporter', exporter)
+    yield
+    exporter.shutdown()
+
+
+@pytest.fixture
+def assert_max_queries(monkeypatch):
+    """Check a response against a per-route statement budget
+
+    Turns on the X-DB-* headers QueryBudgetMiddleware sends, so the app
+    under test must include that middleware:
+
+        response = await client.get("/api/v1/notifications/u1")
+        assert_max_queries(response, 1)
+    """
+    monkeypatch.setattr(settings, 'QUERY_BUDGET_HEADERS', True)
+
+    def check(response, max_queries: int):
+        count = int(response.headers['x-db-query-count'])
+        repeats = int(response.headers['x-db-repeated-statements'])
+        assert count <= max_queries, (
+            f"{response.request.method} {response.request.url.path} executed {count} statements "
+            f"(budget {max_queries}, most repeated statement ran {repeats}x)"
+        )
+        return count
+
+    return check
@@ -0,0 +1,110 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import IntegrityError
+
+from src.models.audit_log import AuditLog
+from src.repositories.audit_log_partitions import audit_log_partitions
+from src.repositories.audit_log_repository import AuditLogRepository
+from src.repositories.read_repository import ReadRepository
+from src.services.audit_maintenance_service import AuditLogMaintenance
+
+
+@pytest.fixture
+def partitioned(monkeypatch):
+    monkeypatch.setattr(audit_log_partitions, 'enabled', True)
+    return audit_log_partitions
+
+
+def _log(n, timestamp, user_id='u1', operator_id='op1', action_type='deposit'):
+    return AuditLog(
+        log_id=f"l{n}", timestamp=timestamp, action_type=action_type, user_id=user_id,
+        operator_id=operator_id, details={'n': n}, result='success'
+    )
+
+
+def _seed(db, repository):
+    repository.create_log(_log(1, datetime(2026, 1, 15)))
+    repository.create_log(_log(2, datetime(2026, 2, 10)))
+    repository.create_log(_log(3, datetime(2026, 2, 20), user_id='u2'))
+    repository.create_log(_log(4, datetime(2026, 3, 5)))
+
+
+def test_writes_go_to_month_tables_and_reads_span_them(engine, session_factory, partitioned):
+    db = session_factory()
+    # A row written before partitioning was turned on stays readable from audit_logs
+    db.add(_log(0, datetime(2025, 12, 31)))
+    db.commit()
+    repository = AuditLogRepository(db)
+    _seed(db, repository)
+
+    tables = set(inspect(engine).get_table_names())
+    assert {'audit_logs_2026_01', 'audit_logs_2026_02', 'audit_logs_2026_03'} <= tables
+    assert db.query(AuditLog).count() == 1
+
+    assert [log.log_id for log in repository.get_logs_by_user('u1')] == ['l4', 'l2', 'l1', 'l0']
+    assert repository.get_log('l3').user_id == 'u2'
+    assert [row.log_id for row in ReadRepository(db).user_audit_logs('u1', datetime(2026, 2, 1), datetime(2026, 3, 31))] == ['l4', 'l2']
+    assert [log.log_id for log in repository.search_logs({'operator_id': 'op1', 'end_date': datetime(2026, 1, 31)})] == ['l1', 'l0']
+
+
+def test_queries_only_touch_the_months_their_dates_cover(engine, session_factory, partitioned):
+    db = session_factory()
+    repository = AuditLogRepository(db)
+    _seed(db, repository)
+
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda conn, cursor, statement, *args: statements.append(statement))
+    logs = repository.get_logs_by_operator('op1', datetime(2026, 2, 1), datetime(2026, 2, 28))
+
+    assert [log.log_id for log in logs] == ['l3', 'l2']
+    query = statements[-1]
+    assert 'audit_logs_2026_02' in query
+    assert 'audit_logs_2026_01' not in query and 'audit_logs_2026_03' not in query
+
+
+def test_retention_drops_whole_months_and_chunks_the_rest(engine, session_factory, partitioned):
+    db = session_factory()
+    repository = AuditLogRepository(db)
+    _seed(db, repository)
+    db.add(_log(0, datetime(2025, 12, 31)))
+    db.commit()
+
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda conn, cursor, statement, *args: statements.append(statement))
+    deleted = repository.delete_old_logs(datetime(2026, 2, 15), chunk_size=1)
+
+    assert deleted == 3  # l0 (legacy table), l1 (January dropped), l2 (first half of February)
+    assert 'audit_logs_2026_01' not in inspect(engine).get_table_names()
+    assert any(statement.startswith('DROP TABLE audit_logs_2026_01') for statement in statements)
+    assert not any(statement.startswith('DELETE FROM audit_logs_2026_01') for statement in statements)
+    assert sorted(log.log_id for log in repository.search_logs({})) == ['l3', 'l4']
+
+
+def test_unpartitioned_delete_is_chunked(engine, session_factory):
+    db = session_factory()
+    repository = AuditLogRepository(db)
+    for n in range(7):
+        repository.create_log(_log(n, datetime(2026, 1, n + 1)))
+
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda conn, cursor, statement, *args: statements.append(statement))
+    assert repository.delete_old_logs(datetime(2026, 1, 6), chunk_size=2) == 5
+    assert sum(statement.startswith('DELETE FROM audit_logs ') for statement in statements) == 3
+    assert [log.log_id for log in repository.get_logs_by_user('u1')] == ['l6', 'l5']
+
+
+def test_unpartitioned_log_ids_stay_unique(engine, session_factory):
+    assert inspect(engine).get_pk_constraint('audit_logs')['constrained_columns'] == ['log_id']
+    db = session_factory()
+    repository = AuditLogRepository(db)
+    repository.create_log(_log(1, datetime(2026, 1, 1)))
+    with pytest.raises(IntegrityError):
+        repository.create_log(_log(1, datetime(2026, 1, 2)))
+
+
+def test_maintenance_creates_upcoming_partitions(engine, session_factory, partitioned):
+    result = AuditLogMaintenance(session_factory, retention_days=0).run_once(datetime(2026, 12, 10))
+    assert result['deleted'] == 0
+    assert {'audit_logs_2026_12', 'audit_logs_2027_01'} <= set(inspect(engine).get_table_names())
@@ -0,0 +1,161 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, text
+from sqlalchemy.exc import IntegrityError
+
+from src.models.audit_log import AuditLog, AuditLogSearch
+from src.repositories.audit_log_partitions import audit_log_partitions
+from src.repositories.audit_log_repository import AuditLogRepository
+from src.services.audit_maintenance_service import AuditLogMaintenance
+
+
+def _log(n, timestamp=None, reason=None, details=None, ip_address='10.0.0.1'):
+    return AuditLog(
+        log_id=f"l{n:03d}", timestamp=timestamp or datetime(2026, 1, 1) + timedelta(minutes=n),
+        action_type='deposit', user_id=f"u{n % 3}", operator_id='op1', ip_address=ip_address,
+        reason=reason, details=details or {'n': n}, result='success'
+    )
+
+
+def _ids(logs):
+    return [log.log_id for log in logs]
+
+
+def _seed(repository):
+    repository.create_log(_log(1, reason='Manual review after chargeback',
+                               details={'game_id': 'roulette_eu', 'amount': 250.0, 'payment': {'method': 'card'}}))
+    repository.create_log(_log(2, reason='Limit raised by support',
+                               details={'game_id': 'blackjack', 'amount': 20, 'concordium_id': 'ccd-42'}))
+    repository.create_log(_log(3, details={'game_id': 'roulette_us', 'amount': 75.5}, ip_address='10.0.0.2'))
+    repository.create_log(_log(4, reason='Chargeback reversed', details={'payment': {'method': 'wallet'}}))
+
+
+def test_text_search_matches_reason_and_details(session_factory):
+    db = session_factory()
+    repository = AuditLogRepository(db)
+    _seed(repository)
+
+    assert _ids(repository.search_logs({'text': 'chargeback'})) == ['l004', 'l001']
+    assert _ids(repository.search_logs({'text': 'chargeback card'})) == ['l001']
+    assert _ids(repository.search_logs({'text': 'wallet'})) == ['l004']
+    assert _ids(repository.search_logs({'text': 'ccd-42'})) == ['l002']
+    assert _ids(repository.search_logs({'text': 'roulette*'})) == ['l003', 'l001']
+    assert _ids(repository.search_logs({'text': 'chargeback', 'game_id': 'roulette_eu'})) == ['l001']
+    assert repository.search_logs({'text': 'withdrawal'}) == []
+
+
+def test_punctuation_does_not_stick_to_words(session_factory):
+    db = session_factory()
+    repository = AuditLogRepository(db)
+    repository.create_log(_log(1, reason='Daily limit exceeded.'))
+    repository.create_log(_log(2, reason='Blocked: self-excluded user'))
+    repository.create_log(_log(3, reason='Session ended, limit: 100', details={'ip': '10.1.2.3', 'at': '12:30'}))
+
+    assert _ids(repository.search_logs({'text': 'exceeded'})) == ['l001']
+    assert _ids(repository.search_logs({'text': 'blocked self-excluded'})) == ['l002']
+    assert _ids(repository.search_logs({'text': 'limit'})) == ['l003', 'l001']
+    assert _ids(repository.search_logs({'text': 'limit: exceeded.'})) == ['l001']
+    assert _ids(repository.search_logs({'text': '10.1.2.3 12:30'})) == ['l003']
+
+
+def test_detail_columns_and_ip_address_filter(session_factory):
+    db = session_factory()
+    repository = AuditLogRepository(db)
+    _seed(repository)
+
+    assert _ids(repository.search_logs({'game_id': 'blackjack'})) == ['l002']
+    assert _ids(repository.search_logs({'concordium_id': 'ccd-42'})) == ['l002']
+    assert _ids(repository.search_logs({'amount_min': 50})) == ['l003', 'l001']
+    assert _ids(repository.search_logs({'amount_min': 50, 'amount_max': 100})) == ['l003']
+    assert _ids(repository.search_logs({'ip_address': '10.0.0.2'})) == ['l003']
+
+    # Changing details keeps the indexed columns in step
+    log = repository.get_log('l002')
+    log.details = {'game_id': 'poker'}
+    db.commit()
+    assert (log.detail_game_id, log.detail_amount, log.detail_concordium_id) == ('poker', None, None)
+
+
+def test_cursor_pages_through_results_without_gaps(session_factory):
+    db = session_factory()
+    repository = AuditLogRepository(db)
+    same_time = datetime(2026, 1, 1)
+    for n in range(7):
+        repository.create_log(_log(n, timestamp=same_time if n < 4 else None))
+
+    seen = []
+    cursor = None
+    while True:
+        logs, cursor = repository.search_page({}, limit=3, cursor=cursor)
+        seen.extend(_ids(logs))
+        if cursor is None:
+            break
+    assert seen == ['l006', 'l005', 'l004', 'l003', 'l002', 'l001', 'l000']
+
+    with pytest.raises(ValueError):
+        repository.search_page({}, cursor='not-a-cursor')
+
+
+def test_search_spans_partitions(session_factory, monkeypatch):
+    monkeypatch.setattr(audit_log_partitions, 'enabled', True)
+    db = session_factory()
+    repository = AuditLogRepository(db)
+    repository.create_log(_log(1, datetime(2026, 1, 15), reason='Chargeback opened', details={'game_id': 'slots'}))
+    repository.create_log(_log(2, datetime(2026, 2, 15), reason='Chargeback closed', details={'game_id': 'slots'}))
+    repository.create_log(_log(3, datetime(2026, 3, 15), reason='Deposit', details={'game_id': 'slots'}))
+
+    assert _ids(repository.search_logs({'text': 'chargeback'})) == ['l002', 'l001']
+    assert _ids(repository.search_logs({'game_id': 'slots', 'start_date': datetime(2026, 2, 1)})) == ['l003', 'l002']
+
+
+def test_failed_write_in_a_new_month_leaves_no_search_document(session_factory, monkeypatch):
+    monkeypatch.setattr(audit_log_partitions, 'enabled', True)
+    db = session_factory()
+    repository = AuditLogRepository(db)
+    broken = _log(1, datetime(2026, 4, 1), reason='Chargeback')
+    broken.action_type = None
+    with pytest.raises(IntegrityError):
+        repository.create_log(broken)
+    db.rollback()
+
+    assert db.query(AuditLogSearch).count() == 0
+    assert repository.search_logs({'text': 'chargeback'}) == []
+
+
+def test_retention_removes_search_documents(session_factory):
+    db = session_factory()
+    repository = AuditLogRepository(db)
+    repository.create_log(_log(1, datetime(2025, 6, 1), reason='Chargeback'))
+    repository.create_log(_log(2, datetime(2026, 1, 10), reason='Chargeback'))
+
+    assert repository.delete_old_logs(datetime(2026, 1, 1), chunk_size=1) == 1
+    assert [document.log_id for document in db.query(AuditLogSearch)] == ['l002']
+    assert _ids(repository.search_logs({'text': 'chargeback'})) == ['l002']
+
+
+def test_maintenance_indexes_logs_written_without_a_document(session_factory):
+    db = session_factory()
+    db.execute(insert(AuditLog), [
+        {'log_id': f"b{n}", 'timestamp': datetime(2026, 1, 1), 'action_type': 'deposit', 'user_id': 'u1',
+         'reason': 'Bulk import', 'details': {'batch': 'march'}, 'result': 'success'}
+        for n in range(5)
+    ])
+    db.commit()
+    repository = AuditLogRepository(db)
+    assert repository.search_logs({'text': 'march'}) == []
+
+    maintenance = AuditLogMaintenance(session_factory, chunk_size=2)
+    assert maintenance.run_once(datetime(2026, 1, 2))['indexed'] == 5
+    assert len(repository.search_logs({'text': 'bulk march'})) == 5
+    assert maintenance.run_once(datetime(2026, 1, 2))['indexed'] == 0
+
+
+def test_query_plans_use_the_indexes(engine, session_factory):
+    def plan(sql):
+        with engine.connect() as connection:
+            return ' '.join(row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+    assert 'ix_audit_logs_ip_address' in plan("SELECT * FROM audit_logs WHERE ip_address = '10.0.0.1'")
+    assert 'ix_audit_logs_detail_amount' in plan("SELECT * FROM audit_logs WHERE detail_amount > 100")
+    assert 'VIRTUAL TABLE INDEX' in plan("SELECT rowid FROM audit_log_search_fts WHERE audit_log_search_fts MATCH 'x'")
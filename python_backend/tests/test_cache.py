@@ -0,0 +1,98 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.models.operator import Operator
+from src.models.user import User
+from src.repositories.operator_repository import OperatorRepository
+from src.repositories.user_repository import UserRepository
+from src.utils.cache import LRUCache, MISSING, clear_caches, get_cache_stats
+from src.utils.operator_index import hash_api_key
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    User.metadata.create_all(bind=engine)
+    Operator.metadata.create_all(bind=engine)
+    clear_caches()
+    yield engine
+    clear_caches()
+
+
+@pytest.fixture
+def statements(engine):
+    seen = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: seen.append(statement))
+    return seen
+
+
+def test_lru_cache_evicts_and_expires():
+    cache = LRUCache(max_entries=2, ttl_seconds=0.05)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is MISSING
+    assert cache.get('a') == 1
+    time.sleep(0.06)
+    assert cache.get('a') is MISSING
+
+
+def test_get_user_is_served_from_cache(engine, statements):
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add(User(wallet_address="addr1"))
+    db.commit()
+    user_id = db.query(User).one().id
+    db.close()
+
+    statements.clear()
+    first = UserRepository(Session()).get_user(user_id)
+    second = UserRepository(Session()).get_user(user_id)
+
+    assert first.wallet_address == second.wallet_address == "addr1"
+    assert len([s for s in statements if s.startswith("SELECT")]) == 1
+    assert get_cache_stats()['users']['hits'] == 1
+
+
+def test_cached_user_can_be_updated_and_invalidates(engine):
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.add(User(wallet_address="addr1"))
+    db.commit()
+    user_id = db.query(User).one().id
+    db.close()
+
+    repo = UserRepository(Session())
+    assert repo.get_user_by_wallet("addr1") is not None
+    user = repo.get_user(user_id)
+    user.wallet_address = "addr2"
+    repo.update_user(user)
+    repo.set_self_exclusion(user_id, True)
+
+    fresh = UserRepository(Session())
+    assert fresh.get_user(user_id).self_excluded is True
+    assert fresh.get_user(user_id).wallet_address == "addr2"
+    assert fresh.get_user_by_wallet("addr1") is None
+
+
+def test_operator_api_key_lookup_invalidated_on_update(engine):
+    Session = sessionmaker(bind=engine)
+    repo = OperatorRepository(Session())
+    repo.create_operator(Operator(operator_id="op1", name="Casino", api_key_hash=hash_api_key("key1")))
+
+    operator = repo.get_operator_by_api_key("key1")
+    operator.api_key_hash = hash_api_key("key2")
+    repo.update_operator(operator)
+
+    fresh = OperatorRepository(Session())
+    assert fresh.get_operator_by_api_key("key1") is None
+    assert fresh.get_operator_by_api_key("key2").operator_id == "op1"
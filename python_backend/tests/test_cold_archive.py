@@ -0,0 +1,141 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import inspect
+
+pytest.importorskip('pyarrow')
+
+from src.models.audit_log import AuditLog
+from src.models.payment import Payment, PaymentStatus, PaymentType
+from src.models.session import Session as GamingSession
+from src.repositories.audit_log_partitions import audit_log_partitions
+from src.repositories.audit_log_repository import AuditLogRepository
+from src.repositories.cold_archive import ColdArchive
+from src.services.archive_service import Archiver
+from src.services.audit_service import AuditService
+
+NOW = datetime(2026, 6, 10)
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return ColdArchive(str(tmp_path / 'archive'))
+
+
+def _log(n, timestamp, user_id='u1', operator_id='op1', action_type='deposit', result='success'):
+    return AuditLog(
+        log_id=f"l{n}", timestamp=timestamp, action_type=action_type, user_id=user_id,
+        operator_id=operator_id, details={'n': n}, result=result
+    )
+
+
+def _seed(db):
+    repository = AuditLogRepository(db)
+    repository.create_log(_log(1, datetime(2026, 1, 15)))
+    repository.create_log(_log(2, datetime(2026, 2, 10), result='failure'))
+    repository.create_log(_log(3, datetime(2026, 2, 20), user_id='u2', action_type='login'))
+    repository.create_log(_log(4, datetime(2026, 5, 5)))
+    db.add_all([
+        Payment(payment_id='p1', user_id='u1', payment_type=PaymentType.DEPOSIT, amount=5.0,
+                status=PaymentStatus.COMPLETED, created_at=datetime(2026, 1, 3)),
+        Payment(payment_id='p2', user_id='u1', payment_type=PaymentType.DEPOSIT, amount=7.0,
+                status=PaymentStatus.PENDING, created_at=datetime(2026, 1, 4)),
+        GamingSession(session_id='s1', user_id='u1', platform_id='web', start_time=datetime(2026, 2, 1),
+                      end_time=datetime(2026, 2, 1, 1)),
+        GamingSession(session_id='s2', user_id='u1', platform_id='web', start_time=datetime(2026, 2, 2)),
+    ])
+    db.commit()
+
+
+def test_closed_months_move_to_the_archive(session_factory, archive):
+    db = session_factory()
+    _seed(db)
+
+    result = Archiver(session_factory, archive, hot_months=2).run_once(NOW)
+
+    assert result['archived'] == {
+        'audit_logs': {'2026-01': 1, '2026-02': 2},
+        'payments': {'2026-01': 1},
+        'sessions': {'2026-02': 1},
+    }
+    assert sorted(log.log_id for log in db.query(AuditLog)) == ['l4']
+    assert [p.payment_id for p in db.query(Payment)] == ['p2']  # pending payments stay
+    assert [s.session_id for s in db.query(GamingSession)] == ['s2']  # open sessions stay
+    part = archive.parts('audit_logs', datetime(2026, 2, 1), datetime(2026, 2, 28))[0]
+    assert part['file'] == 'audit_logs/2026-02/part-0.parquet'
+    assert part['rows'] == 2 and part['state'] == 'archived' and part['bytes'] > 0
+
+    # Nothing is left to move on a second pass
+    assert Archiver(session_factory, archive, hot_months=2).run_once(NOW)['archived'] == {}
+
+
+@pytest.mark.asyncio
+async def test_history_and_report_merge_archived_months(session_factory, archive):
+    db = session_factory()
+    _seed(db)
+    Archiver(session_factory, archive, hot_months=2).run_once(NOW)
+    service = AuditService(db, archive)
+
+    history = await service.get_user_action_history('u1', (datetime(2026, 1, 1), datetime(2026, 5, 31)))
+    assert [row.log_id for row in history['history']] == ['l4', 'l2', 'l1']
+    assert history['history'][1].details == {'n': 2}
+
+    filtered = await service.get_user_action_history('u2', (datetime(2026, 1, 1), datetime(2026, 5, 31)), ['login'])
+    assert [row.log_id for row in filtered['history']] == ['l3']
+
+    report = (await service.generate_regulatory_report('op1', 'custom', datetime(2026, 2, 1), datetime(2026, 5, 31)))['report']
+    assert report['total_actions'] == 3
+    assert report['action_breakdown'] == {'deposit': 2, 'login': 1}
+    assert [log['log_id'] for log in report['failed_actions']] == ['l2']
+
+
+@pytest.mark.asyncio
+async def test_hot_ranges_do_not_open_the_archive(session_factory, archive, monkeypatch):
+    db = session_factory()
+    _seed(db)
+    Archiver(session_factory, archive, hot_months=2).run_once(NOW)
+    monkeypatch.setattr(archive, 'read', lambda *args: pytest.fail("archive read for a hot range"))
+
+    history = await AuditService(db, archive).get_user_action_history('u1', (datetime(2026, 4, 1), datetime(2026, 5, 31)))
+    assert [row.log_id for row in history['history']] == ['l4']
+
+
+def test_reads_open_only_the_months_in_range(session_factory, archive):
+    db = session_factory()
+    _seed(db)
+    Archiver(session_factory, archive, hot_months=2).run_once(NOW)
+
+    assert [p['file'] for p in archive.parts('audit_logs', datetime(2026, 2, 5), datetime(2026, 2, 25))] == [
+        'audit_logs/2026-02/part-0.parquet'
+    ]
+    rows = archive.read('audit_logs', datetime(2026, 2, 5), datetime(2026, 2, 15), {'user_id': 'u1'})
+    assert [row['log_id'] for row in rows] == ['l2']
+
+
+def test_an_interrupted_month_is_finished_on_the_next_pass(session_factory, archive, monkeypatch):
+    db = session_factory()
+    _seed(db)
+    archiver = Archiver(session_factory, archive, hot_months=2)
+    monkeypatch.setattr(archiver, '_delete_part', lambda spec, part: None)  # stop after writing the files
+    archiver.run_once(NOW)
+    assert archive.parts('audit_logs', state='exported')
+    assert not archive.covers('audit_logs')  # readers ignore parts still in the database
+    monkeypatch.undo()
+
+    archiver.run_once(NOW)
+    assert [log.log_id for log in db.query(AuditLog)] == ['l4']
+    assert not archive.parts('audit_logs', state='exported')
+    assert len(archive.parts('audit_logs')) == 2  # the exported parts, not new copies
+
+
+def test_partitioned_months_are_dropped(engine, session_factory, archive, monkeypatch):
+    monkeypatch.setattr(audit_log_partitions, 'enabled', True)
+    db = session_factory()
+    _seed(db)
+
+    Archiver(session_factory, archive, hot_months=2).run_once(NOW)
+
+    tables = set(inspect(engine).get_table_names())
+    assert 'audit_logs_2026_01' not in tables and 'audit_logs_2026_02' not in tables
+    assert 'audit_logs_2026_05' in tables
+    assert [log.log_id for log in AuditLogRepository(db).get_logs_by_user('u1')] == ['l4']
@@ -0,0 +1,77 @@
+import random
+import time
+
+import pytest
+
+from benchmarks.concordium_stub import ConcordiumStub, EndpointBehaviour, StubConfig
+from src.services.blockchain_integration_service import BlockchainIntegrationService
+
+
+@pytest.fixture
+def stub():
+    with ConcordiumStub(StubConfig(balances={'addr1': 42.5}, seed=1)) as stub:
+        yield stub
+
+
+def test_latency_distributions_are_bounded():
+    rng = random.Random(0)
+    uniform = EndpointBehaviour(latency_ms=100, distribution='uniform', jitter=20)
+    lognormal = EndpointBehaviour(latency_ms=100, distribution='lognormal', jitter=0.5)
+
+    samples = [uniform.sample_latency(rng) for _ in range(200)]
+    assert min(samples) >= 0.08 and max(samples) <= 0.12
+    median = sorted(lognormal.sample_latency(rng) for _ in range(2001))[1000]
+    assert 0.08 < median < 0.12
+    with pytest.raises(ValueError):
+        EndpointBehaviour(distribution='gaussian')
+
+
+@pytest.mark.asyncio
+async def test_serves_the_endpoints_the_backend_calls(stub):
+    service = BlockchainIntegrationService(stub.url)
+
+    health = await service.check_service_health()
+    balance = await service.get_wallet_balance('addr1')
+    identity = await service.verify_user_identity('acc1')
+
+    assert health['available'] is True
+    assert balance['success'] is True and balance['balance'] == 42.5
+    assert identity['verified'] is True and 'mock' not in identity
+    assert stub.stats['health']['calls'] == 2  # verify_user_identity probes health first
+
+
+@pytest.mark.asyncio
+async def test_logged_transactions_finalize_after_delay(stub):
+    stub.config.finality_delay = 0.2
+    service = BlockchainIntegrationService(stub.url)
+
+    logged = await service.log_transaction_on_chain({'amount': 10})
+    pending = await service.verify_transaction(logged['transaction_hash'])
+    time.sleep(0.25)
+    final = await service.verify_transaction(logged['transaction_hash'])
+
+    assert logged['on_chain'] is True
+    assert pending['data']['status'] == 'committed'
+    assert final['data']['status'] == 'finalized'
+
+
+@pytest.mark.asyncio
+async def test_injected_errors_and_timeouts_surface_as_failures(stub):
+    stub.config.update({
+        'endpoints': {
+            'balance': {'error_rate': 1.0},
+            'verify_identity': {'timeout_rate': 1.0, 'timeout_seconds': 2}
+        }
+    })
+    service = BlockchainIntegrationService(stub.url)
+    service.timeout = 0.2
+
+    balance = await service.get_wallet_balance('addr1')
+    started = time.monotonic()
+    identity = await service.verify_user_identity('acc1')
+
+    assert balance['success'] is False
+    assert identity.get('mock') is True
+    assert time.monotonic() - started < 1
+    assert stub.stats['balance']['errors'] == 1
+    assert stub.stats['verify_identity']['timeouts'] == 1
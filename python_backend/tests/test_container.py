@@ -0,0 +1,46 @@
+import logging
+
+import httpx
+import pytest
+
+from src.main import app as main_app
+from src.services.container import ServiceContainer
+
+
+def test_scope_shares_services_and_container_singletons():
+    container = ServiceContainer()
+    db, other_db = object(), object()
+    scope = container.scope(db)
+
+    assert scope.payment_service is scope.payment_service
+    assert scope.payment_service.wallet_service is scope.wallet_service
+    assert scope.session_service.notification_service is scope.notification_service
+    assert scope.transaction_service.audit_service is scope.user_service.audit_service
+    assert scope.payment_service.contract_service is container.contract_service
+    assert scope.user_service.blockchain_service is container.blockchain_service
+
+    other = container.scope(other_db)
+    assert other.payment_service is not scope.payment_service
+    assert other.payment_service.db is other_db
+    assert other.wallet_service.blockchain_service is scope.wallet_service.blockchain_service
+
+
+def test_smart_contract_warning_is_logged_once_per_container(caplog):
+    with caplog.at_level(logging.WARNING, logger="src.services.smart_contract_service"):
+        container = ServiceContainer()
+        for _ in range(5):
+            container.scope(object()).payment_service
+
+    assert len(caplog.records) == 1
+
+
+@pytest.mark.asyncio
+async def test_requests_resolve_the_same_container():
+    seen = []
+    async with httpx.AsyncClient(app=main_app, base_url="http://test") as client:
+        for _ in range(2):
+            await client.get("/api/v1/concordium/health")
+            seen.append(main_app.state.container)
+
+    assert seen[0] is seen[1]
+    assert isinstance(seen[0], ServiceContainer)
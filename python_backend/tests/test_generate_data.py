@@ -0,0 +1,38 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.generate_data import COLUMNS, DataGenerator, generate
+from src.models.notification import Notification
+from src.models.payment import Payment
+from src.models.session import Session as GamingSession
+
+
+def test_same_seed_produces_identical_rows():
+    first = list(DataGenerator(20, 14, seed=5).rows())
+    second = list(DataGenerator(20, 14, seed=5).rows())
+    other = list(DataGenerator(20, 14, seed=6).rows())
+
+    assert first == second
+    assert first != other
+    assert all(len(row) == len(COLUMNS[table]) for table, row in first)
+
+
+def test_bulk_load_is_readable_through_the_models(tmp_path):
+    url = f"sqlite:///{tmp_path / 'data.db'}"
+    counts = generate(url, users=40, days=21, seed=3, chunk_size=500, verbose=False)
+
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        for table, expected in counts.items():
+            assert conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar() == expected
+        indexes = conn.execute(text("SELECT COUNT(*) FROM sqlite_master WHERE type = 'index' AND tbl_name = 'audit_logs'")).scalar()
+    assert counts['users'] == 40
+    assert counts['transactions'] > counts['sessions'] > 0
+    assert indexes >= 4
+
+    db = sessionmaker(bind=engine)()
+    session = db.query(GamingSession).first()
+    assert session.end_time > session.start_time
+    assert db.query(Payment).first().to_dict()['payment_type'] in ('deposit', 'withdrawal', 'winnings')
+    assert db.query(Notification).first().to_dict()['notification_type'] in ('reality_check', 'risk_alert')
+    db.close()
@@ -0,0 +1,168 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import LargeBinary, create_engine, select, type_coerce
+from sqlalchemy.orm import sessionmaker
+
+pytest.importorskip('msgpack')
+pytest.importorskip('zstandard')
+
+from src.config.database import Base
+from src.config.settings import settings
+from src.models.audit_log import AuditLog
+from src.models.json_dictionary import JsonDictionary
+from src.models.risk_assessment import RiskAssessment, RiskLevel
+from src.services.json_compression_service import JsonCompactor
+from src.utils.json_codec import MSGPACK, ZSTD, json_codec
+
+
+@pytest.fixture(autouse=True)
+def reset_json_codec():
+    """Forget dictionaries from earlier tests; the codec is process-wide"""
+    json_codec.clear()
+    yield
+    json_codec.clear()
+
+
+@pytest.fixture
+def database(tmp_path):
+    """An engine factory on one SQLite file, so rows can be written before and after enabling compression"""
+    url = f"sqlite:///{tmp_path / 'codec.db'}"
+
+    def connect():
+        engine = create_engine(url)
+        Base.metadata.create_all(bind=engine)
+        return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    return connect
+
+
+def _details(n):
+    if n % 2:
+        return {'amount': round(n * 1.37, 2), 'currency': 'CCD', 'game_id': f"g{n % 40}", 'platform': 'web'}
+    return {'device': 'ios', 'ip_country': 'DK', 'session_id': f"s{n}", 'two_factor': bool(n % 3)}
+
+
+def _log(n):
+    action_type = 'payment_deposit' if n % 2 else 'login'
+    return AuditLog(log_id=f"l{n:04d}", timestamp=datetime(2026, 1, 1), action_type=action_type,
+                    user_id=f"u{n % 7}", details=_details(n), result='success')
+
+
+def _stored(db, column):
+    return db.execute(select(type_coerce(column, LargeBinary))).scalars().all()
+
+
+def test_values_round_trip_through_every_format():
+    for value in ({'a': 1, 'nested': {'b': [1, 2.5, None, 'x']}}, [1, 'two'], 'text', 3, True):
+        assert json_codec.decode(json_codec.encode('audit_logs.details', value)) == value
+    assert json_codec.encode('audit_logs.details', {'a': 1})[:1] == MSGPACK  # too small to compress
+    assert json_codec.encode('audit_logs.details', {'text': 'repeat ' * 20})[:1] == ZSTD
+    assert json_codec.decode('{"legacy": [1, 2]}') == {'legacy': [1, 2]}
+    assert json_codec.decode(b'{"legacy": true}') == {'legacy': True}
+
+
+def test_columns_are_stored_compact_when_enabled(database, monkeypatch):
+    monkeypatch.setattr(settings, 'JSON_COMPRESSION_ENABLED', True)
+    db = database()()
+    db.add(_log(1))
+    db.add(RiskAssessment(assessment_id='r1', user_id='u1', risk_score=40.0, risk_level=RiskLevel.MEDIUM,
+                          factors={'loss_chasing': 30, 'late_night_gambling': 15},
+                          recommendations=['Set a deposit limit', 'Take a break']))
+    db.commit()
+    db.expunge_all()
+
+    assert isinstance(_stored(db, AuditLog.details)[0], bytes)
+    assert db.get(AuditLog, 'l0001').details == _details(1)
+    assessment = db.get(RiskAssessment, 'r1')
+    assert assessment.factors == {'loss_chasing': 30, 'late_night_gambling': 15}
+    assert assessment.recommendations == ['Set a deposit limit', 'Take a break']
+
+
+def test_compactor_trains_per_action_type_and_rewrites_legacy_rows(database, monkeypatch):
+    legacy = database()()
+    legacy.add_all(_log(n) for n in range(400))
+    legacy.commit()
+    legacy_size = sum(len(value) for value in _stored(legacy, AuditLog.details))
+    legacy.close()
+
+    monkeypatch.setattr(settings, 'JSON_COMPRESSION_ENABLED', True)
+    factory = database()
+    compactor = JsonCompactor(factory, min_samples=50, batch_size=64, pause=0)
+    result = compactor.run_once()
+
+    assert sorted(result['trained']['audit_logs.details']) == ['login', 'payment_deposit']
+    assert result['rewritten']['audit_logs.details'] == 400
+    db = factory()
+    stored = _stored(db, AuditLog.details)
+    assert all(isinstance(value, bytes) for value in stored)
+    assert sum(len(value) for value in stored) < legacy_size / 2
+    assert {log.log_id: log.details for log in db.query(AuditLog)} == {f"l{n:04d}": _details(n) for n in range(400)}
+    assert db.query(JsonDictionary).count() == 2
+
+    # Nothing new to train or rewrite on the next pass
+    assert compactor.run_once() == {'success': True, 'trained': {}, 'rewritten': {}}
+
+
+def test_rows_compressed_before_a_dictionary_existed_are_recompressed(database, monkeypatch):
+    monkeypatch.setattr(settings, 'JSON_COMPRESSION_ENABLED', True)
+    factory = database()
+    db = factory()
+    db.add_all(_log(n) for n in range(200))
+    db.commit()
+    before = sum(len(value) for value in _stored(db, AuditLog.details))
+
+    result = JsonCompactor(factory, min_samples=50, pause=0).run_once()
+
+    assert result['rewritten']['audit_logs.details'] == 200
+    assert sum(len(value) for value in _stored(db, AuditLog.details)) < before
+    db.expunge_all()
+    assert db.query(AuditLog).filter(AuditLog.log_id == 'l0007').one().details == _details(7)
+
+
+def test_another_process_loads_dictionaries_from_the_database(database, monkeypatch):
+    monkeypatch.setattr(settings, 'JSON_COMPRESSION_ENABLED', True)
+    factory = database()
+    db = factory()
+    db.add_all(_log(n) for n in range(200))
+    db.commit()
+    JsonCompactor(factory, min_samples=50, pause=0).run_once()
+
+    json_codec.clear()
+    json_codec.load(db)
+    db.expunge_all()
+    assert db.query(AuditLog).filter(AuditLog.log_id == 'l0010').one().details == _details(10)
+
+
+def test_compressed_rows_stay_readable_with_compression_turned_off(database, monkeypatch):
+    monkeypatch.setattr(settings, 'JSON_COMPRESSION_ENABLED', True)
+    factory = database()
+    db = factory()
+    db.add_all(_log(n) for n in range(200))
+    db.commit()
+    JsonCompactor(factory, min_samples=50, pause=0).run_once()
+    db.close()
+
+    monkeypatch.setattr(settings, 'JSON_COMPRESSION_ENABLED', False)
+    db = database()()
+    assert db.get(AuditLog, 'l0007').details == _details(7)
+    db.add(_log(200))
+    db.commit()
+    db.expunge_all()
+    assert db.get(AuditLog, 'l0200').details == _details(200)
+    assert {log.log_id: log.details for log in db.query(AuditLog)} == {f"l{n:04d}": _details(n) for n in range(201)}
+
+
+def test_startup_refuses_compressed_rows_without_the_codec(database, monkeypatch):
+    monkeypatch.setattr(settings, 'JSON_COMPRESSION_ENABLED', True)
+    factory = database()
+    db = factory()
+    db.add(_log(1))
+    db.commit()
+    db.close()
+
+    compactor = JsonCompactor(factory)
+    compactor.check_storage()
+    monkeypatch.setattr('src.utils.json_codec.zstandard', None)
+    with pytest.raises(RuntimeError, match='audit_logs.details'):
+        compactor.check_storage()
@@ -0,0 +1,46 @@
+from sqlalchemy import create_engine, text
+
+from benchmarks.load_test import MIX, Recorder, TrafficMix, percentile, seed_database, summarise
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(n) for n in range(1, 101)]
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([], 0.5) is None
+
+
+def test_seed_is_deterministic(tmp_path):
+    first = seed_database(f"sqlite:///{tmp_path / 'a.db'}", 50, seed=7)
+    second = seed_database(f"sqlite:///{tmp_path / 'b.db'}", 50, seed=7)
+
+    assert first == second
+    engine = create_engine(f"sqlite:///{tmp_path / 'a.db'}")
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM wallets")).scalar() == 50
+        assert conn.execute(text("SELECT COUNT(*) FROM sessions WHERE status = 'active'")).scalar() == len(first)
+
+
+def test_traffic_mix_is_reproducible_and_covers_every_scenario():
+    a = TrafficMix(100, ['s1'], seed=3)
+    b = TrafficMix(100, ['s1'], seed=3)
+    requests = [a.next() for _ in range(500)]
+
+    assert requests == [b.next() for _ in range(500)]
+    assert {name for name, *_ in requests} == set(MIX)
+
+
+def test_summary_reports_queries_per_request_from_metrics_delta():
+    recorder = Recorder()
+    for latency in (0.01, 0.02, 0.03):
+        recorder.record('winnings', latency, 200)
+    before = {'/api/v1/payment/winnings': (10.0, 2.0)}
+    after = {'/api/v1/payment/winnings': (37.0, 5.0)}
+
+    summary = summarise(recorder, 1.0, before, after)
+
+    winnings = summary['routes']['winnings']
+    assert winnings['db_queries_per_request'] == 9.0
+    assert winnings['latency_ms']['p50'] == 20.0
+    assert winnings['status_codes'] == {'200': 3}
+    assert summary['totals']['requests'] == 3
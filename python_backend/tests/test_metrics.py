@@ -0,0 +1,85 @@
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from src.api.middleware import MetricsMiddleware
+from src.main import app as main_app
+from src.services.blockchain_integration_service import BlockchainIntegrationService
+from src.utils.metrics import (
+    Histogram, concordium_errors, concordium_request_duration, db_queries_per_request,
+    http_request_duration, install_query_metrics, register_queue, render_metrics, unregister_queue
+)
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram('test_latency_seconds', 'Test latency', ('route',), buckets=(0.1, 1.0))
+    histogram.observe(0.05, ('/a',))
+    histogram.observe(0.5, ('/a',))
+    histogram.observe(3, ('/a',))
+
+    lines = histogram.samples()
+
+    assert 'test_latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'test_latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'test_latency_seconds_count{route="/a"} 3' in lines
+    assert histogram.sum(('/a',)) == pytest.approx(3.55)
+
+
+@pytest.mark.asyncio
+async def test_requests_are_timed_per_route_with_query_counts():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    install_query_metrics(engine)
+
+    def get_conn():
+        with engine.connect() as conn:
+            yield conn
+
+    app = FastAPI()
+
+    @app.get("/metrics-test/items/{item_id}")
+    def item(item_id: int, conn=Depends(get_conn)):
+        for _ in range(3):
+            conn.execute(text("SELECT 1"))
+        return {"item_id": item_id}
+
+    labels = ('GET', '/metrics-test/items/{item_id}', 200)
+    before = http_request_duration.count(labels)
+    queries_before = db_queries_per_request.sum(('/metrics-test/items/{item_id}',))
+
+    async with httpx.AsyncClient(app=MetricsMiddleware(app), base_url="http://test") as client:
+        await client.get("/metrics-test/items/1")
+        await client.get("/metrics-test/items/2")
+
+    assert http_request_duration.count(labels) == before + 2
+    assert db_queries_per_request.sum(('/metrics-test/items/{item_id}',)) == queries_before + 6
+
+
+@pytest.mark.asyncio
+async def test_concordium_failures_are_counted():
+    service = BlockchainIntegrationService("http://127.0.0.1:9")
+    service.timeout = 1
+    errors_before = concordium_errors.value(('get_wallet_balance',))
+
+    result = await service.get_wallet_balance("addr1")
+
+    assert result['success'] is False
+    assert concordium_errors.value(('get_wallet_balance',)) == errors_before + 1
+    assert concordium_request_duration.count(('get_wallet_balance', 'error')) >= 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_exposes_queue_depths():
+    register_queue('test_queue', lambda: 7)
+    try:
+        async with httpx.AsyncClient(app=main_app, base_url="http://test") as client:
+            response = await client.get("/metrics")
+    finally:
+        unregister_queue('test_queue')
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'background_queue_depth{queue="test_queue"} 7' in response.text
+    assert '# TYPE http_request_duration_seconds histogram' in render_metrics()
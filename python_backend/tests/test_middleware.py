@@ -0,0 +1,84 @@
+import logging
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from src.api.middleware import ErrorHandlingMiddleware, LoggingMiddleware, request_id_ctx
+
+
+def _build_app(sample_rate=1.0):
+    app = FastAPI()
+
+    @app.get("/ok")
+    async def ok():
+        return {"request_id": request_id_ctx.get()}
+
+    @app.get("/missing")
+    async def missing():
+        return {"ok": False}
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for n in range(3):
+                yield f"chunk{n};".encode()
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    app.add_middleware(LoggingMiddleware, sample_rate=sample_rate)
+    app.add_middleware(ErrorHandlingMiddleware)
+    return app
+
+
+def _client(app):
+    return httpx.AsyncClient(app=app, base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_request_id_is_generated_or_propagated():
+    async with _client(_build_app()) as client:
+        generated = await client.get("/ok")
+        supplied = await client.get("/ok", headers={"X-Request-ID": "abc123"})
+
+    assert generated.headers["x-request-id"] == generated.json()["request_id"]
+    assert len(generated.headers["x-request-id"]) == 32
+    assert supplied.headers["x-request-id"] == "abc123"
+    assert supplied.json()["request_id"] == "abc123"
+
+
+@pytest.mark.asyncio
+async def test_successful_requests_are_sampled(caplog):
+    caplog.set_level(logging.INFO, logger="src.api.middleware")
+    async with _client(_build_app(sample_rate=0.0)) as client:
+        await client.get("/ok")
+        await client.get("/nope")
+
+    records = [r for r in caplog.records if r.name == "src.api.middleware"]
+    assert [r.status_code for r in records] == [404]
+    assert records[0].path == "/nope"
+    assert records[0].request_id
+
+
+@pytest.mark.asyncio
+async def test_unhandled_error_returns_json_500_with_request_id():
+    async with _client(_build_app()) as client:
+        response = await client.get("/boom", headers={"X-Request-ID": "req-1"})
+
+    assert response.status_code == 500
+    assert response.json() == {"error": "An internal error occurred", "request_id": "req-1"}
+    assert response.headers["x-request-id"] == "req-1"
+
+
+@pytest.mark.asyncio
+async def test_streaming_responses_pass_through():
+    async with _client(_build_app()) as client:
+        response = await client.get("/stream")
+
+    assert response.status_code == 200
+    assert response.text == "chunk0;chunk1;chunk2;"
+    assert "x-request-id" in response.headers
@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy import event
+
+from src.models.notification import Notification, NotificationType
+from src.services.notification_coalescer import NotificationCoalescer
+from src.services.notification_delivery_service import NotificationDeliveryPool
+from src.services.notification_service import NotificationService
+from src.utils.notification_hub import NotificationHub
+
+
+@pytest.fixture
+def delivery(session_factory):
+    delivery = NotificationDeliveryPool(session_factory, channels=[])
+    delivery.wake = lambda: None
+    return delivery
+
+
+def _coalescer(session_factory, delivery, **windows):
+    return NotificationCoalescer(session_factory, hub=NotificationHub(), delivery=delivery, windows=windows)
+
+
+@pytest.mark.asyncio
+async def test_repeats_in_a_window_are_not_written(engine, session_factory, delivery):
+    coalescer = _coalescer(session_factory, delivery, break_reminder=3600)
+    service = NotificationService(session_factory(), hub=NotificationHub(), delivery=delivery, coalescer=coalescer)
+    first = await service.send_user_notification('u1', NotificationType.BREAK_REMINDER, {'session_minutes': 60})
+
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    for minutes in (61, 62, 63):
+        result = await service.send_user_notification('u1', NotificationType.BREAK_REMINDER, {'session_minutes': minutes})
+        assert result == {'success': True, 'coalesced': True, 'notification': None}
+
+    assert first['notification']['notification_id']
+    assert statements == []
+    assert coalescer.suppressed_total == 3 and coalescer.pending == 1
+    assert session_factory().query(Notification).count() == 1
+
+
+@pytest.mark.asyncio
+async def test_closed_window_with_repeats_becomes_one_digest(session_factory, delivery):
+    coalescer = _coalescer(session_factory, delivery, reality_check=300)
+    subscription = coalescer.hub.subscribe('u1', lambda: 0)
+
+    assert coalescer.admit('u1', NotificationType.REALITY_CHECK, 'Reality Check', 'first', {'n': 1}, now=1000.0)
+    for n in range(2, 6):
+        assert not coalescer.admit('u1', NotificationType.REALITY_CHECK, 'Reality Check', f"repeat {n}", {'n': n}, now=1000.0 + n)
+    assert coalescer.admit('u2', NotificationType.REALITY_CHECK, 'Reality Check', 'only', {}, now=1010.0)
+
+    assert coalescer.flush(now=1199.0) == 0  # window [900, 1200) still open
+    assert coalescer.flush(now=1200.0) == 1
+    assert coalescer.pending == 0
+
+    digest = session_factory().query(Notification).one()
+    assert digest.user_id == 'u1' and digest.message == 'repeat 5'
+    assert digest.notification_data['n'] == 5 and digest.notification_data['coalesced_count'] == 4
+    assert digest.notification_data['window_end'] == '1970-01-01T00:20:00'
+    assert await subscription.next(1) == ('unread', {'unread_count': 0})
+    event, published = await subscription.next(1)
+    assert event == 'notification' and published['notification_id'] == digest.notification_id
+
+
+def test_next_window_sends_again_and_keeps_the_closed_burst(session_factory, delivery):
+    coalescer = _coalescer(session_factory, delivery, limit_warning=900)
+    assert coalescer.admit('u1', NotificationType.LIMIT_WARNING, 'Limit', 'a', {}, now=100.0)
+    assert not coalescer.admit('u1', NotificationType.LIMIT_WARNING, 'Limit', 'b', {}, now=200.0)
+    # The first window closed but was not flushed before the next notification arrived
+    assert coalescer.admit('u1', NotificationType.LIMIT_WARNING, 'Limit', 'c', {}, now=950.0)
+    assert not coalescer.admit('u1', NotificationType.LIMIT_WARNING, 'Limit', 'd', {}, now=960.0)
+
+    assert coalescer.flush(now=960.0) == 1
+    assert coalescer.pending == 1
+    assert coalescer.flush(now=1800.0) == 1
+    messages = sorted(n.message for n in session_factory().query(Notification))
+    assert messages == ['b', 'd']
+
+
+@pytest.mark.asyncio
+async def test_types_without_a_window_are_never_coalesced(session_factory, delivery):
+    coalescer = _coalescer(session_factory, delivery, break_reminder=3600)
+    service = NotificationService(session_factory(), hub=NotificationHub(), delivery=delivery, coalescer=coalescer)
+    for _ in range(3):
+        result = await service.send_user_notification('u1', NotificationType.WELLNESS_TIP, {})
+        assert result['notification'] is not None
+    await service.send_operator_alert('op1', 'u1', 'loss_chasing', {})
+    await service.send_operator_alert('op1', 'u1', 'loss_chasing', {})
+    assert session_factory().query(Notification).count() == 5
+
+
+@pytest.mark.asyncio
+async def test_stop_writes_digests_for_open_windows(session_factory, delivery):
+    coalescer = _coalescer(session_factory, delivery, session_time_warning=300)
+    coalescer.start()
+    coalescer.admit('u1', NotificationType.SESSION_TIME_WARNING, 'Session', 'a', {})
+    coalescer.admit('u1', NotificationType.SESSION_TIME_WARNING, 'Session', 'b', {})
+    await coalescer.stop()
+    digest = session_factory().query(Notification).one()
+    assert digest.message == 'b' and digest.notification_data['coalesced_count'] == 1
@@ -0,0 +1,149 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from benchmarks.notification_sinks import GatewaySink, SmtpSink
+from src.models.notification import Notification, NotificationStatus, NotificationType
+from src.repositories.notification_repository import NotificationRepository
+from src.services.notification_channels import EmailChannel, GatewayChannel, NotificationChannel
+from src.services.notification_delivery_service import NotificationDeliveryPool
+from src.services.notification_service import NotificationService
+from src.utils.notification_hub import NotificationHub
+
+
+class FlakyChannel(NotificationChannel):
+    name = 'flaky'
+    recipient_key = 'flaky'
+
+    def __init__(self):
+        self.batches = []
+
+    async def deliver(self, addressed):
+        self.batches.append([n.notification_id for n, _ in addressed])
+        return {n.notification_id: None if to == 'ok' else 'flaky: down' for n, to in addressed}
+
+
+def _add(db, n, data=None, **columns):
+    db.add(Notification(
+        notification_id=f"n{n}", user_id=f"u{n}", notification_type=NotificationType.WELLNESS_TIP,
+        title='Wellness Tip', message='Remember to play responsibly', status=NotificationStatus.PENDING,
+        created_at=datetime.utcnow() + timedelta(microseconds=n), notification_data=data or {}, **columns
+    ))
+
+
+@pytest.mark.asyncio
+async def test_send_only_queues_and_wakes_the_pool(session_factory):
+    delivery = NotificationDeliveryPool(session_factory, channels=[])
+    woken = []
+    delivery.wake = lambda: woken.append(1)
+    service = NotificationService(session_factory(), hub=NotificationHub(), delivery=delivery)
+
+    result = await service.send_user_notification('u1', NotificationType.BREAK_REMINDER, {'email': 'a@example.com'})
+    await service.send_operator_alert('op1', 'u1', 'loss_chasing', {})
+
+    assert result['notification']['status'] == 'pending'
+    assert woken == [1, 1]
+    outcome = await delivery.run_once()
+    assert outcome == {'success': True, 'claimed': 2, 'sent': 2, 'retrying': 0, 'failed': 0}
+    stored = session_factory().get(Notification, result['notification']['notification_id'])
+    assert stored.status == NotificationStatus.SENT and stored.sent_at and stored.claim_token is None
+
+
+def test_claims_skip_held_future_and_stale_rows(session_factory):
+    db = session_factory()
+    now = datetime.utcnow()
+    for n in range(5):
+        _add(db, n)
+    _add(db, 5, next_attempt_at=now + timedelta(hours=1))
+    _add(db, 6, claim_token='crashed', claimed_at=now - timedelta(hours=1))
+    _add(db, 7, claim_token='busy', claimed_at=now)
+    db.commit()
+    repository = NotificationRepository(db)
+
+    first = repository.claim_pending('a', 3, now, lease_seconds=300)
+    second = repository.claim_pending('b', 10, now, lease_seconds=300)
+
+    assert [n.notification_id for n in first] == ['n0', 'n1', 'n2']
+    assert sorted(n.notification_id for n in second) == ['n3', 'n4', 'n6']
+    assert repository.claim_pending('c', 10, now, lease_seconds=300) == []
+
+
+@pytest.mark.asyncio
+async def test_delivers_over_smtp_and_gateway_with_retries(session_factory):
+    with SmtpSink(reject_substring='bounce') as smtp, GatewaySink() as gateway:
+        channels = [
+            EmailChannel(host=smtp.host, port=smtp.port, sender='noreply@example.com'),
+            GatewayChannel('push', 'push_token', gateway.url + '/push')
+        ]
+        delivery = NotificationDeliveryPool(session_factory, channels=channels, max_attempts=2, backoff_seconds=60)
+        db = session_factory()
+        _add(db, 1, {'email': 'player@example.com', 'push_token': 'tok1'})
+        _add(db, 2, {'email': 'bounce@example.com'})
+        _add(db, 3)
+        db.commit()
+
+        assert await delivery.run_once() == {'success': True, 'claimed': 3, 'sent': 2, 'retrying': 1, 'failed': 0}
+        await channels[1].close()
+
+    assert [m.rcpt_tos for m in smtp.messages] == [['<player@example.com>']]
+    assert b"Remember to play responsibly" in smtp.messages[0].data
+    assert [m['to'] for m in gateway.received['push']] == ['tok1']
+
+    db = session_factory()
+    retry = db.get(Notification, 'n2')
+    assert retry.status == NotificationStatus.PENDING and retry.attempts == 1
+    assert 'email' in retry.last_error and retry.claim_token is None
+    assert timedelta(seconds=29) < retry.next_attempt_at - datetime.utcnow() <= timedelta(seconds=60)
+    assert db.get(Notification, 'n3').status == NotificationStatus.SENT
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_attempts_and_keeps_read_status(session_factory):
+    class ReadDuringDelivery(FlakyChannel):
+        async def deliver(self, addressed):
+            reader = session_factory()
+            reader.get(Notification, 'n2').mark_as_read()
+            reader.commit()
+            return await super().deliver(addressed)
+
+    channel = ReadDuringDelivery()
+    delivery = NotificationDeliveryPool(session_factory, channels=[channel], max_attempts=3)
+    db = session_factory()
+    _add(db, 1, {'flaky': 'down'}, attempts=2)
+    _add(db, 2, {'flaky': 'ok'})
+    db.commit()
+
+    assert await delivery.run_once() == {'success': True, 'claimed': 2, 'sent': 1, 'retrying': 0, 'failed': 1}
+
+    db = session_factory()
+    failed = db.get(Notification, 'n1')
+    assert failed.status == NotificationStatus.FAILED and failed.attempts == 3 and failed.last_error == 'flaky: down'
+    assert db.get(Notification, 'n2').status == NotificationStatus.READ
+
+
+def test_backoff_doubles_with_jitter_up_to_the_cap():
+    delivery = NotificationDeliveryPool(channels=[], backoff_seconds=10, max_backoff_seconds=60)
+    assert 5 <= delivery.backoff(1) <= 10
+    assert 10 <= delivery.backoff(2) <= 20
+    assert 30 <= delivery.backoff(10) <= 60
+
+
+@pytest.mark.asyncio
+async def test_started_pool_delivers_without_waiting_for_the_poll(session_factory):
+    channel = FlakyChannel()
+    delivery = NotificationDeliveryPool(session_factory, channels=[channel], workers=2, poll_interval=30)
+    delivery.start()
+    try:
+        await asyncio.sleep(0.05)  # workers find nothing and go idle
+        service = NotificationService(session_factory(), hub=NotificationHub(), delivery=delivery)
+        result = await service.send_user_notification('u1', NotificationType.WELLNESS_TIP, {'flaky': 'ok'})
+        notification_id = result['notification']['notification_id']
+
+        for _ in range(100):
+            if channel.batches:
+                break
+            await asyncio.sleep(0.01)
+        assert channel.batches == [[notification_id]]
+    finally:
+        await delivery.stop()
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from src.models.notification import Notification, NotificationStatus, NotificationType
+from src.services.notification_retention_service import NotificationPurger
+from src.utils.notification_hub import NotificationHub
+
+
+NOW = datetime(2026, 6, 1)
+
+
+def _add(db, n, user_id='u1', notification_type=NotificationType.WELLNESS_TIP, priority='normal',
+         age_days=0, status=NotificationStatus.READ):
+    db.add(Notification(
+        notification_id=f"n{n}", user_id=user_id, notification_type=notification_type,
+        title='Title', message='Message', status=status, priority=priority,
+        created_at=NOW - timedelta(days=age_days, seconds=n)
+    ))
+
+
+def _purger(session_factory, **options):
+    options = {'default_days': 90, 'days_by_type': {'wellness_tip': 30, 'risk_alert': 365},
+               'days_by_priority': {'critical': 365}, 'max_per_user': 0, 'chunk_size': 3, 'pause': 0, **options}
+    return NotificationPurger(session_factory, hub=NotificationHub(), **options)
+
+
+def _remaining(session_factory):
+    return {n.notification_id for n in session_factory().query(Notification)}
+
+
+@pytest.mark.asyncio
+async def test_age_retention_by_type_and_priority(session_factory):
+    db = session_factory()
+    _add(db, 1, age_days=31)                                                   # tip, past 30 days
+    _add(db, 2, age_days=29)                                                   # tip, kept
+    _add(db, 3, age_days=31, priority='critical')                              # critical outlives the tip policy
+    _add(db, 4, notification_type=NotificationType.LIMIT_WARNING, age_days=91)  # default 90 days
+    _add(db, 5, notification_type=NotificationType.LIMIT_WARNING, age_days=60)
+    _add(db, 6, notification_type=NotificationType.RISK_ALERT, age_days=200)
+    _add(db, 7, age_days=400, status=NotificationStatus.PENDING)                # never delivered yet
+    for n in range(10, 17):
+        _add(db, n, user_id=f"u{n}", age_days=45, status=NotificationStatus.SENT)
+    db.commit()
+
+    purger = _purger(session_factory)
+    result = await purger.run_once(NOW)
+
+    assert result['expired'] == 9 and result['capped'] == 0
+    assert _remaining(session_factory) == {'n2', 'n3', 'n5', 'n6', 'n7'}
+    assert purger.retention_days(NotificationType.WELLNESS_TIP, 'critical') == 365
+    assert purger.stats()['expired'] == 9 and purger.stats()['last_run']['expired'] == 9
+
+
+@pytest.mark.asyncio
+async def test_cap_keeps_each_users_newest(session_factory):
+    db = session_factory()
+    for n in range(10):
+        _add(db, n)  # n0 is the newest
+    _add(db, 10, status=NotificationStatus.PENDING, age_days=1)
+    for n in range(20, 24):
+        _add(db, n, user_id='u2')
+    db.commit()
+
+    result = await _purger(session_factory, max_per_user=4).run_once(NOW)
+
+    assert result['capped'] == 6
+    assert _remaining(session_factory) == {'n0', 'n1', 'n2', 'n3', 'n10', 'n20', 'n21', 'n22', 'n23'}
+
+
+@pytest.mark.asyncio
+async def test_purge_deletes_in_bounded_chunks(engine, session_factory):
+    db = session_factory()
+    for n in range(10):
+        _add(db, n, age_days=60)
+    db.commit()
+
+    deletes = []
+    event.listen(engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statement.startswith('DELETE') and deletes.append(statement))
+    result = await _purger(session_factory, chunk_size=3).run_once(NOW)
+
+    assert result['expired'] == 10
+    # 3 + 3 + 3 + 1 for wellness tips at normal priority, one empty chunk for every other policy
+    assert len(deletes) == result['chunks'] == 4 + len(NotificationType) * 4 - 1
+    assert _remaining(session_factory) == set()
+
+
+@pytest.mark.asyncio
+async def test_purged_unread_notifications_leave_the_stream_counters(session_factory):
+    db = session_factory()
+    _add(db, 1, age_days=60, status=NotificationStatus.SENT)
+    _add(db, 2, age_days=60, status=NotificationStatus.READ)
+    _add(db, 3, age_days=1, status=NotificationStatus.DELIVERED)
+    db.commit()
+
+    purger = _purger(session_factory)
+    subscription = purger.hub.subscribe('u1', lambda: 2)
+    await purger.run_once(NOW)
+
+    assert purger.hub.unread_count('u1') == 1
+    assert subscription.pending[-1] == ('unread', {'unread_count': 1})
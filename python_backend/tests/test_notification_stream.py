@@ -0,0 +1,128 @@
+import asyncio
+import json
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.api import streaming
+from src.config.database import get_db
+from src.main import app as main_app
+from src.models.notification import NotificationType
+from src.services.notification_service import NotificationService
+from src.utils.notification_hub import NotificationHub
+
+
+@pytest.mark.asyncio
+async def test_hub_fans_out_and_counts_unread():
+    hub = NotificationHub(max_connections=3)
+    loads = []
+    first = hub.subscribe('u1', lambda: loads.append(1) or 2)
+    second = hub.subscribe('u1', lambda: loads.append(1) or 99)
+
+    hub.publish('u1', {'title': 'Reality check'})
+    hub.publish('u2', {'title': 'nobody is listening'})
+
+    assert loads == [1]
+    for subscription in (first, second):
+        events = [await subscription.next(0.1) for _ in range(3)]
+        assert events == [
+            ('unread', {'unread_count': 2}),
+            ('notification', {'title': 'Reality check'}),
+            ('unread', {'unread_count': 3})
+        ]
+    assert await first.next(0.01) is None
+
+    hub.mark_read('u1')
+    assert hub.unread_count('u1') == 2
+    hub.subscribe('u3', lambda: 0)
+    assert hub.subscribe('u4', lambda: 0) is None
+
+    hub.unsubscribe(first)
+    hub.unsubscribe(second)
+    assert hub.unread_count('u1') is None
+    assert hub.stats()['connections'] == 1
+
+
+@pytest.mark.asyncio
+async def test_unread_count_reads_the_database_and_corrects_streams(engine, session_factory):
+    hub = NotificationHub()
+    service = NotificationService(session_factory(), hub=hub)
+    await service.send_user_notification('u1', NotificationType.BREAK_REMINDER, {})
+    subscription = service.open_stream('u1')
+    await service.send_user_notification('u1', NotificationType.REALITY_CHECK, {'message': 'hi'})
+    assert [name for name, _ in subscription.pending] == ['unread', 'notification', 'unread']
+
+    notification_id = subscription.pending[1][1]['notification_id']
+    await service.mark_notification_read(notification_id)
+    await service.mark_notification_read(notification_id)
+    assert hub.unread_count('u1') == 1
+
+    # Another worker (its own hub) creates a notification this worker's counter never hears of
+    other_worker = NotificationService(session_factory(), hub=NotificationHub())
+    await other_worker.send_user_notification('u1', NotificationType.LIMIT_WARNING, {'percentage': 90})
+    subscription.pending.clear()
+
+    result = await service.get_unread_count('u1')
+
+    assert result['unread_count'] == 2
+    assert hub.unread_count('u1') == 2
+    assert subscription.pending == [('unread', {'unread_count': 2})]
+    await service.get_unread_count('u1')
+    assert len(subscription.pending) == 1  # unchanged counts are not pushed again
+
+
+@pytest.mark.asyncio
+async def test_sse_frames_and_heartbeat(monkeypatch):
+    monkeypatch.setattr(streaming.settings, 'NOTIFICATION_STREAM_HEARTBEAT_SECONDS', 0.01)
+    hub = NotificationHub()
+    subscription = hub.subscribe('u1', lambda: 4)
+    events = streaming.sse_events(hub, subscription)
+
+    assert await events.__anext__() == b"retry: 5000\n\n"
+    assert await events.__anext__() == b'event: unread\ndata: {"unread_count":4}\n\n'
+    assert await events.__anext__() == b": keepalive\n\n"
+
+    await events.aclose()
+    assert hub.stats()['connections'] == 0
+
+
+@pytest.mark.asyncio
+async def test_sse_subscription_is_closed_when_the_client_leaves_before_the_first_chunk():
+    hub = NotificationHub()
+    response = streaming.SSEResponse(hub, hub.subscribe('u1', lambda: 0))
+
+    async def receive():
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        raise OSError("connection reset")
+
+    with pytest.raises(OSError):
+        await response({'type': 'http'}, receive, send)
+    assert hub.stats()['connections'] == 0
+
+
+def test_websocket_receives_published_notifications(session_factory):
+    def override_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    main_app.dependency_overrides[get_db] = override_db
+    try:
+        client = TestClient(main_app)
+        with client.websocket_connect("/api/v1/notifications/u9/ws") as websocket:
+            assert json.loads(websocket.receive_text()) == {'event': 'unread', 'data': {'unread_count': 0}}
+
+            asyncio.run(NotificationService(session_factory()).send_user_notification(
+                'u9', NotificationType.WELLNESS_TIP, {'message': 'Remember to play responsibly'}
+            ))
+
+            pushed = json.loads(websocket.receive_text())
+            assert pushed['event'] == 'notification'
+            assert pushed['data']['message'] == 'Remember to play responsibly'
+            assert json.loads(websocket.receive_text()) == {'event': 'unread', 'data': {'unread_count': 1}}
+    finally:
+        main_app.dependency_overrides.pop(get_db, None)
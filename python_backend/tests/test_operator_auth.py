@@ -0,0 +1,198 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.config.database import get_db
+from src.config.settings import settings
+from src.main import app
+from src.models.operator import Operator
+from src.repositories.operator_repository import migrate_plaintext_api_keys
+from src.services.operator_auth_service import LastActiveTracker, OperatorAuthService, warm_operator_index
+from src.utils.cache import clear_caches
+from src.utils.operator_index import OperatorKeyIndex, operator_key_index
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Operator.metadata.create_all(bind=engine)
+    clear_caches()
+    operator_key_index.load([])
+    yield sessionmaker(bind=engine)
+    operator_key_index.load([])
+
+
+@pytest.fixture
+def client(session_factory):
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_registered_key_is_stored_hashed(session_factory):
+    db = session_factory()
+    result = OperatorAuthService(db).register_operator({'operator_id': 'op1', 'name': 'Casino'})
+
+    stored = db.query(Operator).one()
+    assert stored.api_key_hash != result['api_key']
+    assert operator_key_index.lookup(result['api_key']).operator_id == 'op1'
+    assert operator_key_index.lookup('wrong-key') is None
+
+
+def test_rotation_revokes_old_key(session_factory):
+    db = session_factory()
+    service = OperatorAuthService(db)
+    old_key = service.register_operator({'operator_id': 'op1', 'name': 'Casino'})['api_key']
+    new_key = service.rotate_api_key('op1')['api_key']
+
+    assert operator_key_index.lookup(old_key) is None
+    assert operator_key_index.lookup(new_key).operator_id == 'op1'
+
+
+def test_plaintext_api_key_tables_are_migrated():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    with engine.begin() as connection:
+        # operators as created before keys were hashed
+        connection.execute(text(
+            "CREATE TABLE operators (operator_id VARCHAR NOT NULL PRIMARY KEY, name VARCHAR NOT NULL, "
+            "platform_url VARCHAR, api_key VARCHAR NOT NULL UNIQUE, is_active BOOLEAN, registered_at DATETIME NOT NULL, "
+            "last_active DATETIME, supported_currencies JSON, compliance_level VARCHAR, country VARCHAR, "
+            "license_number VARCHAR, contact_email VARCHAR, settings JSON)"
+        ))
+        connection.execute(text("CREATE INDEX ix_operators_operator_id ON operators (operator_id)"))
+        connection.execute(text(
+            "INSERT INTO operators (operator_id, name, api_key, is_active, registered_at, compliance_level) "
+            "VALUES ('op1', 'Casino', 'legacy-key', 1, '2026-01-01 00:00:00', 'enhanced')"
+        ))
+    Operator.metadata.create_all(bind=engine)
+    operator_key_index.load([])
+    session_factory = sessionmaker(bind=engine)
+    try:
+        assert migrate_plaintext_api_keys(engine) == 1
+        assert migrate_plaintext_api_keys(engine) == 0
+        assert 'api_key' not in {column['name'] for column in inspect(engine).get_columns('operators')}
+
+        assert warm_operator_index(session_factory) == 1
+        identity = operator_key_index.lookup('legacy-key')
+        assert (identity.operator_id, identity.compliance_level) == ('op1', 'enhanced')
+        new_key = OperatorAuthService(session_factory()).register_operator({'operator_id': 'op2', 'name': 'New'})['api_key']
+        assert operator_key_index.lookup(new_key).operator_id == 'op2'
+    finally:
+        operator_key_index.load([])
+
+
+def test_warm_index_loads_only_active_operators(session_factory):
+    db = session_factory()
+    service = OperatorAuthService(db)
+    active_key = service.register_operator({'operator_id': 'op1', 'name': 'A'})['api_key']
+    inactive_key = service.register_operator({'operator_id': 'op2', 'name': 'B'})['api_key']
+    service.operator_repository.deactivate_operator('op2')
+
+    operator_key_index.load([])
+    assert warm_operator_index(session_factory) == 1
+    assert operator_key_index.lookup(active_key) is not None
+    assert operator_key_index.lookup(inactive_key) is None
+
+
+def test_authentication_does_not_hit_database(client, session_factory):
+    db = session_factory()
+    api_key = OperatorAuthService(db).register_operator({'operator_id': 'op1', 'name': 'Casino'})['api_key']
+
+    statements = []
+    engine = db.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        response = client.get("/api/v1/operators/me", headers={"X-API-Key": api_key})
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert response.status_code == 200
+    assert response.json()['operator_id'] == 'op1'
+    assert statements == []
+    assert client.get("/api/v1/operators/me", headers={"X-API-Key": "nope"}).status_code == 401
+
+
+def test_key_unknown_to_the_index_is_looked_up_once(client, session_factory):
+    db = session_factory()
+    api_key = OperatorAuthService(db).register_operator({'operator_id': 'op1', 'name': 'Casino'})['api_key']
+    operator_key_index.load([])  # as in a worker that has not refreshed since op1 registered
+
+    assert client.get("/api/v1/operators/me", headers={"X-API-Key": api_key}).status_code == 200
+    assert operator_key_index.lookup(api_key).operator_id == 'op1'
+
+    db.query(Operator).update({'is_active': False})
+    db.commit()
+    operator_key_index.load([])
+    assert client.get("/api/v1/operators/me", headers={"X-API-Key": api_key}).status_code == 401
+
+
+def test_register_operator_requires_admin_key(client):
+    response = client.post("/api/v1/operators", json={'name': 'Casino'})
+    assert response.status_code == 401
+
+    response = client.post("/api/v1/operators", json={'name': 'Casino'}, headers={"X-API-Key": settings.API_KEY})
+    assert response.status_code == 201
+    assert 'api_key' in response.json()
+
+
+def test_admin_api_refuses_placeholder_keys(client, monkeypatch):
+    monkeypatch.setattr(settings, 'API_KEY', 'your_api_key_here')
+    response = client.post("/api/v1/operators", json={'name': 'Casino'}, headers={"X-API-Key": 'your_api_key_here'})
+    assert response.status_code == 503
+
+    monkeypatch.setattr(settings, 'API_KEY', 'a-real-admin-key')
+    monkeypatch.setattr(settings, 'SECRET_KEY', 'your-super-secret-key-change-this-in-production')
+    response = client.post("/api/v1/operators", json={'name': 'Casino'}, headers={"X-API-Key": 'a-real-admin-key'})
+    assert response.status_code == 503
+
+
+def test_register_operator_rejects_bad_input(client):
+    headers = {"X-API-Key": settings.API_KEY}
+    response = client.post("/api/v1/operators", json={'name': 'Casino', 'is_active': False, 'api_key_hash': 'x'},
+                           headers=headers)
+    assert response.status_code == 400
+    assert response.json()['detail'] == 'Unknown operator fields: api_key_hash, is_active'
+    assert client.post("/api/v1/operators", json={'operator_id': 'op1'}, headers=headers).status_code == 400
+    assert client.post("/api/v1/operators", json={'name': 'Casino', 'compliance_level': 'gold'},
+                       headers=headers).status_code == 400
+
+    assert client.post("/api/v1/operators", json={'operator_id': 'op1', 'name': 'Casino'}, headers=headers).status_code == 201
+    response = client.post("/api/v1/operators", json={'operator_id': 'op1', 'name': 'Other'}, headers=headers)
+    assert response.status_code == 409
+
+
+def test_last_active_writes_are_coalesced(session_factory):
+    db = session_factory()
+    OperatorAuthService(db).register_operator({'operator_id': 'op1', 'name': 'Casino'})
+    tracker = LastActiveTracker(session_factory)
+
+    for _ in range(100):
+        tracker.touch('op1')
+    assert tracker.pending == 1
+    assert tracker.flush() == 1
+
+    db.expire_all()
+    assert db.query(Operator).one().last_active is not None
+
+
+def test_index_upsert_replaces_old_hash():
+    index = OperatorKeyIndex()
+    op = Operator(operator_id='op1', name='A', api_key_hash='h1', is_active=True)
+    index.upsert(op)
+    op.api_key_hash = 'h2'
+    index.upsert(op)
+    assert len(index) == 1
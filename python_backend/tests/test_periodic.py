@@ -0,0 +1,45 @@
+import asyncio
+import logging
+
+import pytest
+
+from src.utils.periodic import PeriodicTask
+
+
+@pytest.mark.asyncio
+async def test_errors_are_logged_and_the_loop_carries_on(caplog):
+    calls = []
+
+    def step():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ValueError("boom")
+
+    task = PeriodicTask('Test pass', step, 0.01)
+    with caplog.at_level(logging.ERROR, logger='src.utils.periodic'):
+        assert task.start()
+        assert not task.start()
+        await asyncio.sleep(0.05)
+        assert await task.stop()
+
+    assert len(calls) >= 2
+    assert [record.getMessage() for record in caplog.records] == ["Test pass failed: boom"]
+    assert not task.running
+    assert not await task.stop()
+
+
+@pytest.mark.asyncio
+async def test_wake_ends_the_wait_early():
+    calls = []
+
+    async def step():
+        calls.append(1)
+
+    task = PeriodicTask('Test pass', step, lambda: 60)
+    task.start()
+    await asyncio.sleep(0.01)
+    assert len(calls) == 1
+    task.wake()
+    await asyncio.sleep(0.01)
+    assert len(calls) == 2
+    await task.stop()
@@ -0,0 +1,90 @@
+import asyncio
+import sys
+import time
+
+import httpx
+import pytest
+
+from src.api.middleware import ProfilingMiddleware
+from src.config.settings import settings
+from src.main import app as main_app
+from src.utils.profiler import SamplingProfiler, request_profiler
+
+
+def spin(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_samples_are_attributed_to_the_profiled_task_only():
+    profiler = SamplingProfiler(interval=0.001)
+
+    async def profiled():
+        profile = profiler.begin('GET', '/a', sys._getframe())
+        spin(0.05)
+        await asyncio.sleep(0.03)
+        profiler.end(profile, 200, '/a')
+        return profile
+
+    async def bystander():
+        await asyncio.sleep(0)
+        spin(0.05)
+
+    profile, _ = await asyncio.gather(profiled(), bystander())
+
+    assert profile.samples > 0
+    assert any(stack.startswith('spin (tests/test_profiler.py') for stack in profile.stacks)
+    assert not any('bystander' in stack for stack in profile.stacks)
+    assert '<not running>' in profile.stacks
+    assert profiler.get(profile.id) is profile
+
+
+def test_armed_routes_match_templates_and_count_down():
+    profiler = SamplingProfiler()
+    profiler.arm('/api/v1/users/{user_id}', count=2, method='get')
+
+    assert not profiler.take_armed('GET', '/api/v1/users/u1/sessions')
+    assert not profiler.take_armed('POST', '/api/v1/users/u1')
+    assert profiler.take_armed('GET', '/api/v1/users/u1')
+    assert profiler.take_armed('GET', '/api/v1/users/u2')
+    assert not profiler.armed
+
+
+@pytest.mark.asyncio
+async def test_admin_can_arm_a_route_and_fetch_the_profile():
+    # PROFILING_ENABLED is off by default, so install the middleware here
+    async with httpx.AsyncClient(app=ProfilingMiddleware(main_app), base_url="http://test") as client:
+        assert (await client.post("/api/v1/profiling/arm", json={"route": "/"})).status_code == 401
+        unknown = await client.post("/api/v1/profiling/arm", json={"route": "/nope"}, headers={"X-API-Key": settings.API_KEY})
+        assert unknown.status_code == 404
+
+        armed = await client.post("/api/v1/profiling/arm", json={"route": "/", "count": 1}, headers={"X-API-Key": settings.API_KEY})
+        assert armed.json()['armed'] == [{'route': '/', 'method': None, 'remaining': 1}]
+
+        first = await client.get("/")
+        second = await client.get("/")
+        by_header = await client.get("/", headers={"X-Profile-Key": settings.API_KEY})
+        wrong_key = await client.get("/", headers={"X-Profile-Key": "guess"})
+
+        profile_id = first.headers["x-profile-id"]
+        detail = await client.get(f"/api/v1/profiling/profiles/{profile_id}", headers={"X-API-Key": settings.API_KEY})
+        collapsed = await client.get(f"/api/v1/profiling/profiles/{profile_id}?format=collapsed", headers={"X-API-Key": settings.API_KEY})
+
+    assert "x-profile-id" not in second.headers
+    assert "x-profile-id" in by_header.headers
+    assert "x-profile-id" not in wrong_key.headers
+    profile = detail.json()['profile']
+    assert profile['route'] == '/'
+    assert profile['status_code'] == 200
+    assert collapsed.headers["content-type"].startswith("text/plain")
+    assert request_profiler.get(profile_id) is not None
+
+
+@pytest.mark.asyncio
+async def test_profile_header_is_ignored_while_api_key_is_a_placeholder(monkeypatch):
+    monkeypatch.setattr(settings, 'API_KEY', 'your_api_key_here')
+    async with httpx.AsyncClient(app=ProfilingMiddleware(main_app), base_url="http://test") as client:
+        response = await client.get("/", headers={"X-Profile-Key": 'your_api_key_here'})
+    assert "x-profile-id" not in response.headers
@@ -0,0 +1,86 @@
+import logging
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from src.api.middleware import QueryBudgetMiddleware
+from src.config.database import get_db
+from src.main import app as main_app
+from src.utils.metrics import install_query_metrics
+
+
+def make_engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    install_query_metrics(engine)
+    return engine
+
+
+def make_app(engine):
+    def get_conn():
+        with engine.connect() as conn:
+            yield conn
+
+    app = FastAPI()
+
+    @app.get("/budget-test/users/{user_id}/items")
+    def items(user_id: str, n: int = 1, conn=Depends(get_conn)):
+        # One lookup per item: the classic N+1 shape
+        return [conn.execute(text("SELECT :i"), {"i": i}).scalar() for i in range(n)]
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_repeated_statements_are_logged_as_n_plus_one(caplog):
+    app = QueryBudgetMiddleware(make_app(make_engine()), max_statements=100, repeat_threshold=5)
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        with caplog.at_level(logging.WARNING, logger="src.api.middleware"):
+            await client.get("/budget-test/users/u1/items", params={"n": 2})
+            assert not caplog.records
+            await client.get("/budget-test/users/u1/items", params={"n": 6})
+
+    [record] = caplog.records
+    assert record.getMessage().startswith("Possible N+1: GET /budget-test/users/{user_id}/items - statement repeated 6x")
+    assert record.repeated_statement == "SELECT ?"
+
+
+@pytest.mark.asyncio
+async def test_statement_budget_is_enforced_and_exposed_in_headers(caplog, assert_max_queries):
+    app = QueryBudgetMiddleware(make_app(make_engine()), max_statements=3, repeat_threshold=100)
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        with caplog.at_level(logging.WARNING, logger="src.api.middleware"):
+            response = await client.get("/budget-test/users/u1/items", params={"n": 4})
+
+    assert response.headers["x-db-query-count"] == "4"
+    assert response.headers["x-db-repeated-statements"] == "4"
+    assert float(response.headers["x-db-query-time-ms"]) >= 0
+    assert "Query budget exceeded" in caplog.records[0].getMessage()
+    with pytest.raises(AssertionError, match="executed 4 statements"):
+        assert_max_queries(response, 3)
+
+
+@pytest.mark.asyncio
+async def test_notification_poll_stays_within_one_query(engine, session_factory, assert_max_queries):
+    install_query_metrics(engine)
+
+    def get_test_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    main_app.dependency_overrides[get_db] = get_test_db
+    try:
+        async with httpx.AsyncClient(app=main_app, base_url="http://test") as client:
+            response = await client.get("/api/v1/notifications/u1")
+    finally:
+        main_app.dependency_overrides.pop(get_db)
+
+    assert response.status_code == 200
+    assert assert_max_queries(response, 1) == 1
@@ -0,0 +1,153 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.api.middleware import RateLimitMiddleware, TokenBucket
+from src.models.operator import Operator
+from src.utils.loop_lag import LoopLagMonitor
+from src.utils.operator_index import hash_api_key, operator_key_index
+
+
+def _build_app(**limits):
+    app = FastAPI()
+
+    @app.get("/api/v1/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/api/v1/users/{user_id}/limits")
+    async def user_limits(user_id: str):
+        return {"user_id": user_id}
+
+    @app.get("/api/v1/slow")
+    async def slow():
+        await asyncio.sleep(0.05)
+        return {"ok": True}
+
+    middleware = RateLimitMiddleware(app, **limits)
+    return middleware
+
+
+def _client(app):
+    return httpx.AsyncClient(app=app, base_url="http://test")
+
+
+def test_token_bucket_refills_at_rate():
+    bucket = TokenBucket(rate=10, capacity=2, now=0.0)
+    assert bucket.take(0.0) == 0
+    assert bucket.take(0.0) == 0
+    assert bucket.take(0.0) == pytest.approx(0.1)
+    assert bucket.take(0.1) == 0
+    assert bucket.is_idle(1.0)
+
+
+@pytest.mark.asyncio
+async def test_rejects_with_retry_after_once_burst_is_spent():
+    app = _build_app(anonymous_rps=0.5, anonymous_burst=3, user_rps=100, user_burst=100)
+    async with _client(app) as client:
+        codes = [(await client.get("/api/v1/ping")).status_code for _ in range(4)]
+        rejected = await client.get("/api/v1/ping")
+        health = await client.get("/api/v1/health")
+
+    assert codes == [200, 200, 200, 429]
+    assert rejected.headers["retry-after"] == "2"
+    assert rejected.json()["error"] == "Rate limit exceeded"
+    assert health.status_code == 404  # exempt path reaches the app
+    assert app.rejected == 2
+
+
+@pytest.mark.asyncio
+async def test_user_buckets_are_separate_per_user():
+    app = _build_app(operator_rps=100, operator_burst=100, user_rps=0.1, user_burst=1)
+    async with _client(app) as client:
+        first = await client.get("/api/v1/users/u1/limits")
+        second = await client.get("/api/v1/users/u1/limits")
+        other = await client.get("/api/v1/ping", headers={"X-User-ID": "u2"})
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert other.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_operator_limits_come_from_settings_and_compliance_level():
+    operator_key_index.load([
+        Operator(operator_id="op-premium", name="P", api_key_hash=hash_api_key("premium-key"),
+                 is_active=True, compliance_level="premium"),
+        Operator(operator_id="op-custom", name="C", api_key_hash=hash_api_key("custom-key"),
+                 is_active=True, settings={"rate_limit": {"burst": 1, "requests_per_second": 0.1}})
+    ])
+    app = _build_app(operator_rps=1, operator_burst=2, user_rps=100, user_burst=100)
+    try:
+        async with _client(app) as client:
+            premium = [(await client.get("/api/v1/ping", headers={"X-API-Key": "premium-key"})).status_code
+                       for _ in range(10)]
+            custom = [(await client.get("/api/v1/ping", headers={"X-API-Key": "custom-key"})).status_code
+                      for _ in range(2)]
+    finally:
+        operator_key_index.load([])
+
+    assert premium == [200] * 10
+    assert custom == [200, 429]
+
+
+@pytest.mark.asyncio
+async def test_anonymous_clients_are_limited_per_forwarded_address_behind_trusted_proxies():
+    app = _build_app(operator_rps=100, operator_burst=100, anonymous_rps=0.1, anonymous_burst=1,
+                     user_rps=100, user_burst=100, trusted_proxies=["127.0.0.0/8"])
+    proxied = httpx.ASGITransport(app=app, client=("127.0.0.1", 5000))
+    direct = httpx.ASGITransport(app=app, client=("203.0.113.9", 5000))
+    async with httpx.AsyncClient(transport=proxied, base_url="http://test") as proxy, \
+            httpx.AsyncClient(transport=direct, base_url="http://test") as spoofer:
+        first = await proxy.get("/api/v1/ping", headers={"X-Forwarded-For": "198.51.100.1"})
+        second = await proxy.get("/api/v1/ping", headers={"X-Forwarded-For": "198.51.100.2, 127.0.0.2"})
+        repeat = await proxy.get("/api/v1/ping", headers={"X-Forwarded-For": "198.51.100.1"})
+        # X-Forwarded-For from an untrusted peer is ignored
+        spoofed = [(await spoofer.get("/api/v1/ping", headers={"X-Forwarded-For": f"10.0.0.{n}"})).status_code
+                   for n in range(2)]
+
+    assert (first.status_code, second.status_code, repeat.status_code) == (200, 200, 429)
+    assert spoofed == [200, 429]
+
+
+@pytest.mark.asyncio
+async def test_flooding_new_user_ids_does_not_reset_active_limits():
+    app = _build_app(anonymous_rps=1000, anonymous_burst=1000, user_rps=0.01, user_burst=1, max_buckets=10)
+    async with _client(app) as client:
+        first = await client.get("/api/v1/ping", headers={"X-User-ID": "victim"})
+        for n in range(30):
+            await client.get("/api/v1/ping", headers={"X-User-ID": f"flood{n}"})
+            if n % 5 == 0:
+                assert (await client.get("/api/v1/ping", headers={"X-User-ID": "victim"})).status_code == 429
+
+    assert first.status_code == 200
+    assert len(app._user_buckets) <= 10
+
+
+@pytest.mark.asyncio
+async def test_sheds_when_too_many_requests_are_in_flight():
+    app = _build_app(operator_rps=100, operator_burst=100, user_rps=100, user_burst=100, max_in_flight=2)
+    async with _client(app) as client:
+        responses = await asyncio.gather(*[client.get("/api/v1/slow") for _ in range(4)])
+
+    codes = sorted(r.status_code for r in responses)
+    assert codes == [200, 200, 429, 429]
+    assert app.shed == 2
+    assert app.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_sheds_when_event_loop_lags():
+    monitor = LoopLagMonitor()
+    monitor.lag = 1.0
+    app = _build_app(lag_threshold_ms=100, lag_monitor=monitor)
+    async with _client(app) as client:
+        lagging = await client.get("/api/v1/ping")
+        monitor.lag = 0.0
+        recovered = await client.get("/api/v1/ping")
+
+    assert lagging.status_code == 429
+    assert lagging.headers["retry-after"] == "2"
+    assert recovered.status_code == 200
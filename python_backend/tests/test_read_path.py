@@ -0,0 +1,39 @@
+import json
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from benchmarks.bench_read_path import current_paths, legacy_paths, seed
+from src.api import responses
+from src.api.responses import FastJSONResponse
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    seed(engine, 25)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_row_dtos_encode_exactly_like_the_orm_to_dict_path(db):
+    legacy = legacy_paths(db, 25)
+    current = current_paths(db, 25)
+
+    for name in legacy:
+        expected = jsonable_encoder(legacy[name]())
+        assert json.loads(FastJSONResponse(current[name]()).body) == expected, name
+    assert len(expected['history']) == 25
+
+
+def test_stdlib_fallback_matches_orjson(db, monkeypatch):
+    content = current_paths(db, 25)['notifications']()
+    fast = FastJSONResponse(content).body
+
+    monkeypatch.setattr(responses, 'orjson', None)
+
+    assert json.loads(FastJSONResponse(content).body) == json.loads(fast)
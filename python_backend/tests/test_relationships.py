@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from benchmarks.bench_round_trips import InstantBlockchainService
+from src.config.database import Base
+from src.models.payment import Payment, PaymentStatus
+from src.models.session import Session as GamingSession
+from src.models.user import User
+from src.models.wallet import Wallet
+from src.services.payment_service import PaymentService
+from src.services.session_service import SessionService
+from src.services.smart_contract_service import SmartContractService
+from src.services.user_service import UserService
+from src.services.wallet_service import WalletService
+from src.utils.cache import clear_caches
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    clear_caches()
+    return engine
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    user = User(wallet_address='addr1')
+    session.add(user)
+    session.commit()
+    session.add(Wallet(wallet_id='w1', user_id=str(user.id), concordium_address='addr1', balance=5.0))
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def statements(engine):
+    executed = []
+    event.listen(engine, 'before_cursor_execute', lambda conn, cursor, statement, *args: executed.append(statement))
+    return executed
+
+
+def test_all_models_share_one_metadata():
+    assert {'users', 'wallets', 'sessions', 'payments', 'notifications', 'audit_logs', 'operators'} <= set(Base.metadata.tables)
+
+
+@pytest.mark.asyncio
+async def test_account_is_one_joined_query(db, statements):
+    now = datetime.utcnow()
+    db.add(GamingSession(session_id='s1', user_id='1', platform_id='casino', status='ended', start_time=now - timedelta(hours=2)))
+    db.add(GamingSession(session_id='s2', user_id='1', platform_id='casino', status='active', start_time=now))
+    db.commit()
+    db.expunge_all()
+    statements.clear()
+
+    result = await UserService(db, blockchain_service=InstantBlockchainService()).get_account('1')
+
+    assert len(statements) == 1
+    assert result['wallet']['wallet_id'] == 'w1'
+    assert result['active_session']['session_id'] == 's2'
+    assert [s.session_id for s in db.get(User, 1).sessions] == ['s2', 's1']
+    assert db.get(Wallet, 'w1').user.wallet_address == 'addr1'
+
+
+@pytest.mark.asyncio
+async def test_start_session_reads_sessions_once(db, statements):
+    service = SessionService(db)
+    db.add(GamingSession(
+        session_id='old', user_id='1', platform_id='casino', status='ended',
+        start_time=datetime.utcnow() - timedelta(hours=1), end_time=datetime.utcnow() - timedelta(minutes=5)
+    ))
+    db.commit()
+
+    assert 'Mandatory break' in (await service.start_session('1', 'casino'))['message']
+
+    db.query(GamingSession).update({'end_time': datetime.utcnow() - timedelta(hours=1)})
+    db.commit()
+    statements.clear()
+    started = await service.start_session('1', 'casino')
+    assert started['success']
+    assert sum(s.startswith('SELECT') for s in statements) == 2  # current session, then refresh after insert
+
+    rejected = await service.start_session('1', 'casino')
+    assert rejected['session_id'] == started['session']['session_id']
+
+
+@pytest.mark.asyncio
+async def test_deposit_commits_payment_and_balance_together(db, engine):
+    commits = []
+    event.listen(engine, 'commit', lambda conn: commits.append(conn))
+    blockchain = InstantBlockchainService()
+    service = PaymentService(
+        db,
+        wallet_service=WalletService(db, blockchain_service=blockchain),
+        blockchain_service=blockchain,
+        contract_service=SmartContractService()
+    )
+
+    result = await service.deposit('1', 10.0)
+
+    assert result['success']
+    assert len(commits) == 2  # pending payment, then completion + balance
+    assert result['payment']['status'] == PaymentStatus.COMPLETED
+    assert db.query(Payment).one().tx_hash == 'ab' * 32
+    assert db.query(Wallet).one().balance == 15.0
@@ -0,0 +1,131 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models.notification import Notification, NotificationStatus, NotificationType
+from src.models.scheduled_notification import ScheduledNotification, ScheduledStatus
+from src.services.notification_delivery_service import NotificationDeliveryPool
+from src.services.notification_service import NotificationService
+from src.services.reminder_service import ReminderScheduler
+from src.utils.notification_hub import NotificationHub
+
+
+@pytest.fixture
+def delivery(session_factory):
+    delivery = NotificationDeliveryPool(session_factory, channels=[])
+    delivery.woken = 0
+
+    def wake():
+        delivery.woken += 1
+
+    delivery.wake = wake
+    return delivery
+
+
+def _scheduler(session_factory, delivery, **options):
+    return ReminderScheduler(session_factory, hub=NotificationHub(), delivery=delivery, **options)
+
+
+@pytest.mark.asyncio
+async def test_reminder_fires_once_when_due(session_factory, delivery):
+    scheduler = _scheduler(session_factory, delivery)
+    service = NotificationService(session_factory(), hub=NotificationHub(), delivery=delivery, scheduler=scheduler)
+    now = datetime.utcnow()
+    result = await service.schedule_reminder('u1', 'hydrate', now + timedelta(minutes=2), {'message': 'Drink some water'})
+    schedule_id = result['scheduled']['schedule_id']
+
+    assert (await service.get_unread_count('u1'))['unread_count'] == 0
+    assert scheduler.run_once(now) == {'success': True, 'loaded': 1, 'fired': 0, 'expired': 0}
+    assert scheduler.run_once(now + timedelta(minutes=2)) == {'success': True, 'loaded': 0, 'fired': 1, 'expired': 0}
+
+    db = session_factory()
+    notification = db.get(Notification, schedule_id)
+    assert notification.title == 'Reminder: hydrate' and notification.message == 'Drink some water'
+    assert notification.status == NotificationStatus.PENDING
+    assert db.get(ScheduledNotification, schedule_id).status == ScheduledStatus.FIRED
+    assert delivery.woken == 1
+
+    # A restarted process, or another worker, finds nothing left to fire
+    other = _scheduler(session_factory, delivery)
+    assert other.run_once(now + timedelta(minutes=11))['fired'] == 0
+
+
+@pytest.mark.asyncio
+async def test_two_schedulers_holding_the_same_window_fire_it_once(session_factory, delivery):
+    service = NotificationService(session_factory(), delivery=delivery, scheduler=_scheduler(session_factory, delivery))
+    now = datetime.utcnow()
+    for n in range(5):
+        await service.schedule_notification(f"u{n}", NotificationType.WELLNESS_TIP, now + timedelta(seconds=n))
+
+    first, second = _scheduler(session_factory, delivery), _scheduler(session_factory, delivery)
+    first.run_once(now - timedelta(seconds=1))
+    second.run_once(now - timedelta(seconds=1))
+    assert first.pending == second.pending == 5
+
+    later = now + timedelta(seconds=10)
+    assert first.run_once(later)['fired'] + second.run_once(later)['fired'] == 5
+    assert session_factory().query(Notification).count() == 5
+
+
+@pytest.mark.asyncio
+async def test_window_is_capped_and_refilled(session_factory, delivery):
+    scheduler = _scheduler(session_factory, delivery, window_seconds=60, max_loaded=3, batch_size=2)
+    service = NotificationService(session_factory(), delivery=delivery, scheduler=scheduler)
+    now = datetime.utcnow()
+    for n in range(7):
+        await service.schedule_notification('u1', NotificationType.BREAK_REMINDER, now + timedelta(seconds=n))
+    await service.schedule_notification('u1', NotificationType.BREAK_REMINDER, now + timedelta(days=30))
+
+    assert scheduler.run_once(now - timedelta(seconds=1))['loaded'] == 3
+    fired = 0
+    for _ in range(4):
+        fired += scheduler.run_once(now + timedelta(seconds=10))['fired']
+    assert fired == 7
+    assert scheduler.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_and_long_overdue_reminders_do_not_fire(session_factory, delivery):
+    scheduler = _scheduler(session_factory, delivery, max_lateness_seconds=600)
+    service = NotificationService(session_factory(), delivery=delivery, scheduler=scheduler)
+    now = datetime.utcnow()
+    cooldown_end = now + timedelta(hours=3)
+    await service.schedule_cooldown_ending('u1', cooldown_end)
+    replacement = await service.schedule_cooldown_ending('u1', cooldown_end + timedelta(hours=1))
+    await service.schedule_self_exclusion_reminder('u2', now + timedelta(days=30))
+    await service.schedule_notification('u3', NotificationType.WELLNESS_TIP, now - timedelta(hours=2))
+    await service.cancel_scheduled('u2')
+
+    assert replacement['scheduled']['due_at'] == cooldown_end.isoformat()
+    assert scheduler.run_once(now)['expired'] == 1
+    assert scheduler.run_once(cooldown_end)['fired'] == 1
+
+    statuses = {
+        (row.user_id, row.status) for row in session_factory().query(ScheduledNotification)
+    }
+    assert statuses == {
+        ('u1', ScheduledStatus.CANCELLED), ('u1', ScheduledStatus.FIRED),
+        ('u2', ScheduledStatus.CANCELLED), ('u3', ScheduledStatus.EXPIRED)
+    }
+    fired = session_factory().query(Notification).one()
+    assert fired.notification_type == NotificationType.COOLDOWN_ENDING
+
+
+@pytest.mark.asyncio
+async def test_started_scheduler_wakes_for_a_new_earlier_reminder(session_factory, delivery):
+    scheduler = _scheduler(session_factory, delivery, window_seconds=60)
+    scheduler.start()
+    try:
+        await asyncio.sleep(0.02)  # loads an empty window and sleeps until it ends
+        service = NotificationService(session_factory(), delivery=delivery, scheduler=scheduler)
+        result = await service.schedule_notification(
+            'u1', NotificationType.REALITY_CHECK, datetime.utcnow() + timedelta(milliseconds=50)
+        )
+        for _ in range(100):
+            if delivery.woken:
+                break
+            await asyncio.sleep(0.01)
+        assert session_factory().get(Notification, result['scheduled']['schedule_id']) is not None
+    finally:
+        await scheduler.stop()
@@ -0,0 +1,54 @@
+import httpx
+import pytest
+from sqlalchemy import create_engine, text
+
+from src.config.settings import settings
+from src.main import app as main_app
+from src.utils.slow_query_log import SlowQueryLog, fingerprint, install_slow_query_log, normalise_statement, slow_query_log
+
+
+def test_fingerprint_ignores_literals_placeholders_and_in_list_length():
+    assert normalise_statement("SELECT * FROM t WHERE a = 'x'  AND b IN (1, 2, 3)") == "SELECT * FROM t WHERE a = ? AND b IN (?, ...)"
+    assert fingerprint("SELECT * FROM t WHERE id IN (?, ?)") == fingerprint("SELECT * FROM t WHERE id IN (:a, :b, :c)")
+    assert fingerprint("SELECT * FROM t1 WHERE id = 5") != fingerprint("SELECT * FROM t2 WHERE id = 5")
+
+
+def test_slow_statements_are_grouped_with_parameter_shape_and_plan():
+    engine = create_engine("sqlite://")
+    log = SlowQueryLog(threshold_ms=0)
+    install_slow_query_log(engine, log)
+
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TABLE bets (id INTEGER PRIMARY KEY, user_id TEXT, amount REAL)"))
+        for user_id in ('u1', 'u2', 'u3'):
+            conn.execute(text("SELECT SUM(amount) FROM bets WHERE user_id = :user_id"), {"user_id": user_id})
+
+    [entry] = [e for e in log.entries(sort='count') if e['statement'].startswith('SELECT')]
+    assert entry['count'] == 3
+    assert entry['statement'] == "SELECT SUM(amount) FROM bets WHERE user_id = ?"
+    assert entry['parameter_shape'] == ['str']
+    assert entry['plan'] == ['SCAN bets']
+    assert 'u1' not in str(entry)
+
+
+@pytest.mark.asyncio
+async def test_admin_endpoint_lists_slow_queries():
+    engine = create_engine("sqlite://")
+    slow_query_log.clear()
+    threshold = slow_query_log.threshold
+    slow_query_log.threshold = 0
+    install_slow_query_log(engine, slow_query_log)
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        async with httpx.AsyncClient(app=main_app, base_url="http://test") as client:
+            listing = await client.get("/api/v1/slow-queries", headers={"X-API-Key": settings.API_KEY})
+            key = listing.json()['queries'][0]['fingerprint']
+            detail = await client.get(f"/api/v1/slow-queries/{key}", headers={"X-API-Key": settings.API_KEY})
+            unauthorised = await client.get("/api/v1/slow-queries")
+    finally:
+        slow_query_log.threshold = threshold
+        slow_query_log.clear()
+
+    assert detail.json()['query']['statement'] == 'SELECT ?'
+    assert unauthorised.status_code == 401
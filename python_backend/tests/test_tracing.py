@@ -0,0 +1,147 @@
+import json
+
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.config.database import get_db
+from src.main import app as main_app
+from src.models.notification import Notification
+from src.utils.tracing import FileSpanExporter, Tracer, trace_class, trace_headers, tracer
+
+
+class CollectingExporter:
+    def __init__(self):
+        self.traces = []
+
+    def export(self, spans):
+        self.traces.append(list(spans))
+
+    def shutdown(self):
+        pass
+
+
+@trace_class()
+class Repository:
+    def load(self, key):
+        return {'key': key}
+
+
+@trace_class(kind='client')
+class ChainClient:
+    async def transfer(self):
+        return {'success': False, 'error': 'node unreachable', 'headers': trace_headers()}
+
+
+@trace_class()
+class Service:
+    async def run(self):
+        Repository().load('a')
+        return await ChainClient().transfer()
+
+
+@pytest.mark.asyncio
+async def test_spans_nest_per_request_and_record_failures():
+    exporter = CollectingExporter()
+    local = Tracer(1.0, exporter)
+
+    root = local.start_trace('GET /things')
+    with local.activate(root):
+        result = await Service().run()
+
+    [spans] = exporter.traces
+    by_name = {span.name: span for span in spans}
+    assert by_name['Service.run'].parent_id == root.span_id
+    assert by_name['Repository.load'].parent_id == by_name['Service.run'].span_id
+    assert by_name['ChainClient.transfer'].parent_id == by_name['Service.run'].span_id
+    assert by_name['ChainClient.transfer'].status_message == 'node unreachable'
+    assert result['headers']['traceparent'] == f"00-{root.trace_id}-{by_name['ChainClient.transfer'].span_id}-01"
+    assert all(span.trace_id == root.trace_id for span in spans)
+
+
+@pytest.mark.asyncio
+async def test_unsampled_requests_create_no_spans_unless_the_caller_sampled():
+    local = Tracer(0.0, CollectingExporter())
+
+    assert local.start_trace('GET /a') is None
+    assert await Service().run()  # no active trace: plain calls
+    continued = local.start_trace('GET /a', traceparent='00-' + 'ab' * 16 + '-' + 'cd' * 8 + '-01')
+    assert continued.trace_id == 'ab' * 16
+    assert continued.parent_id == 'cd' * 8
+    assert local.start_trace('GET /a', traceparent='00-' + 'ab' * 16 + '-' + 'cd' * 8 + '-00') is None
+
+
+def test_file_exporter_writes_rotated_otlp_json_lines(tmp_path):
+    path = tmp_path / 'traces' / 'spans.jsonl'
+    exporter = FileSpanExporter(str(path), max_bytes=2000, backup_count=2, service_name='backend')
+    local = Tracer(1.0, exporter)
+    for _ in range(20):
+        root = local.start_trace('GET /a')
+        with local.activate(root):
+            with local.span('child', user_id='u1'):
+                pass
+    exporter.shutdown()
+
+    line = json.loads(path.read_text().splitlines()[0])
+    resource_spans = line['resourceSpans'][0]
+    assert resource_spans['resource']['attributes'][0] == {'key': 'service.name', 'value': {'stringValue': 'backend'}}
+    spans = resource_spans['scopeSpans'][0]['spans']
+    assert [span['name'] for span in spans] == ['GET /a', 'child']
+    assert spans[1]['parentSpanId'] == spans[0]['spanId']
+    assert spans[1]['attributes'] == [{'key': 'user_id', 'value': {'stringValue': 'u1'}}]
+    assert (tmp_path / 'traces' / 'spans.jsonl.1').exists()
+
+
+def test_file_exporters_write_only_their_own_spans(tmp_path):
+    first = FileSpanExporter(str(tmp_path / 'a.jsonl'), max_bytes=10 ** 6, backup_count=1, service_name='a')
+    second = FileSpanExporter(str(tmp_path / 'b.jsonl'), max_bytes=10 ** 6, backup_count=1, service_name='b')
+    for exporter, name in ((first, 'GET /a'), (second, 'GET /b')):
+        local = Tracer(1.0, exporter)
+        with local.activate(local.start_trace(name)):
+            pass
+    first.shutdown()
+    local = Tracer(1.0, second)
+    with local.activate(local.start_trace('GET /b2')):
+        pass
+    second.shutdown()
+
+    def names(path):
+        return [json.loads(line)['resourceSpans'][0]['scopeSpans'][0]['spans'][0]['name']
+                for line in path.read_text().splitlines()]
+
+    assert names(tmp_path / 'a.jsonl') == ['GET /a']
+    assert names(tmp_path / 'b.jsonl') == ['GET /b', 'GET /b2']
+
+
+@pytest.mark.asyncio
+async def test_middleware_traces_route_service_and_repository(monkeypatch):
+    exporter = CollectingExporter()
+    monkeypatch.setattr(tracer, 'sample_rate', 1.0)
+    monkeypatch.setattr(tracer, 'exporter', exporter)
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Notification.__table__.create(engine)
+    SessionLocal = sessionmaker(bind=engine)
+
+    def get_test_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    main_app.dependency_overrides[get_db] = get_test_db
+    try:
+        async with httpx.AsyncClient(app=main_app, base_url="http://test") as client:
+            response = await client.get("/api/v1/notifications/u1")
+    finally:
+        main_app.dependency_overrides.pop(get_db)
+
+    [spans] = exporter.traces
+    root, service, repository = spans
+    assert response.headers['x-trace-id'] == root.trace_id
+    assert root.name == 'GET /api/v1/notifications/{user_id}'
+    assert root.attributes['http.status_code'] == 200
+    assert service.name == 'NotificationService.get_user_notifications'
+    assert repository.parent_id == service.span_id
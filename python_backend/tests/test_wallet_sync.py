@@ -0,0 +1,129 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.models.payment import Payment, PaymentType, PaymentStatus
+from src.models.wallet import Wallet
+from src.services.wallet_sync_service import WalletSyncScheduler
+
+
+class FakeBlockchainService:
+    def __init__(self, balances, delay=0.01):
+        self.balances = balances
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = []
+
+    async def get_wallet_balance(self, concordium_address, currency="CCD"):
+        self.calls.append(concordium_address)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        if concordium_address not in self.balances:
+            return {'success': False, 'error': 'unavailable'}
+        return {'success': True, 'balance': self.balances[concordium_address]}
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Wallet.metadata.create_all(bind=engine)
+    Payment.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def _add_wallet(db, n, synced_at=None, balance=1.0):
+    db.add(Wallet(
+        wallet_id=f"w{n}",
+        user_id=f"u{n}",
+        concordium_address=f"addr{n}",
+        balance=balance,
+        last_synced_at=synced_at
+    ))
+
+
+@pytest.mark.asyncio
+async def test_refreshes_only_stale_wallets(session_factory):
+    db = session_factory()
+    now = datetime.now(timezone.utc)
+    _add_wallet(db, 1)
+    _add_wallet(db, 2, synced_at=now - timedelta(hours=1))
+    _add_wallet(db, 3, synced_at=now)
+    db.commit()
+
+    chain = FakeBlockchainService({'addr1': 10.0, 'addr2': 20.0, 'addr3': 30.0})
+    scheduler = WalletSyncScheduler(session_factory, chain, staleness_seconds=300)
+    result = await scheduler.run_once()
+
+    assert result == {'success': True, 'checked': 2, 'updated': 2, 'failed': 0}
+    assert sorted(chain.calls) == ['addr1', 'addr2']
+    db.expire_all()
+    balances = {w.wallet_id: w.balance for w in db.query(Wallet).all()}
+    assert balances == {'w1': 10.0, 'w2': 20.0, 'w3': 1.0}
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_fetch_keeps_cached_balance(session_factory):
+    db = session_factory()
+    _add_wallet(db, 1, balance=5.0)
+    db.commit()
+
+    scheduler = WalletSyncScheduler(session_factory, FakeBlockchainService({}))
+    result = await scheduler.run_once()
+
+    assert result['failed'] == 1
+    db.expire_all()
+    wallet = db.query(Wallet).one()
+    assert wallet.balance == 5.0
+    assert wallet.last_synced_at is None
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded_and_batches_commit(session_factory):
+    db = session_factory()
+    for n in range(25):
+        _add_wallet(db, n)
+    db.commit()
+
+    chain = FakeBlockchainService({f"addr{n}": float(n) for n in range(25)})
+    scheduler = WalletSyncScheduler(session_factory, chain, concurrency=4, batch_size=10)
+    result = await scheduler.run_once()
+
+    assert result['updated'] == 25
+    assert chain.max_in_flight <= 4
+    db.close()
+
+
+def test_recently_active_wallets_come_first(session_factory):
+    db = session_factory()
+    now = datetime.now(timezone.utc)
+    for n in range(3):
+        _add_wallet(db, n)
+    db.add(Payment(
+        payment_id="p1",
+        user_id="u2",
+        payment_type=PaymentType.DEPOSIT,
+        amount=1.0,
+        status=PaymentStatus.COMPLETED,
+        created_at=now
+    ))
+    db.commit()
+
+    scheduler = WalletSyncScheduler(session_factory, FakeBlockchainService({}))
+    stale = scheduler._get_stale_wallets(db)
+
+    assert stale[0] == ("w2", "u2", "addr2")
+    assert len(stale) == 3
+    db.close()